@@ -71,6 +71,9 @@ class MyData(wx.App):
         parser.add_argument("-l", "--loglevel", help="set logging verbosity")
         parser.add_argument("--autoexit", action="store_true",
                             help="Exit upon completion of scans and uploads")
+        parser.add_argument("--headless", action="store_true",
+                            help="Run scheduled scans and uploads without "
+                            "a GUI, e.g. as a service on a server")
         args, _ = parser.parse_known_args(argv[1:])
         if args.version:
             sys.stdout.write("MyData %s (%s)\n" % (VERSION, LATEST_COMMIT))
@@ -247,7 +250,11 @@ def Run(argv):
     """
     Main function for launching MyData.
     """
-    app = MyData(argv)
+    if "--headless" in argv[1:]:
+        from .daemon import MyDataDaemon
+        app = MyDataDaemon(argv)
+    else:
+        app = MyData(argv)
     app.MainLoop()
 
 
@@ -0,0 +1,187 @@
+"""
+An asyncio backend for datafile verifications.
+
+By default, each datafile lookup is performed by one of the verification
+worker threads (SETTINGS.miscellaneous.maxVerificationThreads), which is
+blocked until the MyTardis server responds.  When async_verifications is
+enabled in MyData.cfg, lookups are performed by a single event loop thread
+instead, which keeps up to max_concurrent_lookups lookups in flight over
+async_lookup_connections keep-alive connections (using aiohttp, see
+utils/asynchttp.py).
+
+Each datafile is still represented by a VerifyDatafileRunnable, so the
+verifications view is updated with the same status transitions and the
+same events are posted as with the worker threads.  The steps before and
+after each lookup (cache lookups, and the follow-up requests for files
+found on the server without verified replicas) are run on a small pool of
+threads, so they don't block the event loop.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import traceback
+
+from ..settings import SETTINGS
+from ..utils.asynchttp import AsyncSession
+from ..utils.exceptions import DoesNotExist
+from ..logs import logger
+
+
+class AsyncVerificationEngine(object):
+    """
+    Runs VerifyDatafileRunnable lookups from an asyncio event loop.
+
+    Usage:
+
+        engine = AsyncVerificationEngine()
+        engine.Start()
+        engine.Submit(VerifyDatafileRunnable(folderModel, dataFileIndex))
+        ...
+        engine.Shutdown()
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self):
+        self.loop = None
+        self.thread = None
+        self.executor = None
+        self.session = None
+        self.semaphore = None
+        self.pending = set()
+        self.pendingLock = threading.Lock()
+        self.idle = threading.Event()
+        self.idle.set()
+
+    def Start(self):
+        """
+        Start the event loop thread.
+        """
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(
+            max_workers=SETTINGS.miscellaneous.maxVerificationThreads,
+            thread_name_prefix="VerificationWorkerThread")
+        started = threading.Event()
+        self.thread = threading.Thread(
+            name="AsyncVerificationThread", target=self.RunEventLoop,
+            args=[started])
+        self.thread.daemon = True
+        self.thread.start()
+        started.wait()
+
+    def RunEventLoop(self, started):
+        """
+        Run the event loop until Shutdown is called.
+        """
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.CreateSession())
+        self.loop.call_soon(started.set)
+        try:
+            self.loop.run_forever()
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(
+                asyncio.gather(*tasks, return_exceptions=True))
+        finally:
+            self.loop.run_until_complete(self.session.Close())
+            self.loop.close()
+
+    async def CreateSession(self):
+        """
+        Create the HTTP session and the semaphore limiting the number of
+        lookups in flight, from within the event loop.
+        """
+        self.session = AsyncSession(
+            maxConnections=SETTINGS.miscellaneous.asyncLookupConnections,
+            connectTimeout=SETTINGS.miscellaneous.connectionTimeout,
+            readTimeout=SETTINGS.miscellaneous.httpReadTimeout,
+            maxRetries=SETTINGS.miscellaneous.httpMaxRetries,
+            retryBackoff=SETTINGS.miscellaneous.httpRetryBackoff)
+        self.semaphore = asyncio.Semaphore(
+            SETTINGS.miscellaneous.maxConcurrentLookups)
+
+    def Submit(self, verifyDatafileRunnable):
+        """
+        Schedule a VerifyDatafileRunnable's lookup.  This can be called
+        from any thread, and returns immediately.
+        """
+        if not self.loop:
+            return
+        future = asyncio.run_coroutine_threadsafe(
+            self.Verify(verifyDatafileRunnable), self.loop)
+        with self.pendingLock:
+            self.pending.add(future)
+            self.idle.clear()
+        future.add_done_callback(self.OnVerificationDone)
+
+    def OnVerificationDone(self, future):
+        """
+        Called when a lookup and its follow-ups have finished.
+        """
+        with self.pendingLock:
+            self.pending.discard(future)
+            if not self.pending:
+                self.idle.set()
+        if not future.cancelled() and future.exception():
+            logger.error(
+                "".join(traceback.format_exception(
+                    type(future.exception()), future.exception(),
+                    future.exception().__traceback__)))
+
+    async def RunInExecutor(self, func, *args):
+        """
+        Run a blocking step of a verification on the thread pool.
+        """
+        return await self.loop.run_in_executor(self.executor, func, *args)
+
+    async def Verify(self, verifyDatafileRunnable):
+        """
+        Look up one data file on the MyTardis server, and then handle the
+        result on the thread pool, as VerifyDatafileRunnable.Run does.
+        """
+        runnable = verifyDatafileRunnable
+        async with self.semaphore:
+            if not await self.RunInExecutor(runnable.PrepareLookup):
+                return
+            try:
+                existingDatafile = runnable.GetBulkLookupResult()
+            except DoesNotExist:
+                await self.RunInExecutor(runnable.HandleNonExistentDataFile)
+                return
+            if not existingDatafile:
+                try:
+                    response = await self.session.Get(
+                        runnable.GetLookupUrl(),
+                        headers=SETTINGS.defaultHeaders)
+                    existingDatafile = runnable.ParseLookupResponse(response)
+                except DoesNotExist:
+                    await self.RunInExecutor(
+                        runnable.HandleNonExistentDataFile)
+                    return
+                except Exception:  # pylint: disable=broad-except
+                    runnable.HandleLookupFailure()
+                    return
+        await self.RunInExecutor(runnable.HandleLookupResult, existingDatafile)
+
+    def Join(self, timeout=None):
+        """
+        Wait until all of the submitted verifications have finished.
+
+        Returns False if the timeout expired first.
+        """
+        return self.idle.wait(timeout)
+
+    def Shutdown(self):
+        """
+        Cancel any verifications which haven't finished, and stop the
+        event loop thread and the thread pool.
+        """
+        if not self.loop:
+            return
+        with self.pendingLock:
+            pending = list(self.pending)
+        for future in pending:
+            future.cancel()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.executor.shutdown(wait=True)
+        self.loop = None
@@ -0,0 +1,62 @@
+"""
+Calculating MD5 checksums of datafiles ahead of their uploads.
+
+When a datafile lookup finds that a file needs to be uploaded, its MD5
+checksum is calculated by one of the checksum worker threads, and then
+its upload task is added to the uploads queue, so that upload threads
+don't need to read each file twice (once to calculate its checksum and
+once to upload it) while other uploads wait in the queue.
+"""
+import os
+import traceback
+
+from ..threads.locks import LOCKS
+from ..threads.dispatcher import GetApp
+from ..logs import logger
+
+
+class ChecksumDatafileRunnable(object):
+    """
+    The Run method of this class provides the functionality of
+    the checksum workers.
+    """
+    def __init__(self, uploadDatafileRunnable):
+        self.uploadDatafileRunnable = uploadDatafileRunnable
+
+    def Run(self):
+        """
+        Calculate the MD5 checksum of the file to be uploaded by
+        self.uploadDatafileRunnable, and then add it to the uploads queue.
+
+        If the checksum can't be calculated here (e.g. because the file
+        has been moved or deleted), the upload task is still added to the
+        uploads queue, and the upload worker will handle it.
+        """
+        foldersController = GetApp().foldersController
+        folderModel = self.uploadDatafileRunnable.folderModel
+        dataFileIndex = self.uploadDatafileRunnable.dataFileIndex
+        try:
+            if foldersController.IsShuttingDown():
+                return
+            dataFilePath = folderModel.GetDataFilePath(dataFileIndex)
+            try:
+                if os.path.exists(dataFilePath) and \
+                        not folderModel.FileIsTooNewToUpload(dataFileIndex):
+                    self.uploadDatafileRunnable.dataFileMd5Sum = \
+                        folderModel.CalculateMd5Sum(
+                            dataFileIndex,
+                            canceledCallback=foldersController.IsShuttingDown)
+            except Exception:  # pylint: disable=broad-except
+                # The upload worker will calculate the checksum instead:
+                logger.warning(
+                    "Couldn't calculate MD5 sum for %s ahead of its "
+                    "upload." % dataFilePath)
+                logger.warning(traceback.format_exc())
+            if foldersController.IsShuttingDown():
+                return
+            foldersController.uploadsQueue.Put(self.uploadDatafileRunnable)
+        finally:
+            # The upload task has now been added to the uploads queue,
+            # so it will be counted there instead:
+            with LOCKS.numChecksumsPending:
+                foldersController.numChecksumsPending -= 1
@@ -6,12 +6,10 @@ import os
 import sys
 import time
 import threading
-from queue import Queue
 import traceback
 import datetime
 
 import requests
-from requests.exceptions import HTTPError
 
 import wx
 import wx.lib.newevent
@@ -24,18 +22,29 @@ from ..events import PostEvent
 from ..events.stop import CheckIfShouldAbort
 from ..events import MYDATA_THREADS
 from ..settings import SETTINGS
-from ..models.experiment import ExperimentModel
-from ..models.dataset import DatasetModel
 from ..logs import logger
 from ..logs.testrun import LogTestRunSummary
 from ..utils import EndBusyCursorIfRequired
 from ..utils import SafeStr
 from ..utils.exceptions import StorageBoxAttributeNotFound
+from ..utils.scanindex import SCAN_INDEX
+from ..utils.uploadprocesses import UPLOAD_PROCESSES
 from ..threads.flags import FLAGS
 from ..threads.locks import LOCKS
+from ..threads.dispatcher import GetApp
+from ..threads.dispatcher import IsMainLoopRunning
+from ..threads.dispatcher import CallAfter
+from ..threads.dispatcher import NewTimer
 from .uploads import UploadMethod
 from .uploads import UploadDatafileRunnable
+from .uploads import ShouldHashWhileUploading
+from .checksums import ChecksumDatafileRunnable
 from .verifications import VerifyDatafileRunnable
+from .queues import WorkerQueue
+from .queues import VerificationsQueue
+from .resolvers import FolderResolver
+from .resolvers import LookupDatafilesInBulk
+from .resolvers import GetExperimentErrorMessage
 
 
 class FoldersController(object):
@@ -57,19 +66,21 @@ class FoldersController(object):
 
         self.finishedCountingVerifications = dict()
         self.finishedScanningForDatasetFolders = threading.Event()
-        self.verificationsQueue = None
-        self.uploadsQueue = None
+        self.changedFoldersOnly = False
+        self.numChecksumsPending = 0
         self.numVerificationsToBePerformed = 0
         self.uploadsAcknowledged = 0
         self.uploadMethod = UploadMethod.HTTP_POST
+        self.folderResolver = FolderResolver()
 
         # These will get overwritten in InitForUploads, but we need
         # to initialize them here, so that ShutDownUploadThreads()
         # can be called.
-        self.numVerificationWorkerThreads = 0
-        self.verificationWorkerThreads = []
-        self.numUploadWorkerThreads = 0
-        self.uploadWorkerThreads = []
+        self.verificationsQueue = VerificationsQueue(self.IsShuttingDown)
+        self.checksumsQueue = WorkerQueue(
+            "ChecksumWorkerThread", 0, self.IsShuttingDown)
+        self.uploadsQueue = WorkerQueue(
+            "UploadWorkerThread", 0, self.IsShuttingDown)
 
         self.countCompletedTimer = None
 
@@ -198,43 +209,90 @@ class FoldersController(object):
         uploadDatafileRunnable = UploadDatafileRunnable(
             folderModel, dfi, existingUnverifiedDatafile,
             verificationModel, bytesUploadedPreviously)
-        if wx.PyApp.IsMainLoopRunning():
-            self.uploadsQueue.put(uploadDatafileRunnable)
-        else:
+        if not IsMainLoopRunning():
             uploadDatafileRunnable.Run()
+        elif self.ShouldCalculateMd5SumAheadOfUpload(
+                existingUnverifiedDatafile):
+            with LOCKS.numChecksumsPending:
+                self.numChecksumsPending += 1
+            self.checksumsQueue.Put(
+                ChecksumDatafileRunnable(uploadDatafileRunnable))
+        else:
+            self.uploadsQueue.Put(uploadDatafileRunnable)
         self.CountCompletedUploadsAndVerifications(event=None)
 
-    def InitForUploads(self):
+    def ShouldCalculateMd5SumAheadOfUpload(self, existingUnverifiedDatafile):
+        """
+        Determine whether an upload task should be passed to the checksum
+        workers before being added to the uploads queue.
+
+        An MD5 checksum is not required for re-uploading an existing
+        unverified DataFile via staging, because the DataFile record
+        already has one, or if the checksum will be calculated while
+        uploading.
+        """
+        if self.checksumsQueue.numWorkerThreads < 1 or \
+                SETTINGS.miscellaneous.fakeMd5Sum or \
+                ShouldHashWhileUploading(self.uploadMethod):
+            return False
+        return self.uploadMethod == UploadMethod.HTTP_POST or \
+            not existingUnverifiedDatafile
+
+    def InitForUploads(self, changedFolders=None):
         """
         Initialize folders controller in preparation for uploads
+
+        :param changedFolders: The dataset folders to upload changes from,
+            when uploading changes found by the Continuous schedule's
+            folder watcher, rather than rescanning all folders.  Only these
+            folders' files are listed again; the other folders' upload
+            counts are kept.
         """
         # pylint: disable=too-many-branches
         self.InitializeStatusFlags()
         mydata.views.messages.LAST_ERROR_MESSAGE = None
         mydata.views.messages.LAST_CONFIRMATION_QUESTION = None
-        DATAVIEW_MODELS['folders'].ResetCounts()
+        self.changedFoldersOnly = changedFolders is not None
+        if changedFolders is None:
+            DATAVIEW_MODELS['folders'].ResetCounts()
+        else:
+            for folderModel in changedFolders:
+                folderModel.ResetDataFiles()
+            # The data directory hasn't been rescanned (which would have
+            # loaded the scan index), so load it for walking the changed
+            # folders:
+            if SETTINGS.miscellaneous.cacheFolderScans:
+                SCAN_INDEX.Load(SETTINGS.scanIndexPath,
+                                SETTINGS.miscellaneous.forceFullRescan)
+        # Open the history log first, so that DeleteAllRows can clear the
+        # previous run's history:
+        SETTINGS.InitializeDataViewHistory()
         DATAVIEW_MODELS['verifications'].DeleteAllRows()
         DATAVIEW_MODELS['uploads'].DeleteAllRows()
         DATAVIEW_MODELS['uploads'].SetStartTime(datetime.datetime.now())
-        self.verificationsQueue = Queue()
-        self.numVerificationWorkerThreads = \
-            SETTINGS.miscellaneous.maxVerificationThreads
-        self.verificationWorkerThreads = []
         self.finishedScanningForDatasetFolders = threading.Event()
         self.numVerificationsToBePerformed = 0
         self.uploadsAcknowledged = 0
         self.finishedCountingVerifications = dict()
+        self.folderResolver.InitForUploads()
         SETTINGS.InitializeVerifiedDatafilesCache()
-
-        if wx.PyApp.IsMainLoopRunning():
-            for i in range(self.numVerificationWorkerThreads):
-                thread = threading.Thread(
-                    name="VerificationWorkerThread-%d" % (i + 1),
-                    target=self.VerificationWorker)
-                self.verificationWorkerThreads.append(thread)
-                thread.start()
-        self.uploadsQueue = Queue()
-        self.numUploadWorkerThreads = SETTINGS.advanced.maxUploadThreads
+        SETTINGS.InitializeChecksumCache()
+
+        self.verificationsQueue = VerificationsQueue(self.IsShuttingDown)
+        if IsMainLoopRunning():
+            self.verificationsQueue.Start()
+        # An unexpected exception from one checksum task is logged, and
+        # the worker continues with the next task, so that the remaining
+        # upload tasks aren't left waiting for a checksum forever:
+        self.checksumsQueue = WorkerQueue(
+            "ChecksumWorkerThread", SETTINGS.miscellaneous.maxChecksumThreads,
+            self.IsShuttingDown, continueAfterErrors=True)
+        self.numChecksumsPending = 0
+        if IsMainLoopRunning():
+            self.checksumsQueue.Start()
+        self.uploadsQueue = WorkerQueue(
+            "UploadWorkerThread", SETTINGS.advanced.maxUploadThreads,
+            self.IsShuttingDown)
         self.uploadMethod = UploadMethod.HTTP_POST
 
         self.InitializeTimers()
@@ -292,21 +350,15 @@ class FoldersController(object):
                     icon=wx.ICON_WARNING))
             self.uploadMethod = UploadMethod.HTTP_POST
         if self.uploadMethod == UploadMethod.HTTP_POST and \
-                self.numUploadWorkerThreads > 1:
+                self.uploadsQueue.numWorkerThreads > 1:
             logger.warning(
                 "Using HTTP POST, so setting "
                 "numUploadWorkerThreads to 1, "
                 "because urllib2 is not thread-safe.")
-            self.numUploadWorkerThreads = 1
+            self.uploadsQueue.numWorkerThreads = 1
 
-        self.uploadWorkerThreads = []
-        if wx.PyApp.IsMainLoopRunning():
-            for i in range(self.numUploadWorkerThreads):
-                thread = threading.Thread(
-                    name="UploadWorkerThread-%d" % (i + 1),
-                    target=self.UploadWorker, args=())
-                self.uploadWorkerThreads.append(thread)
-                thread.start()
+        if IsMainLoopRunning():
+            self.uploadsQueue.Start()
 
     def InitializeTimers(self):
         """
@@ -314,19 +366,20 @@ class FoldersController(object):
         which can't be updated every time the underlying data changes,
         because it changes too quickly.
 
-        Timers do not run in unit tests.
+        Timers do not run in unit tests.  When running headless, there is
+        no GUI to update, but the count completed timer still runs, so
+        that MyData can tell when the uploads have finished.
 
         This method is usually run from a worker thread, hence the use of
-        wx.CallAfter
+        CallAfter
         """
-        self.countCompletedTimer = wx.Timer(self.parent)
-        self.parent.Bind(
-            wx.EVT_TIMER, self.CountCompletedUploadsAndVerifications,
-            self.countCompletedTimer)
+        self.countCompletedTimer = NewTimer(
+            self.parent, self.CountCompletedUploadsAndVerifications)
         if 'MYDATA_TESTING' not in os.environ:
-            wx.CallAfter(self.countCompletedTimer.Start, 500)
-            wx.CallAfter(self.parent.dataViews['verifications']
-                         .updateCacheHitSummaryTimer.Start, 500)
+            CallAfter(self.countCompletedTimer.Start, 500)
+            if self.parent:
+                CallAfter(self.parent.dataViews['verifications']
+                          .updateCacheHitSummaryTimer.Start, 500)
 
     def StopTimers(self):
         """
@@ -337,13 +390,15 @@ class FoldersController(object):
         Timers do not run in unit tests.
 
         This method is currently run from the main thread, hence the lack of
-        wx.CallAfter when stopping the timers.
+        CallAfter when stopping the timers.
         """
         assert threading.current_thread().name == "MainThread"
         if 'MYDATA_TESTING' not in os.environ:
-            self.parent.dataViews['verifications'] \
-                .updateCacheHitSummaryTimer.Stop()
-            self.parent.dataViews['verifications'].UpdateCacheHitSummary(None)
+            if self.parent:
+                self.parent.dataViews['verifications'] \
+                    .updateCacheHitSummaryTimer.Stop()
+                self.parent.dataViews['verifications'].UpdateCacheHitSummary(
+                    None)
             self.countCompletedTimer.Stop()
 
     def ClearStatusFlags(self):
@@ -378,21 +433,26 @@ class FoldersController(object):
         self.failed = False
         self.completed = False
 
-    def FinishedScanningForDatasetFolders(self):
+    def FinishedScanningForDatasetFolders(self, numFolders=None):
         """
         At this point, we know that FoldersModel's
         ScanFolders method has finished populating
         DATAVIEW_MODELS['folders'] with dataset folders.
+
+        :param numFolders: The number of folders to wait for, if uploads
+            were only started for some of the folders in
+            DATAVIEW_MODELS['folders'] (see InitForUploads)
         """
-        while len(self.finishedCountingVerifications.keys()) < \
-                DATAVIEW_MODELS['folders'].GetCount():
+        if numFolders is None:
+            numFolders = DATAVIEW_MODELS['folders'].GetCount()
+        while len(self.finishedCountingVerifications.keys()) < numFolders:
             if self.IsShuttingDown() or CheckIfShouldAbort():
                 break
             time.sleep(0.01)
         logger.debug("Finished scanning for dataset folders.")
         self.finishedScanningForDatasetFolders.set()
-        if wx.PyApp.IsMainLoopRunning():
-            wx.CallAfter(
+        if IsMainLoopRunning():
+            CallAfter(
                 self.CountCompletedUploadsAndVerifications, event=None)
         else:
             self.CountCompletedUploadsAndVerifications(event=None)
@@ -410,52 +470,19 @@ class FoldersController(object):
                     threading.Event()
             if self.IsShuttingDown() or CheckIfShouldAbort():
                 return
-            with LOCKS.numVerificationsToBePerformed:
-                self.numVerificationsToBePerformed += folderModel.numFiles
             logger.debug(
                 "StartUploadsForFolder: Starting verifications "
                 "and uploads for folder: " + folderModel.folderName)
             try:
                 try:
-                    with LOCKS.getOrCreateExp:
-                        if self.IsShuttingDown() or CheckIfShouldAbort():
-                            return
-                        experimentModel = ExperimentModel\
-                            .GetOrCreateExperimentForFolder(folderModel)
+                    if self.IsShuttingDown() or CheckIfShouldAbort():
+                        return
+                    experimentModel = self.folderResolver.experimentResolver\
+                        .GetOrCreateExperimentForFolder(folderModel)
                 except Exception as err:
                     if self.failed:
                         return
-                    message = str(err)
-                    if isinstance(err, HTTPError) and \
-                            err.response.status_code == 500:
-                        logger.error(err.response.request.url)
-                        try:
-                            error = ("Internal Server Error: %s"
-                                     % err.response.json()['error_message'])
-                            logger.error(error)
-                            info = "See the Log for more information."
-                            logger.error(err.response.json()['traceback'])
-                        except:
-                            error = "An Internal Server Error occurred."
-                            info = (
-                                "For more information, set DEBUG to True in "
-                                "MyTardis's settings.")
-                            logger.error(info)
-                        message = ("%s\n\n%s\n\n%s"
-                                   % (error, err.response.request.url, info))
-                        PostEvent(
-                            MYDATA_EVENTS.ShowMessageDialogEvent(
-                                title="MyData", message=message,
-                                icon=wx.ICON_ERROR))
-                    elif isinstance(err, HTTPError) and not message:
-                        message = ("Received %s (%s) response from server."
-                                   % (type(err).__name__,
-                                      err.response.status_code))
-                        message = ("%s\n\n%s"
-                                   % (message, err.response.request.url))
-                        logger.error(message)
-                    else:
-                        logger.error(traceback.format_exc())
+                    message = GetExperimentErrorMessage(err)
                     if not self.failed:
                         self.failed = True
                         FLAGS.shouldAbort = True
@@ -468,8 +495,9 @@ class FoldersController(object):
                     return
                 folderModel.experimentModel = experimentModel
                 try:
-                    folderModel.datasetModel = DatasetModel\
-                        .CreateDatasetIfNecessary(folderModel)
+                    folderModel.datasetModel = self.folderResolver\
+                        .datasetResolver.GetOrCreateDatasetForFolder(
+                            folderModel)
                 except Exception as err:
                     logger.error(traceback.format_exc())
                     PostEvent(
@@ -478,6 +506,9 @@ class FoldersController(object):
                             message=str(err),
                             icon=wx.ICON_ERROR))
                     return
+                if SETTINGS.miscellaneous.bulkDataFileLookups and \
+                        not self.IsShuttingDown():
+                    LookupDatafilesInBulk(folderModel)
                 self.VerifyDatafiles(folderModel)
             except requests.exceptions.ConnectionError as err:
                 logger.error(str(err))
@@ -492,84 +523,26 @@ class FoldersController(object):
                              "experiment to store data in for "
                              "folder " + folderModel.folderName)
                 return
-            if self.IsShuttingDown() or CheckIfShouldAbort():
-                return
-            with LOCKS.finishedCounting:
-                self.finishedCountingVerifications[folderModel].set()
-            if DATAVIEW_MODELS['folders'].GetRowCount() == 0 or \
-                    self.numVerificationsToBePerformed == 0:
-                # For the case of zero folders or zero files, we
-                # can't use the usual triggers (e.g. datafile
-                # upload complete) to determine when to check if
-                # we have finished:
-                wx.CallAfter(
-                    self.CountCompletedUploadsAndVerifications, event=None)
         except:
             logger.error(traceback.format_exc())
+        finally:
+            self.FinishedCountingVerifications(folderModel)
 
-    def UploadWorker(self):
-        # Could be moved to uploads controller
-        """
-        One worker per thread
-        By default, up to 5 threads can run simultaneously
-        for uploading local data files to
-        the MyTardis server.
-        """
-        while True:
-            if self.IsShuttingDown():
-                return
-            task = self.uploadsQueue.get()
-            if task is None:
-                return
-            try:
-                task.Run()
-            except ValueError as err:
-                if str(err) == "I/O operation on closed file":
-                    logger.info(
-                        "Ignoring closed file exception - it is normal "
-                        "to encounter these exceptions while canceling "
-                        "uploads.")
-                    self.uploadsQueue.task_done()
-                else:
-                    logger.error(traceback.format_exc())
-                    self.uploadsQueue.task_done()
-                return
-            except:
-                logger.error(traceback.format_exc())
-                self.uploadsQueue.task_done()
-                return
-
-    def VerificationWorker(self):
-        # Could be moved to verifications controller
+    def FinishedCountingVerifications(self, folderModel):
         """
-        One worker per thread.
-        By default, up to 5 threads can run simultaneously
-        for verifying whether local data files exist on
-        the MyTardis server.
+        Mark the folder as having finished counting its verifications,
+        i.e. all of its files have been found and queued for verification,
+        or no more of its files will be queued (e.g. because looking up
+        its dataset failed or uploads are being shut down).
         """
-        while True:
-            if self.IsShuttingDown():
-                return
-            task = self.verificationsQueue.get()
-            if task is None:
-                break
-            try:
-                task.Run()
-            except ValueError as err:
-                if str(err) == "I/O operation on closed file":
-                    logger.info(
-                        "Ignoring closed file exception - it is normal "
-                        "to encounter these exceptions while canceling "
-                        "uploads.")
-                    self.verificationsQueue.task_done()
-                else:
-                    logger.error(traceback.format_exc())
-                    self.verificationsQueue.task_done()
-                return
-            except:
-                logger.error(traceback.format_exc())
-                self.verificationsQueue.task_done()
-                return
+        with LOCKS.finishedCounting:
+            if folderModel in self.finishedCountingVerifications:
+                self.finishedCountingVerifications[folderModel].set()
+        # The folder's last verification may have completed before its
+        # walk finished, in which case the usual triggers (e.g. datafile
+        # upload complete) have already fired, so we need to check if
+        # we have finished:
+        CallAfter(self.CountCompletedUploadsAndVerifications, event=None)
 
     def CountCompletedUploadsAndVerifications(self, event):
         """
@@ -595,14 +568,15 @@ class FoldersController(object):
         numVerificationsCompleted = \
             DATAVIEW_MODELS['verifications'].GetCompletedCount()
 
-        uploadsToBePerformed = DATAVIEW_MODELS['uploads'].GetRowCount() + \
-            self.uploadsQueue.qsize()
+        uploadsToBePerformed = \
+            DATAVIEW_MODELS['uploads'].GetTotalRowCount() + \
+            self.uploadsQueue.qsize() + self.numChecksumsPending
 
         uploadsCompleted = DATAVIEW_MODELS['uploads'].GetCompletedCount()
         uploadsFailed = DATAVIEW_MODELS['uploads'].GetFailedCount()
         uploadsProcessed = uploadsCompleted + uploadsFailed
 
-        if hasattr(wx.GetApp(), "frame") and numVerificationsCompleted > 0:
+        if hasattr(GetApp(), "frame") and numVerificationsCompleted > 0:
             if numVerificationsCompleted == \
                     self.numVerificationsToBePerformed \
                     and uploadsToBePerformed > 0:
@@ -612,14 +586,18 @@ class FoldersController(object):
                 message = "Looked up %d of %d files." % \
                     (numVerificationsCompleted,
                      self.numVerificationsToBePerformed)
-            wx.GetApp().frame.SetStatusMessage(message)
+            GetApp().frame.SetStatusMessage(message)
 
         finishedVerificationCounting = \
             self.finishedScanningForDatasetFolders.isSet()
+        # Folders waiting for a thread in the folders pool haven't started
+        # counting their verifications yet:
+        if self.folderResolver.numFoldersPending > 0:
+            finishedVerificationCounting = False
         # Use lock to avoid "dictionary changed size during iteration" error:
         with LOCKS.finishedCounting:
             for folder in self.finishedCountingVerifications:
-                if not self.finishedCountingVerifications[folder]:
+                if not self.finishedCountingVerifications[folder].is_set():
                     finishedVerificationCounting = False
                     break
 
@@ -643,7 +621,7 @@ class FoldersController(object):
                        self.numVerificationsToBePerformed))
                 logger.warning(message)
             PostEvent(MYDATA_EVENTS.ShutdownUploadsEvent(completed=True))
-        elif not wx.PyApp.IsMainLoopRunning() and FLAGS.testRunRunning and \
+        elif not IsMainLoopRunning() and FLAGS.testRunRunning and \
                 finishedVerificationCounting:
             PostEvent(MYDATA_EVENTS.ShutdownUploadsEvent(completed=True))
 
@@ -658,10 +636,10 @@ class FoldersController(object):
         assert threading.current_thread().name == "MainThread"
 
         self.SetShuttingDown(True)
-        app = wx.GetApp()
+        app = GetApp()
         if SETTINGS.miscellaneous.cacheDataFileLookups:
             threading.Thread(
-                target=SETTINGS.SaveVerifiedDatafilesCache).start()
+                target=SETTINGS.CloseVerifiedDatafilesCache).start()
         # Reset self.started so that scheduled tasks know that's OK to start
         # new scan-and-upload tasks:
         self.started = False
@@ -674,6 +652,7 @@ class FoldersController(object):
             else:
                 message = "No folders were found to upload from."
                 self.completed = True
+            self.SaveScanIndex()
             if hasattr(app, "frame"):
                 app.frame.toolbar.EnableTestAndUploadToolbarButtons()
                 FLAGS.shouldAbort = False
@@ -697,23 +676,22 @@ class FoldersController(object):
         else:
             self.canceled = True
             DATAVIEW_MODELS['uploads'].CancelRemaining()
+        logger.debug("Shutting down FoldersController checksum "
+                     "worker threads.")
+        self.checksumsQueue.Shutdown()
         logger.debug("Shutting down FoldersController upload worker threads.")
-        for _ in range(self.numUploadWorkerThreads):
-            self.uploadsQueue.put(None)
-        for uploadThread in self.uploadWorkerThreads:
-            if hasattr(uploadThread, "paramikoTransport"):
-                uploadThread.paramikoTransport.close()
-            uploadThread.join()
+        self.uploadsQueue.Shutdown()
+        UPLOAD_PROCESSES.Shutdown()
         logger.debug("Shutting down FoldersController verification "
                      "worker threads.")
-        for _ in range(self.numVerificationWorkerThreads):
-            self.verificationsQueue.put(None)
-        for thread in self.verificationWorkerThreads:
-            thread.join()
+        self.verificationsQueue.Shutdown()
+        self.folderResolver.Shutdown()
 
         logger.debug("Joining remaining threads...")
         MYDATA_THREADS.Join()
         logger.debug("Joined remaining threads.")
+        self.SaveScanIndex()
+        SETTINGS.CloseChecksumCache()
 
         if FLAGS.testRunRunning:
             LogTestRunSummary()
@@ -778,15 +756,37 @@ class FoldersController(object):
             sys.stdout.write("%s\n" % message)
             app.ShutDownCleanlyAndExit(event, confirm=False)
 
+    def SaveScanIndex(self):
+        """
+        Save the scan index, once the upload threads have finished walking
+        the dataset folders.
+
+        Index entries for directories which weren't visited are only pruned
+        if the data directory was completely scanned and every dataset
+        folder was walked, i.e. not if the uploads were canceled or failed,
+        or if only the folders changed since the last scan were uploaded.
+        """
+        SCAN_INDEX.Save(prune=self.completed and not self.changedFoldersOnly)
+
     def VerifyDatafiles(self, folderModel):
         """
         Verify datafiles in the specified folder
+
+        The folder's files are verified as soon as they are found, rather
+        than after its whole directory tree has been walked, so the number
+        of verifications to be performed is counted as they are queued.
+        The folder is only marked as finished counting (in
+        StartUploadsForFolder) after all of its files have been found.
         """
-        for dfi in range(0, folderModel.numFiles):
+        foldersModel = DATAVIEW_MODELS['folders']
+        for dfi in folderModel.EnumerateDataFiles():
             if self.IsShuttingDown():
                 return
+            with LOCKS.numVerificationsToBePerformed:
+                self.numVerificationsToBePerformed += 1
+            foldersModel.FolderStatusUpdated(folderModel)
             verifyDatafileRunnable = VerifyDatafileRunnable(folderModel, dfi)
-            if wx.PyApp.IsMainLoopRunning():
-                self.verificationsQueue.put(verifyDatafileRunnable)
+            if IsMainLoopRunning():
+                self.verificationsQueue.Put(verifyDatafileRunnable)
             else:
                 verifyDatafileRunnable.Run()
@@ -0,0 +1,164 @@
+"""
+mydata/controllers/queues.py
+
+The task queues used by the FoldersController for datafile verifications,
+MD5 checksum calculations and uploads, each serviced by a pool of worker
+threads.
+"""
+from queue import Queue
+import threading
+import traceback
+
+from ..settings import SETTINGS
+from ..logs import logger
+
+
+class WorkerQueue(object):
+    """
+    A queue of tasks (e.g. UploadDatafileRunnable instances), each of which
+    is run by calling its Run method from one of numWorkerThreads worker
+    threads.
+
+    The worker threads are only started when Start is called, so tasks are
+    only run if the queue is used while a main loop is running.  (In unit
+    tests without a main loop, tasks are run synchronously instead of being
+    added to a queue.)
+    """
+    def __init__(self, threadName, numWorkerThreads, isShuttingDown,
+                 continueAfterErrors=False):
+        """
+        :param threadName: Prefix for the worker threads' names
+        :param numWorkerThreads: The number of worker threads to start
+        :param isShuttingDown: Callback returning True if the worker
+            threads should stop running tasks
+        :param continueAfterErrors: If True, an unexpected exception from
+            one task is logged, and the worker thread continues with the
+            next task.  Otherwise the worker thread exits.
+        """
+        self.threadName = threadName
+        self.numWorkerThreads = numWorkerThreads
+        self.isShuttingDown = isShuttingDown
+        self.continueAfterErrors = continueAfterErrors
+        self.queue = Queue()
+        self.workerThreads = []
+
+    def Start(self):
+        """
+        Start the worker threads.
+        """
+        for i in range(self.numWorkerThreads):
+            thread = threading.Thread(
+                name="%s-%d" % (self.threadName, i + 1), target=self.Worker)
+            self.workerThreads.append(thread)
+            thread.start()
+
+    def Put(self, task):
+        """
+        Add a task to the queue.
+        """
+        self.queue.put(task)
+
+    def qsize(self):
+        """
+        Return the approximate number of tasks waiting in the queue.
+        """
+        # pylint: disable=invalid-name
+        return self.queue.qsize()
+
+    def Worker(self):
+        """
+        One worker per thread, running tasks until the queue is shut down.
+        """
+        while True:
+            if self.isShuttingDown():
+                return
+            task = self.queue.get()
+            if task is None:
+                return
+            try:
+                task.Run()
+            except ValueError as err:
+                if str(err) == "I/O operation on closed file":
+                    logger.info(
+                        "Ignoring closed file exception - it is normal "
+                        "to encounter these exceptions while canceling "
+                        "uploads.")
+                else:
+                    logger.error(traceback.format_exc())
+                self.queue.task_done()
+                if not self.continueAfterErrors:
+                    return
+            except:
+                logger.error(traceback.format_exc())
+                self.queue.task_done()
+                if not self.continueAfterErrors:
+                    return
+
+    def Shutdown(self):
+        """
+        Ask the worker threads to exit once they have finished their
+        current tasks, and wait for them to exit.
+
+        Upload worker threads keep their SFTP connections open between
+        uploads (see mydata/utils/openssh.py), so their connections are
+        closed first, to interrupt any uploads in progress.
+        """
+        for _ in range(len(self.workerThreads)):
+            self.queue.put(None)
+        for thread in self.workerThreads:
+            if hasattr(thread, "paramikoTransport"):
+                thread.paramikoTransport.close()
+            thread.join()
+        self.workerThreads = []
+
+
+class VerificationsQueue(WorkerQueue):
+    """
+    The datafile verifications queue, serviced by max_verification_threads
+    worker threads, or when async_verifications is enabled in MyData.cfg,
+    by the asyncio verification engine.
+    """
+    def __init__(self, isShuttingDown):
+        super(VerificationsQueue, self).__init__(
+            "VerificationWorkerThread",
+            SETTINGS.miscellaneous.maxVerificationThreads, isShuttingDown)
+        self.asyncVerificationEngine = None
+
+    def Start(self):
+        """
+        Start the asyncio verification engine if async_verifications is
+        enabled, otherwise start the verification worker threads.
+        """
+        if SETTINGS.miscellaneous.asyncVerifications:
+            # Lookups will be performed by the asyncio verification engine
+            # instead of the verification worker threads.  It is imported
+            # here, because it requires the optional aiohttp package:
+            try:
+                from .asyncverifications import AsyncVerificationEngine
+                self.numWorkerThreads = 0
+                self.asyncVerificationEngine = AsyncVerificationEngine()
+                self.asyncVerificationEngine.Start()
+            except ImportError as err:
+                logger.warning(
+                    "Not using async_verifications, because the aiohttp "
+                    "package couldn't be imported: %s" % err)
+        super(VerificationsQueue, self).Start()
+
+    def Put(self, task):
+        """
+        Add a VerifyDatafileRunnable to the queue, or submit it to the
+        asyncio verification engine.
+        """
+        if self.asyncVerificationEngine:
+            self.asyncVerificationEngine.Submit(task)
+        else:
+            super(VerificationsQueue, self).Put(task)
+
+    def Shutdown(self):
+        """
+        Stop the worker threads or the asyncio verification engine.
+        """
+        super(VerificationsQueue, self).Shutdown()
+        if self.asyncVerificationEngine:
+            self.asyncVerificationEngine.Shutdown()
+            self.asyncVerificationEngine = None
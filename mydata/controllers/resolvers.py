@@ -0,0 +1,164 @@
+"""
+mydata/controllers/resolvers.py
+
+Resolves each dataset folder's experiment and dataset on MyTardis (looking
+them up, or creating them if necessary) for the FoldersController, before
+the folder's files are queued for verification.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import traceback
+
+import requests
+from requests.exceptions import HTTPError
+
+import wx
+
+from ..events import MYDATA_EVENTS
+from ..events import PostEvent
+from ..settings import SETTINGS
+from ..models.experiment import ExperimentResolver
+from ..models.dataset import DatasetResolver
+from ..models.datafile import DataFileModel
+from ..models.objectacl import ObjectAclQueue
+from ..logs import logger
+from ..threads.locks import LOCKS
+from ..threads.dispatcher import IsMainLoopRunning
+
+
+class FolderResolver(object):
+    """
+    Resolves dataset folders' experiments and datasets, optionally on a
+    bounded pool of folder threads (max_dataset_threads in MyData.cfg).
+
+    New experiments' ObjectACLs can be created in the background, by a
+    pool of max_objectacl_threads threads.
+    """
+    def __init__(self):
+        self.experimentResolver = ExperimentResolver()
+        self.datasetResolver = DatasetResolver()
+        self.foldersPool = None
+        self.numFoldersPending = 0
+        self.objectAclQueue = None
+
+    def InitForUploads(self):
+        """
+        Initialize the resolvers and thread pools in preparation for
+        uploads.  The thread pools are only used if a main loop is running.
+        """
+        if self.objectAclQueue:
+            self.objectAclQueue.Shutdown(wait=False)
+            self.objectAclQueue = None
+        maxObjectAclThreads = SETTINGS.miscellaneous.maxObjectAclThreads
+        if IsMainLoopRunning() and maxObjectAclThreads > 0:
+            self.objectAclQueue = ObjectAclQueue(maxObjectAclThreads)
+        self.experimentResolver = ExperimentResolver(self.objectAclQueue)
+        self.datasetResolver = DatasetResolver()
+        self.numFoldersPending = 0
+        if self.foldersPool:
+            self.foldersPool.shutdown(wait=False)
+            self.foldersPool = None
+        maxDatasetThreads = SETTINGS.miscellaneous.maxDatasetThreads
+        if IsMainLoopRunning() and maxDatasetThreads > 0:
+            self.foldersPool = ThreadPoolExecutor(
+                max_workers=maxDatasetThreads,
+                thread_name_prefix="StartDataUploadsForFolderThread")
+
+    def SubmitFolder(self, worker, folderModel):
+        """
+        Run worker(folderModel) in the folders pool, which limits the
+        number of folders whose experiments and datasets are looked up
+        (or created) concurrently to max_dataset_threads.
+        """
+        with LOCKS.numFoldersPending:
+            self.numFoldersPending += 1
+
+        def RunWorker():
+            """
+            Run the worker, and then count the folder as no longer pending.
+            """
+            try:
+                worker(folderModel)
+            finally:
+                with LOCKS.numFoldersPending:
+                    self.numFoldersPending -= 1
+
+        self.foldersPool.submit(RunWorker)
+
+    def Shutdown(self):
+        """
+        Wait for the folder threads to finish, and for queued ObjectACLs
+        to be created.
+        """
+        if self.foldersPool:
+            self.foldersPool.shutdown(wait=True)
+            self.foldersPool = None
+        if self.objectAclQueue:
+            logger.debug("Waiting for queued ObjectACLs to be created.")
+            self.objectAclQueue.Shutdown(wait=True)
+            if self.objectAclQueue.numFailed > 0:
+                logger.error(
+                    "%d ObjectACL(s) couldn't be created, so some new "
+                    "experiments may not be accessible to their users "
+                    "and groups." % self.objectAclQueue.numFailed)
+            self.objectAclQueue = None
+
+
+def LookupDatafilesInBulk(folderModel):
+    """
+    Retrieve all of the DataFile records in the folder's dataset, so
+    that verifications don't need to look up each file individually.
+
+    If the bulk lookup fails, verifications will fall back to
+    looking up each file individually.
+    """
+    dataset = folderModel.datasetModel
+    if not dataset:
+        return
+    try:
+        dataset.dataFiles = DataFileModel.GetDataFilesForDataset(dataset)
+        logger.debug(
+            "Found %d DataFile records for dataset %s in bulk lookup."
+            % (len(dataset.dataFiles), dataset.datasetId))
+    except requests.exceptions.RequestException as err:
+        logger.warning(
+            "Bulk DataFile lookup failed for dataset %s: %s"
+            % (dataset.datasetId, err))
+        dataset.dataFiles = None
+
+
+def GetExperimentErrorMessage(err):
+    """
+    Log an exception raised while looking up or creating a folder's
+    experiment, and return a message describing it for the user.
+
+    Internal Server Errors are also reported in a message dialog, with
+    the server's error message if it is available.
+    """
+    message = str(err)
+    if isinstance(err, HTTPError) and err.response.status_code == 500:
+        logger.error(err.response.request.url)
+        try:
+            error = ("Internal Server Error: %s"
+                     % err.response.json()['error_message'])
+            logger.error(error)
+            info = "See the Log for more information."
+            logger.error(err.response.json()['traceback'])
+        except:
+            error = "An Internal Server Error occurred."
+            info = (
+                "For more information, set DEBUG to True in "
+                "MyTardis's settings.")
+            logger.error(info)
+        message = ("%s\n\n%s\n\n%s"
+                   % (error, err.response.request.url, info))
+        PostEvent(
+            MYDATA_EVENTS.ShowMessageDialogEvent(
+                title="MyData", message=message, icon=wx.ICON_ERROR))
+    elif isinstance(err, HTTPError) and not message:
+        message = ("Received %s (%s) response from server."
+                   % (type(err).__name__, err.response.status_code))
+        message = "%s\n\n%s" % (message, err.response.request.url)
+        logger.error(message)
+    else:
+        logger.error(traceback.format_exc())
+    return message
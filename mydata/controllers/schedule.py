@@ -17,6 +17,10 @@ from ..settings import SETTINGS
 from ..models.task import TaskModel
 from ..models.settings import LastSettingsUpdateTrigger
 from ..logs import logger
+from ..threads.dispatcher import GetApp
+from ..threads.dispatcher import IsMainLoopRunning
+from ..threads.dispatcher import CallAfter
+from .watcher import FOLDER_WATCHER
 
 # Default description for jobs created here:
 JOB_DESC = "Scan folders and upload datafiles"
@@ -26,13 +30,12 @@ def ScanAndUploadTask(event, needToValidateSettings, jobId):
     """
     Task to be run according to the schedule.
     """
-    app = wx.GetApp()
-    if wx.PyApp.IsMainLoopRunning():
-        wx.CallAfter(app.frame.toolbar.DisableTestAndUploadToolbarButtons)
+    app = GetApp()
+    if IsMainLoopRunning():
+        CallAfter(app.frame.toolbar.DisableTestAndUploadToolbarButtons)
         while not app.Processing():
             time.sleep(0.01)
-        wx.CallAfter(StartScansAndUploads, event, needToValidateSettings,
-                     jobId)
+        CallAfter(StartScansAndUploads, event, needToValidateSettings, jobId)
         while app.Processing():
             time.sleep(0.01)
     else:
@@ -63,6 +66,8 @@ class ScheduleController(object):
         logger.debug("runManually: %s" % str(runManually))
         scheduleType = SETTINGS.schedule.scheduleType
         logger.debug("Schedule Type: %s" % scheduleType)
+        if scheduleType != "Continuous" and not runManually:
+            FOLDER_WATCHER.Stop()
         if scheduleType == "On Startup" and \
                 SETTINGS.lastSettingsUpdateTrigger == \
                 LastSettingsUpdateTrigger.READ_FROM_DISK:
@@ -86,6 +91,9 @@ class ScheduleController(object):
             ScheduleController.CreateWeeklyTask(event, needToValidateSettings)
         elif scheduleType == "Timer":
             ScheduleController.CreateTimerTask(event, needToValidateSettings)
+        elif scheduleType == "Continuous":
+            ScheduleController.CreateContinuousTask(
+                event, needToValidateSettings)
         logger.debug("Finished processing schedule type.")
 
     @staticmethod
@@ -95,8 +103,8 @@ class ScheduleController(object):
         Collecting the common functionality for creating tasks for different
         schedule types
         """
-        if wx.PyApp.IsMainLoopRunning():
-            wx.GetApp().frame.SetStatusMessage(msg)
+        if IsMainLoopRunning():
+            GetApp().frame.SetStatusMessage(msg)
         else:
             sys.stderr.write("%s\n" % msg)
         taskDataViewId = DATAVIEW_MODELS['tasks'].GetMaxDataViewId() + 1
@@ -274,3 +282,32 @@ class ScheduleController(object):
         ScheduleController.CreateTask(
             event, needToValidateSettings, startTime, scheduleType, msg,
             intervalMinutes=intervalMinutes)
+
+    @staticmethod
+    def CreateContinuousTask(event, needToValidateSettings):
+        """
+        Create a task to scan all folders and upload any new files shortly
+        after MyData is launched (or its settings are saved), and then
+        watch the data directory, uploading the files in each dataset
+        folder shortly after they have been written.
+        """
+        scheduleType = "Continuous"
+        logger.debug("Schedule type is Continuous.")
+        try:
+            FOLDER_WATCHER.Start()
+        except OSError as err:
+            message = "Couldn't watch %s for changes: %s" \
+                % (SETTINGS.general.dataDirectory, str(err))
+            logger.error(message)
+            if wx.PyApp.IsMainLoopRunning():
+                wx.MessageBox(message, "MyData", wx.ICON_ERROR)
+            return
+        startTime = datetime.now() + timedelta(seconds=5)
+        timeString = startTime.strftime("%I:%M %p")
+        dateString = \
+            "{d:%A} {d.day}/{d.month}/{d.year}".format(d=startTime)
+        msg = ("The \"%s\" task is scheduled "
+               "to run at %s on %s (and then whenever files change)"
+               % (JOB_DESC, timeString, dateString))
+        ScheduleController.CreateTask(
+            event, needToValidateSettings, startTime, scheduleType, msg)
@@ -13,6 +13,7 @@ import wx
 from paramiko.ssh_exception import SSHException
 
 from ..utils.openssh import UploadFile
+from ..utils.uploadprocesses import UPLOAD_PROCESSES
 
 from ..settings import SETTINGS
 from ..dataviewmodels.dataview import DATAVIEW_MODELS
@@ -22,7 +23,10 @@ from ..models.upload import UploadStatus
 from ..models.datafile import DataFileModel
 from ..threads.flags import FLAGS
 from ..threads.locks import LOCKS
+from ..threads.dispatcher import GetApp
+from ..threads.dispatcher import IsMainLoopRunning
 from ..utils import SafeStr
+from ..utils.checksums import GetFileSignature
 from ..utils.exceptions import StorageBoxAttributeNotFound
 from ..events import MYDATA_EVENTS
 from ..events import PostEvent
@@ -58,7 +62,7 @@ def StopUploadsAsFailed(message, showError=False):
     Shutdown uploads with the reason: failed.
     """
     logger.error(message)
-    wx.GetApp().foldersController.failed = True
+    GetApp().foldersController.failed = True
     FLAGS.shouldAbort = True
     PostEvent(MYDATA_EVENTS.ShutdownUploadsEvent(failed=True))
     if showError:
@@ -68,6 +72,27 @@ def StopUploadsAsFailed(message, showError=False):
                 icon=wx.ICON_ERROR))
 
 
+def ShouldHashWhileUploading(uploadMethod, existingDatafile=None):
+    """
+    Determine whether MD5 checksums should be calculated while files
+    are being uploaded (reading each file once), instead of before their
+    uploads begin.  This is only supported for uploads to staging, where
+    the DataFile record can be updated with the checksum before MyData
+    requests verification.
+
+    An existing DataFile record which still has the placeholder checksum
+    (because an earlier upload was interrupted before its checksum was
+    updated) is always updated with the checksum calculated while
+    uploading it again.
+    """
+    if uploadMethod != UploadMethod.VIA_STAGING or \
+            SETTINGS.miscellaneous.fakeMd5Sum:
+        return False
+    return SETTINGS.miscellaneous.hashWhileUploading or (
+        existingDatafile is not None and existingDatafile.md5sum ==
+        MiscellaneousSettingsModel.GetFakeMd5Sum())
+
+
 class UploadDatafileRunnable(object):
     """
     The Run method of this class provides the functionality of
@@ -84,6 +109,10 @@ class UploadDatafileRunnable(object):
         self.verificationModel = verificationModel
         self.bytesUploadedPreviously = bytesUploadedPreviously
         self.mimeTypes = mimetypes.MimeTypes()
+        # Set by a checksum worker if the MD5 checksum was
+        # calculated before the upload task was queued:
+        self.dataFileMd5Sum = None
+        self.hashWhileUploading = False
 
     def Run(self):
         """
@@ -92,7 +121,7 @@ class UploadDatafileRunnable(object):
         """
         # pylint: disable=too-many-statements
         # pylint: disable=too-many-branches
-        foldersController = wx.GetApp().foldersController
+        foldersController = GetApp().foldersController
         uploadsModel = DATAVIEW_MODELS['uploads']
         with LOCKS.addUpload:
             uploadDataViewId = uploadsModel.GetMaxDataViewId() + 1
@@ -134,12 +163,22 @@ class UploadDatafileRunnable(object):
             return
 
         dataFileMd5Sum = None
+        self.hashWhileUploading = ShouldHashWhileUploading(
+            foldersController.uploadMethod,
+            self.existingUnverifiedDatafile) and not self.dataFileMd5Sum
         if foldersController.uploadMethod == UploadMethod.HTTP_POST or \
                 not self.existingUnverifiedDatafile:
             message = "Calculating MD5 checksum..."
             uploadsModel.SetMessage(self.uploadModel, message)
 
-            if SETTINGS.miscellaneous.fakeMd5Sum:
+            if self.dataFileMd5Sum:
+                dataFileMd5Sum = self.dataFileMd5Sum
+            elif self.hashWhileUploading:
+                # The DataFile record will be created with a placeholder
+                # checksum, and updated with the checksum calculated
+                # while uploading:
+                dataFileMd5Sum = MiscellaneousSettingsModel.GetFakeMd5Sum()
+            elif SETTINGS.miscellaneous.fakeMd5Sum:
                 dataFileMd5Sum = MiscellaneousSettingsModel.GetFakeMd5Sum()
                 logger.warning("Faking MD5 sum for %s" % dataFilePath)
             else:
@@ -219,7 +258,7 @@ class UploadDatafileRunnable(object):
         Called by MD5 calculation method to check whether uploads
         have been canceled.
         """
-        return wx.GetApp().foldersController.IsShuttingDown() or \
+        return GetApp().foldersController.IsShuttingDown() or \
             self.uploadModel.canceled
 
     def Md5ProgressCallback(self, bytesSummed):
@@ -227,7 +266,7 @@ class UploadDatafileRunnable(object):
         Called by MD5 calculation method to update progress.
         """
         if self.uploadModel.canceled:
-            wx.GetApp().foldersController.canceled = True
+            GetApp().foldersController.canceled = True
             return
         size = self.folderModel.GetDataFileSize(self.dataFileIndex)
         if size > 0:
@@ -248,7 +287,7 @@ class UploadDatafileRunnable(object):
         Updates upload progress.
         """
         if self.uploadModel.canceled:
-            wx.GetApp().foldersController.canceled = True
+            GetApp().foldersController.canceled = True
             return
         if self.uploadModel.status == UploadStatus.COMPLETED:
             return
@@ -348,7 +387,7 @@ class UploadDatafileRunnable(object):
                 DataFileModel.CreateDataFileForStagingUpload(dataFileDict)
             response.raise_for_status()
         uploadToStagingRequest = SETTINGS.uploaderModel.uploadToStagingRequest
-        foldersController = wx.GetApp().foldersController
+        foldersController = GetApp().foldersController
         try:
             host = uploadToStagingRequest.scpHostname
             port = uploadToStagingRequest.scpPort
@@ -377,14 +416,27 @@ class UploadDatafileRunnable(object):
             remoteFilePath = tempUrl
             dataFileId = response.headers['Location'].split('/')[-2]
             self.uploadModel.dataFileId = dataFileId
+        md5sum = None
+        signature = None
+        if self.hashWhileUploading:
+            signature = GetFileSignature(dataFilePath)
         while True:
             # Upload retries loop:
             try:
-                UploadFile(
-                    dataFilePath, dataFileSize, username,
-                    SETTINGS.uploaderModel.sshKeyPair.privateKey,
-                    host, port, remoteFilePath, self.ProgressCallback,
-                    self.uploadModel)
+                if UPLOAD_PROCESSES.enabled:
+                    md5sum = UPLOAD_PROCESSES.UploadFile(
+                        dataFilePath, dataFileSize, username,
+                        SETTINGS.uploaderModel.sshKeyPair,
+                        host, port, remoteFilePath, self.ProgressCallback,
+                        self.uploadModel,
+                        calculateMd5Sum=self.hashWhileUploading)
+                else:
+                    md5sum = UploadFile(
+                        dataFilePath, dataFileSize, username,
+                        SETTINGS.uploaderModel.sshKeyPair.privateKey,
+                        host, port, remoteFilePath, self.ProgressCallback,
+                        self.uploadModel,
+                        calculateMd5Sum=self.hashWhileUploading)
                 # Break out of upload retries loop.
                 break
             except SSHException as err:
@@ -396,8 +448,9 @@ class UploadDatafileRunnable(object):
                         SETTINGS.advanced.maxUploadRetries:
                     logger.warning(SafeStr(err))
                     self.uploadModel.retries += 1
-                    logger.debug("Restarting upload for " + dataFilePath)
-                    self.uploadModel.SetProgress(0)
+                    # UploadFile will resume from the end of the partial
+                    # copy in staging, rather than starting again:
+                    logger.debug("Resuming upload for " + dataFilePath)
                     continue
                 else:
                     logger.error(traceback.format_exc())
@@ -423,6 +476,19 @@ class UploadDatafileRunnable(object):
             else:
                 location = response.headers['location']
                 datafileId = location.split("/")[-2]
+            if md5sum:
+                try:
+                    DataFileModel.UpdateMd5Sum(datafileId, md5sum)
+                except requests.exceptions.RequestException as err:
+                    self.uploadModel.traceback = traceback.format_exc()
+                    logger.error(traceback.format_exc())
+                    message = "Couldn't update MD5 checksum for %s: %s" \
+                        % (dataFilePath, SafeStr(err))
+                    self.FinalizeUpload(uploadSuccess=False, message=message)
+                    return
+                if GetFileSignature(dataFilePath) == signature:
+                    SETTINGS.checksumCache.SetMd5Sum(
+                        dataFilePath, signature, md5sum)
             verificationDelay = SETTINGS.miscellaneous.verificationDelay
 
             def RequestVerification():
@@ -434,7 +500,7 @@ class UploadDatafileRunnable(object):
                 uploading to staging.
                 """
                 DataFileModel.Verify(datafileId)
-            if wx.PyApp.IsMainLoopRunning() and \
+            if IsMainLoopRunning() and \
                     int(verificationDelay) > 0:
                 timer = threading.Timer(verificationDelay,
                                         RequestVerification)
@@ -458,7 +524,7 @@ class UploadDatafileRunnable(object):
         dataFileName = os.path.basename(dataFilePath)
         foldersModel = DATAVIEW_MODELS['folders']
         uploadsModel = DATAVIEW_MODELS['uploads']
-        foldersController = wx.GetApp().foldersController
+        foldersController = GetApp().foldersController
         uploadMethod = foldersController.uploadMethod
         if uploadSuccess:
             logger.debug("Upload succeeded for %s" % dataFileName)
@@ -3,23 +3,26 @@ The main controller class for managing datafile verifications.
 
 class VerifyDatafileRunnable(object):
   Run:
+    PrepareLookup  # Check the cache and add a row to the verifications view
     HandleNonExistentDataFile:
       Post DidntFindDatafileOnServerEvent  # DataFile record doesn't exist
-    HandleExistingDatafile:
-      HandleExistingVerifiedDatafile:
-        Post FoundVerifiedDatafileEvent  # Verified DFO exists!
-      HandleExistingUnverifiedDatafile:
-        HandleUnverifiedFileOnStaging:  # Reupload if staged copy is incomplete
-          HandleFullSizeStagedUpload:
-            Post FoundFullSizeStagedEvent
-          HandleIncompleteStagedUpload:
-            Post FoundIncompleteStagedEvent
-        HandleUnverifiedUnstagedUpload:  # No staged file to check size of
-          Post FoundUnverifiedUnstagedEvent
+    HandleLookupResult:
+      HandleExistingDatafile:
+        HandleExistingVerifiedDatafile:
+          Post FoundVerifiedDatafileEvent  # Verified DFO exists!
+        HandleExistingUnverifiedDatafile:
+          HandleUnverifiedFileOnStaging:  # Reupload if staged copy is partial
+            HandleFullSizeStagedUpload:
+              Post FoundFullSizeStagedEvent
+            HandleIncompleteStagedUpload:
+              Post FoundIncompleteStagedEvent
+          HandleUnverifiedUnstagedUpload:  # No staged file to check size of
+            Post FoundUnverifiedUnstagedEvent
 """
 import os
 import traceback
 
+import requests
 import wx
 
 from ..settings import SETTINGS
@@ -31,6 +34,7 @@ from ..models.verification import VerificationModel
 from ..models.verification import VerificationStatus
 from ..models.datafile import DataFileModel
 from ..threads.locks import LOCKS
+from ..threads.dispatcher import GetApp
 from ..utils.exceptions import DoesNotExist
 from ..utils.exceptions import MissingMyDataReplicaApiEndpoint
 from ..events import MYDATA_EVENTS
@@ -61,14 +65,52 @@ class VerifyDatafileRunnable(object):
         to whether they are found on the server, whether they are
         verified, and if not, whether they have been completely or
         partially uploaded.
+
+        The asyncio verification engine (see asyncverifications.py)
+        runs the same steps, but performs the lookup itself.
+        """
+        if not self.PrepareLookup():
+            return
+        try:
+            existingDatafile = self.GetBulkLookupResult()
+            if not existingDatafile:
+                existingDatafile = DataFileModel.GetDataFile(
+                    dataset=self.folderModel.datasetModel,
+                    filename=self.GetDataFileName(),
+                    directory=self.GetDataFileDirectory())
+        except DoesNotExist:
+            self.HandleNonExistentDataFile()
+            return
+        except:
+            self.HandleLookupFailure()
+            return
+        self.HandleLookupResult(existingDatafile)
+
+    def GetDataFileName(self):
+        """
+        Returns the name of the local data file.
+        """
+        return os.path.basename(
+            self.folderModel.GetDataFilePath(self.dataFileIndex))
+
+    def GetDataFileDirectory(self):
+        """
+        Returns the data file's directory, relative to its dataset folder.
+        """
+        return self.folderModel.GetDataFileDirectory(self.dataFileIndex)
+
+    def PrepareLookup(self):
+        """
+        Check the verified datafiles cache and add a row to the
+        verifications view.
+
+        Returns True if the data file needs to be looked up on the
+        MyTardis server, or False if it has already been handled.
         """
         dataFilePath = self.folderModel.GetDataFilePath(self.dataFileIndex)
-        dataFileDirectory = \
-            self.folderModel.GetDataFileDirectory(self.dataFileIndex)
-        dataFileName = os.path.basename(dataFilePath)
         verificationsModel = DATAVIEW_MODELS['verifications']
-        if wx.GetApp().foldersController.IsShuttingDown():
-            return
+        if GetApp().foldersController.IsShuttingDown():
+            return False
 
         dataset = self.folderModel.datasetModel
 
@@ -84,7 +126,7 @@ class VerifyDatafileRunnable(object):
                 self.folderModel.SetDataFileUploaded(self.dataFileIndex, True)
                 DATAVIEW_MODELS['folders'].FolderStatusUpdated(
                     self.folderModel, delay=True)
-                return
+                return False
         except:
             # If an unhandled exception occurs during a cache lookup,
             # don't bail out - we can look it up on the MyTardis server instead.
@@ -101,16 +143,57 @@ class VerifyDatafileRunnable(object):
 
         if not dataset:  # test runs don't create required datasets
             self.HandleNonExistentDataFile()
-            return
+            return False
+
+        self.verificationModel.message = \
+            "Looking for matching file on MyTardis server..."
+        self.verificationModel.status = VerificationStatus.IN_PROGRESS
+        verificationsModel.MessageUpdated(self.verificationModel)
+        return True
 
+    def GetBulkLookupResult(self):
+        """
+        Returns the matching DataFile record from the dataset's bulk
+        lookup, or None if the file needs to be looked up individually,
+        because there was no bulk lookup (or it failed), or because more
+        than one DataFile record matched.
+
+        :raises DoesNotExist: if the bulk lookup didn't find the file
+        """
+        dataset = self.folderModel.datasetModel
+        if dataset.dataFiles is None:
+            return None
+        key = (self.GetDataFileDirectory(), self.GetDataFileName())
+        if key not in dataset.dataFiles:
+            raise DoesNotExist(
+                "DataFile %s wasn't found in dataset %s's bulk lookup."
+                % ("/".join(filter(None, key)), dataset.datasetId),
+                modelClass=DataFileModel)
+        return dataset.dataFiles[key]
+
+    def GetLookupUrl(self):
+        """
+        Returns the URL for looking up the data file on the MyTardis server.
+        """
+        return DataFileModel.GetDataFileLookupUrl(
+            self.folderModel.datasetModel, self.GetDataFileName(),
+            self.GetDataFileDirectory())
+
+    def ParseLookupResponse(self, response):
+        """
+        Returns the DataFileModel found by the lookup.
+
+        :raises DoesNotExist:
+        """
+        return DataFileModel.ParseDataFileLookupResponse(
+            self.folderModel.datasetModel, self.GetDataFileName(), response)
+
+    def HandleLookupResult(self, existingDatafile):
+        """
+        Found a matching DataFile record on the MyTardis server.
+        """
+        verificationsModel = DATAVIEW_MODELS['verifications']
         try:
-            self.verificationModel.message = \
-                "Looking for matching file on MyTardis server..."
-            self.verificationModel.status = VerificationStatus.IN_PROGRESS
-            verificationsModel.MessageUpdated(self.verificationModel)
-            existingDatafile = DataFileModel.GetDataFile(
-                dataset=dataset, filename=dataFileName,
-                directory=dataFileDirectory)
             self.verificationModel.message = \
                 "Found datafile on MyTardis server."
             verificationsModel.SetFoundVerified(self.verificationModel)
@@ -119,15 +202,23 @@ class VerifyDatafileRunnable(object):
         except DoesNotExist:
             self.HandleNonExistentDataFile()
         except:
-            verificationsModel.SetFailed(self.verificationModel)
-            verificationsModel.SetComplete(self.verificationModel)
-            logger.error(traceback.format_exc())
+            self.HandleLookupFailure()
+
+    def HandleLookupFailure(self):
+        """
+        The lookup failed unexpectedly.  This should be called from an
+        except block, so the traceback can be logged.
+        """
+        verificationsModel = DATAVIEW_MODELS['verifications']
+        verificationsModel.SetFailed(self.verificationModel)
+        verificationsModel.SetComplete(self.verificationModel)
+        logger.error(traceback.format_exc())
 
     def HandleNonExistentDataFile(self):
         """
         If file doesn't exist on the server, it needs to be uploaded.
         """
-        if wx.GetApp().foldersController.IsShuttingDown():
+        if GetApp().foldersController.IsShuttingDown():
             return
         verificationsModel = DATAVIEW_MODELS['verifications']
         self.verificationModel.message = \
@@ -145,7 +236,7 @@ class VerifyDatafileRunnable(object):
         """
         Check if existing DataFile is verified.
         """
-        if wx.GetApp().foldersController.IsShuttingDown():
+        if GetApp().foldersController.IsShuttingDown():
             return
         if not existingDatafile.replicas or \
                 not existingDatafile.replicas[0].verified:
@@ -159,7 +250,7 @@ class VerifyDatafileRunnable(object):
         need to wait for it to be verified.  But if it was uploaded via
         staging, we might be able to resume a partial upload.
         """
-        if wx.GetApp().foldersController.IsShuttingDown():
+        if GetApp().foldersController.IsShuttingDown():
             return
         self.verificationModel.existingUnverifiedDatafile = existingDatafile
         dataFilePath = self.folderModel.GetDataFilePath(self.dataFileIndex)
@@ -170,7 +261,7 @@ class VerifyDatafileRunnable(object):
             "Found unverified datafile record on MyTardis."
         uploadToStagingRequest = SETTINGS.uploaderModel.uploadToStagingRequest
 
-        if wx.GetApp().foldersController.uploadMethod != \
+        if GetApp().foldersController.uploadMethod != \
                 UploadMethod.HTTP_POST and \
                 uploadToStagingRequest is not None and \
                 uploadToStagingRequest.approved and \
@@ -195,7 +286,7 @@ class VerifyDatafileRunnable(object):
         on the MyTardis server, which is provided by the
         mytardis-app-mydata app.
         """
-        if wx.GetApp().foldersController.IsShuttingDown():
+        if GetApp().foldersController.IsShuttingDown():
             return
         try:
             bytesUploadedPreviously = ReplicaModel.CountBytesUploadedToStaging(
@@ -223,7 +314,7 @@ class VerifyDatafileRunnable(object):
         in staging, then we can request its verification, but no upload
         is needed.
         """
-        if wx.GetApp().foldersController.IsShuttingDown():
+        if GetApp().foldersController.IsShuttingDown():
             return
         verificationsModel = DATAVIEW_MODELS['verifications']
         dataFilePath = self.folderModel.GetDataFilePath(self.dataFileIndex)
@@ -234,12 +325,7 @@ class VerifyDatafileRunnable(object):
         self.folderModel.SetDataFileUploaded(self.dataFileIndex, True)
         DATAVIEW_MODELS['folders'].FolderStatusUpdated(self.folderModel)
         if existingDatafile and not FLAGS.testRunRunning:
-            if existingDatafile.md5sum == \
-                    MiscellaneousSettingsModel.GetFakeMd5Sum():
-                logger.warning("MD5(%s): %s" %
-                               (dataFilePath, existingDatafile.md5sum))
-            else:
-                DataFileModel.Verify(existingDatafile.datafileId)
+            self.RequestVerification(existingDatafile)
         verificationsModel.SetComplete(self.verificationModel)
         PostEvent(MYDATA_EVENTS.FoundFullSizeStagedEvent(
             folderModel=self.folderModel, dataFileIndex=self.dataFileIndex,
@@ -252,9 +338,11 @@ class VerifyDatafileRunnable(object):
     def HandleIncompleteStagedUpload(self, existingDatafile,
                                      bytesUploadedPreviously):
         """
-        Re-upload file (resuming partial uploads is not supported).
+        Upload the rest of the file, resuming from the end of the partial
+        copy in staging, or re-upload the whole file if resuming uploads
+        is disabled or the partial copy doesn't match the local file.
         """
-        if wx.GetApp().foldersController.IsShuttingDown():
+        if GetApp().foldersController.IsShuttingDown():
             return
         verificationsModel = DATAVIEW_MODELS['verifications']
         dataFilePath = self.folderModel.GetDataFilePath(self.dataFileIndex)
@@ -263,7 +351,7 @@ class VerifyDatafileRunnable(object):
         verificationsModel.SetFoundUnverifiedNotFullSize(
             self.verificationModel)
         verificationsModel.MessageUpdated(self.verificationModel)
-        logger.debug("Re-uploading \"%s\" to staging, because "
+        logger.debug("Uploading \"%s\" to staging again, because "
                      "the file size is %s bytes in staging, "
                      "but it should be %s bytes."
                      % (dataFilePath, bytesUploadedPreviously,
@@ -285,7 +373,7 @@ class VerifyDatafileRunnable(object):
         Or we could be using the STAGING method but failed to find any
         DataFileObjects on the server for the datafile.
         """
-        if wx.GetApp().foldersController.IsShuttingDown():
+        if GetApp().foldersController.IsShuttingDown():
             return
         verificationsModel = DATAVIEW_MODELS['verifications']
         dataFilePath = self.folderModel.GetDataFilePath(self.dataFileIndex)
@@ -304,12 +392,7 @@ class VerifyDatafileRunnable(object):
             VerificationStatus.FOUND_UNVERIFIED_UNSTAGED
         verificationsModel.MessageUpdated(self.verificationModel)
         if existingDatafile and not FLAGS.testRunRunning:
-            if existingDatafile.md5sum == \
-                    MiscellaneousSettingsModel.GetFakeMd5Sum():
-                logger.warning("MD5(%s): %s" %
-                               (dataFilePath, existingDatafile.md5sum))
-            else:
-                DataFileModel.Verify(existingDatafile.datafileId)
+            self.RequestVerification(existingDatafile)
         verificationsModel.SetComplete(self.verificationModel)
         PostEvent(MYDATA_EVENTS.FoundUnverifiedUnstagedEvent(
             folderModel=self.folderModel, dataFileIndex=self.dataFileIndex,
@@ -319,19 +402,45 @@ class VerifyDatafileRunnable(object):
                 % self.folderModel.GetDataFileRelPath(self.dataFileIndex)
             logger.testrun(message)
 
+    def RequestVerification(self, existingDatafile):
+        """
+        Request verification of an existing unverified DataFile.
+
+        If MyData exited after uploading a file with hash_while_uploading
+        but before updating its DataFile record's placeholder checksum, the
+        checksum is calculated and updated now, so that the file can be
+        verified.  Placeholder checksums from fake_md5_sum are left as is.
+        """
+        dataFilePath = self.folderModel.GetDataFilePath(self.dataFileIndex)
+        if existingDatafile.md5sum == \
+                MiscellaneousSettingsModel.GetFakeMd5Sum():
+            if SETTINGS.miscellaneous.fakeMd5Sum:
+                logger.warning("MD5(%s): %s" %
+                               (dataFilePath, existingDatafile.md5sum))
+                return
+            logger.info("Updating placeholder MD5 checksum for %s"
+                        % dataFilePath)
+            md5sum = self.folderModel.CalculateMd5Sum(self.dataFileIndex)
+            try:
+                DataFileModel.UpdateMd5Sum(existingDatafile.datafileId, md5sum)
+            except requests.exceptions.RequestException:
+                logger.error(traceback.format_exc())
+                return
+            existingDatafile.md5sum = md5sum
+        DataFileModel.Verify(existingDatafile.datafileId)
+
     def HandleExistingVerifiedDatafile(self):
         """
         Found existing verified file on server.
         """
-        if wx.GetApp().foldersController.IsShuttingDown():
+        if GetApp().foldersController.IsShuttingDown():
             return
         verificationsModel = DATAVIEW_MODELS['verifications']
         dataFilePath = self.folderModel.GetDataFilePath(self.dataFileIndex)
         cacheKey = "%s,%s" % (self.folderModel.datasetModel.datasetId,
                               dataFilePath.encode('utf8'))
         if SETTINGS.miscellaneous.cacheDataFileLookups:
-            with LOCKS.updateCache:
-                SETTINGS.verifiedDatafilesCache[cacheKey] = True
+            SETTINGS.verifiedDatafilesCache[cacheKey] = True
         self.folderModel.SetDataFileUploaded(self.dataFileIndex, True)
         DATAVIEW_MODELS['folders'].FolderStatusUpdated(self.folderModel)
         verificationsModel.SetComplete(self.verificationModel)
@@ -0,0 +1,251 @@
+"""
+mydata/controllers/watcher.py
+
+Functionality for the "Continuous" schedule type, which watches the data
+directory for changes (using inotify on Linux), rather than periodically
+rescanning the whole directory tree, and uploads the files in each changed
+dataset folder shortly after they have been written.
+"""
+import os
+import threading
+import time
+import traceback
+
+from ..dataviewmodels.dataview import DATAVIEW_MODELS
+from ..settings import SETTINGS
+from ..logs import logger
+from ..threads.flags import FLAGS
+from ..threads.locks import LOCKS
+from ..threads.dispatcher import CallAfter
+from ..utils.inotify import DirectoryWatcher
+
+# How often (in seconds) to check for changed folders which are ready to
+# upload:
+DEBOUNCE_POLL_INTERVAL = 1.0
+
+
+class FolderWatcher(object):
+    """
+    Watches the data directory, and uploads the files in each dataset
+    folder once it has stopped changing for continuous_debounce_seconds
+    (plus ignore_new_files_minutes if ignore_new_files is enabled, so that
+    the new files won't be skipped for being too new).
+
+    Changes are matched to the dataset folders found by the most recent
+    scan.  Changes which don't belong to any of those folders (e.g. a new
+    dataset folder), or which may have been missed (because inotify's
+    event queue overflowed), trigger a full rescan instead.
+    """
+    def __init__(self):
+        self.directoryWatcher = None
+        self.debounceThread = None
+        self.stopRequested = threading.Event()
+        # The time of the most recent change to each changed folder:
+        self.changedFolders = dict()
+        # The time of the most recent change requiring a full rescan:
+        self.rescanRequested = None
+        self.folderIndex = dict()
+        self.experimentFilesIndex = dict()
+        self.folderIndexKey = None
+
+    def Start(self):
+        """
+        Start watching SETTINGS.general.dataDirectory for changes.
+
+        :raises OSError: if the data directory can't be watched
+        """
+        self.Stop()
+        self.directoryWatcher = DirectoryWatcher(
+            SETTINGS.general.dataDirectory, self.OnChange)
+        self.directoryWatcher.Start()
+        self.stopRequested.clear()
+        self.debounceThread = threading.Thread(
+            target=self.DebounceWorker, name="FolderWatcherDebounceThread")
+        self.debounceThread.daemon = True
+        self.debounceThread.start()
+
+    def Stop(self):
+        """
+        Stop watching the data directory, discarding any changes which
+        haven't been uploaded yet.
+        """
+        self.stopRequested.set()
+        if self.debounceThread and \
+                self.debounceThread != threading.current_thread():
+            self.debounceThread.join()
+        self.debounceThread = None
+        if self.directoryWatcher:
+            self.directoryWatcher.Stop()
+            self.directoryWatcher = None
+        with LOCKS.changedFolders:
+            self.changedFolders.clear()
+            self.rescanRequested = None
+
+    def IsRunning(self):
+        """
+        Returns True if the data directory is being watched.
+        """
+        return self.directoryWatcher is not None and \
+            self.directoryWatcher.IsRunning()
+
+    def OnChange(self, path, now=None):
+        """
+        Record a change to path (or a change which may have been missed,
+        if path is None).
+        """
+        if now is None:
+            now = time.time()
+        folderModel = self.GetFolderForPath(path) if path else None
+        with LOCKS.changedFolders:
+            if folderModel:
+                self.changedFolders[folderModel] = now
+            else:
+                if self.rescanRequested is None:
+                    logger.debug("Changes in %s require a rescan." % path)
+                self.rescanRequested = now
+
+    def Requeue(self, folderModels):
+        """
+        Mark folders as changed again, e.g. because another scan and
+        upload task was running when their changes were ready to upload.
+        """
+        now = time.time()
+        with LOCKS.changedFolders:
+            for folderModel in folderModels:
+                self.changedFolders[folderModel] = now
+
+    def GetFolderForPath(self, path):
+        """
+        Return the dataset folder (from the most recent scan) containing
+        path, or None if path isn't within any of those folders.
+        """
+        folderIndex, experimentFilesIndex = self.GetFolderIndex()
+        parent = path
+        while True:
+            if parent in folderIndex:
+                return folderIndex[parent]
+            grandparent = os.path.dirname(parent)
+            if grandparent == parent:
+                break
+            parent = grandparent
+        return experimentFilesIndex.get(os.path.dirname(path))
+
+    def GetFolderIndex(self):
+        """
+        Return dicts mapping the absolute path of each dataset folder in
+        the Folders view to its FolderModel, and mapping each experiment
+        folder to its experiment files folder, rebuilding them if the
+        Folders view's rows have changed since they were last built.
+
+        When the rows have changed (because the data directory has been
+        rescanned), folders whose changes haven't been uploaded yet are
+        replaced by the corresponding folders from the new scan.
+        """
+        rows = list(DATAVIEW_MODELS['folders'].rowsData)
+        key = (len(rows), id(rows[-1]) if rows else None)
+        with LOCKS.changedFolders:
+            if key == self.folderIndexKey:
+                return self.folderIndex, self.experimentFilesIndex
+            self.folderIndex = dict()
+            self.experimentFilesIndex = dict()
+            for folderModel in rows:
+                if folderModel.isExperimentFilesFolder:
+                    self.experimentFilesIndex[folderModel.location] = \
+                        folderModel
+                else:
+                    self.folderIndex[GetFolderPath(folderModel)] = \
+                        folderModel
+            self.folderIndexKey = key
+            changedFolders = dict()
+            for folderModel, changed in self.changedFolders.items():
+                if folderModel.isExperimentFilesFolder:
+                    current = self.experimentFilesIndex.get(
+                        folderModel.location)
+                else:
+                    current = self.folderIndex.get(
+                        GetFolderPath(folderModel))
+                if current:
+                    changedFolders[current] = changed
+            self.changedFolders = changedFolders
+            return self.folderIndex, self.experimentFilesIndex
+
+    @staticmethod
+    def GetQuietPeriod():
+        """
+        Return the number of seconds for which a folder must stop changing
+        before its files are uploaded.
+        """
+        quietPeriod = SETTINGS.miscellaneous.continuousDebounceSeconds
+        if SETTINGS.filters.ignoreNewFiles:
+            quietPeriod += SETTINGS.filters.ignoreNewFilesMinutes * 60
+        return quietPeriod
+
+    def TakeReadyChanges(self, now=None):
+        """
+        Return a (rescanRequired, folderModels) tuple for the changes
+        which have been quiet for long enough, and stop tracking them, or
+        return None if no changes are ready to upload.
+
+        When a rescan is required, all of the changed folders are included
+        in the rescan, so they aren't returned separately.
+        """
+        if now is None:
+            now = time.time()
+        self.GetFolderIndex()
+        quietPeriod = FolderWatcher.GetQuietPeriod()
+        with LOCKS.changedFolders:
+            if self.rescanRequested is not None:
+                if now - self.rescanRequested < quietPeriod:
+                    return None
+                self.rescanRequested = None
+                self.changedFolders.clear()
+                return True, []
+            folderModels = [
+                folderModel for folderModel, changed in
+                self.changedFolders.items() if now - changed >= quietPeriod]
+            for folderModel in folderModels:
+                del self.changedFolders[folderModel]
+        if not folderModels:
+            return None
+        return False, folderModels
+
+    def DebounceWorker(self):
+        """
+        Start uploading changes once they are ready, unless another scan
+        and upload task is running, in which case the changes wait for it
+        to finish.
+        """
+        while not self.stopRequested.wait(DEBOUNCE_POLL_INTERVAL):
+            if FLAGS.scanningFolders or FLAGS.performingLookupsAndUploads:
+                continue
+            try:
+                readyChanges = self.TakeReadyChanges()
+                if readyChanges:
+                    FolderWatcher.UploadChanges(*readyChanges)
+            except Exception:
+                logger.error(traceback.format_exc())
+
+    @staticmethod
+    def UploadChanges(rescanRequired, folderModels):
+        """
+        Rescan the data directory, or upload the changes in the specified
+        dataset folders.
+        """
+        from ..events.start import StartScansAndUploads
+        from ..events.start import StartUploadsForChangedFolders
+        if rescanRequired:
+            logger.info("Rescanning %s for changes."
+                        % SETTINGS.general.dataDirectory)
+            CallAfter(StartScansAndUploads, None, False)
+        else:
+            CallAfter(StartUploadsForChangedFolders, folderModels)
+
+
+def GetFolderPath(folderModel):
+    """
+    Return the absolute path of a dataset folder.
+    """
+    return os.path.join(folderModel.location, folderModel.folderName)
+
+
+FOLDER_WATCHER = FolderWatcher()
@@ -0,0 +1,199 @@
+"""
+mydata/daemon.py
+
+Runs MyData headless, e.g. as a service on a Linux server with no display.
+
+Launch with "python run.py --headless".  MyData.cfg is read from the usual
+location, and the schedule configured there is applied, using the same
+threaded verification and upload pipeline as the GUI.  Instead of wxPython's
+main loop, events and deferred calls are handled by the EventDispatcher in
+mydata/threads/dispatcher.py, and log messages are written to stderr as
+well as to ~/.MyData_debug_log.txt.
+
+MyData shuts down cleanly when it receives SIGINT or SIGTERM, or when the
+scans and uploads are complete if the --autoexit option is used.
+"""
+import logging
+import os
+import signal
+import sys
+
+from . import __version__ as VERSION
+from . import LATEST_COMMIT
+from .constants import APPNAME
+from .settings import SETTINGS
+from .dataviewmodels.dataview import DATAVIEW_MODELS
+from .controllers.folders import FoldersController
+from .controllers.schedule import ScheduleController
+from .events import MYDATA_EVENTS
+from .logs import logger
+from .logs import MyDataFormatter
+from .threads.dispatcher import DISPATCHER
+from .threads.flags import FLAGS
+
+
+class HeadlessToolbar(object):
+    """
+    Stands in for MyData's toolbar when running headless.
+
+    The GUI uses the state of the toolbar's buttons to determine whether
+    MyData is busy processing scans and uploads, so this class keeps
+    track of that state.
+    """
+    def __init__(self):
+        self.processing = False
+
+    def DisableTestAndUploadToolbarButtons(self):
+        """
+        Called when scans and uploads begin.
+        """
+        self.processing = True
+
+    def EnableTestAndUploadToolbarButtons(self):
+        """
+        Called when scans and uploads finish or are canceled.
+        """
+        self.processing = False
+
+
+class HeadlessFrame(object):
+    """
+    Stands in for MyData's main window when running headless, logging
+    status messages instead of displaying them in a status bar.
+    """
+    def __init__(self):
+        self.toolbar = HeadlessToolbar()
+        self.lastStatusMessage = None
+
+    def SetStatusMessage(self, msg, force=False):
+        """
+        Log status message, unless scans and uploads are being aborted.
+        """
+        if FLAGS.shouldAbort and not force:
+            return
+        if msg and msg != self.lastStatusMessage:
+            logger.info(msg)
+        self.lastStatusMessage = msg
+
+    @staticmethod
+    def GetTitle():
+        """
+        Returns the title the main window would have.
+        """
+        return "%s - %s" % (APPNAME, SETTINGS.general.instrumentName)
+
+
+class MyDataDaemon(object):
+    """
+    Encapsulates the headless MyData application.
+    """
+    def __init__(self, argv):
+        """
+        :param argv: Command-line arguments
+        """
+        from .MyData import MyData
+        MyData.ParseArgs(argv)
+
+        self.frame = HeadlessFrame()
+
+        # Test runs are only available from the GUI:
+        self.testRunFrame = None
+
+        self.foldersController = None
+        self.scheduleController = None
+
+        # There's no one to respond to modal dialogs:
+        os.environ['MYDATA_DONT_SHOW_MODAL_DIALOGS'] = 'True'
+
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setLevel(logger.GetLevel())
+        handler.setFormatter(MyDataFormatter(logger.formatString))
+        logger.loggerObject.addHandler(handler)
+
+    def OnInit(self):
+        """
+        Initialize MyData's models and controllers, and queue the schedule
+        to be applied once the main loop has started.
+
+        Returns False if MyData can't run without a GUI, because
+        MyData.cfg hasn't been configured.
+        """
+        from .MyData import InitializeDataViewModels
+        from .utils import CreateConfigPathIfNecessary
+        from .utils import InitializeTrustedCertsPath
+        appdirPath = CreateConfigPathIfNecessary()
+        InitializeTrustedCertsPath()
+        InitializeDataViewModels()
+
+        logger.info("%s version: v%s" % (APPNAME, VERSION))
+        logger.info("%s commit:  %s" % (APPNAME, LATEST_COMMIT))
+        logger.info("appdirPath: " + appdirPath)
+        logger.info("SETTINGS.configPath: " + SETTINGS.configPath)
+
+        if SETTINGS.RequiredFieldIsBlank():
+            logger.error(
+                "MyData can't run headless until its required settings "
+                "have been saved in %s." % SETTINGS.configPath)
+            return False
+
+        DISPATCHER.app = self
+        MYDATA_EVENTS.InitializeWithNotifyWindow(None)
+        self.foldersController = FoldersController(None)
+        self.scheduleController = ScheduleController()
+
+        DISPATCHER.CallAfter(self.ApplySchedule)
+        return True
+
+    def ApplySchedule(self):
+        """
+        Apply the schedule configured in MyData.cfg.
+
+        Without a GUI, there's no way to trigger the "Manually" and
+        "On Settings Saved" schedule types, so they run the scans and
+        uploads once at startup instead.
+        """
+        scheduleType = SETTINGS.schedule.scheduleType
+        if scheduleType in ("Manually", "On Settings Saved"):
+            logger.warning(
+                "The \"%s\" schedule type can't be triggered when running "
+                "headless, so the scans and uploads will run once now."
+                % scheduleType)
+            self.scheduleController.CreateManualTask(None)
+        else:
+            self.scheduleController.ApplySchedule(None)
+
+    def MainLoop(self):
+        """
+        Run the headless dispatcher's main loop until MyData shuts down.
+        """
+        if not self.OnInit():
+            sys.exit(1)
+        signal.signal(signal.SIGINT, self.OnSignal)
+        signal.signal(signal.SIGTERM, self.OnSignal)
+        DISPATCHER.MainLoop()
+
+    def OnSignal(self, signum, frame):
+        """
+        Shut down cleanly when asked to terminate.
+        """
+        # pylint: disable=unused-argument
+        logger.info("Received signal %d, shutting down." % signum)
+        DISPATCHER.CallAfter(self.ShutDownCleanlyAndExit, None)
+
+    def ShutDownCleanlyAndExit(self, event, confirm=False):
+        """
+        Shut down any scans and uploads in progress, cancel scheduled
+        tasks and exit the main loop.
+        """
+        # pylint: disable=unused-argument
+        FLAGS.shouldAbort = True
+        self.foldersController.ShutDownUploadThreads()
+        DATAVIEW_MODELS['tasks'].ShutDown()
+        DISPATCHER.ExitMainLoop()
+
+    def Processing(self):
+        """
+        Returns True/False, depending on whether MyData is
+        currently busy processing something.
+        """
+        return self.frame.toolbar.processing
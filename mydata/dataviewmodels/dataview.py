@@ -1,12 +1,17 @@
 """
 Shared functionality for MyData's dataview model classes.
 """
+import collections
 import threading
 import traceback
 
 import wx
 
+from ..settings import SETTINGS
 from ..logs import logger
+from ..threads.dispatcher import CallAfter
+from ..utils.history import DATAVIEW_HISTORY
+from .updates import DATAVIEW_UPDATES
 
 if 'phoenix' in wx.PlatformInfo:
     from wx.dataview import DataViewIndexListModel
@@ -14,6 +19,12 @@ else:
     from wx.dataview import PyDataViewIndexListModel as DataViewIndexListModel
 
 
+# If more than this many cells have changed since a view was last refreshed,
+# the view is asked to refresh the rows containing them with one ItemsChanged
+# notification, instead of one RowValueChanged notification per cell:
+MAX_ROW_VALUE_CHANGED_NOTIFICATIONS = 20
+
+
 class ColumnRenderer(object):
     """
     Enumerated data type.
@@ -50,6 +61,25 @@ class MyDataDataViewModel(DataViewIndexListModel):
         self.maxDataViewId = 0
         self.maxDataViewIdLock = threading.Lock()
 
+        # Indexes for finding a row from its data object or its dataViewId
+        # without searching rowsData.  Appending a row updates them, but
+        # inserting or deleting rows (e.g. when filtering) shifts the rows
+        # which follow, so then the indexes are rebuilt when next needed.
+        # Sorting is done by the view, so it doesn't affect rowsData:
+        self.rowIndexLock = threading.Lock()
+        self.rowsByObjectId = dict()
+        self.rowsByDataViewId = dict()
+        self.rowIndexesValid = True
+
+        # Models with a historyName (Verifications and Uploads) can be
+        # bounded by max_completed_dataview_rows in MyData.cfg, so that
+        # only the most recent completed rows are kept in memory.  Older
+        # completed rows are moved to DATAVIEW_HISTORY (see RowCompleted):
+        self.historyName = None
+        self.completedRows = collections.deque()
+        self.completedRowsLock = threading.Lock()
+        self.numRowsRemoved = 0
+
     def GetColumnType(self, col):
         """
         All of our columns are strings.  If the model or the renderers
@@ -146,12 +176,79 @@ class MyDataDataViewModel(DataViewIndexListModel):
         """
         return len(self.filteredData)
 
+    def GetTotalRowCount(self):
+        """
+        Report how many rows have been added to this model, including
+        rows which have been filtered out, or moved to DATAVIEW_HISTORY.
+        """
+        return len(self.rowsData) + len(self.filteredData) + \
+            self.numRowsRemoved
+
     def GetColumnCount(self):
         """
         Report how many columns this model provides data for.
         """
         return len(self.columnNames)
 
+    def GetRowIndex(self, rowData):
+        """
+        Returns the row containing rowData, or None if rowData isn't
+        in the model (e.g. because it has been filtered out).
+        """
+        with self.rowIndexLock:
+            self.RebuildRowIndexesIfNecessary()
+            row = self.rowsByObjectId.get(id(rowData))
+            if row is None:
+                return None
+            if row >= len(self.rowsData) or self.rowsData[row] is not rowData:
+                # The rows have changed without the indexes being updated:
+                self.rowIndexesValid = False
+                self.RebuildRowIndexesIfNecessary()
+                row = self.rowsByObjectId.get(id(rowData))
+        return row
+
+    def GetRowIndexForDataViewId(self, dataViewId):
+        """
+        Returns the row containing the record with the specified
+        dataViewId, or None if there is no such row.
+        """
+        with self.rowIndexLock:
+            self.RebuildRowIndexesIfNecessary()
+            row = self.rowsByDataViewId.get(dataViewId)
+        if row is None or row >= len(self.rowsData):
+            return None
+        return row
+
+    def IndexRow(self, row, rowData):
+        """
+        Add a row to the row indexes.  The caller must hold rowIndexLock.
+        """
+        self.rowsByObjectId[id(rowData)] = row
+        dataViewId = getattr(rowData, "dataViewId", None)
+        if dataViewId is not None:
+            self.rowsByDataViewId[dataViewId] = row
+
+    def InvalidateRowIndexes(self):
+        """
+        Called when rows have been inserted or deleted, so that the row
+        indexes will be rebuilt when they are next needed.
+        """
+        with self.rowIndexLock:
+            self.rowIndexesValid = False
+
+    def RebuildRowIndexesIfNecessary(self):
+        """
+        Rebuild the row indexes if rows have been inserted or deleted.
+        The caller must hold rowIndexLock.
+        """
+        if self.rowIndexesValid:
+            return
+        self.rowsByObjectId = dict()
+        self.rowsByDataViewId = dict()
+        for row, rowData in enumerate(list(self.rowsData)):
+            self.IndexRow(row, rowData)
+        self.rowIndexesValid = True
+
     def Filter(self, searchString):
         """
         Only show rows matching the query string, typed in the search box
@@ -159,6 +256,7 @@ class MyDataDataViewModel(DataViewIndexListModel):
         """
         if not self.filterFields:
             return
+        self.InvalidateRowIndexes()
         self.searchString = searchString
         query = self.searchString.lower()
         if self.GetFilteredRowCount() == 0:
@@ -195,6 +293,7 @@ class MyDataDataViewModel(DataViewIndexListModel):
                     self.rowsData.insert(row, self.filteredData[filteredRow])
                     self._RowInserted(row)
                 del self.filteredData[filteredRow]
+        self.InvalidateRowIndexes()
 
     def _RowAppended(self):
         """
@@ -203,7 +302,7 @@ class MyDataDataViewModel(DataViewIndexListModel):
         if threading.current_thread().name == "MainThread":
             super(MyDataDataViewModel, self).RowAppended()
         else:
-            wx.CallAfter(super(MyDataDataViewModel, self).RowAppended)
+            CallAfter(super(MyDataDataViewModel, self).RowAppended)
 
     def _RowInserted(self, row):
         """
@@ -212,7 +311,7 @@ class MyDataDataViewModel(DataViewIndexListModel):
         if threading.current_thread().name == "MainThread":
             super(MyDataDataViewModel, self).RowInserted(row)
         else:
-            wx.CallAfter(super(MyDataDataViewModel, self).RowInserted, row)
+            CallAfter(super(MyDataDataViewModel, self).RowInserted, row)
 
     def _RowDeleted(self, row):
         """
@@ -221,7 +320,7 @@ class MyDataDataViewModel(DataViewIndexListModel):
         if threading.current_thread().name == "MainThread":
             super(MyDataDataViewModel, self).RowDeleted(row)
         else:
-            wx.CallAfter(super(MyDataDataViewModel, self).RowDeleted, row)
+            CallAfter(super(MyDataDataViewModel, self).RowDeleted, row)
 
     def _RowsDeleted(self, rows):
         """
@@ -230,19 +329,30 @@ class MyDataDataViewModel(DataViewIndexListModel):
         if threading.current_thread().name == "MainThread":
             super(MyDataDataViewModel, self).RowsDeleted(rows)
         else:
-            wx.CallAfter(super(MyDataDataViewModel, self).RowsDeleted, rows)
+            CallAfter(super(MyDataDataViewModel, self).RowsDeleted, rows)
 
     def AddRow(self, value):
         """
         Add a new row
         """
-        self.Filter("")
-        self.rowsData.append(value)
-        self._RowAppended()
+        if not self.searchString and not self.filteredData:
+            # No rows are filtered out, so there's no need to scan all of
+            # the rows to remove and restore the filter:
+            with self.rowIndexLock:
+                self.rowsData.append(value)
+                if self.rowIndexesValid:
+                    self.IndexRow(len(self.rowsData) - 1, value)
+            self._RowAppended()
+            self.unfilteredData = self.rowsData
+        else:
+            self.Filter("")
+            self.rowsData.append(value)
+            self.InvalidateRowIndexes()
+            self._RowAppended()
 
-        self.unfilteredData = self.rowsData
-        self.filteredData = list()
-        self.Filter(self.searchString)
+            self.unfilteredData = self.rowsData
+            self.filteredData = list()
+            self.Filter(self.searchString)
 
         with self.maxDataViewIdLock:
             self.maxDataViewId = value.dataViewId
@@ -252,9 +362,13 @@ class MyDataDataViewModel(DataViewIndexListModel):
         Delete all rows.
         """
         rowsDeleted = []
-        for row in reversed(range(0, self.GetCount())):
-            del self.rowsData[row]
-            rowsDeleted.append(row)
+        with self.rowIndexLock:
+            for row in reversed(range(0, self.GetCount())):
+                del self.rowsData[row]
+                rowsDeleted.append(row)
+            self.rowsByObjectId = dict()
+            self.rowsByDataViewId = dict()
+            self.rowIndexesValid = True
 
         self._RowsDeleted(rowsDeleted)
 
@@ -263,6 +377,71 @@ class MyDataDataViewModel(DataViewIndexListModel):
         self.searchString = ""
         self.maxDataViewId = 0
 
+        with self.completedRowsLock:
+            self.completedRows.clear()
+            self.numRowsRemoved = 0
+        if self.historyName:
+            DATAVIEW_HISTORY.Clear(self.historyName)
+
+    def RowCompleted(self, rowData):
+        """
+        Called when the row containing rowData has completed successfully,
+        so it won't change again.
+
+        If max_completed_dataview_rows is set, the oldest completed rows
+        are moved to DATAVIEW_HISTORY once there are more than that many.
+        They are moved in batches (of up to a tenth of the maximum), so
+        the remaining rows don't need to be shifted every time a row
+        completes.
+        """
+        maxRows = SETTINGS.miscellaneous.maxCompletedDataViewRows
+        if not self.historyName or maxRows <= 0:
+            return
+        with self.completedRowsLock:
+            self.completedRows.append(rowData)
+            if len(self.completedRows) <= maxRows + maxRows // 10:
+                return
+            rowsToRemove = [
+                self.completedRows.popleft()
+                for _ in range(len(self.completedRows) - maxRows)]
+        DATAVIEW_HISTORY.Append(
+            self.historyName,
+            [(rowData.dataViewId, self.GetHistoryValues(rowData))
+             for rowData in rowsToRemove])
+        self.DeleteRows(rowsToRemove)
+
+    def GetHistoryValues(self, rowData):
+        """
+        Return a dictionary mapping column keys to the strings displayed
+        in those columns for rowData, to record in DATAVIEW_HISTORY.
+        """
+        return dict(
+            (key, str(rowData.GetValueForKey(key)))
+            for key in self.columnKeys)
+
+    def DeleteRows(self, rowsToDelete):
+        """
+        Delete the rows containing the data objects in rowsToDelete,
+        including any which have been filtered out.
+        """
+        idsToDelete = set(id(rowData) for rowData in rowsToDelete)
+        with self.rowIndexLock:
+            rowsDeleted = [
+                row for row in reversed(range(len(self.rowsData)))
+                if id(self.rowsData[row]) in idsToDelete]
+            # Slice assignment keeps unfilteredData referring to rowsData
+            # when the model isn't filtered:
+            self.rowsData[:] = [
+                rowData for rowData in self.rowsData
+                if id(rowData) not in idsToDelete]
+            self.filteredData[:] = [
+                rowData for rowData in self.filteredData
+                if id(rowData) not in idsToDelete]
+            self.rowIndexesValid = False
+            self.numRowsRemoved += len(rowsToDelete)
+        if rowsDeleted:
+            self._RowsDeleted(rowsDeleted)
+
     def GetMaxDataViewId(self):
         """
         Get maximum dataview ID
@@ -290,6 +469,41 @@ class MyDataDataViewModel(DataViewIndexListModel):
         except wx.PyAssertionError:
             logger.warning(traceback.format_exc())
 
+    def MarkRowValueChanged(self, rowData, col):
+        """
+        Mark the value in the specified column of the row containing
+        rowData as changed, so that the view is refreshed the next time
+        DATAVIEW_UPDATES is flushed.  This can be called from any thread.
+        """
+        DATAVIEW_UPDATES.RowValueChanged(self, rowData, col)
+
+    def NotifyRowValuesChanged(self, changedRows):
+        """
+        Notify views of changed values, called from the main thread by
+        DATAVIEW_UPDATES.Flush
+
+        :param changedRows: A list of (rowData, columns) tuples
+        """
+        changedCells = []
+        for rowData, cols in changedRows:
+            row = self.GetRowIndex(rowData)
+            if row is not None:
+                changedCells.append((row, sorted(cols)))
+        changedCells.sort()
+        if sum(len(cols) for _, cols in changedCells) <= \
+                MAX_ROW_VALUE_CHANGED_NOTIFICATIONS:
+            for row, cols in changedCells:
+                for col in cols:
+                    self.TryRowValueChanged(row, col)
+            return
+        items = wx.dataview.DataViewItemArray()
+        for row, _ in changedCells:
+            items.append(self.GetItem(row))
+        try:
+            self.ItemsChanged(items)
+        except wx.PyAssertionError:
+            logger.warning(traceback.format_exc())
+
     def GetColumnRenderer(self, col):
         """
         Return the renderer to be used for the specified dataview column
@@ -7,10 +7,9 @@ import threading
 import os
 import sys
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from glob import glob
-
-import wx
+from fnmatch import fnmatch
 
 from ..settings import SETTINGS
 from ..models.folder import FolderModel
@@ -24,6 +23,8 @@ from ..events import MYDATA_EVENTS
 from ..events import PostEvent
 from ..events.stop import RaiseExceptionIfUserAborted
 from ..threads.locks import LOCKS
+from ..threads.dispatcher import CallAfter
+from ..utils.scanindex import SCAN_INDEX
 from .dataview import MyDataDataViewModel
 from .dataview import DATAVIEW_MODELS
 
@@ -153,13 +154,7 @@ class FoldersModel(MyDataDataViewModel):
             if folderModel not in self.foldersToUpdate:
                 with LOCKS.foldersToUpdate:
                     self.foldersToUpdate.append(folderModel)
-        for row in range(0, self.GetCount()):
-            if self.rowsData[row] == folderModel:
-                col = self.columnNames.index("Status")
-                if threading.current_thread().name == "MainThread":
-                    self.TryRowValueChanged(row, col)
-                else:
-                    wx.CallAfter(self.TryRowValueChanged, row, col)
+        self.MarkRowValueChanged(folderModel, self.columnNames.index("Status"))
 
     def ScanFolders(self, writeProgressUpdateToStatusBar):
         """
@@ -176,152 +171,299 @@ class FoldersModel(MyDataDataViewModel):
         defaultOwner = SETTINGS.general.defaultOwner
         folderStructure = SETTINGS.advanced.folderStructure
         logger.debug("FoldersModel.ScanFolders(): Scanning " + dataDir + "...")
-        if folderStructure.startswith("Username") or \
-                folderStructure.startswith("Email"):
-            self.ScanForUserFolders(writeProgressUpdateToStatusBar)
-        elif folderStructure.startswith("User Group"):
-            self.ScanForGroupFolders(writeProgressUpdateToStatusBar)
-        elif folderStructure.startswith("Experiment"):
-            self.ScanForExperimentFolders(dataDir, defaultOwner,
-                                          defaultOwner.username)
-        elif folderStructure.startswith("Dataset"):
-            self.ScanForDatasetFolders(dataDir, defaultOwner,
-                                       defaultOwner.username)
+        if SETTINGS.miscellaneous.cacheFolderScans:
+            SCAN_INDEX.Load(SETTINGS.scanIndexPath,
+                            SETTINGS.miscellaneous.forceFullRescan)
         else:
-            raise InvalidFolderStructure("Unknown folder structure.")
+            SCAN_INDEX.Disable()
+        scanCompleted = False
+        try:
+            if folderStructure.startswith("Username") or \
+                    folderStructure.startswith("Email"):
+                self.ScanForUserFolders(writeProgressUpdateToStatusBar)
+            elif folderStructure.startswith("User Group"):
+                self.ScanForGroupFolders(writeProgressUpdateToStatusBar)
+            elif folderStructure.startswith("Experiment"):
+                self.ScanForExperimentFolders(dataDir, defaultOwner,
+                                              defaultOwner.username)
+            elif folderStructure.startswith("Dataset"):
+                self.ScanForDatasetFolders(dataDir, defaultOwner,
+                                           defaultOwner.username)
+            else:
+                raise InvalidFolderStructure("Unknown folder structure.")
+            scanCompleted = True
+        finally:
+            # After a complete scan, the index stays enabled while the
+            # dataset folders are walked by the upload threads, and is
+            # saved (and pruned) by FoldersController.ShutDownUploadThreads.
+            # Index entries for directories we didn't visit are only pruned
+            # if the scan wasn't interrupted:
+            if not scanCompleted:
+                SCAN_INDEX.Save(prune=False)
 
     def ScanForUserFolders(self, writeProgressUpdateToStatusBar):
         """
         Scan for user folders.
         """
+        self.ScanUserOrGroupFolders(
+            UserFolderNames(SETTINGS.general.dataDirectory),
+            self.LookUpUserFolder, self.ScanUserFolder,
+            DATAVIEW_MODELS['users'], writeProgressUpdateToStatusBar)
+
+    @staticmethod
+    def LookUpUserFolder(userFolderName):
+        """
+        Look up the MyTardis user record for a user folder.
+
+        Returns a (shouldScan, userRecord) tuple, where shouldScan is False
+        if the folder should be skipped.
+        """
+        logger.debug(
+            "Found folder assumed to be %s: %s" % (UserFolderType(),
+                                                   userFolderName))
+        try:
+            userRecord = UserModel.GetUserForFolder(userFolderName)
+        except DoesNotExist:
+            userRecord = None
+        RaiseExceptionIfUserAborted()
+        if not userRecord:
+            message = "Didn't find a MyTardis user record for folder " \
+                "\"%s\" in %s" % (userFolderName,
+                                  SETTINGS.general.dataDirectory)
+            logger.warning(message)
+            if not SETTINGS.advanced.uploadInvalidUserOrGroupFolders:
+                logger.warning("Skipping %s, because "
+                               "'Upload invalid user folders' "
+                               "setting is not checked." % userFolderName)
+                return False, None
+            userRecord = UserModel.GetUserForFolder(
+                userFolderName, userNotFoundInMyTardis=True)
+        return True, userRecord
+
+    def ScanUserFolder(self, userFolderName, userRecord,
+                       pendingFolders=None):
+        """
+        Scan a user folder for dataset folders.
+
+        Returns False if the user folder couldn't be scanned.
+        """
         folderStructure = SETTINGS.advanced.folderStructure
-        uploadInvalidUserOrGroupFolders = \
-            SETTINGS.advanced.uploadInvalidUserOrGroupFolders
-        numUserFoldersScanned = 0
-        for userFolderName in \
-                UserFolderNames(SETTINGS.general.dataDirectory):
-            RaiseExceptionIfUserAborted()
-            logger.debug(
-                "Found folder assumed to be %s: %s" % (UserFolderType(),
-                                                       userFolderName))
-            try:
-                userRecord = UserModel.GetUserForFolder(userFolderName)
-            except DoesNotExist:
-                userRecord = None
-            RaiseExceptionIfUserAborted()
-            usersDataViewId = DATAVIEW_MODELS['users'].GetMaxDataViewId() + 1
-            if not userRecord:
-                message = "Didn't find a MyTardis user record for folder " \
-                    "\"%s\" in %s" % (userFolderName,
-                                      SETTINGS.general.dataDirectory)
+        userFolderPath = os.path.join(
+            SETTINGS.general.dataDirectory, userFolderName)
+        logger.debug("Folder structure: " + folderStructure)
+        if folderStructure in ('Username / Dataset', 'Email / Dataset'):
+            self.ScanForDatasetFolders(userFolderPath, userRecord,
+                                       userFolderName,
+                                       pendingFolders=pendingFolders)
+        elif folderStructure in (
+                'Username / Experiment / Dataset',
+                'Email / Experiment / Dataset'):
+            self.ScanForExperimentFolders(userFolderPath, userRecord,
+                                          userFolderName,
+                                          pendingFolders=pendingFolders)
+        elif folderStructure == \
+                'Username / "MyTardis" / Experiment / Dataset':
+            userFolderContents = os.listdir(userFolderPath)
+            myTardisFolderName = None
+            for item in userFolderContents:
+                if item.lower() == 'mytardis':
+                    myTardisFolderName = item
+            if not myTardisFolderName:
+                message = 'Didn\'t find "MyTardis" folder in ' \
+                    '"%s"' % userFolderPath
                 logger.warning(message)
-                if not uploadInvalidUserOrGroupFolders:
-                    logger.warning("Skipping %s, because "
-                                   "'Upload invalid user folders' "
-                                   "setting is not checked." % userFolderName)
-                    continue
-                userRecord = UserModel.GetUserForFolder(
-                    userFolderName, userNotFoundInMyTardis=True)
-            userRecord.dataViewId = usersDataViewId
-            DATAVIEW_MODELS['users'].AddRow(userRecord)
-
-            userFolderPath = os.path.join(
-                SETTINGS.general.dataDirectory, userFolderName)
-            logger.debug("Folder structure: " + folderStructure)
-            if folderStructure in ('Username / Dataset', 'Email / Dataset'):
-                self.ScanForDatasetFolders(userFolderPath, userRecord,
-                                           userFolderName)
-            elif folderStructure in (
-                    'Username / Experiment / Dataset',
-                    'Email / Experiment / Dataset'):
-                self.ScanForExperimentFolders(userFolderPath, userRecord,
-                                              userFolderName)
-            elif folderStructure == \
-                    'Username / "MyTardis" / Experiment / Dataset':
-                userFolderContents = os.listdir(userFolderPath)
-                myTardisFolderName = None
-                for item in userFolderContents:
-                    if item.lower() == 'mytardis':
-                        myTardisFolderName = item
-                if not myTardisFolderName:
-                    message = 'Didn\'t find "MyTardis" folder in ' \
-                        '"%s"' % userFolderPath
-                    logger.warning(message)
-                    continue
-                myTardisFolderPath = os.path.join(userFolderPath,
-                                                  myTardisFolderName)
-                self.ScanForExperimentFolders(myTardisFolderPath,
-                                              userRecord,
-                                              userFolderName)
-            RaiseExceptionIfUserAborted()
-
-            numUserFoldersScanned += 1
-            if threading.current_thread().name == "MainThread":
-                writeProgressUpdateToStatusBar(numUserFoldersScanned)
-            else:
-                wx.CallAfter(
-                    writeProgressUpdateToStatusBar, numUserFoldersScanned)
+                return False
+            myTardisFolderPath = os.path.join(userFolderPath,
+                                              myTardisFolderName)
+            self.ScanForExperimentFolders(myTardisFolderPath,
+                                          userRecord,
+                                          userFolderName,
+                                          pendingFolders=pendingFolders)
+        return True
 
     def ScanForGroupFolders(self, writeProgressUpdateToStatusBar):
         """
         Scan for group folders.
         """
+        self.ScanUserOrGroupFolders(
+            GroupFolderNames(SETTINGS.general.dataDirectory),
+            self.LookUpGroupFolder, self.ScanGroupFolder,
+            DATAVIEW_MODELS['groups'], writeProgressUpdateToStatusBar)
+
+    @staticmethod
+    def LookUpGroupFolder(groupFolderName):
+        """
+        Look up the MyTardis user group record for a group folder.
+
+        Returns a (shouldScan, groupRecord) tuple, where shouldScan is False
+        if the folder should be skipped.  The groupRecord is None if the
+        group wasn't found but invalid group folders are being uploaded.
+        """
+        logger.debug("Found folder assumed to be user group name: " +
+                     groupFolderName)
+        try:
+            groupName = SETTINGS.advanced.groupPrefix + groupFolderName
+            groupRecord = GroupModel.GetGroupByName(groupName)
+        except DoesNotExist:
+            groupRecord = None
+            message = "Didn't find a MyTardis user group record for " \
+                "folder \"%s\" in %s" % (groupFolderName,
+                                         SETTINGS.general.dataDirectory)
+            logger.warning(message)
+            if not SETTINGS.advanced.uploadInvalidUserOrGroupFolders:
+                logger.warning("Skipping %s, because "
+                               "'Upload invalid user group folders' "
+                               "setting is not checked." % groupFolderName)
+                return False, None
+        return True, groupRecord
+
+    def ScanGroupFolder(self, groupFolderName, groupRecord,
+                        pendingFolders=None):
+        """
+        Scan a user group folder for dataset folders.
+
+        Returns True, for consistency with ScanUserFolder.
+        """
         folderStructure = SETTINGS.advanced.folderStructure
-        uploadInvalidUserOrGroupFolders = \
-            SETTINGS.advanced.uploadInvalidUserOrGroupFolders
-        numGroupFoldersScanned = 0
-        for groupFolderName in \
-                GroupFolderNames(SETTINGS.general.dataDirectory):
+        groupFolderPath = os.path.join(
+            SETTINGS.general.dataDirectory, groupFolderName)
+        defaultOwner = SETTINGS.general.defaultOwner
+        if folderStructure == \
+                'User Group / Instrument / Full Name / Dataset':
+            self.ImportGroupFolders(groupFolderPath, groupRecord,
+                                    pendingFolders=pendingFolders)
+        elif folderStructure == 'User Group / Experiment / Dataset':
+            self.ScanForExperimentFolders(groupFolderPath,
+                                          owner=defaultOwner,
+                                          groupRecord=groupRecord,
+                                          groupFolderName=groupFolderName,
+                                          pendingFolders=pendingFolders)
+        elif folderStructure == 'User Group / Dataset':
+            self.ScanForDatasetFolders(groupFolderPath,
+                                       owner=defaultOwner,
+                                       groupRecord=groupRecord,
+                                       groupFolderName=groupFolderName,
+                                       pendingFolders=pendingFolders)
+        else:
+            raise InvalidFolderStructure("Unknown folder structure.")
+        return True
+
+    def ScanUserOrGroupFolders(self, folderNames, lookUpFolder, scanFolder,
+                               recordsModel, writeProgressUpdateToStatusBar):
+        """
+        Scan user or group folders.
+
+        For each folder name, lookUpFolder returns a (shouldScan, record)
+        tuple, then the record is added to recordsModel (the Users or
+        Groups view) and scanFolder scans the folder for dataset folders.
+
+        If folder_scan_threads in MyData.cfg is greater than 1, the lookups
+        and scans run concurrently in a thread pool (see
+        ScanUserOrGroupFoldersConcurrently).
+        """
+        # pylint: disable=too-many-arguments
+        if SETTINGS.miscellaneous.folderScanThreads > 1:
+            self.ScanUserOrGroupFoldersConcurrently(
+                folderNames, lookUpFolder, scanFolder, recordsModel,
+                writeProgressUpdateToStatusBar)
+            return
+        numFoldersScanned = 0
+        for folderName in folderNames:
             RaiseExceptionIfUserAborted()
-            logger.debug("Found folder assumed to be user group name: " +
-                         groupFolderName)
-            groupsDataViewId = DATAVIEW_MODELS['groups'].GetMaxDataViewId() + 1
-            try:
-                groupName = SETTINGS.advanced.groupPrefix + groupFolderName
-                groupRecord = GroupModel.GetGroupByName(groupName)
-            except DoesNotExist:
-                groupRecord = None
-                message = "Didn't find a MyTardis user group record for " \
-                    "folder \"%s\" in %s" % (groupFolderName,
-                                             SETTINGS.general.dataDirectory)
-                logger.warning(message)
-                if not uploadInvalidUserOrGroupFolders:
-                    logger.warning("Skipping %s, because "
-                                   "'Upload invalid user group folders' "
-                                   "setting is not checked." % groupFolderName)
-                    continue
+            shouldScan, record = lookUpFolder(folderName)
+            if not shouldScan:
+                continue
+            self.AddUserOrGroupRecord(recordsModel, record)
+            if not scanFolder(folderName, record):
+                continue
             RaiseExceptionIfUserAborted()
-            if groupRecord:
-                groupRecord.dataViewId = groupsDataViewId
-                DATAVIEW_MODELS['groups'].AddRow(groupRecord)
-            groupFolderPath = os.path.join(
-                SETTINGS.general.dataDirectory, groupFolderName)
-            defaultOwner = SETTINGS.general.defaultOwner
-            if folderStructure == \
-                    'User Group / Instrument / Full Name / Dataset':
-                self.ImportGroupFolders(groupFolderPath, groupRecord)
-            elif folderStructure == 'User Group / Experiment / Dataset':
-                self.ScanForExperimentFolders(groupFolderPath,
-                                              owner=defaultOwner,
-                                              groupRecord=groupRecord,
-                                              groupFolderName=groupFolderName)
-            elif folderStructure == 'User Group / Dataset':
-                self.ScanForDatasetFolders(groupFolderPath,
-                                           owner=defaultOwner,
-                                           groupRecord=groupRecord,
-                                           groupFolderName=groupFolderName)
-            else:
-                raise InvalidFolderStructure("Unknown folder structure.")
+            numFoldersScanned += 1
+            UpdateScanProgress(
+                writeProgressUpdateToStatusBar, numFoldersScanned)
+
+    def ScanUserOrGroupFoldersConcurrently(
+            self, folderNames, lookUpFolder, scanFolder, recordsModel,
+            writeProgressUpdateToStatusBar):
+        """
+        Look up and scan user or group folders in a pool of
+        folder_scan_threads threads, with each scan collecting its dataset
+        folders in a list, rather than adding them to the Folders view.
+        The records and dataset folders are then added from this thread in
+        the order of folderNames, so they get the same dataViewIds as they
+        would from a sequential scan.
+        """
+        # pylint: disable=too-many-arguments
+        def LookUpAndScanFolder(folderName):
+            """
+            Look up a user or group folder's record and collect its
+            dataset folders, without adding them to the views.
+            """
             RaiseExceptionIfUserAborted()
-            numGroupFoldersScanned += 1
-            if threading.current_thread().name == "MainThread":
-                writeProgressUpdateToStatusBar(numGroupFoldersScanned)
-            else:
-                wx.CallAfter(
-                    writeProgressUpdateToStatusBar, numGroupFoldersScanned)
+            shouldScan, record = lookUpFolder(folderName)
+            if not shouldScan:
+                return None
+            pendingFolders = []
+            scanned = scanFolder(folderName, record, pendingFolders)
+            return record, pendingFolders, scanned
+
+        executor = ThreadPoolExecutor(
+            max_workers=SETTINGS.miscellaneous.folderScanThreads,
+            thread_name_prefix="ScanFoldersThread")
+        futures = [executor.submit(LookUpAndScanFolder, folderName)
+                   for folderName in folderNames]
+        numFoldersScanned = 0
+        try:
+            for future in futures:
+                result = future.result()
+                RaiseExceptionIfUserAborted()
+                if not result or \
+                        not self.AddScannedFolders(recordsModel, *result):
+                    continue
+                numFoldersScanned += 1
+                UpdateScanProgress(
+                    writeProgressUpdateToStatusBar, numFoldersScanned)
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def AddScannedFolders(self, recordsModel, record, pendingFolders,
+                          scanned):
+        """
+        Add a user or group record and the dataset folders collected by
+        its folder's scan to the views.
+
+        Returns True if the user or group folder was scanned.
+        """
+        self.AddUserOrGroupRecord(recordsModel, record)
+        for folderModel in pendingFolders:
+            folderModel.dataViewId = self.GetMaxDataViewId() + 1
+            self.AddRow(folderModel)
+        return scanned
+
+    @staticmethod
+    def AddUserOrGroupRecord(recordsModel, record):
+        """
+        Add a user or group record to the Users or Groups view.
+        """
+        if record:
+            record.dataViewId = recordsModel.GetMaxDataViewId() + 1
+            recordsModel.AddRow(record)
+
+    def AddFolder(self, folderModel, pendingFolders=None):
+        """
+        Add a dataset folder found by a scan to the Folders view, or if
+        pendingFolders is a list, append the folder to it, so that it can
+        be added to the view later.
+        """
+        if pendingFolders is not None:
+            pendingFolders.append(folderModel)
+        else:
+            self.AddRow(folderModel)
 
     def ScanForDatasetFolders(self, pathToScan, owner, userFolderName=None,
-                              groupRecord=None, groupFolderName=None):
+                              groupRecord=None, groupFolderName=None,
+                              pendingFolders=None):
         """
         Scan for dataset folders.
         """
@@ -348,12 +490,13 @@ class FoldersModel(MyDataDataViewModel):
                 RaiseExceptionIfUserAborted()
                 folderModel.SetCreatedDate()
                 SetExperimentTitle(folderModel, owner, groupFolderName)
-                self.AddRow(folderModel)
+                self.AddFolder(folderModel, pendingFolders)
         except:
             logger.error(traceback.format_exc())
 
     def ScanForExperimentFolders(self, pathToScan, owner, userFolderName=None,
-                                 groupRecord=None, groupFolderName=None):
+                                 groupRecord=None, groupFolderName=None,
+                                 pendingFolders=None):
         """
         Scans for experiment folders.
 
@@ -398,7 +541,7 @@ class FoldersModel(MyDataDataViewModel):
                 else:
                     raise InvalidFolderStructure("Unknown folder structure.")
                 folderModel.SetCreatedDate()
-                self.AddRow(folderModel)
+                self.AddFolder(folderModel, pendingFolders)
             filesDepth1 = FilesInTopLevel(expFolderPath)
             if filesDepth1:
                 logger.info("Found %s experiment file(s) in %s\n"
@@ -415,9 +558,10 @@ class FoldersModel(MyDataDataViewModel):
                 RaiseExceptionIfUserAborted()
                 folderModel.experimentTitle = expFolderName
                 folderModel.SetCreatedDate()
-                self.AddRow(folderModel)
+                self.AddFolder(folderModel, pendingFolders)
 
-    def ImportGroupFolders(self, groupFolderPath, groupRecord):
+    def ImportGroupFolders(self, groupFolderPath, groupRecord,
+                           pendingFolders=None):
         """
         Imports folders structured according to the
         "User Group / Instrument / Researcher's Name / Dataset"
@@ -453,7 +597,7 @@ class FoldersModel(MyDataDataViewModel):
 
             logger.debug("Scanning " + instrumentFolderPath +
                          " for user folders...")
-            userFolders = next(os.walk(instrumentFolderPath))[1]
+            userFolders = SCAN_INDEX.ListDir(instrumentFolderPath)[0]
             RaiseExceptionIfUserAborted()
             for userFolderName in userFolders:
                 userFolderPath = os.path.join(instrumentFolderPath,
@@ -481,7 +625,7 @@ class FoldersModel(MyDataDataViewModel):
                     folderModel.experimentTitle = \
                         "%s - %s" % (SETTINGS.general.instrumentName,
                                      userFolderName)
-                    self.AddRow(folderModel)
+                    self.AddFolder(folderModel, pendingFolders)
         except InvalidFolderStructure:
             raise
         except:
@@ -503,14 +647,36 @@ class FoldersModel(MyDataDataViewModel):
         for folderModel in self.rowsData:
             folderModel.ResetCounts()
 
+def UpdateScanProgress(writeProgressUpdateToStatusBar, numFoldersScanned):
+    """
+    Report the number of user or group folders scanned so far.
+    """
+    if threading.current_thread().name == "MainThread":
+        writeProgressUpdateToStatusBar(numFoldersScanned)
+    else:
+        CallAfter(writeProgressUpdateToStatusBar, numFoldersScanned)
+
+
 def FolderNames(pathToScan, filterPattern=''):
     """
     List of folder names in path matching the filter pattern
     (or all folders in the specified path if there is no filter).
     """
-    filesDepth1 = glob(os.path.join(pathToScan, '*%s*' % filterPattern))
-    dirsDepth1 = [item for item in filesDepth1 if os.path.isdir(item)]
-    return [os.path.basename(d) for d in dirsDepth1]
+    try:
+        dirnames = SCAN_INDEX.ListDir(pathToScan)[0]
+    except OSError:
+        return []
+    return MatchingNames(dirnames, filterPattern)
+
+
+def MatchingNames(names, filterPattern=''):
+    """
+    Filter a directory listing, matching names the same way as
+    glob('*%s*' % filterPattern) would, i.e. excluding hidden names
+    """
+    pattern = '*%s*' % filterPattern
+    return [name for name in names
+            if not name.startswith('.') and fnmatch(name, pattern)]
 
 
 def UserFolderNames(pathToScan):
@@ -555,9 +721,12 @@ def FilesInTopLevel(expFolderPath):
     Return a list of file names in the specified experiment
     folder path, not within any specific dataset folder.
     """
-    globDepth1 = glob(os.path.join(
-        expFolderPath, '*%s*' % SETTINGS.filters.datasetFilter))
-    return [item for item in globDepth1 if os.path.isfile(item)]
+    try:
+        filenames = SCAN_INDEX.ListDir(expFolderPath)[1]
+    except OSError:
+        return []
+    return [os.path.join(expFolderPath, filename) for filename in
+            MatchingNames(filenames, SETTINGS.filters.datasetFilter)]
 
 
 def DatasetIsTooOld(pathToScan, datasetFolderName):
@@ -7,10 +7,12 @@ import threading
 from datetime import datetime
 from datetime import timedelta
 
-import wx
-
 from ..models.task import TaskModel
 from ..threads.flags import FLAGS
+from ..threads.dispatcher import GetApp
+from ..threads.dispatcher import IsMainLoopRunning
+from ..threads.dispatcher import CallAfter
+from ..threads.dispatcher import CallLater
 from ..utils.notification import Notification
 from ..logs import logger
 from .dataview import MyDataDataViewModel
@@ -85,8 +87,8 @@ class TasksModel(MyDataDataViewModel):
                 title = "Finished"
                 message = taskModel.jobDesc
                 Notification.Notify(message, title=title)
-                if wx.PyApp.IsMainLoopRunning():
-                    wx.CallAfter(tasksModel.TryRowValueChanged, row, col)
+                if IsMainLoopRunning():
+                    CallAfter(tasksModel.TryRowValueChanged, row, col)
                 else:
                     tasksModel.TryRowValueChanged(row, col)
                 if taskModel.scheduleType == "Timer":
@@ -106,8 +108,8 @@ class TasksModel(MyDataDataViewModel):
                            "(recurring every %d minutes)"
                            % (taskModel.jobDesc,
                               timeString, dateString, taskModel.intervalMinutes))
-                    if wx.PyApp.IsMainLoopRunning():
-                        wx.CallAfter(wx.GetApp().frame.SetStatusMessage, msg)
+                    if IsMainLoopRunning():
+                        CallAfter(GetApp().frame.SetStatusMessage, msg)
                         tasksModel.AddRow(newTaskModel)
                     else:
                         sys.stderr.write("%s\n" % msg)
@@ -128,8 +130,8 @@ class TasksModel(MyDataDataViewModel):
                            "(recurring daily)"
                            % (taskModel.jobDesc,
                               timeString, dateString))
-                    if wx.PyApp.IsMainLoopRunning():
-                        wx.CallAfter(wx.GetApp().frame.SetStatusMessage, msg)
+                    if IsMainLoopRunning():
+                        CallAfter(GetApp().frame.SetStatusMessage, msg)
                         tasksModel.AddRow(newTaskModel)
                     else:
                         sys.stderr.write("%s\n" % msg)
@@ -151,15 +153,15 @@ class TasksModel(MyDataDataViewModel):
                            "(recurring on specified days)"
                            % (taskModel.jobDesc,
                               timeString, dateString))
-                    if wx.PyApp.IsMainLoopRunning():
-                        wx.CallAfter(wx.GetApp().frame.SetStatusMessage, msg)
+                    if IsMainLoopRunning():
+                        CallAfter(GetApp().frame.SetStatusMessage, msg)
                         tasksModel.AddRow(newTaskModel)
                     else:
                         sys.stderr.write("%s\n" % msg)
 
-            app = wx.GetApp()
+            app = GetApp()
             if not FLAGS.shouldAbort and not app.foldersController.started:
-                if wx.PyApp.IsMainLoopRunning():
+                if IsMainLoopRunning():
                     thread = threading.Thread(target=TaskJobFunc)
                     logger.debug("Starting task %s" % taskModel.jobDesc)
                     thread.start()
@@ -170,7 +172,7 @@ class TasksModel(MyDataDataViewModel):
                     logger.warning(
                         "Not starting task because we are aborting.")
                     message = "Data scans and uploads were canceled."
-                    wx.GetApp().frame.SetStatusMessage(message)
+                    GetApp().frame.SetStatusMessage(message)
                 else:
                     logger.warning(
                         "Not starting task because scans and uploads are "
@@ -195,12 +197,12 @@ class TasksModel(MyDataDataViewModel):
 
         def ScheduleTask():
             """
-            Schedule task, using wx.CallLater.
+            Schedule task, using CallLater.
             """
-            taskModel.callLater = wx.CallLater(millis, JobFunc, *args)
+            taskModel.callLater = CallLater(millis, JobFunc, *args)
 
-        if wx.PyApp.IsMainLoopRunning():
-            wx.CallAfter(ScheduleTask)
+        if IsMainLoopRunning():
+            CallAfter(ScheduleTask)
         else:
             JobFunc(*args)
 
@@ -209,4 +211,5 @@ class TasksModel(MyDataDataViewModel):
         Shut down all tasks.
         """
         for task in self.rowsData:
-            task.callLater.Stop()
+            if task.callLater:
+                task.callLater.Stop()
@@ -0,0 +1,83 @@
+"""
+Coalesces notifications of changed values in MyData's dataviews.
+
+Worker threads update upload progress, upload and verification messages
+and folder statuses far more often than a view can usefully be redrawn.
+Rather than scheduling a RowValueChanged notification on the main thread
+for each change (which can keep the main thread too busy to respond to
+the user when there are many uploads and verifications), the dataview
+models mark the changed cells here, and the main thread refreshes them
+at most once per FLUSH_INTERVAL_MS.
+
+The timer is only started when a cell is marked as changed, so nothing
+runs while the views are idle.
+
+Usage:
+
+    from .updates import DATAVIEW_UPDATES
+    DATAVIEW_UPDATES.RowValueChanged(model, rowData, col)
+"""
+import threading
+
+from ..threads.dispatcher import CallAfter
+from ..threads.dispatcher import CallLater
+from ..threads.dispatcher import IsMainLoopRunning
+
+# Minimum interval between refreshes of the views, i.e. at most 10 per second:
+FLUSH_INTERVAL_MS = 100
+
+
+class DataViewUpdates(object):
+    """
+    Collects changed cells from any thread, and notifies the views of
+    them from the main thread.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Maps each dataview model to a dictionary mapping the id of each
+        # changed row's data object to a (rowData, columns) tuple:
+        self.changedCells = dict()
+        self.flushScheduled = False
+
+    def RowValueChanged(self, model, rowData, col):
+        """
+        Mark the value in the specified column of the row containing
+        rowData as changed.
+
+        The row index isn't determined until the views are refreshed,
+        so it doesn't matter if rows are added or deleted in between.
+        """
+        with self.lock:
+            changedRows = self.changedCells.setdefault(model, dict())
+            changedRows.setdefault(id(rowData), (rowData, set()))[1].add(col)
+            if self.flushScheduled:
+                return
+            self.flushScheduled = True
+        if not IsMainLoopRunning():
+            CallAfter(self.Flush)
+        elif threading.current_thread().name == "MainThread":
+            self.ScheduleFlush()
+        else:
+            CallAfter(self.ScheduleFlush)
+
+    def ScheduleFlush(self):
+        """
+        Start the timer which refreshes the views.  This must be called
+        from the main thread.
+        """
+        CallLater(FLUSH_INTERVAL_MS, self.Flush)
+
+    def Flush(self):
+        """
+        Notify the views of the cells which have changed since the
+        last refresh.
+        """
+        with self.lock:
+            changedCells = self.changedCells
+            self.changedCells = dict()
+            self.flushScheduled = False
+        for model, changedRows in changedCells.items():
+            model.NotifyRowValuesChanged(list(changedRows.values()))
+
+
+DATAVIEW_UPDATES = DataViewUpdates()
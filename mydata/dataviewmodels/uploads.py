@@ -31,6 +31,7 @@ class UploadsModel(MyDataDataViewModel):
                            "filename", "filesizeString", "status", "progress",
                            "message", "speed"]
         self.defaultColumnWidths = [40, 170, 170, 200, 75, 55, 100, 200, 100]
+        self.historyName = "uploads"
 
         self.completedCount = 0
         self.completedSize = 0
@@ -113,33 +114,22 @@ class UploadsModel(MyDataDataViewModel):
         """
         Notify views that upload progress has been updated
         """
-        for row in reversed(range(0, self.GetCount())):
-            if self.rowsData[row] == uploadModel:
-                col = self.columnNames.index("Progress")
-                wx.CallAfter(self.TryRowValueChanged, row, col)
-                col = self.columnNames.index("Speed")
-                wx.CallAfter(self.TryRowValueChanged, row, col)
-                break
+        self.MarkRowValueChanged(
+            uploadModel, self.columnNames.index("Progress"))
+        self.MarkRowValueChanged(uploadModel, self.columnNames.index("Speed"))
 
     def StatusUpdated(self, uploadModel):
         """
         Notify views that upload status has been updated
         """
-        for row in reversed(range(0, self.GetCount())):
-            if self.rowsData[row] == uploadModel:
-                col = self.columnNames.index("Status")
-                wx.CallAfter(self.TryRowValueChanged, row, col)
-                break
+        self.MarkRowValueChanged(uploadModel, self.columnNames.index("Status"))
 
     def MessageUpdated(self, uploadModel):
         """
         Notify views that upload message has been updated
         """
-        for row in reversed(range(0, self.GetCount())):
-            if self.rowsData[row] == uploadModel:
-                col = self.columnNames.index("Message")
-                wx.CallAfter(self.TryRowValueChanged, row, col)
-                break
+        self.MarkRowValueChanged(
+            uploadModel, self.columnNames.index("Message"))
 
     def SetStatus(self, uploadModel, status):
         """
@@ -154,6 +144,7 @@ class UploadsModel(MyDataDataViewModel):
                 self.finishTime = datetime.datetime.now()
             finally:
                 self.completedCountLock.release()
+            self.RowCompleted(uploadModel)
         elif status == UploadStatus.FAILED:
             self.failedCountLock.acquire()
             try:
@@ -4,8 +4,6 @@ and the tabular data displayed on that tab view.
 """
 import threading
 
-import wx
-
 from ..models.verification import VerificationStatus
 from .dataview import MyDataDataViewModel
 
@@ -25,6 +23,7 @@ class VerificationsModel(MyDataDataViewModel):
         self.columnKeys = ["dataViewId", "folderName", "subdirectory",
                            "filename", "message"]
         self.defaultColumnWidths = [40, 170, 170, 200, 500]
+        self.historyName = "verifications"
 
         self.totals = dict(
             completed=0,
@@ -65,6 +64,8 @@ class VerificationsModel(MyDataDataViewModel):
         verificationModel.complete = True
         with self.countLocks['completed']:
             self.totals['completed'] += 1
+        if verificationModel.status != VerificationStatus.FAILED:
+            self.RowCompleted(verificationModel)
 
     def SetNotFound(self, verificationModel):
         """
@@ -119,11 +120,8 @@ class VerificationsModel(MyDataDataViewModel):
         """
         Update verificationModel's message
         """
-        for row in reversed(range(0, self.GetCount())):
-            if self.rowsData[row] == verificationModel:
-                col = self.columnNames.index("Message")
-                wx.CallAfter(self.TryRowValueChanged, row, col)
-                break
+        self.MarkRowValueChanged(
+            verificationModel, self.columnNames.index("Message"))
 
     def GetFoundVerifiedCount(self):
         """
@@ -6,6 +6,7 @@ import wx
 
 from ..views.messages import ShowMessageDialog
 from ..logs import logger
+from ..threads.dispatcher import DISPATCHER
 
 from .handlers import ShutdownForRefresh
 from .handlers import ShutdownForRefreshComplete
@@ -68,9 +69,12 @@ def NewEvent(defaultTarget=None, defaultHandler=None):
 
 def PostEvent(event):
     """
-    For now, just call wx.PostEvent, but later this will be able to call the
-    event's default handler directly if necessary, eliminating the dependency
-    on wxPython's event loop.  This is useful for automated testing.
+    Post the event to its target with wx.PostEvent if wxPython's main loop
+    is running.  If MyData is running headless, queue the event's default
+    handler to be called from the headless dispatcher's main loop.
+    Otherwise, call the event's default handler directly, eliminating the
+    dependency on wxPython's event loop.  This is useful for automated
+    testing.
     """
     # pylint: disable=too-many-branches
     app = wx.GetApp()
@@ -88,16 +92,18 @@ def PostEvent(event):
         if not target:
             target = app.frame
         wx.PostEvent(target, event)
-    else:
-        if hasattr(event, "GetDefaultHandler"):
-            if not eventTypeString:
-                eventTypeString = str(eventTypeId)
+    elif hasattr(event, "GetDefaultHandler"):
+        if not eventTypeString:
+            eventTypeString = str(eventTypeId)
+        if DISPATCHER.IsActive():
+            logger.debug("Queuing default handler for %s" % eventTypeString)
+            DISPATCHER.CallAfter(event.GetDefaultHandler(), event)
+        else:
             logger.debug("Calling default handler for %s" % eventTypeString)
             event.GetDefaultHandler()(event)
             logger.debug("Called default handler for %s" % eventTypeString)
-        else:
-            logger.debug("Didn't find default handler for %s"
-                         % eventTypeString)
+    else:
+        logger.debug("Didn't find default handler for %s" % eventTypeString)
 
 
 # List of tuples, each with
@@ -19,6 +19,9 @@ from ..utils.exceptions import InvalidSettings
 from ..utils import BeginBusyCursorIfRequired
 from ..utils import EndBusyCursorIfRequired
 from ..threads.flags import FLAGS
+from ..threads.dispatcher import GetApp
+from ..threads.dispatcher import IsMainLoopRunning
+from ..threads.dispatcher import CallAfter
 from ..logs import logger
 
 
@@ -36,14 +39,14 @@ def ShutdownForRefresh(event):
     logger.debug("Shutting down for refresh from %s."
                  % threading.current_thread().name)
     try:
-        wx.CallAfter(BeginBusyCursorIfRequired)
-        app = wx.GetApp()
+        CallAfter(BeginBusyCursorIfRequired)
+        app = GetApp()
         app.foldersController.ShutDownUploadThreads()
         shutdownForRefreshCompleteEvent = \
             MYDATA_EVENTS.ShutdownForRefreshCompleteEvent(
                 shutdownSuccessful=True)
         PostEvent(shutdownForRefreshCompleteEvent)
-        wx.CallAfter(EndBusyCursorIfRequired, event)
+        CallAfter(EndBusyCursorIfRequired, event)
         app.scheduleController.ApplySchedule(event)
     except:
         message = "An error occurred while trying to shut down " \
@@ -78,7 +81,7 @@ def CheckConnectivity(event):
     """
     from . import MYDATA_THREADS
     nextEvent = getattr(event, "nextEvent", None)
-    if wx.PyApp.IsMainLoopRunning():
+    if IsMainLoopRunning():
         checkConnectivityThread = threading.Thread(
             target=CONNECTIVITY.Check,
             name="CheckConnectivityThread", args=[nextEvent])
@@ -234,7 +237,7 @@ def SettingsDialogValidation(event):
             wx.CallAfter(settingsDialog.okButton.Disable)
             wx.CallAfter(settingsDialog.lockOrUnlockButton.Disable)
 
-            app = wx.GetApp()
+            app = GetApp()
             if hasattr(app, "connectivity"):
                 if CONNECTIVITY.NeedToCheck():
                     settingsDialogValidationEvent = \
@@ -258,7 +261,7 @@ def SettingsDialogValidation(event):
                 """
                 if hasattr(app, "frame"):
                     wx.CallAfter(
-                        wx.GetApp().frame.SetStatusMessage, message)
+                        GetApp().frame.SetStatusMessage, message)
             try:
                 datasetCount = ValidateSettings(SetStatusMessage)
                 PostEvent(MYDATA_EVENTS.ProvideSettingsValidationResultsEvent(
@@ -305,7 +308,7 @@ def ProvideSettingsValidationResults(event):
     if invalidSettings:
         message = invalidSettings.message
         logger.error(message)
-        app = wx.GetApp()
+        app = GetApp()
         if hasattr(app, "frame"):
             app.frame.SetStatusMessage("")
 
@@ -486,22 +489,26 @@ def StartDataUploadsForFolder(event):
         logger.debug("Starting run() method for thread %s"
                      % threading.current_thread().name)
         logger.debug("StartDataUploadsForFolderWorker")
-        wx.CallAfter(BeginBusyCursorIfRequired)
+        CallAfter(BeginBusyCursorIfRequired)
         if FLAGS.shouldAbort or not FLAGS.scanningFolders:
             return
         FLAGS.performingLookupsAndUploads = True
         message = "Checking for data files on MyTardis and uploading " \
             "if necessary for folder: %s" % folderModel.folderName
         logger.info(message)
-        app = wx.GetApp()
+        app = GetApp()
         if FLAGS.testRunRunning:
             logger.testrun(message)
-        if type(app).__name__ == "MyData":
-            wx.CallAfter(app.frame.toolbar.DisableTestAndUploadToolbarButtons)
+        if type(app).__name__ in ("MyData", "MyDataDaemon"):
+            CallAfter(app.frame.toolbar.DisableTestAndUploadToolbarButtons)
             app.foldersController.StartUploadsForFolder(folderModel)
-            wx.CallAfter(EndBusyCursorIfRequired, event)
+            CallAfter(EndBusyCursorIfRequired, event)
 
-    if wx.PyApp.IsMainLoopRunning():
+    foldersController = getattr(GetApp(), "foldersController", None)
+    if foldersController and foldersController.folderResolver.foldersPool:
+        foldersController.folderResolver.SubmitFolder(
+            StartDataUploadsForFolderWorker, event.folderModel)
+    elif IsMainLoopRunning():
         startDataUploadsForFolderThread = \
             threading.Thread(target=StartDataUploadsForFolderWorker,
                              args=[event.folderModel])
@@ -519,35 +526,35 @@ def DidntFindDatafileOnServer(event):
     """
     Didn't find DataFile on MyTardis server
     """
-    wx.GetApp().foldersController.UploadDatafile(event)
+    GetApp().foldersController.UploadDatafile(event)
 
 
 def FoundIncompleteStaged(event):
     """
     Found incomplete file on staging
     """
-    wx.GetApp().foldersController.UploadDatafile(event)
+    GetApp().foldersController.UploadDatafile(event)
 
 
 def FoundVerifiedDatafile(event):
     """
     Found verified file on MyTardis server
     """
-    wx.GetApp().foldersController.CountCompletedUploadsAndVerifications(event)
+    GetApp().foldersController.CountCompletedUploadsAndVerifications(event)
 
 
 def FoundFullSizeStaged(event):
     """
     Found full-sized file on staging
     """
-    wx.GetApp().foldersController.CountCompletedUploadsAndVerifications(event)
+    GetApp().foldersController.CountCompletedUploadsAndVerifications(event)
 
 
 def FoundUnverifiedNoDfosDatafile(event):
     """
     Found unverified file without any DataFileObjects (Replicas)
     """
-    wx.GetApp().foldersController.CountCompletedUploadsAndVerifications(event)
+    GetApp().foldersController.CountCompletedUploadsAndVerifications(event)
 
 
 def FoundUnverifiedUnstaged(event):
@@ -557,25 +564,25 @@ def FoundUnverifiedUnstaged(event):
     a Duplicate Key error, so we just need to wait for the file to be
     verified:
     """
-    wx.GetApp().foldersController.CountCompletedUploadsAndVerifications(event)
+    GetApp().foldersController.CountCompletedUploadsAndVerifications(event)
 
 
 def UploadComplete(event):
     """
     Upload complete
     """
-    wx.GetApp().foldersController.CountCompletedUploadsAndVerifications(event)
+    GetApp().foldersController.CountCompletedUploadsAndVerifications(event)
 
 
 def UploadFailed(event):
     """
     Upload failed
     """
-    wx.GetApp().foldersController.CountCompletedUploadsAndVerifications(event)
+    GetApp().foldersController.CountCompletedUploadsAndVerifications(event)
 
 
 def ShutDownUploads(event):
     """
     Shut down uploads
     """
-    wx.GetApp().foldersController.ShutDownUploadThreads(event)
+    GetApp().foldersController.ShutDownUploadThreads(event)
@@ -32,6 +32,9 @@ from ..utils.connectivity import CONNECTIVITY
 from ..utils.connectivity import GetActiveNetworkInterfaces
 from ..threads.flags import FLAGS
 from ..threads.locks import LOCKS
+from ..threads.dispatcher import GetApp
+from ..threads.dispatcher import IsMainLoopRunning
+from ..threads.dispatcher import CallAfter
 from ..views.connectivity import ReportNoActiveInterfaces
 from . import MYDATA_THREADS
 
@@ -49,7 +52,7 @@ def ManuallyTriggerScanFoldersAndUpload(event):
     Scan folders and upload datafiles if necessary.
     """
     from .stop import ResetShouldAbortStatus
-    app = wx.GetApp()
+    app = GetApp()
     SETTINGS.schedule.scheduleType = "Manually"
     SETTINGS.lastSettingsUpdateTrigger = LastSettingsUpdateTrigger.UI_RESPONSE
     ResetShouldAbortStatus()
@@ -66,7 +69,7 @@ def StartScansAndUploads(event, needToValidateSettings=True, jobId=None):
     # pylint: disable=too-many-statements
     from .stop import CheckIfShouldAbort
     from .stop import RestoreUserInterfaceForAbort
-    app = wx.GetApp()
+    app = GetApp()
     LogStartScansAndUploadsCaller(event, jobId)
     if CheckIfShouldAbort():
         return
@@ -97,7 +100,8 @@ def StartScansAndUploads(event, needToValidateSettings=True, jobId=None):
 
     app.foldersController.SetShuttingDown(False)
 
-    app.frame.toolbar.searchCtrl.SetValue("")
+    if hasattr(app.frame.toolbar, "searchCtrl"):
+        app.frame.toolbar.searchCtrl.SetValue("")
 
     # Settings validation:
 
@@ -127,7 +131,7 @@ def StartScansAndUploads(event, needToValidateSettings=True, jobId=None):
                          % threading.current_thread().name)
             activeNetworkInterfaces = []
             try:
-                wx.CallAfter(BeginBusyCursorIfRequired)
+                CallAfter(BeginBusyCursorIfRequired)
                 try:
                     activeNetworkInterfaces = GetActiveNetworkInterfaces()
                 except Exception as err:
@@ -140,7 +144,7 @@ def StartScansAndUploads(event, needToValidateSettings=True, jobId=None):
                     ValidateSettings()
                     event = MYDATA_EVENTS.SettingsValidationCompleteEvent()
                     PostEvent(event)
-                    wx.CallAfter(EndBusyCursorIfRequired)
+                    CallAfter(EndBusyCursorIfRequired)
                 except UserAborted:
                     RestoreUserInterfaceForAbort()
                     return
@@ -159,13 +163,14 @@ def StartScansAndUploads(event, needToValidateSettings=True, jobId=None):
                         message = invalidSettings.message
                         logger.error(message)
                         RestoreUserInterfaceForAbort()
-                        wx.CallAfter(
+                        CallAfter(
                             app.frame.SetStatusMessage,
                             "Settings validation failed.")
                         if FLAGS.testRunRunning:
-                            wx.CallAfter(app.testRunFrame.Hide)
-                        wx.CallAfter(OnSettings, None,
-                                     validationMessage=message)
+                            CallAfter(app.testRunFrame.Hide)
+                        if wx.PyApp.IsMainLoopRunning():
+                            wx.CallAfter(OnSettings, None,
+                                         validationMessage=message)
                         return
             except:
                 logger.error(traceback.format_exc())
@@ -173,7 +178,7 @@ def StartScansAndUploads(event, needToValidateSettings=True, jobId=None):
             logger.debug("Finishing run() method for thread %s"
                          % threading.current_thread().name)
 
-        if wx.PyApp.IsMainLoopRunning():
+        if IsMainLoopRunning():
             thread = threading.Thread(
                 target=ValidateSettingsWorker,
                 name="StartScansAndUploadsValidateSettingsThread")
@@ -216,7 +221,7 @@ def StartScansAndUploads(event, needToValidateSettings=True, jobId=None):
         if CheckIfShouldAbort():
             return
         message = "Scanning data folders..."
-        wx.CallAfter(app.frame.SetStatusMessage, message)
+        CallAfter(app.frame.SetStatusMessage, message)
         message = "Scanning data folders in %s..." \
             % SETTINGS.general.dataDirectory
         logger.info(message)
@@ -226,7 +231,7 @@ def StartScansAndUploads(event, needToValidateSettings=True, jobId=None):
             with LOCKS.scanningFolders:
                 FLAGS.scanningFolders = True
                 logger.debug("Just set scanningFolders to True")
-                wx.CallAfter(
+                CallAfter(
                     app.frame.toolbar.DisableTestAndUploadToolbarButtons)
                 DATAVIEW_MODELS['folders'].ScanFolders(
                     WriteProgressUpdateToStatusBar)
@@ -246,8 +251,9 @@ def StartScansAndUploads(event, needToValidateSettings=True, jobId=None):
                 dlg = wx.MessageDialog(None, str(ifs), "MyData",
                                        wx.OK | wx.ICON_ERROR)
                 dlg.ShowModal()
-            wx.CallAfter(ShowMessageDialog)
-            wx.CallAfter(app.frame.SetStatusMessage, str(ifs))
+            if wx.PyApp.IsMainLoopRunning():
+                wx.CallAfter(ShowMessageDialog)
+            CallAfter(app.frame.SetStatusMessage, str(ifs))
             return
 
         folderStructure = SETTINGS.advanced.folderStructure
@@ -268,11 +274,11 @@ def StartScansAndUploads(event, needToValidateSettings=True, jobId=None):
             logger.warning(message)
             if FLAGS.testRunRunning:
                 logger.testrun(message)
-            wx.CallAfter(app.frame.SetStatusMessage, message)
+            CallAfter(app.frame.SetStatusMessage, message)
             RestoreUserInterfaceForAbort()
-        wx.CallAfter(EndBusyCursorIfRequired)
+        CallAfter(EndBusyCursorIfRequired)
 
-    if wx.PyApp.IsMainLoopRunning():
+    if IsMainLoopRunning():
         thread = threading.Thread(target=ScanDataDirs,
                                   name="ScanDataDirectoriesThread")
         thread.start()
@@ -281,6 +287,57 @@ def StartScansAndUploads(event, needToValidateSettings=True, jobId=None):
         ScanDataDirs()
 
 
+def StartUploadsForChangedFolders(folderModels):
+    """
+    Upload the new and modified files in the specified dataset folders,
+    which were found by the Continuous schedule's folder watcher, without
+    rescanning the rest of the data directory.
+    """
+    from .stop import CheckIfShouldAbort
+    from ..controllers.watcher import FOLDER_WATCHER
+    app = GetApp()
+    if CheckIfShouldAbort():
+        return
+    if FLAGS.scanningFolders or FLAGS.performingLookupsAndUploads:
+        # Upload these folders' changes after the current task finishes:
+        FOLDER_WATCHER.Requeue(folderModels)
+        return
+    logger.debug("StartUploadsForChangedFolders called from the "
+                 "Continuous schedule's folder watcher.")
+    app.foldersController.SetShuttingDown(False)
+
+    def UploadChangedFolders():
+        """
+        Start uploads for the changed folders.
+        """
+        if CheckIfShouldAbort():
+            return
+        app.foldersController.InitForUploads(changedFolders=folderModels)
+        if CheckIfShouldAbort():
+            return
+        message = "Uploading changes in %d folder(s)..." % len(folderModels)
+        CallAfter(app.frame.SetStatusMessage, message)
+        logger.info(message)
+        with LOCKS.scanningFolders:
+            FLAGS.scanningFolders = True
+            CallAfter(app.frame.toolbar.DisableTestAndUploadToolbarButtons)
+            for folderModel in folderModels:
+                PostEvent(MYDATA_EVENTS.StartUploadsForFolderEvent(
+                    folderModel=folderModel))
+            app.foldersController.FinishedScanningForDatasetFolders(
+                numFolders=len(folderModels))
+            FLAGS.scanningFolders = False
+        CallAfter(EndBusyCursorIfRequired)
+
+    if IsMainLoopRunning():
+        thread = threading.Thread(target=UploadChangedFolders,
+                                  name="UploadChangedFoldersThread")
+        thread.start()
+        MYDATA_THREADS.Add(thread)
+    else:
+        UploadChangedFolders()
+
+
 def LogStartScansAndUploadsCaller(event, jobId):
     """
     Called by StartScansAndUploads (the main method for starting the
@@ -288,22 +345,28 @@ def LogStartScansAndUploadsCaller(event, jobId):
     call to StartScansAndUploads (e.g. the toolbar button, the task bar
     icon menu item, or a scheduled task).
     """
-    app = wx.GetApp()
+    app = GetApp()
     try:
         syncNowMenuItemId = \
             app.frame.taskBarIcon.GetSyncNowMenuItem().GetId()
     except (AttributeError, RuntimeError):
         syncNowMenuItemId = None
+    try:
+        settingsToolId = app.frame.toolbar.settingsTool.GetId()
+        uploadToolId = app.frame.toolbar.uploadTool.GetId()
+    except AttributeError:
+        # Running headless, without a toolbar:
+        settingsToolId = uploadToolId = None
     if jobId:
         logger.debug("StartScansAndUploads called from job ID %d" % jobId)
     elif event is None:
         logger.debug("StartScansAndUploads called automatically "
                      "from MyData's OnInit().")
-    elif event.GetId() == app.frame.toolbar.settingsTool.GetId():
+    elif settingsToolId and event.GetId() == settingsToolId:
         logger.debug("StartScansAndUploads called automatically from "
                      "OnSettings(), after displaying SettingsDialog, "
                      "which was launched from MyData's toolbar.")
-    elif event.GetId() == app.frame.toolbar.uploadTool.GetId():
+    elif uploadToolId and event.GetId() == uploadToolId:
         logger.debug("StartScansAndUploads triggered by Upload toolbar icon.")
     elif syncNowMenuItemId and event.GetId() == syncNowMenuItemId:
         logger.debug("StartScansAndUploads triggered by 'Sync Now' "
@@ -334,7 +397,7 @@ def OnTestRunFromToolbar(event):
     The user pressed the Test Run icon on the main window's toolbar.
     """
     from .stop import ResetShouldAbortStatus
-    app = wx.GetApp()
+    app = GetApp()
     logger.debug("OnTestRunFromToolbar")
     FLAGS.testRunRunning = True
     SETTINGS.schedule.scheduleType = "Manually"
@@ -5,9 +5,10 @@ This module contains methods relating to stopping MyData's scan-and-upload
 processes.
 """
 import os
-import wx
 
 from ..threads.flags import FLAGS
+from ..threads.dispatcher import GetApp
+from ..threads.dispatcher import CallAfter
 from ..utils import BeginBusyCursorIfRequired
 from ..utils import EndBusyCursorIfRequired
 from ..utils.exceptions import UserAborted
@@ -23,7 +24,7 @@ def CheckIfShouldAbort():
     """
     if 'MYDATA_TESTING' in os.environ:
         return FLAGS.shouldAbort
-    app = wx.GetApp()
+    app = GetApp()
     if FLAGS.shouldAbort or app.foldersController.canceled:
         RestoreUserInterfaceForAbort()
         return True
@@ -34,11 +35,11 @@ def RestoreUserInterfaceForAbort():
     """
     Restores icons and cursors to their default state.
     """
-    app = wx.GetApp()
-    wx.CallAfter(EndBusyCursorIfRequired)
-    wx.CallAfter(app.frame.toolbar.EnableTestAndUploadToolbarButtons)
-    if app.testRunFrame.IsShown():
-        wx.CallAfter(app.testRunFrame.Hide)
+    app = GetApp()
+    CallAfter(EndBusyCursorIfRequired)
+    CallAfter(app.frame.toolbar.EnableTestAndUploadToolbarButtons)
+    if app.testRunFrame and app.testRunFrame.IsShown():
+        CallAfter(app.testRunFrame.Hide)
     FLAGS.scanningFolders = False
     FLAGS.testRunRunning = False
 
@@ -47,7 +48,7 @@ def ResetShouldAbortStatus():
     """
     Resets the ShouldAbort status
     """
-    app = wx.GetApp()
+    app = GetApp()
     FLAGS.shouldAbort = False
     app.foldersController.ClearStatusFlags()
 
@@ -58,7 +59,7 @@ def OnStop(event):
     """
     from . import MYDATA_EVENTS
     from . import PostEvent
-    app = wx.GetApp()
+    app = GetApp()
     FLAGS.shouldAbort = True
     if app.foldersController.started:
         BeginBusyCursorIfRequired()
@@ -76,7 +77,7 @@ def ShouldCancelUpload(uploadModel):
     """
     Return True if the upload should be canceled
     """
-    app = wx.GetApp()
+    app = GetApp()
     if hasattr(app, "foldersController"):
         return app.foldersController.canceled or uploadModel.canceled
 
@@ -95,7 +96,7 @@ def RaiseExceptionIfUserAborted(setStatusMessage=None):
     A function accepting a status message string argument can be
     supplied which will be called before the exception is raised.
     """
-    app = wx.GetApp()
+    app = GetApp()
     if hasattr(app, "ShouldAbort") and app.ShouldAbort():
         message = "Canceled by user"
         if setStatusMessage:
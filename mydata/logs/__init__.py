@@ -18,6 +18,7 @@ from requests.exceptions import RequestException
 import six
 import wx
 
+from ..threads.dispatcher import CallAfter
 from .SubmitDebugReportDialog import SubmitDebugReportDialog
 from .wxloghandler import WxLogHandler
 from .wxloghandler import EVT_WX_LOG_EVENT
@@ -157,7 +158,7 @@ class Logger(object):
         if threading.current_thread().name == "MainThread":
             self.loggerObject.debug(message, extra=extra)
         else:
-            wx.CallAfter(self.loggerObject.debug, message, extra=extra)
+            CallAfter(self.loggerObject.debug, message, extra=extra)
 
     def error(self, message):
         """
@@ -179,7 +180,7 @@ class Logger(object):
         if threading.current_thread().name == "MainThread":
             self.loggerObject.error(message, extra=extra)
         else:
-            wx.CallAfter(self.loggerObject.error, message, extra=extra)
+            CallAfter(self.loggerObject.error, message, extra=extra)
 
     def warning(self, message):
         """
@@ -203,7 +204,7 @@ class Logger(object):
         if threading.current_thread().name == "MainThread":
             self.loggerObject.warning(message, extra=extra)
         else:
-            wx.CallAfter(self.loggerObject.warning, message, extra=extra)
+            CallAfter(self.loggerObject.warning, message, extra=extra)
 
     def info(self, message):
         """
@@ -227,7 +228,7 @@ class Logger(object):
         if threading.current_thread().name == "MainThread":
             self.loggerObject.info(message, extra=extra)
         else:
-            wx.CallAfter(self.loggerObject.info, message, extra=extra)
+            CallAfter(self.loggerObject.info, message, extra=extra)
 
     def testrun(self, message):
         # pylint: disable=no-self-use
@@ -5,18 +5,21 @@ Model class for MyTardis API v1's DataFileResource.
 import io
 import json
 
-import requests
 from requests_toolbelt.multipart import encoder
 from six.moves import urllib
 
 from ..dataviewmodels.dataview import DATAVIEW_MODELS
 from ..settings import SETTINGS
+from ..utils.session import HTTP_SESSION
 from ..logs import logger
 from ..utils.exceptions import DoesNotExist
 from ..utils.exceptions import MultipleObjectsReturned
 from ..utils import UnderscoreToCamelcase
 from .replica import ReplicaModel
 
+# Number of DataFile records to request per page for bulk lookups:
+BULK_LOOKUP_PAGE_SIZE = 500
+
 
 class DataFileModel(object):
     """
@@ -60,12 +63,34 @@ class DataFileModel(object):
 
         :raises requests.exceptions.HTTPError:
         """
+        url = DataFileModel.GetDataFileLookupUrl(dataset, filename, directory)
+        response = HTTP_SESSION.Get(url=url)
+        return DataFileModel.ParseDataFileLookupResponse(
+            dataset, filename, response)
+
+    @staticmethod
+    def GetDataFileLookupUrl(dataset, filename, directory):
+        """
+        Returns the URL used to lookup a datafile by dataset, filename
+        and directory.
+        """
         myTardisUrl = SETTINGS.general.myTardisUrl
-        url = myTardisUrl + "/api/v1/mydata_dataset_file/?format=json" + \
+        return myTardisUrl + "/api/v1/mydata_dataset_file/?format=json" + \
             "&dataset__id=" + str(dataset.datasetId) + \
             "&filename=" + urllib.parse.quote(filename.encode('utf-8')) + \
             "&directory=" + urllib.parse.quote(directory.encode('utf-8'))
-        response = requests.get(url=url, headers=SETTINGS.defaultHeaders)
+
+    @staticmethod
+    def ParseDataFileLookupResponse(dataset, filename, response):
+        """
+        Returns the DataFileModel found by a datafile lookup.
+
+        The response can come from the shared requests session, or from
+        the asyncio verification engine's connection pool, which provides
+        the same raise_for_status and json methods.
+
+        :raises requests.exceptions.HTTPError:
+        """
         response.raise_for_status()
         dataFilesJson = response.json()
         numDataFilesFound = dataFilesJson['meta']['total_count']
@@ -81,6 +106,45 @@ class DataFileModel(object):
         return DataFileModel(
             dataset=dataset, dataFileJson=dataFilesJson['objects'][0])
 
+    @staticmethod
+    def GetDataFilesForDataset(dataset, pageSize=BULK_LOOKUP_PAGE_SIZE):
+        """
+        Lookup all datafiles in a dataset, requesting one page of
+        DataFile records at a time.
+
+        Returns a dictionary mapping (directory, filename) tuples to
+        DataFileModel instances.  If more than one DataFile record
+        matches the same directory and filename, that key maps to None,
+        so a per-file lookup can raise MultipleObjectsReturned.
+
+        :raises requests.exceptions.HTTPError:
+        """
+        myTardisUrl = SETTINGS.general.myTardisUrl
+        dataFiles = dict()
+        duplicates = set()
+        offset = 0
+        while True:
+            url = "%s/api/v1/mydata_dataset_file/?format=json" \
+                "&dataset__id=%s&limit=%s&offset=%s" \
+                % (myTardisUrl, dataset.datasetId, pageSize, offset)
+            response = HTTP_SESSION.Get(url=url)
+            response.raise_for_status()
+            dataFilesJson = response.json()
+            for dataFileJson in dataFilesJson['objects']:
+                key = (dataFileJson.get("directory") or "",
+                       dataFileJson['filename'])
+                if key in dataFiles:
+                    duplicates.add(key)
+                dataFiles[key] = DataFileModel(
+                    dataset=dataset, dataFileJson=dataFileJson)
+            offset += len(dataFilesJson['objects'])
+            if not dataFilesJson['objects'] or \
+                    offset >= dataFilesJson['meta']['total_count']:
+                break
+        for key in duplicates:
+            dataFiles[key] = None
+        return dataFiles
+
     @staticmethod
     def GetDataFileFromId(dataFileId):
         """
@@ -91,7 +155,7 @@ class DataFileModel(object):
         myTardisUrl = SETTINGS.general.myTardisUrl
         url = "%s/api/v1/mydata_dataset_file/%s/?format=json" \
             % (myTardisUrl, dataFileId)
-        response = requests.get(url=url, headers=SETTINGS.defaultHeaders)
+        response = HTTP_SESSION.Get(url=url)
         response.raise_for_status()
         dataFileJson = response.json()
         return DataFileModel(dataset=None, dataFileJson=dataFileJson)
@@ -103,7 +167,7 @@ class DataFileModel(object):
         """
         myTardisUrl = SETTINGS.general.myTardisUrl
         url = myTardisUrl + "/api/v1/dataset_file/%s/verify/" % datafileId
-        response = requests.get(url=url, headers=SETTINGS.defaultHeaders)
+        response = HTTP_SESSION.Get(url=url)
         if response.status_code < 200 or response.status_code >= 300:
             logger.warning("Failed to verify datafile id \"%s\" " % datafileId)
             logger.warning(response.text)
@@ -114,6 +178,20 @@ class DataFileModel(object):
         # Celery queue.
         return True
 
+    @staticmethod
+    def UpdateMd5Sum(datafileId, md5sum):
+        """
+        Update a DataFile record's MD5 checksum via the MyTardis API,
+        e.g. after calculating the checksum while uploading to staging.
+
+        :raises requests.exceptions.HTTPError:
+        """
+        myTardisUrl = SETTINGS.general.myTardisUrl
+        url = myTardisUrl + "/api/v1/dataset_file/%s/" % datafileId
+        patchData = json.dumps({"md5sum": md5sum})
+        response = HTTP_SESSION.Patch(url=url, data=patchData.encode())
+        response.raise_for_status()
+
     @staticmethod
     def CreateDataFileForStagingUpload(dataFileDict):
         """
@@ -122,8 +200,7 @@ class DataFileModel(object):
         """
         url = "%s/api/v1/mydata_dataset_file/" % SETTINGS.general.myTardisUrl
         dataFileJson = json.dumps(dataFileDict)
-        response = requests.post(headers=SETTINGS.defaultHeaders,
-                                 url=url, data=dataFileJson.encode())
+        response = HTTP_SESSION.Post(url=url, data=dataFileJson.encode())
         return response
 
     @staticmethod
@@ -155,5 +232,8 @@ class DataFileModel(object):
 
         headers = SETTINGS.defaultHeaders
         headers['Content-Type'] = multipart.content_type
-        response = requests.post(url, data=multipart, headers=headers)
+        # Don't time out while waiting for the response to a large upload:
+        response = HTTP_SESSION.Post(
+            url, data=multipart, headers=headers,
+            timeout=(SETTINGS.miscellaneous.connectionTimeout, None))
         return response
@@ -2,13 +2,20 @@
 Model class for MyTardis API v1's DatasetResource.
 """
 import json
+
 import requests
 from six.moves import urllib
 
 from ..settings import SETTINGS
+from ..utils.session import HTTP_SESSION
 from ..threads.flags import FLAGS
+from ..threads.locks import KeyedLocks
 from ..logs import logger
 from ..utils.exceptions import DoesNotExist
+from ..utils.serverprofile import DATASET_INSTRUMENT_FILTER
+
+# Number of dataset records to request per page for bulk lookups:
+BULK_LOOKUP_PAGE_SIZE = 500
 
 
 class DatasetModel(object):
@@ -18,6 +25,9 @@ class DatasetModel(object):
     """
     def __init__(self, datasetJson):
         self.json = datasetJson
+        # DataFile records retrieved in bulk, keyed by (directory, filename)
+        # or None if they haven't been retrieved:
+        self.dataFiles = None
 
     @property
     def datasetId(self):
@@ -78,32 +88,40 @@ class DatasetModel(object):
                 logger.testrun(message)
             return existingDataset
         except DoesNotExist:
-            description = folderModel.folderName
-            logger.debug("Creating dataset record for folder: " + description)
-            myTardisUrl = SETTINGS.general.myTardisUrl
-            experimentUri = experiment.resourceUri.replace(
-                'mydata_experiment', 'experiment') if experiment else None
-            datasetJson = {
-                "instrument": SETTINGS.general.instrument.resourceUri,
-                "description": description,
-                "experiments": [experimentUri],
-                "immutable": SETTINGS.miscellaneous.immutableDatasets}
-            data = json.dumps(datasetJson)
-            url = "%s/api/v1/dataset/" % myTardisUrl
-            if FLAGS.testRunRunning:
-                message = "CREATING NEW DATASET FOR FOLDER: %s\n" \
-                    "    Description: %s" \
-                    % (folderModel.GetRelPath(), description)
-                if experiment:  # Could be None in test run.
-                    message += "\n    In Experiment: %s/%s" \
-                        % (SETTINGS.general.myTardisUrl, experiment.viewUri)
-                logger.testrun(message)
-                return None
-            response = requests.post(headers=SETTINGS.defaultHeaders,
-                                     url=url, data=data.encode())
-            response.raise_for_status()
-            newDatasetJson = response.json()
-            return DatasetModel(newDatasetJson)
+            return DatasetModel.CreateDataset(folderModel)
+
+    @staticmethod
+    def CreateDataset(folderModel):
+        """
+        Create a dataset for this folder, after finding that a suitable
+        dataset doesn't already exist.
+        """
+        experiment = folderModel.experimentModel
+        description = folderModel.folderName
+        logger.debug("Creating dataset record for folder: " + description)
+        myTardisUrl = SETTINGS.general.myTardisUrl
+        experimentUri = experiment.resourceUri.replace(
+            'mydata_experiment', 'experiment') if experiment else None
+        datasetJson = {
+            "instrument": SETTINGS.general.instrument.resourceUri,
+            "description": description,
+            "experiments": [experimentUri],
+            "immutable": SETTINGS.miscellaneous.immutableDatasets}
+        data = json.dumps(datasetJson)
+        url = "%s/api/v1/dataset/" % myTardisUrl
+        if FLAGS.testRunRunning:
+            message = "CREATING NEW DATASET FOR FOLDER: %s\n" \
+                "    Description: %s" \
+                % (folderModel.GetRelPath(), description)
+            if experiment:  # Could be None in test run.
+                message += "\n    In Experiment: %s/%s" \
+                    % (SETTINGS.general.myTardisUrl, experiment.viewUri)
+            logger.testrun(message)
+            return None
+        response = HTTP_SESSION.Post(url=url, data=data.encode())
+        response.raise_for_status()
+        newDatasetJson = response.json()
+        return DatasetModel(newDatasetJson)
 
     @staticmethod
     def GetDataset(folderModel):
@@ -125,14 +143,7 @@ class DatasetModel(object):
                "&description=%s" % (SETTINGS.general.myTardisUrl,
                                     folderModel.experimentModel.experimentId,
                                     description))
-        urlWithInstrument = "%s&instrument__id=%s"\
-            % (url, SETTINGS.general.instrument.instrumentId)
-        response = requests.get(
-            headers=SETTINGS.defaultHeaders, url=urlWithInstrument)
-        if response.status_code == 400:
-            logger.debug(
-                "MyTardis doesn't support filtering datasets by instrument")
-            response = requests.get(headers=SETTINGS.defaultHeaders, url=url)
+        response = DatasetModel.GetDatasetsForInstrument(url)
         response.raise_for_status()
         datasetsJson = response.json()
         numDatasets = datasetsJson['meta']['total_count']
@@ -145,3 +156,132 @@ class DatasetModel(object):
         if numDatasets == 1:
             logger.debug("Found existing dataset for folder %s" % description)
         return DatasetModel(datasetsJson['objects'][0])
+
+    @staticmethod
+    def GetDatasetsForInstrument(url, query=""):
+        """
+        GET dataset records from url (followed by query), filtered by
+        MyData's instrument, unless the MyTardis server is known not to
+        support filtering datasets by instrument.
+
+        Older MyTardis servers respond to the instrument filter with
+        HTTP 400, in which case the request is repeated without it, and
+        the server profile records that the filter isn't supported, so
+        that subsequent requests (in this run or later runs) don't try it.
+        """
+        serverProfile = SETTINGS.serverProfile
+        if serverProfile.Supports(DATASET_INSTRUMENT_FILTER) is not False:
+            response = HTTP_SESSION.Get(
+                url="%s&instrument__id=%s%s"
+                % (url, SETTINGS.general.instrument.instrumentId, query))
+            if response.status_code != 400:
+                if response.ok:
+                    serverProfile.SetSupported(
+                        DATASET_INSTRUMENT_FILTER, True)
+                return response
+            logger.debug(
+                "MyTardis doesn't support filtering datasets by instrument")
+            serverProfile.SetSupported(DATASET_INSTRUMENT_FILTER, False)
+        return HTTP_SESSION.Get(url=url + query)
+
+    @staticmethod
+    def GetDatasetsForExperiment(experiment, pageSize=BULK_LOOKUP_PAGE_SIZE):
+        """
+        Lookup all of this instrument's datasets in an experiment,
+        requesting one page of dataset records at a time.
+
+        Returns a dictionary mapping dataset descriptions to DatasetModel
+        instances.  If multiple datasets have the same description, the
+        first one is used, as in GetDataset.
+
+        :raises requests.exceptions.HTTPError:
+        """
+        url = ("%s/api/v1/dataset/?format=json&experiments__id=%s"
+               % (SETTINGS.general.myTardisUrl, experiment.experimentId))
+        datasets = dict()
+        offset = 0
+        while True:
+            pageQuery = "&limit=%s&offset=%s" % (pageSize, offset)
+            response = DatasetModel.GetDatasetsForInstrument(url, pageQuery)
+            response.raise_for_status()
+            datasetsJson = response.json()
+            for datasetJson in datasetsJson['objects']:
+                description = datasetJson['description']
+                if description in datasets:
+                    logger.warning(
+                        "WARNING: Found multiple datasets for folder %s"
+                        % description)
+                    continue
+                datasets[description] = DatasetModel(datasetJson)
+            offset += len(datasetsJson['objects'])
+            if not datasetsJson['objects'] or \
+                    offset >= datasetsJson['meta']['total_count']:
+                break
+        return datasets
+
+
+class DatasetResolver(object):
+    """
+    Finds or creates the MyTardis dataset for each dataset folder.
+
+    If bulk_dataset_lookups is set in MyData.cfg, all of the datasets in
+    each experiment are retrieved (once per upload run) with a few
+    paginated requests, so finding an existing dataset for a folder doesn't
+    require its own request.  Each experiment and each dataset description
+    has its own lock, so folders in different experiments (or needing
+    different datasets) can be resolved concurrently, and a missing dataset
+    is only created once.
+    """
+    def __init__(self):
+        self.locks = KeyedLocks()
+        # Datasets retrieved in bulk, keyed by experiment ID, then by
+        # description:
+        self.datasets = dict()
+
+    def GetDatasetsForExperiment(self, experiment):
+        """
+        Return the datasets in experiment, retrieving them if no other
+        folder has already done so in this run, or None if the bulk
+        lookup fails.
+        """
+        with self.locks.Get(experiment.experimentId):
+            if experiment.experimentId not in self.datasets:
+                try:
+                    datasets = \
+                        DatasetModel.GetDatasetsForExperiment(experiment)
+                    logger.debug(
+                        "Found %d dataset records for experiment %s in "
+                        "bulk lookup." % (len(datasets),
+                                          experiment.experimentId))
+                except requests.exceptions.RequestException as err:
+                    logger.warning(
+                        "Bulk dataset lookup failed for experiment %s: %s"
+                        % (experiment.experimentId, err))
+                    datasets = None
+                self.datasets[experiment.experimentId] = datasets
+            return self.datasets[experiment.experimentId]
+
+    def GetOrCreateDatasetForFolder(self, folderModel):
+        """
+        Return the folder's dataset, creating it if necessary.
+
+        If bulk dataset lookups are disabled, or they fail, or this is a
+        Test Run, this falls back to DatasetModel.CreateDatasetIfNecessary.
+        """
+        experiment = folderModel.experimentModel
+        if not SETTINGS.miscellaneous.bulkDatasetLookups or \
+                not experiment or FLAGS.testRunRunning:
+            return DatasetModel.CreateDatasetIfNecessary(folderModel)
+        datasets = self.GetDatasetsForExperiment(experiment)
+        if datasets is None:
+            return DatasetModel.CreateDatasetIfNecessary(folderModel)
+        description = folderModel.folderName
+        with self.locks.Get((experiment.experimentId, description)):
+            dataset = datasets.get(description)
+            if dataset:
+                logger.debug(
+                    "Found existing dataset for folder %s" % description)
+            else:
+                dataset = DatasetModel.CreateDataset(folderModel)
+                datasets[description] = dataset
+            return dataset
@@ -2,12 +2,13 @@
 Model class for MyTardis API v1's ExperimentResource.
 """
 import json
-import requests
 
 from six.moves import urllib
 
 from ..settings import SETTINGS
+from ..utils.session import HTTP_SESSION
 from ..threads.flags import FLAGS
+from ..threads.locks import KeyedLocks
 from ..logs import logger
 from ..utils.exceptions import DoesNotExist
 from .objectacl import ObjectAclModel
@@ -21,7 +22,7 @@ class ExperimentModel(object):
         self.json = experimentJson
 
     @staticmethod
-    def GetOrCreateExperimentForFolder(folderModel):
+    def GetOrCreateExperimentForFolder(folderModel, aclQueue=None):
         """
         See also GetExperimentForFolder, CreateExperimentForFolder
         """
@@ -42,7 +43,8 @@ class ExperimentModel(object):
             return existingExperiment
         except DoesNotExist as err:
             if err.GetModelClass() == ExperimentModel:
-                return ExperimentModel.CreateExperimentForFolder(folderModel)
+                return ExperimentModel.CreateExperimentForFolder(
+                    folderModel, aclQueue)
             raise
 
     @staticmethod
@@ -66,7 +68,7 @@ class ExperimentModel(object):
                 % urllib.parse.quote(folderModel.groupFolderName.encode('utf-8'))
 
         logger.debug(url)
-        response = requests.get(url=url, headers=SETTINGS.defaultHeaders)
+        response = HTTP_SESSION.Get(url=url)
         response.raise_for_status()
         experimentsJson = response.json()
         numExperimentsFound = experimentsJson['meta']['total_count']
@@ -81,9 +83,13 @@ class ExperimentModel(object):
         return None
 
     @staticmethod
-    def CreateExperimentForFolder(folderModel):
+    def CreateExperimentForFolder(folderModel, aclQueue=None):
         """
         Create a MyTardis experiment to create this folder's dataset within
+
+        :param aclQueue: An ObjectAclQueue to share the new experiment with
+            its users and groups in the background, or None to share it
+            before returning
         """
         userFolderName = folderModel.userFolderName
         groupFolderName = folderModel.groupFolderName
@@ -142,9 +148,8 @@ class ExperimentModel(object):
                 {"name": "group_folder_name", "value": groupFolderName})
         url = "%s/api/v1/mydata_experiment/" % SETTINGS.general.myTardisUrl
         logger.debug(url)
-        response = requests.post(headers=SETTINGS.defaultHeaders,
-                                 url=url,
-                                 data=json.dumps(experimentJson).encode())
+        response = HTTP_SESSION.Post(
+            url=url, data=json.dumps(experimentJson).encode())
         response.raise_for_status()
         createdExperimentJson = response.json()
         createdExperiment = ExperimentModel(createdExperimentJson)
@@ -155,8 +160,10 @@ class ExperimentModel(object):
             message += " and group folder \"%s\"" % groupFolderName
         logger.debug(message)
 
+        if aclQueue is None:
+            aclQueue = ObjectAclModel
         facilityManagersGroup = SETTINGS.general.facility.managerGroup
-        ObjectAclModel.ShareExperimentWithGroup(
+        aclQueue.ShareExperimentWithGroup(
             createdExperiment, facilityManagersGroup, isOwner=True)
         # Avoid creating a duplicate ObjectACL if the user folder's
         # username matches the facility manager's username.
@@ -164,12 +171,12 @@ class ExperimentModel(object):
         # invalid user (without a MyTardis user ID).
         if SETTINGS.general.username != folderModel.owner.username and \
                 ownerUserId is not None:
-            ObjectAclModel.ShareExperimentWithUser(createdExperiment,
-                                                   folderModel.owner)
+            aclQueue.ShareExperimentWithUser(createdExperiment,
+                                             folderModel.owner)
         if folderModel.group is not None and \
                 folderModel.group.groupId != \
                 facilityManagersGroup.groupId:
-            ObjectAclModel.ShareExperimentWithGroup(
+            aclQueue.ShareExperimentWithGroup(
                 createdExperiment, folderModel.group, isOwner=True)
         return createdExperiment
 
@@ -269,3 +276,52 @@ class ExperimentModel(object):
                 % folderModel.experimentTitle
         logger.debug(message)
         return message
+
+
+class ExperimentResolver(object):
+    """
+    Finds or creates the MyTardis experiment for each dataset folder,
+    looking up or creating each experiment only once per upload run.
+
+    Experiments are keyed by title, folder structure, user folder name and
+    group folder name (the fields used to look them up in MyTardis), and
+    each key has its own lock, so folders belonging to different
+    experiments can be resolved concurrently, while folders belonging to
+    the same experiment wait for the first folder's lookup (or creation)
+    to finish and then reuse its result.
+
+    If an ObjectAclQueue is supplied, new experiments are shared with
+    their users and groups in the background.
+    """
+    def __init__(self, aclQueue=None):
+        self.locks = KeyedLocks()
+        self.experiments = dict()
+        self.aclQueue = aclQueue
+
+    @staticmethod
+    def GetKey(folderModel):
+        """
+        Return the key identifying the folder's experiment.
+        """
+        return (folderModel.experimentTitle,
+                SETTINGS.advanced.folderStructure,
+                folderModel.userFolderName, folderModel.groupFolderName)
+
+    def GetOrCreateExperimentForFolder(self, folderModel):
+        """
+        Return the folder's experiment, looking it up (or creating it) if
+        no other folder has already done so in this run.
+
+        In a Test Run, experiments aren't created, so they aren't reused
+        either, and each folder logs the experiment it would be added to.
+        """
+        key = ExperimentResolver.GetKey(folderModel)
+        with self.locks.Get(key):
+            if FLAGS.testRunRunning:
+                return ExperimentModel.GetOrCreateExperimentForFolder(
+                    folderModel)
+            if key not in self.experiments:
+                self.experiments[key] = \
+                    ExperimentModel.GetOrCreateExperimentForFolder(
+                        folderModel, self.aclQueue)
+            return self.experiments[key]
@@ -1,10 +1,8 @@
 """
 Model class for MyTardis API v1's FacilityResource.
 """
-
-import requests
-
 from ..settings import SETTINGS
+from ..utils.session import HTTP_SESSION
 from .group import GroupModel
 
 
@@ -40,11 +38,15 @@ class FacilityModel(object):
 
         :raises requests.exceptions.HTTPError:
         """
+        found, facilitiesJson = SETTINGS.lookupCache.Get("facilities", "")
+        if not found:
+            url = "%s/api/v1/facility/?format=json" \
+                % SETTINGS.general.myTardisUrl
+            response = HTTP_SESSION.Get(url=url)
+            response.raise_for_status()
+            facilitiesJson = response.json()['objects']
+            SETTINGS.lookupCache.Set("facilities", "", facilitiesJson)
         facilities = []
-        url = "%s/api/v1/facility/?format=json" % SETTINGS.general.myTardisUrl
-        response = requests.get(url=url, headers=SETTINGS.defaultHeaders)
-        response.raise_for_status()
-        facilitiesJson = response.json()
-        for facilityJson in facilitiesJson['objects']:
+        for facilityJson in facilitiesJson:
             facilities.append(FacilityModel(facilityJson=facilityJson))
         return facilities
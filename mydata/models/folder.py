@@ -2,15 +2,121 @@
 Model class representing a data folder which may or may not
 have a corresponding dataset record in MyTardis.
 """
+from array import array
 import os
+import threading
 import time
 from datetime import datetime
-import hashlib
 import traceback
-from fnmatch import fnmatch
 
 from ..settings import SETTINGS
 from ..logs import logger
+from ..utils.checksums import ReadMd5Sum
+from ..utils.checksums import GetFileSignature
+from ..utils.filepatterns import FILE_PATTERNS
+from ..utils.filepatterns import FileFilter
+from ..utils.scanindex import SCAN_INDEX
+from ..utils.uploadprocesses import UPLOAD_PROCESSES
+
+
+class DataFilePaths(object):
+    """
+    Compact list of the data files within a folder.
+
+    A dataset folder can contain hundreds of thousands of files, so
+    rather than storing each file's absolute path and subdirectory, we
+    store each distinct subdirectory once, and for each file, we store
+    its filename and the index of its subdirectory.  Upload flags are
+    stored one byte per file, and the number of files uploaded is
+    updated as each flag is set, instead of being counted each time.
+    """
+    __slots__ = ['dirPaths', 'directories', 'directoryIndexes',
+                 'directoryLookup', 'filenames', 'uploaded', 'numUploaded',
+                 'lock']
+
+    def __init__(self):
+        # The absolute path of each distinct subdirectory:
+        self.dirPaths = []
+        # The same subdirectories in the format used for the directory
+        # field of MyTardis DataFile records:
+        self.directories = []
+        # For each file, the index of its subdirectory in the lists above:
+        self.directoryIndexes = array('I')
+        self.directoryLookup = dict()
+        self.filenames = []
+        self.uploaded = bytearray()
+        self.numUploaded = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def Append(self, dirPath, directory, filename):
+        """
+        Add a file to the list.
+
+        :param dirPath: The absolute path of the file's subdirectory
+        :param directory: The file's subdirectory, relative to the folder,
+            in the format used for the directory field of MyTardis
+            DataFile records
+        :param filename: The file's name
+        """
+        directoryIndex = self.directoryLookup.get(dirPath)
+        if directoryIndex is None:
+            directoryIndex = len(self.dirPaths)
+            self.directoryLookup[dirPath] = directoryIndex
+            self.dirPaths.append(dirPath)
+            self.directories.append(directory)
+        # The filename is appended last, because the file's index isn't
+        # valid until it is included in len(self):
+        self.directoryIndexes.append(directoryIndex)
+        self.uploaded.append(0)
+        self.filenames.append(filename)
+
+    def GetPath(self, dataFileIndex):
+        """
+        Return the absolute path of a file.
+        """
+        return os.path.join(
+            self.dirPaths[self.directoryIndexes[dataFileIndex]],
+            self.filenames[dataFileIndex])
+
+    def GetDirectory(self, dataFileIndex):
+        """
+        Return a file's subdirectory relative to the folder, in the format
+        used for the directory field of MyTardis DataFile records.
+        """
+        return self.directories[self.directoryIndexes[dataFileIndex]]
+
+    def GetName(self, dataFileIndex):
+        """
+        Return a file's name.
+        """
+        return self.filenames[dataFileIndex]
+
+    def SetUploaded(self, dataFileIndex, uploaded):
+        """
+        Set a file's upload flag, and return the number of files uploaded.
+        """
+        with self.lock:
+            uploaded = 1 if uploaded else 0
+            self.numUploaded += uploaded - self.uploaded[dataFileIndex]
+            self.uploaded[dataFileIndex] = uploaded
+            return self.numUploaded
+
+    def IsUploaded(self, dataFileIndex):
+        """
+        Return True if a file has been uploaded.
+        """
+        return bool(self.uploaded[dataFileIndex])
+
+    def ResetUploaded(self):
+        """
+        Clear all of the upload flags.
+        """
+        with self.lock:
+            self.uploaded = bytearray(len(self.filenames))
+            self.numUploaded = 0
 
 
 class FolderModel(object):
@@ -38,11 +144,15 @@ class FolderModel(object):
         # collect these files:
         self.isExperimentFilesFolder = isExperimentFilesFolder
 
-        self.dataFilePaths = dict(
-            files=[],
-            directories=[],
-            uploaded=[])
-        self.PopulateDataFilePaths()
+        # The folder's data files aren't listed until they are needed, so
+        # that the folder can be added to the Folders view without waiting
+        # for its whole directory tree to be walked.  They can be streamed
+        # to the verification queue as they are found (EnumerateDataFiles),
+        # or listed all at once (PopulateDataFilePaths):
+        self.dataFilePaths = DataFilePaths()
+        self.enumerationLock = threading.Lock()
+        self.enumerationStarted = False
+        self.enumerationFinished = threading.Event()
 
         self.userFolderName = userFolderName
         self.groupFolderName = groupFolderName
@@ -50,60 +160,97 @@ class FolderModel(object):
         self.datasetModel = None
         self.experimentModel = None
 
-    def PopulateDataFilePaths(self):
+    def EnumerateDataFiles(self):
         """
-        Populate data file paths within folder object
+        Generate the index of each data file in the folder, as soon as it
+        is found, adding it to dataFilePaths.  Each directory is listed
+        with os.scandir (via SCAN_INDEX), and the folder's status is
+        updated as files are found.
+
+        If the folder's files have already been listed (or are being
+        listed by another thread), this waits for the listing to finish
+        and then generates all of the indexes.
         """
+        with self.enumerationLock:
+            enumerationStarted = self.enumerationStarted
+            self.enumerationStarted = True
+        if enumerationStarted:
+            self.enumerationFinished.wait()
+            for dataFileIndex in range(len(self.dataFilePaths)):
+                yield dataFileIndex
+            return
+
         if self.isExperimentFilesFolder:
             absoluteFolderPath = self.location
         else:
             absoluteFolderPath = os.path.join(self.location, self.folderName)
 
-        for dirname, _, files in os.walk(absoluteFolderPath):
-            for filename in sorted(files):
-                if SETTINGS.filters.useIncludesFile and \
-                        not SETTINGS.filters.useExcludesFile:
-                    if not FolderModel.MatchesIncludes(filename):
-                        logger.debug("Ignoring %s, not matching includes."
-                                     % filename)
-                        continue
-                elif not SETTINGS.filters.useIncludesFile and \
-                        SETTINGS.filters.useExcludesFile:
-                    if FolderModel.MatchesExcludes(filename):
-                        logger.debug("Ignoring %s, matching excludes."
-                                     % filename)
-                        continue
-                elif SETTINGS.filters.useIncludesFile and \
-                        SETTINGS.filters.useExcludesFile:
-                    if FolderModel.MatchesExcludes(filename) and \
-                            not FolderModel.MatchesIncludes(filename):
-                        logger.debug("Ignoring %s, matching excludes "
-                                     "and not matching includes."
-                                     % filename)
+        fileFilter = FolderModel.GetFileFilter()
+        try:
+            for dirname, dirnames, files in \
+                    SCAN_INDEX.Walk(absoluteFolderPath):
+                # Skip excluded subdirectories without listing them:
+                dirnames[:] = [
+                    subdir for subdir in dirnames
+                    if fileFilter.IncludesDirectory(subdir)]
+                directory = None
+                for filename in sorted(files):
+                    if not fileFilter.IncludesFile(filename):
+                        logger.debug(
+                            "Ignoring %s, due to includes/excludes patterns."
+                            % filename)
                         continue
-                self.dataFilePaths['files'].append(
-                    os.path.join(dirname, filename))
-                self.dataFilePaths['directories']\
-                    .append(os.path.relpath(dirname, absoluteFolderPath))
-                self.dataFilePaths['uploaded'].append(False)
-            if self.isExperimentFilesFolder:
-                break
-        self.ConvertSubdirectoriesToMyTardisFormat()
-        self.dataViewFields['status'] = \
-            "0 of %d files uploaded" % self.numFiles
+                    if directory is None:
+                        directory = FolderModel.GetMyTardisDirectory(
+                            os.path.relpath(dirname, absoluteFolderPath))
+                    self.dataFilePaths.Append(dirname, directory, filename)
+                    self.UpdateStatus()
+                    yield len(self.dataFilePaths) - 1
+                if self.isExperimentFilesFolder:
+                    break
+        finally:
+            self.enumerationFinished.set()
+
+    def PopulateDataFilePaths(self):
+        """
+        Populate data file paths within folder object
+        """
+        for _ in self.EnumerateDataFiles():
+            pass
+
+    def ResetDataFiles(self):
+        """
+        Forget the folder's data files (and its dataset and experiment), so
+        that they are listed (and looked up) again when the folder is next
+        uploaded, e.g. after new files have been written to the folder.
+        """
+        with self.enumerationLock:
+            self.dataFilePaths = DataFilePaths()
+            self.enumerationStarted = False
+            self.enumerationFinished = threading.Event()
+        self.datasetModel = None
+        self.experimentModel = None
+        self.UpdateStatus()
+
+    def ListDataFilesIfNecessary(self):
+        """
+        List the folder's data files if they haven't been listed (or
+        started being streamed) yet.
+        """
+        if not self.enumerationStarted:
+            self.PopulateDataFilePaths()
 
-    def ConvertSubdirectoriesToMyTardisFormat(self):
+    @staticmethod
+    def GetMyTardisDirectory(relativeDirectory):
         """
         When we write a subdirectory path into the directory field of a
         MyTardis DataFile record, we use forward slashes, and use an
         empty string (rather than ".") to indicate that the file is in
         the dataset's top-level directory
         """
-        for i in range(0, len(self.dataFilePaths['directories'])):
-            if self.dataFilePaths['directories'][i] == ".":
-                self.dataFilePaths['directories'][i] = ""
-            self.dataFilePaths['directories'][i] = \
-                self.dataFilePaths['directories'][i].replace("\\", "/")
+        if relativeDirectory == ".":
+            return ""
+        return relativeDirectory.replace("\\", "/")
 
     def __hash__(self):
         """
@@ -126,18 +273,26 @@ class FolderModel(object):
         Used to update the number of files uploaded per folder
         displayed in the Status column of the Folders view.
         """
-        self.dataFilePaths['uploaded'][dataFileIndex] = uploaded
-        numFilesUploaded = sum(self.dataFilePaths['uploaded'])
+        self.ListDataFilesIfNecessary()
+        self.dataFilePaths.SetUploaded(dataFileIndex, uploaded)
+        self.UpdateStatus()
+
+    def UpdateStatus(self):
+        """
+        Update the number of files uploaded (and found so far) displayed
+        in the Status column of the Folders view.
+        """
         self.dataViewFields['status'] = \
-            "%d of %d files uploaded" % (numFilesUploaded,
-                                         self.numFiles)
+            "%d of %d files uploaded" % (self.dataFilePaths.numUploaded,
+                                         len(self.dataFilePaths))
 
     def GetDataFilePath(self, dataFileIndex):
         """
         Get the absolute path to a file within this folder's root directory
         which is os.path.join(self.location, self.folderName)
         """
-        return self.dataFilePaths['files'][dataFileIndex]
+        self.ListDataFilesIfNecessary()
+        return self.dataFilePaths.GetPath(dataFileIndex)
 
     def GetDataFileRelPath(self, dataFileIndex):
         """
@@ -153,13 +308,15 @@ class FolderModel(object):
         folder's root directory which is
         os.path.join(self.location, self.folderName)
         """
-        return self.dataFilePaths['directories'][dataFileIndex]
+        self.ListDataFilesIfNecessary()
+        return self.dataFilePaths.GetDirectory(dataFileIndex)
 
     def GetDataFileName(self, dataFileIndex):
         """
         Return a file's filename
         """
-        return os.path.basename(self.dataFilePaths['files'][dataFileIndex])
+        self.ListDataFilesIfNecessary()
+        return self.dataFilePaths.GetName(dataFileIndex)
 
     def GetDataFileSize(self, dataFileIndex):
         """
@@ -211,8 +368,13 @@ class FolderModel(object):
     def numFiles(self):
         """
         Return total number of files in this folder
+
+        If the folder's files haven't been listed yet, they are listed now.
+        If they are being streamed to the verification queue, this returns
+        the number of files found so far.
         """
-        return len(self.dataFilePaths['files'])
+        self.ListDataFilesIfNecessary()
+        return len(self.dataFilePaths)
 
     def GetValueForKey(self, key):
         """
@@ -252,24 +414,28 @@ class FolderModel(object):
         """
         self.dataViewFields['experimentTitle'] = title
 
+    @staticmethod
+    def GetFileFilter():
+        """
+        Return a FileFilter using the compiled patterns from the includes
+        and/or excludes files, if they are enabled in the settings.  The
+        patterns files are only read again if they have been modified.
+        """
+        includes = None
+        excludes = None
+        if SETTINGS.filters.useIncludesFile:
+            includes = FILE_PATTERNS.Get(SETTINGS.filters.includesFile)
+        if SETTINGS.filters.useExcludesFile:
+            excludes = FILE_PATTERNS.Get(SETTINGS.filters.excludesFile)
+        return FileFilter(includes, excludes)
+
     @staticmethod
     def MatchesPatterns(filename, includesOrExcludesFile):
         """
         Return True if file matches at least one pattern in the includes
         or excludes file.
         """
-        match = False
-        with open(includesOrExcludesFile, 'r') as patternsFile:
-            for glob in patternsFile.readlines():
-                glob = glob.strip()
-                if glob == "":
-                    continue
-                if glob.startswith(";"):
-                    continue
-                if glob.startswith("#"):
-                    continue
-                match = match or fnmatch(filename, glob)
-        return match
+        return FILE_PATTERNS.Get(includesOrExcludesFile).Matches(filename)
 
     @staticmethod
     def MatchesIncludes(filename):
@@ -307,40 +473,41 @@ class FolderModel(object):
                         canceledCallback=None):
         """
         Calculate MD5 checksum.
+
+        If the checksum was calculated previously, and the file's size,
+        modified time and inode haven't changed since then, the cached
+        checksum is returned without reading the file again.
         """
         absoluteFilePath = self.GetDataFilePath(dataFileIndex)
         fileSize = self.GetDataFileSize(dataFileIndex)
-        md5 = hashlib.md5()
-
-        defaultChunkSize = 128 * 1024
-        maxChunkSize = 16 * 1024 * 1024
-        chunkSize = defaultChunkSize
-        while (fileSize / chunkSize) > 50 and chunkSize < maxChunkSize:
-            chunkSize *= 2
-        bytesProcessed = 0
-        with open(absoluteFilePath, 'rb') as fileHandle:
-            # Note that the iter() func needs an empty byte string
-            # for the returned iterator to halt at EOF, since read()
-            # returns b'' (not just '').
-            for chunk in iter(lambda: fileHandle.read(chunkSize), b''):
-                if canceledCallback():
-                    logger.debug("Aborting MD5 calculation for "
-                                 "%s" % absoluteFilePath)
-                    return None
-                md5.update(chunk)
-                bytesProcessed += len(chunk)
-                del chunk
-                if progressCallback:
-                    progressCallback(bytesProcessed)
-        return md5.hexdigest()
+        signature = GetFileSignature(absoluteFilePath)
+        md5sum = SETTINGS.checksumCache.GetMd5Sum(absoluteFilePath, signature)
+        if md5sum:
+            logger.debug("Using cached MD5 sum for %s" % absoluteFilePath)
+            if progressCallback:
+                progressCallback(fileSize)
+            return md5sum
+        if UPLOAD_PROCESSES.enabled:
+            md5sum = UPLOAD_PROCESSES.CalculateMd5Sum(
+                absoluteFilePath, fileSize, progressCallback, canceledCallback)
+        else:
+            md5sum = ReadMd5Sum(
+                absoluteFilePath, fileSize, progressCallback, canceledCallback)
+        if md5sum is None:
+            return None
+        # Don't cache the checksum if the file was modified while it
+        # was being read:
+        if GetFileSignature(absoluteFilePath) == signature:
+            SETTINGS.checksumCache.SetMd5Sum(
+                absoluteFilePath, signature, md5sum)
+        return md5sum
 
     def ResetCounts(self):
         """
         Reset counts of uploaded files etc.
         """
-        self.dataFilePaths['uploaded'] = []
-        for _ in range(0, self.numFiles):
-            self.dataFilePaths['uploaded'].append(False)
+        self.dataFilePaths.ResetUploaded()
+        self.UpdateStatus()
 
     @property
     def dataViewId(self):
@@ -349,6 +516,14 @@ class FolderModel(object):
         """
         return self.dataViewFields['dataViewId']
 
+    @dataViewId.setter
+    def dataViewId(self, dataViewId):
+        """
+        Set the row index in MyData's Folders view, before the folder is
+        added to the view
+        """
+        self.dataViewFields['dataViewId'] = dataViewId
+
     @property
     def folderName(self):
         """
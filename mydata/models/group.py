@@ -1,11 +1,10 @@
 """
 Model class for MyTardis API v1's GroupResource.
 """
-import requests
-
 from six.moves import urllib
 
 from ..settings import SETTINGS
+from ..utils.session import HTTP_SESSION
 from ..logs import logger
 from ..utils.exceptions import DoesNotExist
 
@@ -43,17 +42,22 @@ class GroupModel(object):
 
         :raises requests.exceptions.HTTPError:
         """
-        url = "%s/api/v1/group/?format=json&name=%s" \
-            % (SETTINGS.general.myTardisUrl,
-               urllib.parse.quote(name.encode('utf-8')))
-        response = requests.get(url=url, headers=SETTINGS.defaultHeaders)
-        response.raise_for_status()
-        groupsJson = response.json()
-        numGroupsFound = groupsJson['meta']['total_count']
-
-        if numGroupsFound == 0:
+        response = None
+        found, groupJson = SETTINGS.lookupCache.Get("group", name)
+        if not found:
+            url = "%s/api/v1/group/?format=json&name=%s" \
+                % (SETTINGS.general.myTardisUrl,
+                   urllib.parse.quote(name.encode('utf-8')))
+            response = HTTP_SESSION.Get(url=url)
+            response.raise_for_status()
+            groupsJson = response.json()
+            numGroupsFound = groupsJson['meta']['total_count']
+            groupJson = groupsJson['objects'][0] if numGroupsFound else None
+            SETTINGS.lookupCache.Set("group", name, groupJson)
+
+        if groupJson is None:
             raise DoesNotExist(
                 message="Group \"%s\" was not found in MyTardis" % name,
                 response=response)
         logger.debug("Found group record for name '" + name + "'.")
-        return GroupModel(name=name, groupJson=groupsJson['objects'][0])
+        return GroupModel(name=name, groupJson=groupJson)
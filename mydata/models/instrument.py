@@ -3,11 +3,11 @@ Model class for MyTardis API v1's InstrumentResource.
 """
 
 import json
-import requests
 
 from six.moves import urllib
 
 from ..settings import SETTINGS
+from ..utils.session import HTTP_SESSION
 from ..logs import logger
 from ..utils.exceptions import DoesNotExist
 from ..utils.exceptions import DuplicateKey
@@ -44,9 +44,13 @@ class InstrumentModel(object):
             "name": name}
         data = json.dumps(instrumentJson)
         headers = SETTINGS.defaultHeaders
-        response = requests.post(headers=headers, url=url, data=data.encode())
+        response = HTTP_SESSION.Post(
+            headers=headers, url=url, data=data.encode())
         response.raise_for_status()
         instrumentJson = response.json()
+        SETTINGS.lookupCache.Set(
+            "instrument", InstrumentModel.GetLookupKey(facility, name),
+            instrumentJson)
         return InstrumentModel(name=name, instrumentJson=instrumentJson)
 
     @staticmethod
@@ -56,23 +60,39 @@ class InstrumentModel(object):
 
         :raises requests.exceptions.HTTPError:
         """
+        lookupKey = InstrumentModel.GetLookupKey(facility, name)
+        found, instrumentJson = \
+            SETTINGS.lookupCache.Get("instrument", lookupKey)
+        if found:
+            return InstrumentModel(name=name, instrumentJson=instrumentJson)
         url = "%s/api/v1/instrument/?format=json&facility__id=%s&name=%s" \
             % (SETTINGS.general.myTardisUrl, facility.facilityId,
                urllib.parse.quote(name.encode('utf-8')))
-        response = requests.get(url=url, headers=SETTINGS.defaultHeaders)
+        response = HTTP_SESSION.Get(url=url)
         response.raise_for_status()
         instrumentsJson = response.json()
         numInstrumentsFound = \
             instrumentsJson['meta']['total_count']
         if numInstrumentsFound == 0:
+            # Missing instruments aren't cached, because MyData will
+            # usually create the instrument next:
             message = "Instrument \"%s\" was not found in MyTardis" % name
             logger.warning(message)
             raise DoesNotExist(message, response, modelClass=InstrumentModel)
         logger.debug("Found instrument record for name \"%s\" "
                      "in facility \"%s\"" % (name, facility.name))
         instrumentJson = instrumentsJson['objects'][0]
+        SETTINGS.lookupCache.Set("instrument", lookupKey, instrumentJson)
         return InstrumentModel(name=name, instrumentJson=instrumentJson)
 
+    @staticmethod
+    def GetLookupKey(facility, name):
+        """
+        Return the key used to cache lookups of the named instrument
+        in facility.
+        """
+        return "%s/%s" % (facility.facilityId, name)
+
     @staticmethod
     def RenameInstrument(facilityName, oldInstrumentName, newInstrumentName):
         """
@@ -114,6 +134,8 @@ class InstrumentModel(object):
         uploaderJson = {"name": name}
         data = json.dumps(uploaderJson)
         headers = SETTINGS.defaultHeaders
-        response = requests.put(headers=headers, url=url, data=data.encode())
+        response = HTTP_SESSION.Put(
+            headers=headers, url=url, data=data.encode())
         response.raise_for_status()
+        SETTINGS.lookupCache.Invalidate("instrument")
         logger.info("Renaming instrument succeeded.")
@@ -3,9 +3,16 @@ Model class for MyTardis API v1's ObjectACLResource.
 """
 
 import json
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
 from ..settings import SETTINGS
+from ..threads.locks import LOCKS
+from ..utils.session import HTTP_SESSION
+from ..utils.session import RETRY_STATUS_CODES
 from ..logs import logger
 
 
@@ -38,8 +45,8 @@ class ObjectAclModel(object):
             "expiryDate": None}
 
         url = myTardisUrl + "/api/v1/objectacl/"
-        response = requests.post(headers=SETTINGS.defaultHeaders, url=url,
-                                 data=json.dumps(objectAclJson).encode())
+        response = HTTP_SESSION.Post(
+            url=url, data=json.dumps(objectAclJson).encode())
         response.raise_for_status()
         logger.debug("Shared experiment with user " + user.username + ".")
 
@@ -68,7 +75,127 @@ class ObjectAclModel(object):
             "expiryDate": None}
 
         url = myTardisUrl + "/api/v1/objectacl/"
-        response = requests.post(headers=SETTINGS.defaultHeaders, url=url,
-                                 data=json.dumps(objectAclJson).encode())
+        response = HTTP_SESSION.Post(
+            url=url, data=json.dumps(objectAclJson).encode())
         response.raise_for_status()
         logger.debug("Shared experiment with group " + group.name + ".")
+
+    @staticmethod
+    def Exists(objectId, pluginId, entityId):
+        """
+        Returns True if an ObjectACL for the experiment with ID objectId
+        already exists for the user or group with ID entityId (pluginId is
+        "django_user" or "django_group").
+
+        :raises requests.exceptions.HTTPError:
+        """
+        url = "%s/api/v1/objectacl/?format=json&object_id=%s" \
+            "&entityId=%s&pluginId=%s" \
+            % (SETTINGS.general.myTardisUrl, objectId, entityId, pluginId)
+        response = HTTP_SESSION.Get(url)
+        response.raise_for_status()
+        return response.json()['meta']['total_count'] > 0
+
+
+class ObjectAclQueue(object):
+    """
+    Creates ObjectACLs for newly created experiments on a bounded pool of
+    threads, so that datasets can be created and uploads can start as soon
+    as each experiment exists, rather than waiting for it to be shared
+    with the facility managers group, the folder's owner and its group.
+
+    Each ObjectACL is only queued once per upload run.  ObjectACL POSTs
+    aren't retried by the shared HTTP session (because repeating a POST
+    can create a duplicate record), so they are retried here, after
+    connection errors, timeouts and transient server errors (502, 503,
+    504).  Before each retry, we check whether the previous attempt
+    created the ObjectACL after all (e.g. if MyTardis was just slow to
+    respond), and if so, we don't POST it again.
+
+    MyTardis's ObjectACL API only creates one ObjectACL per POST, so they
+    can't be created in batches.
+    """
+    def __init__(self, maxThreads):
+        self.pool = ThreadPoolExecutor(
+            max_workers=maxThreads, thread_name_prefix="ObjectAclThread")
+        self.queued = set()
+        self.numFailed = 0
+
+    def ShareExperimentWithUser(self, experiment, user):
+        """
+        Queue granting full ownership of experiment to user.
+        """
+        self.Queue(
+            (experiment.experimentId, "django_user", user.userId),
+            ObjectAclModel.ShareExperimentWithUser, experiment, user)
+
+    def ShareExperimentWithGroup(self, experiment, group, isOwner):
+        """
+        Queue granting access to experiment to group.
+        """
+        self.Queue(
+            (experiment.experimentId, "django_group", group.groupId),
+            ObjectAclModel.ShareExperimentWithGroup, experiment, group,
+            isOwner)
+
+    def Queue(self, key, share, *args):
+        """
+        Submit share(*args) to the pool, unless an ObjectACL with the same
+        key (experiment ID, plugin ID and entity ID) has already been
+        queued.
+        """
+        with LOCKS.objectAclQueue:
+            if key in self.queued:
+                return
+            self.queued.add(key)
+        self.pool.submit(self.ShareWithRetries, key, share, *args)
+
+    def ShareWithRetries(self, key, share, *args):
+        """
+        Call share(*args), retrying after connection errors, timeouts and
+        transient server errors, unless the ObjectACL with the specified
+        key was created by an earlier attempt, and counting (and logging)
+        the ObjectACL as failed if it still couldn't be created.
+        """
+        maxRetries = SETTINGS.miscellaneous.httpMaxRetries
+        for attempt in range(maxRetries + 1):
+            try:
+                if attempt > 0 and ObjectAclModel.Exists(*key):
+                    logger.debug("ObjectACL %s was created by an earlier "
+                                 "attempt." % str(key))
+                    return
+                share(*args)
+                return
+            except requests.exceptions.HTTPError as err:
+                if err.response is None or \
+                        err.response.status_code not in RETRY_STATUS_CODES \
+                        or attempt == maxRetries:
+                    self.LogFailure(err)
+                    return
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout) as err:
+                if attempt == maxRetries:
+                    self.LogFailure(err)
+                    return
+            except Exception as err:
+                # Otherwise the pool would discard the exception silently:
+                logger.error(traceback.format_exc())
+                self.LogFailure(err)
+                return
+            time.sleep(SETTINGS.miscellaneous.httpRetryBackoff *
+                       (2 ** attempt))
+
+    def LogFailure(self, err):
+        """
+        Count and log an ObjectACL which couldn't be created.
+        """
+        with LOCKS.objectAclQueue:
+            self.numFailed += 1
+        logger.error("Failed to create ObjectACL: %s" % str(err))
+
+    def Shutdown(self, wait=True):
+        """
+        Stop accepting ObjectACLs, waiting for the queued ObjectACLs to be
+        created (unless wait is False).
+        """
+        self.pool.shutdown(wait=wait)
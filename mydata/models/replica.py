@@ -1,11 +1,11 @@
 """
 Model class for MyTardis API v1's ReplicaResource.
 """
-
-import requests
-
 from ..settings import SETTINGS
+from ..utils.session import HTTP_SESSION
 from ..utils import UnderscoreToCamelcase
+from ..utils.exceptions import MissingMyDataReplicaApiEndpoint
+from ..utils.serverprofile import MYDATA_REPLICA_ENDPOINT
 
 
 class ReplicaModel(object):
@@ -38,10 +38,16 @@ class ReplicaModel(object):
         Count bytes uploaded to staging.
 
         :raises requests.exceptions.HTTPError:
+        :raises MissingMyDataReplicaApiEndpoint: if the MyTardis server
+            is known not to provide the /api/v1/mydata_replica/ endpoint
         """
+        if SETTINGS.serverProfile.Supports(MYDATA_REPLICA_ENDPOINT) is False:
+            raise MissingMyDataReplicaApiEndpoint(
+                "MyTardis doesn't provide the /api/v1/mydata_replica/ "
+                "API endpoint.")
         url = "%s/api/v1/mydata_replica/%s/?format=json" \
             % (SETTINGS.general.myTardisUrl, dfoId)
-        response = requests.get(url=url, headers=SETTINGS.defaultHeaders)
+        response = HTTP_SESSION.Get(url=url)
         response.raise_for_status()
         dfoJson = response.json()
         return dfoJson['size']
@@ -54,7 +54,32 @@ class MiscellaneousSettingsModel(BaseSettingsModel):
             'progress_poll_interval',
             'immutable_datasets',
             'cache_datafile_lookups',
-            'connection_timeout'
+            'connection_timeout',
+            'cache_folder_scans',
+            'force_full_rescan',
+            'bulk_datafile_lookups',
+            'http_read_timeout',
+            'http_max_retries',
+            'http_retry_backoff',
+            'cache_checksums',
+            'max_checksum_threads',
+            'hash_while_uploading',
+            'parallel_upload_streams',
+            'parallel_upload_threshold_mb',
+            'sftp_block_size',
+            'resume_uploads',
+            'resume_tail_check_mb',
+            'upload_processes',
+            'async_verifications',
+            'max_concurrent_lookups',
+            'async_lookup_connections',
+            'max_completed_dataview_rows',
+            'folder_scan_threads',
+            'lookup_cache_ttl',
+            'bulk_dataset_lookups',
+            'max_dataset_threads',
+            'max_objectacl_threads',
+            'continuous_debounce_seconds'
         ]
 
         self.default = dict(
@@ -68,7 +93,32 @@ class MiscellaneousSettingsModel(BaseSettingsModel):
             progress_poll_interval=1.0,
             immutable_datasets=False,
             cache_datafile_lookups=True,
-            connection_timeout=10.0)
+            connection_timeout=10.0,
+            cache_folder_scans=True,
+            force_full_rescan=False,
+            bulk_datafile_lookups=False,
+            http_read_timeout=300.0,
+            http_max_retries=3,
+            http_retry_backoff=0.5,
+            cache_checksums=True,
+            max_checksum_threads=2,
+            hash_while_uploading=False,
+            parallel_upload_streams=1,
+            parallel_upload_threshold_mb=1024,
+            sftp_block_size=131072,
+            resume_uploads=True,
+            resume_tail_check_mb=1,
+            upload_processes=0,
+            async_verifications=False,
+            max_concurrent_lookups=200,
+            async_lookup_connections=8,
+            max_completed_dataview_rows=0,
+            folder_scan_threads=1,
+            lookup_cache_ttl=0,
+            bulk_dataset_lookups=False,
+            max_dataset_threads=0,
+            max_objectacl_threads=0,
+            continuous_debounce_seconds=10)
 
         # Settings determined from command-line arguments of the
         # MyData binary or the run.py entry point which are
@@ -243,6 +293,460 @@ class MiscellaneousSettingsModel(BaseSettingsModel):
         """
         self.mydataConfig['connection_timeout'] = connectionTimeout
 
+    @property
+    def cacheFolderScans(self):
+        """
+        Returns True if MyData will keep an index of the directory listings
+        obtained while scanning folders, so that unmodified directories
+        don't need to be listed again in subsequent scans.
+        """
+        return self.mydataConfig['cache_folder_scans']
+
+    @cacheFolderScans.setter
+    def cacheFolderScans(self, cacheFolderScans):
+        """
+        Set this to True if MyData should keep an index of the directory
+        listings obtained while scanning folders.
+        """
+        self.mydataConfig['cache_folder_scans'] = cacheFolderScans
+
+    @property
+    def forceFullRescan(self):
+        """
+        Returns True if MyData will ignore the cached directory listings
+        in its folder scan index, and list every directory again.
+        """
+        return self.mydataConfig['force_full_rescan']
+
+    @forceFullRescan.setter
+    def forceFullRescan(self, forceFullRescan):
+        """
+        Set this to True if MyData should ignore the cached directory
+        listings in its folder scan index, and list every directory again.
+        """
+        self.mydataConfig['force_full_rescan'] = forceFullRescan
+
+    @property
+    def bulkDataFileLookups(self):
+        """
+        Returns True if MyData will retrieve all of the DataFile records in
+        each dataset with a few paginated requests, rather than looking up each
+        local file individually.
+        """
+        return self.mydataConfig['bulk_datafile_lookups']
+
+    @bulkDataFileLookups.setter
+    def bulkDataFileLookups(self, bulkDataFileLookups):
+        """
+        Set this to True if MyData should retrieve all of the DataFile records
+        in each dataset with a few paginated requests, rather than looking up
+        each local file individually.
+        """
+        self.mydataConfig['bulk_datafile_lookups'] = bulkDataFileLookups
+
+    @property
+    def httpReadTimeout(self):
+        """
+        Timeout (in seconds) for reading each response from the MyTardis API,
+        after the connection has been established
+
+        :return: the timeout in seconds
+        :rtype: float
+        """
+        return self.mydataConfig['http_read_timeout']
+
+    @httpReadTimeout.setter
+    def httpReadTimeout(self, httpReadTimeout):
+        """
+        Timeout (in seconds) for reading each response from the MyTardis API
+
+        :param httpReadTimeout: the timeout in seconds
+        :type httpReadTimeout: float
+        """
+        self.mydataConfig['http_read_timeout'] = httpReadTimeout
+
+    @property
+    def httpMaxRetries(self):
+        """
+        Maximum number of times to retry an idempotent MyTardis API request
+        after a connection error or a transient server error (502, 503 or 504)
+        """
+        return self.mydataConfig['http_max_retries']
+
+    @httpMaxRetries.setter
+    def httpMaxRetries(self, httpMaxRetries):
+        """
+        Set the maximum number of times to retry an idempotent MyTardis API
+        request
+        """
+        self.mydataConfig['http_max_retries'] = httpMaxRetries
+
+    @property
+    def httpRetryBackoff(self):
+        """
+        Backoff factor (in seconds) for retrying MyTardis API requests.
+        The delay before each retry doubles, starting from this value.
+
+        :return: the backoff factor in seconds
+        :rtype: float
+        """
+        return self.mydataConfig['http_retry_backoff']
+
+    @httpRetryBackoff.setter
+    def httpRetryBackoff(self, httpRetryBackoff):
+        """
+        Backoff factor (in seconds) for retrying MyTardis API requests.
+
+        :param httpRetryBackoff: the backoff factor in seconds
+        :type httpRetryBackoff: float
+        """
+        self.mydataConfig['http_retry_backoff'] = httpRetryBackoff
+
+    @property
+    def cacheChecksums(self):
+        """
+        Whether to cache the MD5 checksums calculated for local data files, so
+        that unmodified files don't need to be read again if they need to be
+        uploaded again.
+
+        :return: True if MD5 checksums should be cached.
+        """
+        return self.mydataConfig['cache_checksums']
+
+    @cacheChecksums.setter
+    def cacheChecksums(self, cacheChecksums):
+        """
+        Set this to True to cache the MD5 checksums calculated for local data
+        files.
+
+        :param cacheChecksums: True if MD5 checksums should be cached.
+        """
+        self.mydataConfig['cache_checksums'] = cacheChecksums
+
+    @property
+    def maxChecksumThreads(self):
+        """
+        The maximum number of threads calculating MD5 checksums ahead of
+        uploads.
+
+        :return: the maximum number of MD5 checksum threads.
+        """
+        return self.mydataConfig['max_checksum_threads']
+
+    @maxChecksumThreads.setter
+    def maxChecksumThreads(self, maxChecksumThreads):
+        """
+        Set the maximum number of threads calculating MD5 checksums ahead of
+        uploads.
+
+        :param maxChecksumThreads: the maximum number of MD5 checksum threads.
+        """
+        self.mydataConfig['max_checksum_threads'] = maxChecksumThreads
+
+    @property
+    def hashWhileUploading(self):
+        """
+        Whether to calculate the MD5 checksum of each file while uploading it
+        to staging, instead of reading the file once to calculate its checksum
+        before uploading it.
+
+        :return: True if MD5 checksums should be calculated while uploading.
+        """
+        return self.mydataConfig['hash_while_uploading']
+
+    @hashWhileUploading.setter
+    def hashWhileUploading(self, hashWhileUploading):
+        """
+        Set this to True to calculate MD5 checksums while uploading to staging.
+
+        :param hashWhileUploading: True if MD5 checksums should be calculated
+        while uploading.
+        """
+        self.mydataConfig['hash_while_uploading'] = hashWhileUploading
+
+    @property
+    def parallelUploadStreams(self):
+        """
+        The number of parallel SFTP streams used to upload each large file to
+        staging.  Values less than 2 disable parallel uploads.
+
+        :return: the number of parallel SFTP streams.
+        """
+        return self.mydataConfig['parallel_upload_streams']
+
+    @parallelUploadStreams.setter
+    def parallelUploadStreams(self, parallelUploadStreams):
+        """
+        Set the number of parallel SFTP streams used to upload each large file
+        to staging.
+
+        :param parallelUploadStreams: the number of parallel SFTP streams.
+        """
+        self.mydataConfig['parallel_upload_streams'] = parallelUploadStreams
+
+    @property
+    def parallelUploadThresholdMb(self):
+        """
+        The minimum size (in MiB) of files to upload to staging with parallel
+        SFTP streams.
+
+        :return: the parallel upload threshold in MiB.
+        """
+        return self.mydataConfig['parallel_upload_threshold_mb']
+
+    @parallelUploadThresholdMb.setter
+    def parallelUploadThresholdMb(self, parallelUploadThresholdMb):
+        """
+        Set the minimum size (in MiB) of files to upload to staging with
+        parallel SFTP streams.
+
+        :param parallelUploadThresholdMb: the parallel upload threshold in MiB.
+        """
+        self.mydataConfig['parallel_upload_threshold_mb'] = \
+            parallelUploadThresholdMb
+
+    @property
+    def sftpBlockSize(self):
+        """
+        The maximum number of bytes written by each SFTP write request when
+        uploading to staging.
+
+        :return: the SFTP block size in bytes.
+        """
+        return self.mydataConfig['sftp_block_size']
+
+    @sftpBlockSize.setter
+    def sftpBlockSize(self, sftpBlockSize):
+        """
+        Set the maximum number of bytes written by each SFTP write request.
+
+        :param sftpBlockSize: the SFTP block size in bytes.
+        """
+        self.mydataConfig['sftp_block_size'] = sftpBlockSize
+
+    @property
+    def resumeUploads(self):
+        """
+        Whether to resume uploads to staging from the end of a partial copy
+        left by an interrupted upload, instead of uploading the whole file
+        again.
+        """
+        return self.mydataConfig['resume_uploads']
+
+    @resumeUploads.setter
+    def resumeUploads(self, resumeUploads):
+        """
+        Set whether to resume uploads to staging from the end of a partial
+        copy.
+        """
+        self.mydataConfig['resume_uploads'] = resumeUploads
+
+    @property
+    def resumeTailCheckMb(self):
+        """
+        The number of MiB at the end of a partial copy in staging whose MD5
+        checksum is compared with the local file before resuming its upload.
+
+        A value of 0 disables the check.
+        """
+        return self.mydataConfig['resume_tail_check_mb']
+
+    @resumeTailCheckMb.setter
+    def resumeTailCheckMb(self, resumeTailCheckMb):
+        """
+        Set the number of MiB at the end of a partial copy in staging to check
+        before resuming its upload.
+        """
+        self.mydataConfig['resume_tail_check_mb'] = resumeTailCheckMb
+
+    @property
+    def uploadProcesses(self):
+        """
+        The number of worker processes used to calculate MD5 checksums and to
+        encrypt SFTP uploads, so that these don't contend for the GIL when
+        several upload threads are running.
+
+        A value of 0 means that the upload threads do this work themselves.
+        """
+        return self.mydataConfig['upload_processes']
+
+    @uploadProcesses.setter
+    def uploadProcesses(self, uploadProcesses):
+        """
+        Set the number of worker processes used to calculate MD5 checksums and
+        to encrypt SFTP uploads.
+        """
+        self.mydataConfig['upload_processes'] = uploadProcesses
+
+    @property
+    def asyncVerifications(self):
+        """
+        Whether to look up data files on the MyTardis server from a single
+        asyncio event loop, which can keep many more lookups in flight than the
+        verification worker threads can.
+        """
+        return self.mydataConfig['async_verifications']
+
+    @asyncVerifications.setter
+    def asyncVerifications(self, asyncVerifications):
+        """
+        Set whether to look up data files from a single asyncio event loop.
+        """
+        self.mydataConfig['async_verifications'] = asyncVerifications
+
+    @property
+    def maxConcurrentLookups(self):
+        """
+        Maximum number of data file lookups the asyncio verification engine
+        keeps in flight at once.
+        """
+        return self.mydataConfig['max_concurrent_lookups']
+
+    @maxConcurrentLookups.setter
+    def maxConcurrentLookups(self, maxConcurrentLookups):
+        """
+        Set the maximum number of data file lookups the asyncio verification
+        engine keeps in flight at once.
+        """
+        self.mydataConfig['max_concurrent_lookups'] = maxConcurrentLookups
+
+    @property
+    def asyncLookupConnections(self):
+        """
+        Number of keep-alive HTTP connections shared by the asyncio
+        verification engine's lookups.
+        """
+        return self.mydataConfig['async_lookup_connections']
+
+    @asyncLookupConnections.setter
+    def asyncLookupConnections(self, asyncLookupConnections):
+        """
+        Set the number of keep-alive HTTP connections shared by the asyncio
+        verification engine's lookups.
+        """
+        self.mydataConfig['async_lookup_connections'] = asyncLookupConnections
+
+    @property
+    def maxCompletedDataViewRows(self):
+        """
+        The maximum number of completed rows kept in the Verifications and
+        Uploads views.  Older completed rows are moved to an on-disk history
+        log.  0 means that all rows are kept.
+        """
+        return self.mydataConfig['max_completed_dataview_rows']
+
+    @maxCompletedDataViewRows.setter
+    def maxCompletedDataViewRows(self, maxCompletedDataViewRows):
+        """
+        Set the maximum number of completed rows kept in the Verifications and
+        Uploads views.
+        """
+        self.mydataConfig['max_completed_dataview_rows'] = \
+            maxCompletedDataViewRows
+
+    @property
+    def folderScanThreads(self):
+        """
+        The number of user or group folders which can be scanned concurrently,
+        including looking up their MyTardis user or group records.  1 means
+        that folders are scanned one at a time.
+        """
+        return self.mydataConfig['folder_scan_threads']
+
+    @folderScanThreads.setter
+    def folderScanThreads(self, folderScanThreads):
+        """
+        Set the number of user or group folders which can be scanned
+        concurrently.
+        """
+        self.mydataConfig['folder_scan_threads'] = folderScanThreads
+
+    @property
+    def lookupCacheTtl(self):
+        """
+        The number of seconds for which MyTardis user, group, facility and
+        instrument lookups are cached on disk, including lookups which found
+        no matching record.  0 means that lookups are not cached.
+        """
+        return self.mydataConfig['lookup_cache_ttl']
+
+    @lookupCacheTtl.setter
+    def lookupCacheTtl(self, lookupCacheTtl):
+        """
+        Set the number of seconds for which MyTardis user, group, facility
+        and instrument lookups are cached.
+        """
+        self.mydataConfig['lookup_cache_ttl'] = lookupCacheTtl
+
+    @property
+    def bulkDatasetLookups(self):
+        """
+        Whether to retrieve all of the dataset records in each experiment with
+        a few paginated requests, instead of looking up each dataset folder's
+        dataset individually.
+        """
+        return self.mydataConfig['bulk_dataset_lookups']
+
+    @bulkDatasetLookups.setter
+    def bulkDatasetLookups(self, bulkDatasetLookups):
+        """
+        Set this to True to retrieve all of the dataset records in each
+        experiment with a few paginated requests.
+        """
+        self.mydataConfig['bulk_dataset_lookups'] = bulkDatasetLookups
+
+    @property
+    def maxDatasetThreads(self):
+        """
+        The maximum number of dataset folders whose experiments and datasets
+        can be looked up (or created) concurrently, before their files are
+        queued for verification.  0 means that each dataset folder gets its own
+        thread.
+        """
+        return self.mydataConfig['max_dataset_threads']
+
+    @maxDatasetThreads.setter
+    def maxDatasetThreads(self, maxDatasetThreads):
+        """
+        Set the maximum number of dataset folders whose experiments and
+        datasets can be looked up (or created) concurrently.
+        """
+        self.mydataConfig['max_dataset_threads'] = maxDatasetThreads
+
+    @property
+    def maxObjectAclThreads(self):
+        """
+        Maximum number of ObjectACLs (sharing new experiments with users and
+        groups) to create concurrently in the background, or 0 to create them
+        before uploading to each new experiment.
+        """
+        return self.mydataConfig['max_objectacl_threads']
+
+    @maxObjectAclThreads.setter
+    def maxObjectAclThreads(self, maxObjectAclThreads):
+        """
+        Set maximum number of ObjectACLs to create concurrently in the
+        background.
+        """
+        self.mydataConfig['max_objectacl_threads'] = maxObjectAclThreads
+
+    @property
+    def continuousDebounceSeconds(self):
+        """
+        Number of seconds without further changes to wait before uploading
+        files changed in a dataset folder, for the Continuous schedule type.
+        """
+        return self.mydataConfig['continuous_debounce_seconds']
+
+    @continuousDebounceSeconds.setter
+    def continuousDebounceSeconds(self, continuousDebounceSeconds):
+        """
+        Set number of seconds without further changes to wait before uploading
+        changed files, for the Continuous schedule type.
+        """
+        self.mydataConfig['continuous_debounce_seconds'] = \
+            continuousDebounceSeconds
+
     def SetDefaultForField(self, field):
         """
         Set default value for one field.
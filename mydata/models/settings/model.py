@@ -2,8 +2,8 @@
 Model class for the settings displayed in the settings dialog
 and saved to disk in MyData.cfg
 """
+import hashlib
 import os
-import pickle
 import traceback
 
 from six.moves import urllib
@@ -12,6 +12,11 @@ from ...constants import APPNAME
 from ...logs import logger
 from ...threads.locks import LOCKS
 from ...utils import CreateConfigPathIfNecessary
+from ...utils.checksums import ChecksumCache
+from ...utils.datafilecache import VerifiedDatafilesCache
+from ...utils.history import DATAVIEW_HISTORY
+from ...utils.lookupcache import LookupCache
+from ...utils.serverprofile import ServerProfile
 from .general import GeneralSettingsModel
 from .schedule import ScheduleSettingsModel
 from .filters import FiltersSettingsModel
@@ -43,7 +48,10 @@ class SettingsModel(object):
         # "/Users/jsmith/Library/Application Support/MyData/MyData.cfg":
         self._configPath = configPath
 
-        self.verifiedDatafilesCache = dict()
+        self.verifiedDatafilesCache = VerifiedDatafilesCache()
+        self.checksumCache = ChecksumCache()
+        self.lookupCache = LookupCache()
+        self.serverProfile = ServerProfile()
 
         self._uploaderModel = None
 
@@ -258,43 +266,155 @@ class SettingsModel(object):
     @property
     def verifiedDatafilesCachePath(self):
         """
-        We use a serialized dictionary to cache DataFile lookup results.
+        We use an SQLite database to cache DataFile lookup results.
         We'll use a separate cache file for each MyTardis server we connect to.
         """
         parsed = urllib.parse.urlparse(self.general.myTardisUrl)
         return os.path.join(
             os.path.dirname(self.configPath),
-            "verified-files-%s-%s.pkl" %
+            "verified-files-%s-%s.db" %
             (parsed.scheme, parsed.netloc))
 
+    @property
+    def serverProfilePath(self):
+        """
+        The capabilities of each MyTardis server are saved next to its
+        cache of DataFile lookup results.
+        """
+        parsed = urllib.parse.urlparse(self.general.myTardisUrl)
+        return os.path.join(
+            os.path.dirname(self.configPath),
+            "server-profile-%s-%s.json" %
+            (parsed.scheme, parsed.netloc))
+
+    @property
+    def legacyVerifiedDatafilesCachePath(self):
+        """
+        Earlier versions of MyData used a serialized dictionary to cache
+        DataFile lookup results, which will be migrated to the new cache.
+        """
+        return os.path.splitext(self.verifiedDatafilesCachePath)[0] + ".pkl"
+
+    @property
+    def scanIndexPath(self):
+        """
+        The location on disk of the index of directory listings
+        used to speed up folder scans.
+        """
+        return os.path.join(
+            os.path.dirname(self.configPath), "scan-index.pkl")
+
+    @property
+    def checksumCachePath(self):
+        """
+        The location on disk of the cache of MD5 checksums calculated
+        for local data files.
+        """
+        return os.path.join(
+            os.path.dirname(self.configPath), "checksums.db")
+
+    @property
+    def dataViewHistoryPath(self):
+        """
+        The location on disk of the log of completed rows removed from the
+        Verifications and Uploads views.
+        """
+        return os.path.join(
+            os.path.dirname(self.configPath), "dataview-history.db")
+
+    @property
+    def lookupCachePath(self):
+        """
+        The location on disk of the cache of MyTardis user, group, facility
+        and instrument lookups.
+        """
+        return os.path.join(
+            os.path.dirname(self.configPath), "lookups.db")
+
+    @property
+    def lookupCacheScope(self):
+        """
+        A digest of the settings which MyTardis user, group, facility and
+        instrument lookups depend on, so that cached lookups can be
+        discarded when any of these settings change.
+        """
+        scope = "\n".join([
+            self.general.myTardisUrl, self.general.username,
+            self.general.apiKey, self.general.facilityName,
+            self.general.instrumentName, self.advanced.folderStructure,
+            self.advanced.groupPrefix])
+        return hashlib.sha256(scope.encode('utf-8')).hexdigest()
+
     def InitializeVerifiedDatafilesCache(self):
         """
-        We use a serialized dictionary to cache DataFile lookup results.
-        We'll use a separate cache file for each MyTardis server we connect to.
+        Open the cache of DataFile lookup results, migrating the
+        serialized dictionary used by earlier versions if necessary.
         """
-        try:
-            if os.path.exists(self.verifiedDatafilesCachePath):
-                with open(self.verifiedDatafilesCachePath, 'rb') as cacheFile:
-                    self.verifiedDatafilesCache = pickle.load(cacheFile)
-            else:
-                self.verifiedDatafilesCache = dict()
-        except:
-            self.verifiedDatafilesCache = dict()
-            logger.warning(traceback.format_exc())
+        if not self.miscellaneous.cacheDataFileLookups:
+            self.verifiedDatafilesCache.Close(compact=False)
+            return
+        self.verifiedDatafilesCache.Open(
+            self.verifiedDatafilesCachePath,
+            legacyPicklePath=self.legacyVerifiedDatafilesCachePath)
 
-    def SaveVerifiedDatafilesCache(self):
+    def CloseVerifiedDatafilesCache(self):
         """
-        We use a serialized dictionary to cache DataFile lookup results.
-        We'll use a separate cache file for each MyTardis server we connect to.
+        Close the cache of DataFile lookup results.  New entries are
+        written as they are recorded, so there is nothing left to save.
+        """
+        self.verifiedDatafilesCache.Close()
+
+    def InitializeChecksumCache(self):
+        """
+        Open the cache of MD5 checksums calculated for local data files.
+        """
+        if not self.miscellaneous.cacheChecksums:
+            self.checksumCache.Close()
+            return
+        self.checksumCache.Open(self.checksumCachePath)
+
+    def CloseChecksumCache(self):
+        """
+        Close the cache of MD5 checksums calculated for local data files.
+        """
+        self.checksumCache.Close()
+
+    def InitializeServerProfile(self, apiEndpointsJson=None):
+        """
+        Load the capabilities previously discovered for the MyTardis
+        server, discarding them if the list of API endpoints returned by
+        /api/v1/?format=json has changed.
+        """
+        self.serverProfile.Load(self.serverProfilePath, apiEndpointsJson)
+
+    def InitializeLookupCache(self):
+        """
+        Open the cache of MyTardis user, group, facility and instrument
+        lookups, if lookup_cache_ttl is set in MyData.cfg.  The cache is
+        cleared if any of the settings which the lookups depend on have
+        changed since it was last opened.
+        """
+        if self.miscellaneous.lookupCacheTtl <= 0:
+            self.lookupCache.Close()
+            return
+        self.lookupCache.Open(
+            self.lookupCachePath, self.lookupCacheScope,
+            self.miscellaneous.lookupCacheTtl)
+
+    def InitializeDataViewHistory(self):
+        """
+        Open the log of completed rows removed from the Verifications and
+        Uploads views, if they are bounded by max_completed_dataview_rows.
+
+        The log is left open after uploads have finished, so it can still
+        be searched from the views.
         """
-        with LOCKS.closeCache:
-            try:
-                with open(self.verifiedDatafilesCachePath,
-                          'wb') as cacheFile:
-                    pickle.dump(self.verifiedDatafilesCache, cacheFile)
-            except:
-                logger.warning("Couldn't save verified datafiles cache.")
-                logger.warning(traceback.format_exc())
+        if self.miscellaneous.maxCompletedDataViewRows <= 0:
+            DATAVIEW_HISTORY.Close()
+            return
+        if not DATAVIEW_HISTORY.IsOpen() or \
+                DATAVIEW_HISTORY.path != self.dataViewHistoryPath:
+            DATAVIEW_HISTORY.Open(self.dataViewHistoryPath)
 
     @property
     def configPath(self):
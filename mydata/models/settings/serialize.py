@@ -221,22 +221,45 @@ def LoadMiscellaneousSettings(settings, configParser):
     fields = ["locked", "uuid", "cipher", "use_none_cipher",
               "max_verification_threads", "verification_delay",
               "fake_md5_sum", "progress_poll_interval", "immutable_datasets",
-              "cache_datafile_lookups", "connection_timeout"]
+              "cache_datafile_lookups", "connection_timeout",
+              "cache_folder_scans", "force_full_rescan",
+              "bulk_datafile_lookups", "http_read_timeout", "http_max_retries",
+              "http_retry_backoff", "cache_checksums", "max_checksum_threads",
+              "hash_while_uploading", "parallel_upload_streams",
+              "parallel_upload_threshold_mb", "sftp_block_size",
+              "resume_uploads", "resume_tail_check_mb",
+              "upload_processes", "async_verifications",
+              "max_concurrent_lookups", "async_lookup_connections",
+              "max_completed_dataview_rows", "folder_scan_threads",
+              "lookup_cache_ttl", "bulk_dataset_lookups",
+              "max_dataset_threads", "max_objectacl_threads",
+              "continuous_debounce_seconds"]
     for field in fields:
         if configParser.has_option(configFileSection, field):
             settings[field] = configParser.get(configFileSection, field)
     booleanFields = [
         "fake_md5_sum", "use_none_cipher", "locked", "immutable_datasets",
-        "cache_datafile_lookups"]
+        "cache_datafile_lookups", "cache_folder_scans", "force_full_rescan",
+        "bulk_datafile_lookups", "cache_checksums", "hash_while_uploading",
+        "resume_uploads", "async_verifications", "bulk_dataset_lookups"]
     for field in booleanFields:
         if configParser.has_option(configFileSection, field):
             settings[field] = configParser.getboolean(configFileSection, field)
-    intFields = ["max_verification_threads"]
+    intFields = ["max_verification_threads", "http_max_retries",
+                 "max_checksum_threads", "parallel_upload_streams",
+                 "parallel_upload_threshold_mb", "sftp_block_size",
+                 "resume_tail_check_mb",
+                 "upload_processes", "max_concurrent_lookups",
+                 "async_lookup_connections", "max_completed_dataview_rows",
+                 "folder_scan_threads", "lookup_cache_ttl",
+                 "max_dataset_threads", "max_objectacl_threads",
+                 "continuous_debounce_seconds"]
     for field in intFields:
         if configParser.has_option(configFileSection, field):
             settings[field] = configParser.getint(configFileSection, field)
     floatFields = [
-        "verification_delay", "progress_poll_interval", "connection_timeout"]
+        "verification_delay", "progress_poll_interval", "connection_timeout",
+        "http_read_timeout", "http_retry_backoff"]
     for field in floatFields:
         if configParser.has_option(configFileSection, field):
             try:
@@ -281,18 +304,33 @@ def CheckForUpdatedSettingsOnServer(settings):
                         "friday_checked", "saturday_checked",
                         "sunday_checked", "use_includes_file",
                         "use_excludes_file", "immutable_datasets",
-                        "cache_datafile_lookups"):
+                        "cache_datafile_lookups", "cache_folder_scans",
+                        "force_full_rescan", "bulk_datafile_lookups",
+                        "cache_checksums", "hash_while_uploading",
+                        "resume_uploads", "async_verifications",
+                        "bulk_dataset_lookups"):
                     settings[setting['key']] = (setting['value'] == "True")
                 if setting['key'] in (
                         "timer_minutes", "ignore_interval_number",
                         "ignore_new_interval_number",
                         "ignore_new_files_minutes",
                         "max_verification_threads",
-                        "max_upload_threads", "max_upload_retries"):
+                        "max_upload_threads", "max_upload_retries",
+                        "http_max_retries", "max_checksum_threads",
+                        "parallel_upload_streams",
+                        "parallel_upload_threshold_mb", "sftp_block_size",
+                        "resume_tail_check_mb",
+                        "upload_processes", "max_concurrent_lookups",
+                        "async_lookup_connections",
+                        "max_completed_dataview_rows", "folder_scan_threads",
+                        "lookup_cache_ttl", "max_dataset_threads",
+                        "max_objectacl_threads",
+                        "continuous_debounce_seconds"):
                     settings[setting['key']] = int(setting['value'])
                 elif setting['key'] in (
                         "progress_poll_interval", "verification_delay",
-                        "connection_timeout"):
+                        "connection_timeout", "http_read_timeout",
+                        "http_retry_backoff"):
                     try:
                         settings[setting['key']] = float(setting['value'])
                     except ValueError:
@@ -355,7 +393,19 @@ def SaveSettingsToDisk(configPath=None):
                   "progress_poll_interval", "verification_delay",
                   "start_automatically_on_login", "immutable_datasets",
                   "cache_datafile_lookups", "upload_invalid_user_folders",
-                  "connection_timeout"]
+                  "connection_timeout", "cache_folder_scans",
+                  "force_full_rescan", "bulk_datafile_lookups",
+                  "http_read_timeout", "http_max_retries", "http_retry_backoff",
+                  "cache_checksums", "max_checksum_threads",
+                  "hash_while_uploading", "parallel_upload_streams",
+                  "parallel_upload_threshold_mb", "sftp_block_size",
+                  "resume_uploads",
+                  "resume_tail_check_mb", "upload_processes",
+                  "async_verifications", "max_concurrent_lookups",
+                  "async_lookup_connections", "max_completed_dataview_rows",
+                  "folder_scan_threads", "lookup_cache_ttl",
+                  "bulk_dataset_lookups", "max_dataset_threads",
+                  "max_objectacl_threads", "continuous_debounce_seconds"]
         settingsList = []
         for field in fields:
             value = SETTINGS[field]
@@ -18,11 +18,17 @@ from ...events.stop import RaiseExceptionIfUserAborted
 from ...logs import logger
 from ...threads.flags import FLAGS
 from ...utils.autostart import UpdateAutostartFile
+from ...utils.inotify import IsSupported as IsInotifySupported
 from ...utils.exceptions import InvalidSettings
 from ...utils.exceptions import UserAborted
+from ...utils.session import HTTP_SESSION
 from ..facility import FacilityModel
 from .miscellaneous import LastSettingsUpdateTrigger
 
+CONTINUOUS_UNAVAILABLE_MESSAGE = (
+    "The Continuous schedule type is unavailable, because it requires "
+    "Linux's inotify API.")
+
 
 def ValidateSettings(setStatusMessage=None):
     """
@@ -42,6 +48,7 @@ def ValidateSettings(setStatusMessage=None):
     try:
         RaiseExceptionIfUserAborted(setStatusMessage)
         CheckForMissingRequiredField()
+        SETTINGS.InitializeLookupCache()
         LogIfTestRun("Folder structure: %s"
                      % SETTINGS.advanced.folderStructure)
         WarnIfIgnoringInvalidUserFolders()
@@ -66,6 +73,7 @@ def ValidateSettings(setStatusMessage=None):
             CheckAutostart(setStatusMessage)
         RaiseExceptionIfUserAborted(setStatusMessage)
         CheckScheduledTime()
+        CheckScheduleType()
         message = "Settings validation - succeeded!"
         logger.debug(message)
         LogIfTestRun(message)
@@ -263,8 +271,8 @@ def CheckMyTardisUrl(setStatusMessage):
         logger.debug(message)
         if setStatusMessage:
             setStatusMessage(message)
-        response = requests.get(
-            SETTINGS.general.myTardisApiUrl,
+        response = HTTP_SESSION.Get(
+            SETTINGS.general.myTardisApiUrl, headers={},
             timeout=SETTINGS.miscellaneous.connectionTimeout)
         history = response.history
         url = response.url
@@ -305,6 +313,13 @@ def CheckMyTardisUrl(setStatusMessage):
                    response.elapsed.total_seconds())
             logger.debug(message)
             LogIfTestRun(message)
+            try:
+                apiEndpointsJson = response.json()
+            except ValueError:
+                apiEndpointsJson = None
+            if not isinstance(apiEndpointsJson, dict):
+                apiEndpointsJson = None
+            SETTINGS.InitializeServerProfile(apiEndpointsJson)
         elif response.status_code < 200 or response.status_code >= 300:
             logger.debug("Received HTTP %d while trying to access "
                          "MyTardis server (%s)."
@@ -356,7 +371,7 @@ def CheckMyTardisCredentials(setStatusMessage):
         setStatusMessage(message)
     url = SETTINGS.general.myTardisUrl + \
         "/api/v1/user/?format=json&username=" + SETTINGS.general.username
-    response = requests.get(headers=SETTINGS.defaultHeaders, url=url)
+    response = HTTP_SESSION.Get(url=url)
     statusCode = response.status_code
     if statusCode < 200 or statusCode >= 300:
         message = "Your MyTardis credentials are invalid.\n\n" \
@@ -483,6 +498,16 @@ def CheckScheduledTime():
             raise InvalidSettings(message, "scheduled_time")
 
 
+def CheckScheduleType():
+    """
+    Check that the schedule type is supported on this platform
+    """
+    from ...settings import SETTINGS
+    if SETTINGS.schedule.scheduleType == "Continuous" and \
+            not IsInotifySupported():
+        raise InvalidSettings(CONTINUOUS_UNAVAILABLE_MESSAGE, "schedule_type")
+
+
 def PerformGlobsFileValidation(filePath, upper, lower, field):
     """
     Used to validate an "includes" or "excludes"
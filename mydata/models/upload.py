@@ -67,6 +67,9 @@ class UploadModel(object):
         # Number of bytes previously uploaded, or None if the file is not yet
         # on the staging area:
         self.bytesUploadedPreviously = None
+        # The byte ranges being uploaded concurrently, if the file is
+        # large enough to be uploaded with parallel SFTP streams:
+        self.byteRanges = []
 
         self.startTime = None
         # The latest time at which upload progress has been measured:
@@ -78,6 +81,16 @@ class UploadModel(object):
         # if necessary:
         self.verificationTimer = None
 
+    @property
+    def bytesUploadedThisTime(self):
+        """
+        The number of bytes uploaded, excluding any bytes which were
+        uploaded to staging previously, so that the upload speed isn't
+        overestimated when resuming an interrupted upload.
+        """
+        return max(self.bytesUploaded - (self.bytesUploadedPreviously or 0),
+                   0)
+
     def SetBytesUploaded(self, bytesUploaded):
         """
         Set the number of bytes uploaded and update
@@ -87,7 +100,7 @@ class UploadModel(object):
         if self.bytesUploaded and self.latestTime:
             elapsedTime = self.latestTime - self.startTime
             if elapsedTime.total_seconds():
-                speedMBs = (float(self.bytesUploaded) / 1000000.0 /
+                speedMBs = (float(self.bytesUploadedThisTime) / 1000000.0 /
                             elapsedTime.total_seconds())
                 if speedMBs >= 1.0:
                     self.speed = "%3.1f MB/s" % speedMBs
@@ -113,7 +126,7 @@ class UploadModel(object):
         if self.bytesUploaded and self.latestTime:
             elapsedTime = self.latestTime - self.startTime
             if elapsedTime.total_seconds():
-                speedMBs = (float(self.bytesUploaded) / 1000000.0 /
+                speedMBs = (float(self.bytesUploadedThisTime) / 1000000.0 /
                             elapsedTime.total_seconds())
                 if speedMBs >= 1.0:
                     self.speed = "%3.1f MB/s" % speedMBs
@@ -81,7 +81,6 @@ from six.moves import urllib
 
 import dateutil.parser
 import psutil
-import requests
 import netifaces
 
 from .. import __version__ as VERSION
@@ -94,6 +93,7 @@ from ..utils.exceptions import StorageBoxOptionNotFound
 from ..utils.exceptions import StorageBoxAttributeNotFound
 from ..utils import BytesToHuman
 from ..utils import MyDataInstallLocation
+from ..utils.session import HTTP_SESSION
 from ..threads.locks import LOCKS
 from .storage import StorageBox
 
@@ -169,8 +169,8 @@ class UploaderModel(object):
         url = myTardisUrl + "/api/v1/mydata_uploader/?format=json" + \
             "&uuid=" + urllib.parse.quote(self.settings.miscellaneous.uuid)
         headers = self.settings.defaultHeaders
-        response = requests.get(
-            headers=headers, url=url,
+        response = HTTP_SESSION.Get(
+            headers=headers, url=url, settings=self.settings,
             timeout=self.settings.miscellaneous.connectionTimeout)
         response.raise_for_status()
         existingUploaderRecords = response.json()
@@ -236,12 +236,14 @@ class UploaderModel(object):
         logger.debug(data)
         headers = self.settings.defaultHeaders
         if numExistingUploaderRecords > 0:
-            response = requests.put(
+            response = HTTP_SESSION.Put(
                 headers=headers, url=url, data=data.encode(),
+                settings=self.settings,
                 timeout=self.settings.miscellaneous.connectionTimeout)
         else:
-            response = requests.post(
+            response = HTTP_SESSION.Post(
                 headers=headers, url=url, data=data.encode(),
+                settings=self.settings,
                 timeout=self.settings.miscellaneous.connectionTimeout)
         response.raise_for_status()
         logger.debug("Upload succeeded for uploader info.")
@@ -296,7 +298,8 @@ class UploaderModel(object):
                 self.sshKeyPair.fingerprint)
         logger.debug(url)
         headers = self.settings.defaultHeaders
-        response = requests.get(headers=headers, url=url)
+        response = HTTP_SESSION.Get(
+            headers=headers, url=url, settings=self.settings)
         response.raise_for_status()
         logger.debug(response.text)
         existingUploaderRegReqRecords = response.json()
@@ -331,8 +334,9 @@ class UploaderModel(object):
              "requester_public_key": self.sshKeyPair.publicKey,
              "requester_key_fingerprint": self.sshKeyPair.fingerprint}
         data = json.dumps(uploaderRegistrationRequestJson)
-        response = requests.post(headers=self.settings.defaultHeaders, url=url,
-                                 data=data.encode())
+        response = HTTP_SESSION.Post(
+            headers=self.settings.defaultHeaders, url=url,
+            data=data.encode(), settings=self.settings)
         response.raise_for_status()
         return UploaderRegistrationRequest(
             uploaderRegRequestJson=response.json())
@@ -387,7 +391,8 @@ class UploaderModel(object):
             url = "%s/api/v1/mydata_uploader/?format=json&uuid=%s" \
                 % (myTardisUrl,
                    urllib.parse.quote(self.settings.miscellaneous.uuid))
-            response = requests.get(headers=headers, url=url)
+            response = HTTP_SESSION.Get(
+                headers=headers, url=url, settings=self.settings)
             response.raise_for_status()
             existingUploaderRecords = response.json()
             numExistingUploaderRecords = \
@@ -405,8 +410,9 @@ class UploaderModel(object):
             'settings': settingsList,
             'uuid': self.settings.miscellaneous.uuid
         }
-        response = requests.patch(headers=headers, url=url,
-                                  data=json.dumps(patchData).encode())
+        response = HTTP_SESSION.Patch(
+            headers=headers, url=url, data=json.dumps(patchData).encode(),
+            settings=self.settings)
         response.raise_for_status()
 
     def GetSettings(self):
@@ -421,8 +427,8 @@ class UploaderModel(object):
         url = "%s/api/v1/mydata_uploader/?format=json&uuid=%s" \
             % (myTardisUrl, urllib.parse.quote(self.settings.miscellaneous.uuid))
         try:
-            response = requests.get(
-                headers=headers, url=url,
+            response = HTTP_SESSION.Get(
+                headers=headers, url=url, settings=self.settings,
                 timeout=self.settings.miscellaneous.connectionTimeout)
         except Exception as err:
             logger.error(str(err))
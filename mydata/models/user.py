@@ -1,11 +1,10 @@
 """
 Model class for MyTardis API v1's UserResource.
 """
-import requests
-
 from six.moves import urllib
 
 from ..settings import SETTINGS
+from ..utils.session import HTTP_SESSION
 from ..utils.exceptions import DoesNotExist
 from ..logs import logger
 from .group import GroupModel
@@ -118,20 +117,27 @@ class UserModel(object):
 
         :raises requests.exceptions.HTTPError:
         """
-        url = "%s/api/v1/user/?format=json&username=%s" \
-            % (SETTINGS.general.myTardisUrl, username)
-        response = requests.get(url=url, headers=SETTINGS.defaultHeaders)
-        response.raise_for_status()
-        userRecordsJson = response.json()
-        numUserRecordsFound = userRecordsJson['meta']['total_count']
-
-        if numUserRecordsFound == 0:
+        response = None
+        found, userRecordJson = \
+            SETTINGS.lookupCache.Get("user_by_username", username)
+        if not found:
+            url = "%s/api/v1/user/?format=json&username=%s" \
+                % (SETTINGS.general.myTardisUrl, username)
+            response = HTTP_SESSION.Get(url=url)
+            response.raise_for_status()
+            userRecordsJson = response.json()
+            numUserRecordsFound = userRecordsJson['meta']['total_count']
+            userRecordJson = \
+                userRecordsJson['objects'][0] if numUserRecordsFound else None
+            SETTINGS.lookupCache.Set(
+                "user_by_username", username, userRecordJson)
+
+        if userRecordJson is None:
             raise DoesNotExist(
                 message="User \"%s\" was not found in MyTardis" % username,
                 response=response)
         logger.debug("Found user record for username '" + username + "'.")
-        return UserModel(username=username,
-                         userRecordJson=userRecordsJson['objects'][0])
+        return UserModel(username=username, userRecordJson=userRecordJson)
 
     @staticmethod
     def GetUserByEmail(email):
@@ -140,21 +146,29 @@ class UserModel(object):
 
         :raises requests.exceptions.HTTPError:
         """
-        url = "%s/api/v1/user/?format=json&email__iexact=%s" \
-            % (SETTINGS.general.myTardisUrl,
-               urllib.parse.quote(email.encode('utf-8')))
-        response = requests.get(url=url, headers=SETTINGS.defaultHeaders)
-        response.raise_for_status()
-        userRecordsJson = response.json()
-        numUserRecordsFound = userRecordsJson['meta']['total_count']
-
-        if numUserRecordsFound == 0:
+        response = None
+        found, userRecordJson = \
+            SETTINGS.lookupCache.Get("user_by_email", email.lower())
+        if not found:
+            url = "%s/api/v1/user/?format=json&email__iexact=%s" \
+                % (SETTINGS.general.myTardisUrl,
+                   urllib.parse.quote(email.encode('utf-8')))
+            response = HTTP_SESSION.Get(url=url)
+            response.raise_for_status()
+            userRecordsJson = response.json()
+            numUserRecordsFound = userRecordsJson['meta']['total_count']
+            userRecordJson = \
+                userRecordsJson['objects'][0] if numUserRecordsFound else None
+            SETTINGS.lookupCache.Set(
+                "user_by_email", email.lower(), userRecordJson)
+
+        if userRecordJson is None:
             raise DoesNotExist(
                 message="User with email \"%s\" was not found in MyTardis"
                 % email,
                 response=response)
         logger.debug("Found user record for email '" + email + "'.")
-        return UserModel(userRecordJson=userRecordsJson['objects'][0])
+        return UserModel(userRecordJson=userRecordJson)
 
     @staticmethod
     def GetUserForFolder(userFolderName, userNotFoundInMyTardis=False):
@@ -159,6 +159,8 @@ class MyDataTester(unittest.TestCase):
         SETTINGS.general.dataDirectory = dataDirectory
         SETTINGS.general.myTardisUrl = self.fakeMyTardisUrl
         SETTINGS.miscellaneous.cacheDataFileLookups = False
+        SETTINGS.miscellaneous.cacheFolderScans = False
+        SETTINGS.miscellaneous.cacheChecksums = False
 
     def AssertUsers(self, users):
         """
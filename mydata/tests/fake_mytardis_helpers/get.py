@@ -13,10 +13,17 @@ from six.moves import urllib
 
 from . import EMPTY_API_LIST, STAGING_PATH, TEST_FACILITY, TEST_INSTRUMENT
 from . import RespondToRequestForStatusCode, RespondWithStatusCode
+from .post import OBJECT_ACLS
 
 # This storage box attribute can be overwritten by an ephemeral port:
 SFTP_PORT = 2200
 
+# Set this to True to return unverified DataFile records with the
+# placeholder MD5 checksum, as if MyData exited after uploading them with
+# hash_while_uploading, but before updating their checksums:
+PLACEHOLDER_MD5SUMS = False
+PLACEHOLDER_MD5SUM = "00000000000000000000000000000000"
+
 
 def FakeMyTardisGet(mytardis):
     """
@@ -68,7 +75,8 @@ def FakeMyTardisGet(mytardis):
             RespondToUploaderRegRequest,
         "/api/v1/mydata_experiment/": RespondToExperimentRequest,
         "/api/v1/dataset/": RespondToDatasetRequest,
-        "/api/v1/mydata_replica/": RespondToReplicaRequest
+        "/api/v1/mydata_replica/": RespondToReplicaRequest,
+        "/api/v1/objectacl/": RespondToObjectAclRequest
     }
 
     for prefix, responder in six.iteritems(responderForPrefix):
@@ -79,6 +87,9 @@ def FakeMyTardisGet(mytardis):
     if re.match(r"^.*&dataset__id=(\S+)&filename=(\S+)&directory=(\S*)$",
                 mytardis.path):
         RespondToDataFilesRequest(mytardis)
+    elif re.match(r"^.*&dataset__id=(\S+)&limit=(\d+)&offset=(\d+)$",
+                  mytardis.path):
+        RespondToDataFilesPageRequest(mytardis)
     elif re.match(r"^/api/v1/mydata_dataset_file/(\d+)/\?format=json$",
                   mytardis.path):
         RespondToDataFileRequest(mytardis)
@@ -556,6 +567,12 @@ def RespondToDatasetRequest(mytardis):
 
     :param mytardis: The FakeMyTardisHandler instance
     """
+    match = re.match(
+        r"^.*&experiments__id=(\S+)&instrument__id=(\S+)"
+        r"&limit=(\d+)&offset=(\d+)$", mytardis.path)
+    if match:
+        RespondToDatasetsPageRequest(mytardis, match)
+        return
     match = re.match(
         r"^.*&experiments__id=(\S+)&description=(\S+)&instrument__id=(\S+)$",
         mytardis.path)
@@ -578,6 +595,35 @@ def RespondToDatasetRequest(mytardis):
     mytardis.wfile.write(json.dumps(datasetsJson).encode())
 
 
+def RespondToDatasetsPageRequest(mytardis, match):
+    """
+    Respond to a request for one page of an experiment's datasets.
+
+    The only dataset which exists in each experiment is
+    "Existing Dataset", as for single dataset lookups.
+
+    :param mytardis: The FakeMyTardisHandler instance
+    :param match: The regex match for the experiment ID, instrument ID,
+        limit and offset
+    """
+    experimentId, instrumentId, _, offset = match.groups()
+    mytardis.send_response(200)
+    mytardis.send_header("Content-type", "application/json")
+    mytardis.end_headers()
+    datasetsJson = copy.deepcopy(EMPTY_API_LIST)
+    datasetsJson['meta']['total_count'] = 1
+    if int(offset) == 0:
+        datasetsJson['objects'] = [
+            {
+                "id": "1001",
+                "description": "Existing Dataset",
+                "instrument": "/api/v1/instrument/%s/" % instrumentId,
+                "experiments": ["/api/v1/experiment/%s/" % experimentId]
+            }
+        ]
+    mytardis.wfile.write(json.dumps(datasetsJson).encode())
+
+
 def RespondToDataFilesRequest(mytardis):
     """
     Respond to a datafile-related request, which performs a query which could
@@ -610,7 +656,8 @@ def RespondToDataFilesRequest(mytardis):
                 "deleted_time": None,
                 "directory": directory,
                 "filename": filename,
-                "md5sum": "c033080e8b2ec59e37fb1a9dc341c813",
+                "md5sum": PLACEHOLDER_MD5SUM if PLACEHOLDER_MD5SUMS
+                          else "c033080e8b2ec59e37fb1a9dc341c813",
                 "mimetype": "image/jpeg",
                 "modification_time": None,
                 "parameter_sets": [],
@@ -644,7 +691,8 @@ def RespondToDataFilesRequest(mytardis):
                 "deleted_time": None,
                 "directory": directory,
                 "filename": filename,
-                "md5sum": "e71c538337dce5b7fd36ae8db8160756",
+                "md5sum": PLACEHOLDER_MD5SUM if PLACEHOLDER_MD5SUMS
+                          else "e71c538337dce5b7fd36ae8db8160756",
                 "mimetype": "image/jpeg",
                 "modification_time": None,
                 "parameter_sets": [],
@@ -737,6 +785,67 @@ def RespondToDataFilesRequest(mytardis):
     mytardis.wfile.write(json.dumps(datafilesJson).encode())
 
 
+def RespondToDataFilesPageRequest(mytardis):
+    """
+    Respond to a request for one page of the DataFiles in a dataset,
+    as used for bulk DataFile lookups.
+
+    Every dataset contains the same two verified DataFiles, one in the
+    dataset's top-level directory and one in a subdirectory.
+
+    :param mytardis: The FakeMyTardisHandler instance
+    """
+    match = re.match(
+        r"^.*&dataset__id=(\S+)&limit=(\d+)&offset=(\d+)$", mytardis.path)
+    datasetId = match.groups()[0]
+    limit = int(match.groups()[1])
+    offset = int(match.groups()[2])
+    mytardis.send_response(200)
+    mytardis.send_header("Content-type", "application/json")
+    mytardis.end_headers()
+    datafilesJson = copy.deepcopy(EMPTY_API_LIST)
+    allDataFiles = []
+    for index, (directory, filename) in enumerate(
+            [("", "existing_verified_file.txt"),
+             ("subdir", "existing_verified_file.txt")]):
+        dataFileId = 290390 + index
+        allDataFiles.append({
+            "id": dataFileId,
+            "created_time": "2015-06-25T00:26:21",
+            "datafile": None,
+            "dataset": "/api/v1/dataset/%s/" % datasetId,
+            "deleted": False,
+            "deleted_time": None,
+            "directory": directory,
+            "filename": filename,
+            "md5sum": "0d2a8fb0a57bf4a9aabce5f7e69b36e9",
+            "mimetype": "text/plain",
+            "modification_time": None,
+            "parameter_sets": [],
+            "replicas": [
+                {
+                    "created_time": "2015-10-06T10:21:48.910470",
+                    "datafile": "/api/v1/dataset_file/%s/" % dataFileId,
+                    "id": 444900 + index,
+                    "last_verified_time": "2015-10-06T10:21:53.952521",
+                    "resource_uri": "/api/v1/replica/%s/" % (444900 + index),
+                    "uri": "DatasetDescription-%s/%s" % (datasetId,
+                                                         filename),
+                    "verified": True
+                }
+            ],
+            "resource_uri": "/api/v1/mydata_dataset_file/%s/" % dataFileId,
+            "sha512sum": "",
+            "size": "23",
+            "version": 1
+        })
+    datafilesJson['meta']['total_count'] = len(allDataFiles)
+    datafilesJson['meta']['limit'] = limit
+    datafilesJson['meta']['offset'] = offset
+    datafilesJson['objects'] = allDataFiles[offset:offset + limit]
+    mytardis.wfile.write(json.dumps(datafilesJson).encode())
+
+
 def RespondToDataFileRequest(mytardis):
     """
     Respond to a datafile-related request, which performs a query which will
@@ -829,6 +938,27 @@ def RespondToReplicaRequest(mytardis):
     mytardis.wfile.write(json.dumps(replicaJson).encode())
 
 
+def RespondToObjectAclRequest(mytardis):
+    """
+    Respond to a request for the ObjectACLs matching the object ID, entity
+    ID and plugin ID specified, from the ObjectACLs created by POST
+    requests.
+
+    :param mytardis: The FakeMyTardisHandler instance
+    """
+    match = re.match(
+        r"^/api/v1/objectacl/\?format=json&object_id=(\S+)"
+        r"&entityId=(\S+)&pluginId=(\S+)$", mytardis.path)
+    objectId, entityId, pluginId = match.groups()
+    mytardis.send_response(200)
+    mytardis.send_header("Content-type", "application/json")
+    mytardis.end_headers()
+    objectAclsJson = copy.deepcopy(EMPTY_API_LIST)
+    objectAclsJson['meta']['total_count'] = \
+        OBJECT_ACLS.count((objectId, pluginId, entityId))
+    mytardis.wfile.write(json.dumps(objectAclsJson).encode())
+
+
 def RespondToVerifyRequest(mytardis):
     """
     Respond to a request to verify a DataFile.
@@ -0,0 +1,47 @@
+"""
+mydata/tests/fake_mytardis_helpers/patch.py
+
+Responses to PATCH requests for our fake MyTardis server
+"""
+import re
+import json
+
+from . import RespondWithStatusCode
+
+# (datafile ID, MD5 checksum) tuples for each DataFile checksum update:
+PATCHED_MD5SUMS = []
+
+
+def FakeMyTardisPatch(mytardis):
+    """
+    Respond to a PATCH request.
+
+    :param mytardis: The FakeMyTardisHandler instance
+    """
+    assert mytardis.path.startswith("/api/v1/")
+    authorization = mytardis.headers.get("Authorization", "")
+    match = re.match(r"^ApiKey (\S+):(\S+)$", authorization)
+    if not match or match.groups()[1] == "invalid":
+        RespondWithStatusCode(mytardis, 401)
+        return
+    length = int(mytardis.headers['Content-Length'])
+    patchData = json.loads(mytardis.rfile.read(length))
+
+    if mytardis.path.startswith("/api/v1/mydata_uploader/"):
+        RespondWithStatusCode(mytardis, 202)
+    elif mytardis.path.startswith("/api/v1/dataset_file/"):
+        match = re.match(r"^/api/v1/dataset_file/(\d+)/$", mytardis.path)
+        if not match:
+            RespondWithStatusCode(mytardis, 404)
+            return
+        # MyData only updates DataFile records' checksums:
+        if list(patchData.keys()) != ["md5sum"] or \
+                not re.match(r"^[0-9a-f]{32}$", patchData["md5sum"]):
+            RespondWithStatusCode(
+                mytardis, 400, "Invalid DataFile PATCH: %s" % patchData)
+            return
+        PATCHED_MD5SUMS.append((match.groups()[0], patchData["md5sum"]))
+        RespondWithStatusCode(mytardis, 202)
+    else:
+        raise Exception("FakeMyTardis Server doesn't know how to respond "
+                        "to PATCH: %s" % mytardis.path)
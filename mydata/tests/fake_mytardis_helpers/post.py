@@ -13,6 +13,10 @@ import six
 from . import STAGING_PATH, TASTYPIE_CANNED_ERROR, TEST_FACILITY
 from . import RespondToRequestForStatusCode, RespondWithStatusCode
 
+# (object ID, plugin ID, entity ID) tuples for each ObjectACL created, which
+# can be looked up with GET requests:
+OBJECT_ACLS = []
+
 
 def FakeMyTardisPost(mytardis):
     """
@@ -73,7 +77,7 @@ def FakeMyTardisPost(mytardis):
             if responder == RespondToDataFileRequest:
                 responder(mytardis, postData, contentType)
             elif responder == RespondToObjectAclRequest:
-                responder(mytardis, apiUsername)
+                responder(mytardis, apiUsername, postData)
             else:
                 responder(mytardis, postData)
             return
@@ -196,18 +200,22 @@ def RespondToExperimentRequest(mytardis, postData):
     mytardis.wfile.write(json.dumps(experimentJson).encode())
 
 
-def RespondToObjectAclRequest(mytardis, apiUsername):
+def RespondToObjectAclRequest(mytardis, apiUsername, postData):
     """
     Respond to an ObjectACL-related request.
 
     :param mytardis: The FakeMyTardisHandler instance
     :param apiUsername: The authenticated username
+    :param postData: The ObjectACL to create
     """
     if apiUsername == "userwithoutprofile":
         mytardis.send_response(404)
         mytardis.send_header("Content-type", "application/json")
         mytardis.end_headers()
         return
+    OBJECT_ACLS.append(
+        (str(postData['object_id']), postData['pluginId'],
+         str(postData['entityId'])))
     mytardis.send_response(201)
     mytardis.send_header("Content-type", "application/json")
     mytardis.end_headers()
@@ -16,6 +16,7 @@ from six.moves.BaseHTTPServer import BaseHTTPRequestHandler  # pylint: disable=r
 from .fake_mytardis_helpers.get import FakeMyTardisGet
 from .fake_mytardis_helpers.post import FakeMyTardisPost
 from .fake_mytardis_helpers.put import FakeMyTardisPut
+from .fake_mytardis_helpers.patch import FakeMyTardisPatch
 
 # Set this to True to log URL requests:
 DEBUG = False
@@ -49,7 +50,12 @@ class FakeMyTardisHandler(BaseHTTPRequestHandler):
     def do_GET(self):
         """
         Respond to a GET request.
+
+        The fake server can also be used as an HTTP proxy server for itself,
+        in which case the request path is an absolute URL.
         """
+        if self.path.startswith("http://"):
+            self.path = "/" + self.path.split("/", 3)[-1]
         FakeMyTardisGet(self)
 
     def do_POST(self):
@@ -68,9 +74,7 @@ class FakeMyTardisHandler(BaseHTTPRequestHandler):
         """
         Respond to a PATCH request
         """
-        self.send_response(202)
-        self.send_header("Content-type", "text/html")
-        self.end_headers()
+        FakeMyTardisPatch(self)
 
     def log_message(self, format, *args):  # pylint: disable=redefined-builtin
         """
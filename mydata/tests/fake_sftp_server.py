@@ -355,12 +355,14 @@ class MyDataSFTPHandle(paramiko.SFTPHandle):
             to L{SFTPServerInterface.open}
         """
         super(MyDataSFTPHandle, self).__init__(flags=flags)
-        if flags & os.O_RDONLY:
+        # os.O_RDONLY is 0, so it can't be tested for with a bitwise and:
+        if not flags & (os.O_WRONLY | os.O_RDWR):
             self.readfile = open(path, 'rb')
         if flags & os.O_WRONLY:
             self.writefile = open(path, 'wb')
         if flags & os.O_RDWR:
             self.writefile = open(path, 'r+b')
+            self.readfile = self.writefile
 
     def stat(self):
         """
@@ -1,6 +1,8 @@
 """
 Test ability to scan the Username / Experiment / Dataset folder structure.
 """
+from ...settings import SETTINGS
+from ...dataviewmodels.dataview import DATAVIEW_MODELS
 from .. import MyDataScanFoldersTester
 from .. import ValidateSettingsAndScanFolders
 
@@ -17,3 +19,32 @@ class ScanUserExpDatasetTester(MyDataScanFoldersTester):
         self.AssertUsers(["testuser1", "testuser2"])
         self.AssertFolders(["Birds", "Flowers"])
         self.AssertNumFiles(5)
+
+    def test_parallel_scan_folders(self):
+        """Test scanning user folders concurrently, in a deterministic order.
+        """
+        self.UpdateSettingsFromCfg("testdataUserExpDataset")
+
+        def ScannedRows():
+            """
+            Return the users and folders found, with their dataViewIds.
+            """
+            users = [
+                (user.dataViewId, user.username)
+                for user in DATAVIEW_MODELS['users'].rowsData]
+            folders = [
+                (folder.dataViewId, folder.location, folder.folderName)
+                for folder in DATAVIEW_MODELS['folders'].rowsData]
+            return users, folders
+
+        ValidateSettingsAndScanFolders()
+        sequentialRows = ScannedRows()
+        SETTINGS.miscellaneous.folderScanThreads = 4
+        try:
+            ValidateSettingsAndScanFolders()
+            self.assertEqual(ScannedRows(), sequentialRows)
+        finally:
+            SETTINGS.miscellaneous.SetDefaultForField("folder_scan_threads")
+        self.AssertUsers(["testuser1", "testuser2"])
+        self.AssertFolders(["Birds", "Flowers"])
+        self.AssertNumFiles(5)
@@ -0,0 +1,75 @@
+"""
+Test the on-disk cache of MD5 checksums calculated for local data files.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from ...utils.checksums import ChecksumCache
+from ...utils.checksums import GetFileSignature
+from ...utils.checksums import Md5HashingReader
+
+
+class ChecksumCacheTester(unittest.TestCase):
+    """
+    Test the on-disk cache of MD5 checksums calculated for local data files.
+    """
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.cachePath = os.path.join(self.tempDir, "checksums.db")
+        self.dataFilePath = os.path.join(self.tempDir, "file1.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def test_checksum_cache(self):
+        """Test the on-disk cache of MD5 checksums calculated for data files.
+        """
+        with open(self.dataFilePath, 'w') as dataFile:
+            dataFile.write("hello\n")
+        signature = GetFileSignature(self.dataFilePath)
+        self.assertEqual(signature[0], 6)
+
+        cache = ChecksumCache()
+        # Lookups should fail gracefully before the cache is opened:
+        self.assertIsNone(cache.GetMd5Sum(self.dataFilePath, signature))
+
+        cache.Open(self.cachePath)
+        self.assertIsNone(cache.GetMd5Sum(self.dataFilePath, signature))
+        cache.SetMd5Sum(
+            self.dataFilePath, signature, "b1946ac92492d2347c6235b4d2611184")
+        cache.Close()
+
+        cache.Open(self.cachePath)
+        self.assertEqual(
+            cache.GetMd5Sum(self.dataFilePath, signature),
+            "b1946ac92492d2347c6235b4d2611184")
+
+        # If the file is modified, the cached checksum shouldn't be used:
+        with open(self.dataFilePath, 'w') as dataFile:
+            dataFile.write("hello world\n")
+        os.utime(self.dataFilePath, ns=(signature[1] + 10**9,) * 2)
+        newSignature = GetFileSignature(self.dataFilePath)
+        self.assertNotEqual(newSignature, signature)
+        self.assertIsNone(cache.GetMd5Sum(self.dataFilePath, newSignature))
+
+        # Only the latest checksum is kept for each path:
+        cache.SetMd5Sum(
+            self.dataFilePath, newSignature,
+            "6f5902ac237024bdd0c176cb93063dc4")
+        self.assertEqual(len(cache), 1)
+        self.assertIsNone(cache.GetMd5Sum(self.dataFilePath, signature))
+        cache.Close()
+
+    def test_md5_hashing_reader(self):
+        """Test calculating an MD5 checksum while reading a file.
+        """
+        with open(self.dataFilePath, 'w') as dataFile:
+            dataFile.write("hello\n")
+        with open(self.dataFilePath, 'rb') as dataFile:
+            reader = Md5HashingReader(dataFile)
+            chunks = list(iter(lambda: reader.read(4), b''))
+        self.assertEqual(chunks, [b"hell", b"o\n"])
+        self.assertEqual(
+            reader.hexdigest(), "b1946ac92492d2347c6235b4d2611184")
@@ -0,0 +1,110 @@
+"""
+Test bounding the Uploads view, with older completed rows moved to the
+on-disk history log.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from ...settings import SETTINGS
+from ...dataviewmodels.uploads import UploadsModel
+from ...models.upload import UploadStatus
+from ...utils.history import DATAVIEW_HISTORY
+
+
+class UploadRow(object):
+    """
+    Minimal record to display in the Uploads view.
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, dataViewId):
+        self.dataViewId = dataViewId
+        self.folderName = "Folder1"
+        self.subdirectory = ""
+        self.filename = "file%d.txt" % dataViewId
+        self.filesizeString = "1 KB"
+        self.fileSize = 1024
+        self.status = UploadStatus.IN_PROGRESS
+        self.progress = 0
+        self.message = ""
+        self.speed = ""
+
+    def GetValueForKey(self, key):
+        """
+        Return value of field from the record.
+        """
+        return getattr(self, key)
+
+
+class DataViewHistoryTester(unittest.TestCase):
+    """
+    Test bounding the Uploads view, with older completed rows moved to the
+    on-disk history log.
+    """
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        DATAVIEW_HISTORY.Open(os.path.join(self.tempDir, "history.db"))
+        SETTINGS.miscellaneous.maxCompletedDataViewRows = 10
+
+    def tearDown(self):
+        SETTINGS.miscellaneous.SetDefaultForField(
+            "max_completed_dataview_rows")
+        DATAVIEW_HISTORY.Close()
+        shutil.rmtree(self.tempDir)
+
+    def test_dataview_history(self):
+        """Test bounding the Uploads view, with older rows moved to history.
+        """
+        uploadsModel = UploadsModel()
+        rows = []
+        for dataViewId in range(1, 51):
+            rows.append(UploadRow(dataViewId))
+            uploadsModel.AddRow(rows[-1])
+        for row in rows[:40]:
+            row.message = "Upload complete!"
+            uploadsModel.SetStatus(row, UploadStatus.COMPLETED)
+        for row in rows[40:45]:
+            uploadsModel.SetStatus(row, UploadStatus.FAILED)
+
+        # The counters include the rows which have been removed:
+        self.assertEqual(uploadsModel.GetCompletedCount(), 40)
+        self.assertEqual(uploadsModel.GetCompletedSize(), 40 * 1024)
+        self.assertEqual(uploadsModel.GetFailedCount(), 5)
+        self.assertEqual(uploadsModel.GetTotalRowCount(), 50)
+
+        # Between 10 and 11 of the most recent completed rows are kept,
+        # along with the failed and in progress rows:
+        keptCompletedRows = [
+            row for row in uploadsModel.rowsData
+            if row.status == UploadStatus.COMPLETED]
+        self.assertGreaterEqual(len(keptCompletedRows), 10)
+        self.assertLessEqual(len(keptCompletedRows), 11)
+        self.assertEqual(keptCompletedRows[-1], rows[39])
+        self.assertEqual(uploadsModel.rowsData[-10:], rows[40:])
+        self.assertEqual(
+            uploadsModel.GetRowCount(), len(keptCompletedRows) + 10)
+        self.assertEqual(
+            uploadsModel.GetRowIndexForDataViewId(41),
+            len(keptCompletedRows))
+        self.assertIsNone(uploadsModel.GetRowIndex(rows[0]))
+
+        # The removed rows can be searched in the history log:
+        numRemoved = 40 - len(keptCompletedRows)
+        self.assertEqual(DATAVIEW_HISTORY.GetCount("uploads"), numRemoved)
+        self.assertEqual(DATAVIEW_HISTORY.GetCount("verifications"), 0)
+        history = DATAVIEW_HISTORY.Query("uploads", limit=5)
+        self.assertEqual(
+            [dataViewId for dataViewId, _ in history], [1, 2, 3, 4, 5])
+        self.assertEqual(history[0][1]['filename'], "file1.txt")
+        self.assertEqual(history[0][1]['message'], "Upload complete!")
+        matches = DATAVIEW_HISTORY.Query("uploads", "FILE12.TXT")
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0][0], 12)
+        self.assertEqual(matches[0][1]['filename'], "file12.txt")
+        self.assertEqual(DATAVIEW_HISTORY.GetCount("uploads", "file4"), 1)
+
+        # The history is cleared at the beginning of the next run:
+        uploadsModel.DeleteAllRows()
+        self.assertEqual(DATAVIEW_HISTORY.GetCount("uploads"), 0)
+        self.assertEqual(uploadsModel.GetTotalRowCount(), 0)
@@ -0,0 +1,97 @@
+"""
+Test finding rows in MyData's dataview models without searching them.
+"""
+import unittest
+
+from ...dataviewmodels.dataview import MyDataDataViewModel
+
+
+class RowData(object):
+    """
+    Minimal record to display in a dataview.
+    """
+    def __init__(self, dataViewId, name):
+        self.dataViewId = dataViewId
+        self.name = name
+
+    def GetValueForKey(self, key):
+        """
+        Return value of field from the record.
+        """
+        return self.__dict__[key]
+
+
+class FilterableModel(MyDataDataViewModel):
+    """
+    Dataview model which can be filtered by name.
+    """
+    def __init__(self):
+        super(FilterableModel, self).__init__()
+        self.columnNames = ["Id", "Name"]
+        self.columnKeys = ["dataViewId", "name"]
+        self.filterFields = ["name"]
+
+    def Compare(self, item1, item2, col, ascending):
+        """
+        Sort by dataViewId.
+        """
+        return item1.dataViewId - item2.dataViewId
+
+
+class DataViewRowIndexesTester(unittest.TestCase):
+    """
+    Test finding rows in MyData's dataview models without searching them.
+    """
+    def test_dataview_row_indexes(self):
+        """Test finding rows in dataview models without searching them.
+        """
+        model = FilterableModel()
+        names = ["alpha", "beta", "gamma", "delta", "epsilon"]
+        records = []
+        for dataViewId, name in enumerate(names, 1):
+            records.append(RowData(dataViewId, name))
+            model.AddRow(records[-1])
+        self.assertEqual(model.GetMaxDataViewId(), 5)
+        for row, record in enumerate(records):
+            self.assertEqual(model.GetRowIndex(record), row)
+            self.assertEqual(
+                model.GetRowIndexForDataViewId(record.dataViewId), row)
+        self.assertIsNone(model.GetRowIndex(RowData(6, "zeta")))
+        self.assertIsNone(model.GetRowIndexForDataViewId(6))
+
+        # Rows which are filtered out can't be found, and rows after
+        # them are shifted up:
+        model.Filter("e")
+        self.assertEqual(
+            [record.name for record in model.rowsData],
+            ["beta", "delta", "epsilon"])
+        self.assertIsNone(model.GetRowIndex(records[0]))
+        self.assertIsNone(model.GetRowIndexForDataViewId(3))
+        self.assertEqual(model.GetRowIndex(records[3]), 1)
+        self.assertEqual(model.GetRowIndexForDataViewId(5), 2)
+
+        # Adding a row while filtering:
+        records.append(RowData(6, "zeta"))
+        model.AddRow(records[-1])
+        for record in records:
+            row = model.GetRowIndex(record)
+            if row is not None:
+                self.assertIs(model.rowsData[row], record)
+                self.assertEqual(
+                    model.GetRowIndexForDataViewId(record.dataViewId), row)
+
+        # Clearing the filter restores the rows in dataViewId order:
+        model.Filter("")
+        self.assertEqual(
+            [record.dataViewId for record in model.rowsData],
+            [1, 2, 3, 4, 5, 6])
+        for row, record in enumerate(records):
+            self.assertEqual(model.GetRowIndex(record), row)
+            self.assertEqual(
+                model.GetRowIndexForDataViewId(record.dataViewId), row)
+
+        model.DeleteAllRows()
+        self.assertIsNone(model.GetRowIndex(records[0]))
+        self.assertIsNone(model.GetRowIndexForDataViewId(1))
+        model.AddRow(records[0])
+        self.assertEqual(model.GetRowIndexForDataViewId(1), 0)
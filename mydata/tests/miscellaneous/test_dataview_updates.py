@@ -0,0 +1,101 @@
+"""
+Test coalescing notifications of changed values in MyData's dataviews.
+"""
+import threading
+import unittest
+
+from ...dataviewmodels.dataview import MyDataDataViewModel
+from ...dataviewmodels.updates import DATAVIEW_UPDATES
+from ...threads.dispatcher import DISPATCHER
+
+
+class RowData(object):
+    """
+    Minimal record to display in a dataview.
+    """
+    def __init__(self, dataViewId):
+        self.dataViewId = dataViewId
+
+
+class RecordingModel(MyDataDataViewModel):
+    """
+    Dataview model which records the notifications sent to its views.
+    """
+    def __init__(self, numRows):
+        super(RecordingModel, self).__init__()
+        self.columnNames = ["Id", "Message"]
+        for dataViewId in range(1, numRows + 1):
+            self.AddRow(RowData(dataViewId))
+        self.rowValuesChanged = []
+        self.itemsChanged = []
+
+    def TryRowValueChanged(self, row, col):
+        """
+        Record a RowValueChanged notification.
+        """
+        self.rowValuesChanged.append(
+            (row, col, threading.current_thread().name))
+
+    def ItemsChanged(self, items):
+        """
+        Record an ItemsChanged notification.
+        """
+        self.itemsChanged.append(threading.current_thread().name)
+
+
+class DataViewUpdatesTester(unittest.TestCase):
+    """
+    Test coalescing notifications of changed values in MyData's dataviews.
+    """
+    def test_dataview_updates(self):
+        """Test coalescing notifications of changed values in dataviews.
+        """
+        fewChanges = RecordingModel(numRows=3)
+        manyChanges = RecordingModel(numRows=100)
+        deletedRow = fewChanges.rowsData[2]
+
+        def Worker():
+            """
+            Update each row many times, as upload threads do.
+            """
+            for _ in range(50):
+                for rowData in fewChanges.rowsData:
+                    fewChanges.MarkRowValueChanged(rowData, 1)
+                for rowData in manyChanges.rowsData:
+                    manyChanges.MarkRowValueChanged(rowData, 1)
+
+        workers = []
+
+        def StartWorkers():
+            """
+            Start the workers from the main loop.
+            """
+            for _ in range(4):
+                workers.append(threading.Thread(target=Worker))
+                workers[-1].start()
+            # Rows can be deleted before the views are refreshed:
+            DISPATCHER.CallLater(50, fewChanges.rowsData.remove, deletedRow)
+            DISPATCHER.CallLater(1000, DISPATCHER.ExitMainLoop)
+
+        DISPATCHER.CallAfter(StartWorkers)
+        DISPATCHER.MainLoop()
+
+        for thread in workers:
+            thread.join()
+
+        self.assertNotIn(deletedRow, fewChanges.rowsData)
+        # Each changed cell should be refreshed at most once per flush
+        # (at most 10 per second), rather than once per change, and
+        # only from the main thread:
+        self.assertGreater(len(fewChanges.rowValuesChanged), 0)
+        self.assertLess(len(fewChanges.rowValuesChanged), 3 * 11)
+        self.assertLessEqual(
+            set(fewChanges.rowValuesChanged),
+            set([(0, 1, "MainThread"), (1, 1, "MainThread"),
+                 (2, 1, "MainThread")]))
+        # When many cells have changed, they are refreshed with one
+        # ItemsChanged notification:
+        self.assertGreater(len(manyChanges.itemsChanged), 0)
+        self.assertLess(len(manyChanges.itemsChanged), 11)
+        self.assertEqual(set(manyChanges.itemsChanged), set(["MainThread"]))
+        self.assertFalse(DATAVIEW_UPDATES.flushScheduled)
@@ -0,0 +1,74 @@
+"""
+Test the event dispatcher used when running MyData headless.
+"""
+import threading
+import unittest
+
+from ...threads.dispatcher import EventDispatcher
+from ...threads.dispatcher import RepeatingTimer
+
+
+class EventDispatcherTester(unittest.TestCase):
+    """
+    Test the event dispatcher used when running MyData headless.
+    """
+    def test_call_after_and_call_later(self):
+        """Test running deferred and delayed calls in the main loop.
+        """
+        dispatcher = EventDispatcher()
+        calls = []
+
+        def RecordThreadName():
+            """
+            Record which thread the deferred call runs in.
+            """
+            calls.append(threading.current_thread().name)
+
+        def RaiseException():
+            """
+            Exceptions shouldn't stop the main loop.
+            """
+            raise RuntimeError("Error in deferred call.")
+
+        def Worker():
+            """
+            Post calls to the dispatcher from a worker thread.
+            """
+            dispatcher.CallAfter(RaiseException)
+            dispatcher.CallAfter(RecordThreadName)
+            dispatcher.CallLater(50, calls.append, "later")
+            canceled = dispatcher.CallLater(50, calls.append, "canceled")
+            canceled.Stop()
+            self.assertFalse(canceled.IsRunning())
+            dispatcher.CallLater(300, dispatcher.ExitMainLoop)
+
+        thread = threading.Thread(target=Worker, name="WorkerThread")
+        thread.start()
+        dispatcher.MainLoop()
+        thread.join()
+        self.assertFalse(dispatcher.IsRunning())
+        self.assertEqual(calls, ["MainThread", "later"])
+
+    def test_repeating_timer(self):
+        """Test a timer which notifies the main loop at a fixed interval.
+        """
+        dispatcher = EventDispatcher()
+        notifications = []
+
+        def Notify(event):
+            """
+            Count notifications, stopping the timer after three.
+            """
+            self.assertIsNone(event)
+            notifications.append(threading.current_thread().name)
+            if len(notifications) == 3:
+                timer.Stop()
+                dispatcher.ExitMainLoop()
+
+        timer = RepeatingTimer(dispatcher, Notify)
+        self.assertFalse(timer.IsRunning())
+        timer.Start(20)
+        self.assertTrue(timer.IsRunning())
+        dispatcher.MainLoop()
+        self.assertFalse(timer.IsRunning())
+        self.assertEqual(notifications, ["MainThread"] * 3)
@@ -0,0 +1,93 @@
+"""
+Test the compiled glob patterns from includes and excludes files.
+"""
+import fnmatch
+import os
+import shutil
+import tempfile
+import unittest
+
+from ...utils.filepatterns import FilePatterns
+from ...utils.filepatterns import FilePatternsCache
+from ...utils.filepatterns import FileFilter
+
+
+class FilePatternsTester(unittest.TestCase):
+    """
+    Test the compiled glob patterns from includes and excludes files.
+    """
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.patternsFilePath = os.path.join(self.tempDir, "patterns.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def test_file_patterns(self):
+        """Test the compiled glob patterns from includes and excludes files.
+        """
+        globs = [".DS_Store", "*.bak", "*.JPG", "zero*", "file?.t[xy]t",
+                 "*~", "[!a]*.dat"]
+        patterns = FilePatterns(globs)
+        filenames = [".DS_Store", "backup.bak", "image.JPG", "image.jpg",
+                     "zero_sized_file.txt", "file1.txt", "file12.txt",
+                     "notes.txt~", "a.dat", "b.dat", "bak", "readme"]
+        for filename in filenames:
+            self.assertEqual(
+                patterns.Matches(filename),
+                any(fnmatch.fnmatch(filename, glob) for glob in globs),
+                filename)
+
+        # Directory patterns only match directories:
+        patterns = FilePatterns(["*.bak", ".snapshot/", "tmp*/"])
+        self.assertTrue(patterns.MatchesDirectory(".snapshot"))
+        self.assertTrue(patterns.MatchesDirectory("tmp1"))
+        self.assertFalse(patterns.MatchesDirectory("old.bak"))
+        self.assertFalse(patterns.Matches(".snapshot"))
+
+    def test_file_filter(self):
+        """Test deciding which files to upload from includes and excludes.
+        """
+        includes = FilePatterns(["*.jpg", "keep/"])
+        excludes = FilePatterns(["*.txt", "*.jpg", "keep/", "tmp/"])
+
+        fileFilter = FileFilter(includes=includes)
+        self.assertTrue(fileFilter.IncludesFile("image.jpg"))
+        self.assertFalse(fileFilter.IncludesFile("notes.txt"))
+        self.assertTrue(fileFilter.IncludesDirectory("tmp"))
+
+        fileFilter = FileFilter(excludes=excludes)
+        self.assertFalse(fileFilter.IncludesFile("image.jpg"))
+        self.assertTrue(fileFilter.IncludesFile("data.csv"))
+        self.assertFalse(fileFilter.IncludesDirectory("tmp"))
+        self.assertFalse(fileFilter.IncludesDirectory("keep"))
+        self.assertTrue(fileFilter.IncludesDirectory("raw"))
+
+        # Includes patterns take precedence over excludes patterns:
+        fileFilter = FileFilter(includes=includes, excludes=excludes)
+        self.assertTrue(fileFilter.IncludesFile("image.jpg"))
+        self.assertFalse(fileFilter.IncludesFile("notes.txt"))
+        self.assertTrue(fileFilter.IncludesFile("data.csv"))
+        self.assertFalse(fileFilter.IncludesDirectory("tmp"))
+        self.assertTrue(fileFilter.IncludesDirectory("keep"))
+
+        fileFilter = FileFilter()
+        self.assertTrue(fileFilter.IncludesFile("notes.txt"))
+        self.assertTrue(fileFilter.IncludesDirectory("tmp"))
+
+    def test_file_patterns_cache(self):
+        """Test reading patterns files again only when they are modified.
+        """
+        with open(self.patternsFilePath, 'w') as patternsFile:
+            patternsFile.write("# Comment\n; Comment\n\n*.bak\n")
+        cache = FilePatternsCache()
+        patterns = cache.Get(self.patternsFilePath)
+        self.assertTrue(patterns.Matches("backup.bak"))
+        self.assertFalse(patterns.Matches("# Comment"))
+        self.assertIs(cache.Get(self.patternsFilePath), patterns)
+
+        with open(self.patternsFilePath, 'a') as patternsFile:
+            patternsFile.write("*.tmp\n")
+        patterns = cache.Get(self.patternsFilePath)
+        self.assertTrue(patterns.Matches("scratch.tmp"))
+        self.assertIs(cache.Get(self.patternsFilePath), patterns)
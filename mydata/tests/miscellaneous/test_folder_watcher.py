@@ -0,0 +1,200 @@
+"""
+Test watching the data directory for changes (Continuous schedule type).
+"""
+import ctypes
+import errno
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from ...settings import SETTINGS
+from ...controllers.watcher import FolderWatcher
+from ...dataviewmodels.dataview import DATAVIEW_MODELS
+from ...utils import inotify
+from ...utils.inotify import DirectoryWatcher
+from ...utils.inotify import EVENT_HEADER
+from ...utils.inotify import IN_Q_OVERFLOW
+from ...utils.inotify import IsSupported as IsInotifySupported
+from ...logs import logger
+from .. import InitializeModels
+from .. import MyDataScanFoldersTester
+from .. import ValidateSettingsAndScanFolders
+
+
+class FolderWatcherTester(MyDataScanFoldersTester):
+    """
+    Test watching the data directory for changes (Continuous schedule type).
+    """
+    def setUp(self):
+        super(FolderWatcherTester, self).setUp()
+        self.tempDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+        super(FolderWatcherTester, self).tearDown()
+
+    @unittest.skipUnless(IsInotifySupported(), "Requires inotify")
+    def test_directory_watcher(self):
+        """Test watching a directory tree for new and modified files.
+        """
+        existingDir = os.path.join(self.tempDir, "Existing")
+        os.mkdir(existingDir)
+        changedPaths = []
+        watcher = DirectoryWatcher(self.tempDir, changedPaths.append)
+        watcher.Start()
+        try:
+            with open(os.path.join(existingDir, "file1.txt"), 'w') as file1:
+                file1.write("file1")
+            newDir = os.path.join(self.tempDir, "New")
+            os.mkdir(newDir)
+            # Wait for the new directory to be watched:
+            for _ in range(100):
+                if newDir in watcher.paths.values():
+                    break
+                time.sleep(0.05)
+            with open(os.path.join(newDir, "file2.txt"), 'w') as file2:
+                file2.write("file2")
+            expectedPaths = [os.path.join(existingDir, "file1.txt"), newDir,
+                             os.path.join(newDir, "file2.txt")]
+            for _ in range(100):
+                if all(path in changedPaths for path in expectedPaths):
+                    break
+                time.sleep(0.05)
+        finally:
+            watcher.Stop()
+        for path in expectedPaths:
+            self.assertIn(path, changedPaths)
+        self.assertFalse(watcher.IsRunning())
+
+    def test_folder_watcher(self):
+        """Test matching changes to dataset folders and debouncing them.
+        """
+        self.UpdateSettingsFromCfg("testdataExpDatasetExpFiles")
+        ValidateSettingsAndScanFolders()
+        folders = dict()
+        for folderModel in DATAVIEW_MODELS['folders'].rowsData:
+            folders[(os.path.basename(folderModel.location),
+                     folderModel.folderName)] = folderModel
+        flowers = folders[("Exp1", "Flowers")]
+        expFiles = folders[("Exp1", "__EXPERIMENT_FILES__")]
+        flowersPath = os.path.join(flowers.location, flowers.folderName)
+
+        # New files must also be old enough not to be ignored:
+        SETTINGS.filters.ignoreNewFiles = False
+        quietPeriod = FolderWatcher.GetQuietPeriod()
+        self.assertEqual(quietPeriod,
+                         SETTINGS.miscellaneous.continuousDebounceSeconds)
+        SETTINGS.filters.ignoreNewFiles = True
+        SETTINGS.filters.ignoreNewFilesMinutes = 1
+        self.assertEqual(FolderWatcher.GetQuietPeriod(), quietPeriod + 60)
+        quietPeriod = FolderWatcher.GetQuietPeriod()
+
+        folderWatcher = FolderWatcher()
+        now = time.time()
+        folderWatcher.OnChange(
+            os.path.join(flowersPath, "subdir", "new_file.txt"), now)
+        folderWatcher.OnChange(
+            os.path.join(expFiles.location, "new_exp_file.txt"), now + 1)
+
+        # Each folder is ready once it has stopped changing for the quiet
+        # period:
+        self.assertIsNone(folderWatcher.TakeReadyChanges(now))
+        self.assertEqual(folderWatcher.TakeReadyChanges(now + quietPeriod),
+                         (False, [flowers]))
+        self.assertEqual(
+            folderWatcher.TakeReadyChanges(now + quietPeriod + 1),
+            (False, [expFiles]))
+        self.assertIsNone(
+            folderWatcher.TakeReadyChanges(now + quietPeriod + 1))
+
+        # Pending changes are matched to the new scan's folders after the
+        # data directory is rescanned:
+        folderWatcher.OnChange(flowersPath, now)
+        InitializeModels()
+        ValidateSettingsAndScanFolders()
+        readyChanges = folderWatcher.TakeReadyChanges(now + quietPeriod)
+        self.assertFalse(readyChanges[0])
+        self.assertIsNot(readyChanges[1][0], flowers)
+        self.assertEqual(readyChanges[1][0].folderName, "Flowers")
+
+        # Files which don't belong to a known dataset folder (e.g. in a new
+        # dataset folder) require a rescan, which includes any changed
+        # folders:
+        folderWatcher.OnChange(flowersPath, now)
+        folderWatcher.OnChange(
+            os.path.join(flowers.location, "New Dataset", "file.txt"), now)
+        self.assertEqual(folderWatcher.TakeReadyChanges(now + quietPeriod),
+                         (True, []))
+        folderWatcher.OnChange(None, now)
+        self.assertEqual(folderWatcher.TakeReadyChanges(now + quietPeriod),
+                         (True, []))
+
+    def test_event_queue_overflow(self):
+        """Test requesting a rescan when inotify's event queue overflows.
+        """
+        self.UpdateSettingsFromCfg("testdataExpDatasetExpFiles")
+        ValidateSettingsAndScanFolders()
+        folderWatcher = FolderWatcher()
+        now = time.time()
+        watcher = DirectoryWatcher(
+            self.tempDir, lambda path: folderWatcher.OnChange(path, now))
+        # The kernel reports an overflow with a watch descriptor of -1:
+        data = EVENT_HEADER.pack(-1, IN_Q_OVERFLOW, 0, 0)
+        changedPaths = watcher.ParseEvents(data)
+        self.assertEqual(changedPaths, [None])
+        for path in changedPaths:
+            watcher.callback(path)
+        # Changes may have been missed, so the data directory must be
+        # rescanned:
+        quietPeriod = FolderWatcher.GetQuietPeriod()
+        self.assertIsNone(folderWatcher.TakeReadyChanges(now))
+        self.assertEqual(folderWatcher.TakeReadyChanges(now + quietPeriod),
+                         (True, []))
+
+    @unittest.skipUnless(IsInotifySupported(), "Requires inotify")
+    def test_watch_limit_reached(self):
+        """Test watching a directory tree when the watch limit is reached.
+        """
+        os.mkdir(os.path.join(self.tempDir, "Subdir"))
+
+        class LibcWithOneWatch(object):
+            """
+            The C library, with the inotify watch limit
+            (fs.inotify.max_user_watches) reached after one watch.
+            """
+            def __init__(self, libc):
+                self.libc = libc
+                self.numWatches = 0
+
+            def __getattr__(self, name):
+                return getattr(self.libc, name)
+
+            def inotify_add_watch(self, fd, path, mask):
+                # pylint: disable=invalid-name
+                if self.numWatches >= 1:
+                    ctypes.set_errno(errno.ENOSPC)
+                    return -1
+                self.numWatches += 1
+                return self.libc.inotify_add_watch(fd, path, mask)
+
+        # pylint: disable=protected-access
+        libc = inotify.GetLibc()
+        inotify._LIBC = LibcWithOneWatch(libc)
+        watcher = DirectoryWatcher(self.tempDir, lambda path: None)
+        try:
+            loggerOutput = logger.GetValue()
+            watcher.Start()
+            self.assertEqual(list(watcher.paths.values()), [self.tempDir])
+            self.assertFalse(
+                watcher.AddWatch(os.path.join(self.tempDir, "Subdir")))
+            # The directories which could be watched are still watched:
+            self.assertTrue(watcher.IsRunning())
+        finally:
+            watcher.Stop()
+            inotify._LIBC = libc
+        self.assertIn(
+            "because the inotify watch limit "
+            "(fs.inotify.max_user_watches) has been reached",
+            logger.GetValue()[len(loggerOutput):])
@@ -0,0 +1,66 @@
+"""
+Test the shared HTTP session used for MyTardis API requests.
+"""
+from .. import MyDataTester
+from ...settings import SETTINGS
+from ...utils.session import HTTP_SESSION
+from ...utils.session import EXTRA_POOL_CONNECTIONS
+from ...utils.session import RETRY_METHODS
+from ...utils.session import RETRY_METHODS_ARG
+
+
+class HttpSessionTester(MyDataTester):
+    """
+    Test the shared HTTP session used for MyTardis API requests.
+    """
+    def tearDown(self):
+        HTTP_SESSION.Close()
+        super(HttpSessionTester, self).tearDown()
+
+    def test_http_session(self):
+        """Test the shared HTTP session used for MyTardis API requests.
+        """
+        SETTINGS.general.myTardisUrl = self.fakeMyTardisUrl
+        SETTINGS.general.username = "testuser1"
+        SETTINGS.general.apiKey = "valid"
+        SETTINGS.miscellaneous.maxVerificationThreads = 5
+        SETTINGS.advanced.maxUploadThreads = 3
+        SETTINGS.miscellaneous.httpRetryBackoff = 0.0
+
+        response = HTTP_SESSION.Get(
+            "%s/api/v1/facility/?format=json" % self.fakeMyTardisUrl)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['meta']['total_count'], 1)
+        self.assertIn("ApiKey testuser1:valid",
+                      response.request.headers['Authorization'])
+
+        session = HTTP_SESSION.GetSession(SETTINGS)
+        adapter = session.get_adapter(self.fakeMyTardisUrl)
+        self.assertEqual(adapter._pool_maxsize,  # pylint: disable=protected-access
+                         5 + 3 + EXTRA_POOL_CONNECTIONS)
+        # POST requests aren't retried, because they could create duplicate
+        # records (with whichever version of urllib3 is installed):
+        self.assertEqual(
+            getattr(adapter.max_retries, RETRY_METHODS_ARG), RETRY_METHODS)
+        self.assertNotIn("POST", RETRY_METHODS)
+
+        # The same session (and its pooled connections) is reused:
+        response = HTTP_SESSION.Get(
+            "%s/api/v1/facility/?format=json" % self.fakeMyTardisUrl)
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(HTTP_SESSION.GetSession(SETTINGS), session)
+
+        # Transient server errors are retried, and the last response
+        # is returned if they persist:
+        response = HTTP_SESSION.Get(
+            "%s/request/http/code/503/" % self.fakeMyTardisUrl)
+        self.assertEqual(response.status_code, 503)
+
+        # Changing the number of worker threads resizes the pool:
+        SETTINGS.miscellaneous.maxVerificationThreads = 10
+        self.assertIsNot(HTTP_SESSION.GetSession(SETTINGS), session)
+
+        # Settings validation's check of the MyTardis URL is unauthenticated:
+        response = HTTP_SESSION.Get(
+            "%s/api/v1/?format=json" % self.fakeMyTardisUrl, headers={})
+        self.assertNotIn("Authorization", response.request.headers)
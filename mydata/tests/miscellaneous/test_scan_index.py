@@ -0,0 +1,96 @@
+"""
+Test the persistent index of directory listings used for folder scans.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from ...utils.scanindex import ScanIndex
+
+
+class ScanIndexTester(unittest.TestCase):
+    """
+    Test the persistent index of directory listings used for folder scans.
+    """
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.dataDir = os.path.join(self.tempDir, "data")
+        os.makedirs(os.path.join(self.dataDir, "Dataset1", "subdir"))
+        os.makedirs(os.path.join(self.dataDir, "Dataset2"))
+        for relPath in ("Dataset1/file1.txt", "Dataset1/subdir/file2.txt",
+                        "Dataset2/file3.txt"):
+            with open(os.path.join(self.dataDir, relPath), 'w') as dataFile:
+                dataFile.write(relPath)
+        self.indexPath = os.path.join(self.tempDir, "scan-index.pkl")
+        self.AgeDirectories()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def AgeDirectories(self):
+        """
+        Set directory modified times to one hour ago, so that cached
+        listings won't be considered too recent to be trusted.
+        """
+        for dirpath, _, _ in os.walk(self.dataDir):
+            mtime = os.stat(dirpath).st_mtime - 3600
+            os.utime(dirpath, (mtime, mtime))
+
+    def ScanFiles(self, forceFullRescan=False):
+        """
+        Walk the test data directory using a freshly loaded index
+        and return the relative paths of the files found.
+        """
+        scanIndex = ScanIndex()
+        scanIndex.Load(self.indexPath, forceFullRescan)
+        found = []
+        for dirpath, _, filenames in scanIndex.Walk(self.dataDir):
+            for filename in filenames:
+                found.append(os.path.relpath(
+                    os.path.join(dirpath, filename), self.dataDir))
+        scanIndex.Save()
+        return sorted(path.replace(os.sep, "/") for path in found)
+
+    def test_scan_index(self):
+        """Test the persistent index of directory listings used for folder scans.
+        """
+        expected = ["Dataset1/file1.txt", "Dataset1/subdir/file2.txt",
+                    "Dataset2/file3.txt"]
+        self.assertEqual(self.ScanFiles(), expected)
+        self.assertTrue(os.path.exists(self.indexPath))
+        self.assertEqual(self.ScanFiles(), expected)
+
+        # Add a file without updating its directory's modified time,
+        # so the cached listing will be reused, unless we force a rescan:
+        dataset2 = os.path.join(self.dataDir, "Dataset2")
+        mtime = os.stat(dataset2).st_mtime
+        with open(os.path.join(dataset2, "file4.txt"), 'w') as dataFile:
+            dataFile.write("file4")
+        os.utime(dataset2, (mtime, mtime))
+        self.assertEqual(self.ScanFiles(), expected)
+        self.assertEqual(self.ScanFiles(forceFullRescan=True),
+                         expected + ["Dataset2/file4.txt"])
+
+        # Rename a dataset, which updates the parent directory's
+        # modified time, so the stale entries should be removed:
+        os.rename(os.path.join(self.dataDir, "Dataset1"),
+                  os.path.join(self.dataDir, "Renamed"))
+        self.assertEqual(
+            self.ScanFiles(),
+            ["Dataset2/file3.txt", "Dataset2/file4.txt",
+             "Renamed/file1.txt", "Renamed/subdir/file2.txt"])
+        scanIndex = ScanIndex()
+        scanIndex.Load(self.indexPath)
+        self.assertNotIn(os.path.join(self.dataDir, "Dataset1"),
+                         scanIndex.dirs)
+        self.assertIn(os.path.join(self.dataDir, "Renamed", "subdir"),
+                      scanIndex.dirs)
+
+        # Delete a dataset:
+        shutil.rmtree(os.path.join(self.dataDir, "Renamed"))
+        self.assertEqual(self.ScanFiles(),
+                         ["Dataset2/file3.txt", "Dataset2/file4.txt"])
+        scanIndex.Load(self.indexPath)
+        self.assertNotIn(os.path.join(self.dataDir, "Renamed", "subdir"),
+                         scanIndex.dirs)
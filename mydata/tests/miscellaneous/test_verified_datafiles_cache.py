@@ -0,0 +1,60 @@
+"""
+Test the on-disk cache of verified DataFile lookups.
+"""
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from ...utils.datafilecache import VerifiedDatafilesCache
+
+
+class VerifiedDatafilesCacheTester(unittest.TestCase):
+    """
+    Test the on-disk cache of verified DataFile lookups.
+    """
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.cachePath = os.path.join(
+            self.tempDir, "verified-files-http-127.0.0.1.db")
+        self.picklePath = os.path.join(
+            self.tempDir, "verified-files-http-127.0.0.1.pkl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def test_verified_datafiles_cache(self):
+        """Test the on-disk cache of verified DataFile lookups.
+        """
+        with open(self.picklePath, 'wb') as cacheFile:
+            pickle.dump({"1,b'/data/file1.txt'": True,
+                         "1,b'/data/file2.txt'": True}, cacheFile)
+
+        cache = VerifiedDatafilesCache()
+        cache.Open(self.cachePath, legacyPicklePath=self.picklePath)
+        self.assertFalse(os.path.exists(self.picklePath))
+        self.assertEqual(len(cache), 2)
+        self.assertIn("1,b'/data/file1.txt'", cache)
+        self.assertNotIn("2,b'/data/file1.txt'", cache)
+        self.assertNotIn(None, cache)
+
+        # New entries are written immediately, so they are visible
+        # from another connection before the cache is closed:
+        cache["2,b'/data/file3.txt'"] = True
+        cache["2,b'/data/file3.txt'"] = True
+        otherCache = VerifiedDatafilesCache()
+        otherCache.Open(self.cachePath)
+        self.assertIn("2,b'/data/file3.txt'", otherCache)
+        otherCache.Close()
+
+        cache["1,b'/data/file2.txt'"] = False
+        cache.Close()
+        self.assertNotIn("1,b'/data/file1.txt'", cache)
+        cache["3,b'/data/file4.txt'"] = True
+
+        cache.Open(self.cachePath)
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn("1,b'/data/file2.txt'", cache)
+        self.assertNotIn("3,b'/data/file4.txt'", cache)
+        cache.Close()
@@ -0,0 +1,97 @@
+"""
+Test retrieving all of a dataset's DataFile records in bulk.
+"""
+import os
+
+from requests.exceptions import HTTPError
+
+from .. import MyDataTester
+from ...settings import SETTINGS
+from ...models.datafile import DataFileModel
+from ...models.dataset import DatasetModel
+from ...models.folder import FolderModel
+from ...models.user import UserModel
+from ...controllers.verifications import VerifyDatafileRunnable
+from ...utils.exceptions import DoesNotExist
+
+
+class DataFileBulkLookupsTester(MyDataTester):
+    """
+    Test retrieving all of a dataset's DataFile records in bulk.
+    """
+    def test_datafile_bulk_lookups(self):
+        """Test retrieving all of a dataset's DataFile records in bulk.
+        """
+        SETTINGS.general.myTardisUrl = self.fakeMyTardisUrl
+        SETTINGS.general.username = "testuser1"
+        SETTINGS.general.apiKey = "valid"
+
+        dataset = DatasetModel(
+            datasetJson=dict(id=1, description="Flowers",
+                             resource_uri="/api/v1/dataset/1/"))
+        self.assertIsNone(dataset.dataFiles)
+
+        # The Fake MyTardis server has two DataFiles in every dataset,
+        # so a page size of 1 requires two requests:
+        dataFiles = DataFileModel.GetDataFilesForDataset(dataset, pageSize=1)
+        self.assertEqual(
+            sorted(dataFiles.keys()),
+            [("", "existing_verified_file.txt"),
+             ("subdir", "existing_verified_file.txt")])
+        dataFile = dataFiles[("subdir", "existing_verified_file.txt")]
+        self.assertEqual(dataFile.directory, "subdir")
+        self.assertEqual(dataFile.dataset, dataset)
+        self.assertTrue(dataFile.replicas[0].verified)
+
+        dataFiles = DataFileModel.GetDataFilesForDataset(dataset)
+        self.assertEqual(len(dataFiles), 2)
+
+        SETTINGS.general.apiKey = "invalid"
+        with self.assertRaises(HTTPError) as context:
+            _ = DataFileModel.GetDataFilesForDataset(dataset)
+        self.assertEqual(context.exception.response.status_code, 401)
+        SETTINGS.general.apiKey = "valid"
+
+    def test_bulk_lookup_results(self):
+        """Test resolving data files against a dataset's bulk lookup.
+        """
+        self.UpdateSettingsFromCfg(
+            "testdataUsernameDataset_POST",
+            dataFolderName="testdataUsernameDataset")
+        testuser1 = UserModel(username="testuser1")
+        folderModel = FolderModel(
+            1, "Flowers",
+            os.path.join(SETTINGS.general.dataDirectory, "testuser1"),
+            "testuser1", None, testuser1)
+        dataFileIndexes = dict(
+            (folderModel.GetDataFileName(dataFileIndex), dataFileIndex)
+            for dataFileIndex in range(folderModel.numFiles))
+        folderModel.datasetModel = DatasetModel(
+            datasetJson=dict(id=1, description="Flowers",
+                             resource_uri="/api/v1/dataset/1/"))
+        verifiedFile = DataFileModel(
+            dataset=folderModel.datasetModel,
+            dataFileJson=dict(filename="existing_verified_file.txt",
+                              directory="", replicas=[]))
+
+        def GetBulkLookupResult(filename):
+            """
+            Resolve a file in the Flowers folder against the bulk lookup.
+            """
+            return VerifyDatafileRunnable(
+                folderModel, dataFileIndexes[filename]).GetBulkLookupResult()
+
+        # Without a bulk lookup, every file is looked up individually:
+        self.assertIsNone(GetBulkLookupResult("existing_verified_file.txt"))
+
+        # Files which are missing from the bulk lookup don't exist on the
+        # server, so they don't need to be looked up individually, but
+        # files with more than one matching record do:
+        folderModel.datasetModel.dataFiles = {
+            ("", "existing_verified_file.txt"): verifiedFile,
+            ("", "zero_sized_file.txt"): None}
+        self.assertIs(GetBulkLookupResult("existing_verified_file.txt"),
+                      verifiedFile)
+        self.assertIsNone(GetBulkLookupResult("zero_sized_file.txt"))
+        with self.assertRaises(DoesNotExist):
+            GetBulkLookupResult("Pond_Water_Hyacinth_Flowers.jpg")
@@ -0,0 +1,73 @@
+"""
+Test retrieving all of an experiment's datasets in bulk.
+"""
+import os
+import threading
+
+from .. import MyDataTester
+from ...settings import SETTINGS
+from ...models.dataset import DatasetModel
+from ...models.dataset import DatasetResolver
+from ...models.experiment import ExperimentModel
+from ...models.folder import FolderModel
+from ...models.settings.validation import ValidateSettings
+
+
+class DatasetBulkLookupsTester(MyDataTester):
+    """
+    Test retrieving all of an experiment's datasets in bulk.
+    """
+    def test_dataset_bulk_lookups(self):
+        """Test retrieving all of an experiment's datasets in bulk.
+        """
+        self.UpdateSettingsFromCfg("testdataExpDataset")
+        ValidateSettings()
+        SETTINGS.miscellaneous.bulkDatasetLookups = True
+
+        experiment = ExperimentModel(
+            dict(id=2552, title="Existing Experiment",
+                 resource_uri="/api/v1/mydata_experiment/2552/"))
+        datasets = DatasetModel.GetDatasetsForExperiment(
+            experiment, pageSize=1)
+        self.assertEqual(list(datasets.keys()), ["Existing Dataset"])
+        self.assertEqual(datasets["Existing Dataset"].datasetId, "1001")
+
+        owner = SETTINGS.general.defaultOwner
+        location = os.path.join(SETTINGS.general.dataDirectory, "Exp1")
+        folderModels = []
+        for dataViewId, datasetFolderName in enumerate(
+                ["Existing Dataset"] * 2 + ["New Dataset"] * 3):
+            folderModel = FolderModel(
+                dataViewId + 1, datasetFolderName, location,
+                owner.username, None, owner)
+            folderModel.experimentTitle = experiment.title
+            folderModel.experimentModel = experiment
+            folderModels.append(folderModel)
+
+        resolver = DatasetResolver()
+        resolved = dict()
+
+        def Resolve(folderModel):
+            """
+            Resolve the folder's dataset.
+            """
+            resolved[folderModel] = \
+                resolver.GetOrCreateDatasetForFolder(folderModel)
+
+        threads = [threading.Thread(target=Resolve, args=[folderModel])
+                   for folderModel in folderModels]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # The experiment's datasets were retrieved once, and the missing
+        # dataset was only created once:
+        self.assertEqual(
+            sorted(resolver.datasets[experiment.experimentId].keys()),
+            ["Existing Dataset", "New Dataset"])
+        self.assertEqual(resolved[folderModels[0]].datasetId, "1001")
+        self.assertIs(resolved[folderModels[1]], resolved[folderModels[0]])
+        self.assertEqual(resolved[folderModels[2]].datasetId, 4457)
+        for folderModel in folderModels[3:]:
+            self.assertIs(resolved[folderModel], resolved[folderModels[2]])
@@ -0,0 +1,66 @@
+"""
+Test resolving each dataset folder's experiment once per upload run.
+"""
+import os
+import threading
+
+from ...settings import SETTINGS
+from .. import MyDataTester
+from ...models.experiment import ExperimentResolver
+from ...models.folder import FolderModel
+from ...models.settings.validation import ValidateSettings
+
+
+class ExperimentResolverTester(MyDataTester):
+    """
+    Test resolving each dataset folder's experiment once per upload run.
+    """
+    def test_experiment_resolver(self):
+        """Test resolving each dataset folder's experiment once per upload run.
+        """
+        self.UpdateSettingsFromCfg("testdataExpDataset")
+        SETTINGS.miscellaneous.uuid = "1234567890"
+        ValidateSettings()
+
+        owner = SETTINGS.general.defaultOwner
+        location = os.path.join(SETTINGS.general.dataDirectory, "Exp1")
+        folderModels = []
+        for dataViewId, experimentTitle in enumerate(
+                ["Existing Experiment"] * 4 +
+                ["Multiple Existing Experiments"] * 4):
+            folderModel = FolderModel(
+                dataViewId + 1, "Dataset%d" % dataViewId, location,
+                owner.username, None, owner)
+            folderModel.experimentTitle = experimentTitle
+            folderModels.append(folderModel)
+
+        resolver = ExperimentResolver()
+        experiments = dict()
+
+        def Resolve(folderModel):
+            """
+            Resolve the folder's experiment.
+            """
+            experiments[folderModel] = \
+                resolver.GetOrCreateExperimentForFolder(folderModel)
+
+        threads = [threading.Thread(target=Resolve, args=[folderModel])
+                   for folderModel in folderModels]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Each experiment was only looked up once, so folders belonging to
+        # the same experiment share the same ExperimentModel:
+        self.assertEqual(len(resolver.experiments), 2)
+        for folderModel in folderModels[1:4]:
+            self.assertIs(experiments[folderModel],
+                          experiments[folderModels[0]])
+        for folderModel in folderModels[5:]:
+            self.assertIs(experiments[folderModel],
+                          experiments[folderModels[4]])
+        self.assertEqual(experiments[folderModels[0]].title,
+                         "Existing Experiment")
+        self.assertEqual(experiments[folderModels[4]].title,
+                         "Existing Experiment1")
@@ -2,12 +2,14 @@
 Test folder model
 """
 import os
+import shutil
 import sys
 import tempfile
 
 import wx
 
 from ...settings import SETTINGS
+from ...models.folder import DataFilePaths
 from ...models.folder import FolderModel
 from ...models.user import UserModel
 from .. import MyDataTester
@@ -93,8 +95,8 @@ class FolderModelTester(MyDataTester):
         folderModel = FolderModel(dataViewId, folder, location, userFolderName,
                                   groupFolderName, testuser1)
         self.assertEqual(
-            sorted([os.path.basename(f) for f in
-                    folderModel.dataFilePaths['files']]),
+            sorted([folderModel.GetDataFileName(i)
+                    for i in range(folderModel.numFiles)]),
             expectedFiles)
 
         SETTINGS.filters.useIncludesFile = True
@@ -102,8 +104,8 @@ class FolderModelTester(MyDataTester):
         folderModel = FolderModel(dataViewId, folder, location, userFolderName,
                                   groupFolderName, testuser1)
         self.assertEqual(
-            sorted([os.path.basename(f) for f in
-                    folderModel.dataFilePaths['files']]),
+            sorted([folderModel.GetDataFileName(i)
+                    for i in range(folderModel.numFiles)]),
             expectedFiles)
 
         SETTINGS.filters.useIncludesFile = False
@@ -119,10 +121,88 @@ class FolderModelTester(MyDataTester):
         folderModel = FolderModel(dataViewId, folder, location, userFolderName,
                                   groupFolderName, testuser1)
         self.assertEqual(
-            sorted([os.path.basename(f) for f in
-                    folderModel.dataFilePaths['files']]),
+            sorted([folderModel.GetDataFileName(i)
+                    for i in range(folderModel.numFiles)]),
             expectedFiles)
 
+    def test_data_file_paths(self):
+        """Test the compact list of data files within a folder
+        """
+        folderPath = os.path.join(SETTINGS.general.dataDirectory, "Dataset1")
+        dataFilePaths = DataFilePaths()
+        for subdirectory in ("", "subdir1", os.path.join("subdir1", "sub2")):
+            dirPath = os.path.join(folderPath, subdirectory)
+            directory = FolderModel.GetMyTardisDirectory(
+                os.path.relpath(dirPath, folderPath))
+            for filename in ("file1.txt", "file2.txt"):
+                dataFilePaths.Append(dirPath, directory, filename)
+        self.assertEqual(len(dataFilePaths), 6)
+        # Each subdirectory is only stored once:
+        self.assertEqual(dataFilePaths.directories,
+                         ["", "subdir1", "subdir1/sub2"])
+        self.assertEqual(dataFilePaths.GetDirectory(5), "subdir1/sub2")
+        self.assertEqual(dataFilePaths.GetName(5), "file2.txt")
+        self.assertEqual(
+            dataFilePaths.GetPath(5),
+            os.path.join(folderPath, "subdir1", "sub2", "file2.txt"))
+
+        self.assertEqual(dataFilePaths.SetUploaded(0, True), 1)
+        self.assertEqual(dataFilePaths.SetUploaded(3, True), 2)
+        # Setting a flag again doesn't change the count:
+        self.assertEqual(dataFilePaths.SetUploaded(3, True), 2)
+        self.assertEqual(dataFilePaths.SetUploaded(0, False), 1)
+        self.assertTrue(dataFilePaths.IsUploaded(3))
+        self.assertFalse(dataFilePaths.IsUploaded(0))
+        dataFilePaths.ResetUploaded()
+        self.assertEqual(dataFilePaths.numUploaded, 0)
+        self.assertFalse(dataFilePaths.IsUploaded(3))
+
+    def test_enumerate_data_files(self):
+        """Test streaming a folder's data files as they are found
+        """
+        tempDir = tempfile.mkdtemp()
+        try:
+            datasetPath = os.path.join(tempDir, "Dataset1")
+            os.makedirs(os.path.join(datasetPath, "subdir1"))
+            for relpath in ("file1.txt", "file2.txt",
+                            os.path.join("subdir1", "file3.txt")):
+                with open(os.path.join(datasetPath, relpath), 'w') as dataFile:
+                    dataFile.write(relpath)
+            folderModel = FolderModel(
+                dataViewId=1, folderName="Dataset1", location=tempDir,
+                userFolderName=None, groupFolderName=None, owner=None)
+            # Nothing is listed until the files are needed:
+            self.assertEqual(len(folderModel.dataFilePaths), 0)
+
+            enumeration = folderModel.EnumerateDataFiles()
+            self.assertEqual(next(enumeration), 0)
+            # numFiles and the status report the files found so far:
+            self.assertEqual(folderModel.numFiles, 1)
+            self.assertEqual(folderModel.status, "0 of 1 files uploaded")
+            folderModel.SetDataFileUploaded(0, True)
+            self.assertEqual(list(enumeration), [1, 2])
+            self.assertEqual(folderModel.status, "1 of 3 files uploaded")
+            self.assertEqual(folderModel.GetDataFileDirectory(2), "subdir1")
+
+            # Once the files have been listed, they aren't listed again:
+            os.remove(os.path.join(datasetPath, "file1.txt"))
+            self.assertEqual(list(folderModel.EnumerateDataFiles()),
+                             [0, 1, 2])
+            self.assertEqual(folderModel.numFiles, 3)
+
+            # Subdirectories matching excludes patterns aren't walked:
+            with open(self.excludesFilePath, 'w') as excludesFile:
+                excludesFile.write("subdir1/\n")
+            SETTINGS.filters.excludesFile = self.excludesFilePath
+            SETTINGS.filters.useExcludesFile = True
+            folderModel = FolderModel(
+                dataViewId=1, folderName="Dataset1", location=tempDir,
+                userFolderName=None, groupFolderName=None, owner=None)
+            self.assertEqual(folderModel.numFiles, 1)
+            self.assertEqual(folderModel.GetDataFileName(0), "file2.txt")
+        finally:
+            shutil.rmtree(tempDir)
+
     def tearDown(self):
         if os.path.exists(self.includesFilePath):
             os.remove(self.includesFilePath)
@@ -0,0 +1,97 @@
+"""
+Test caching MyTardis user, group and facility lookups on disk.
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from ...settings import SETTINGS
+from ...models.facility import FacilityModel
+from ...models.group import GroupModel
+from ...models.user import UserModel
+from ...utils.exceptions import DoesNotExist
+from ...utils.lookupcache import NOT_FOUND_TTL
+from .. import MyDataTester
+
+
+class LookupCacheTester(MyDataTester):
+    """
+    Test caching MyTardis user, group and facility lookups on disk.
+    """
+    def setUp(self):
+        super(LookupCacheTester, self).setUp()
+        self.tempDir = tempfile.mkdtemp()
+        self.cachePath = os.path.join(self.tempDir, "lookups.db")
+
+    def tearDown(self):
+        SETTINGS.lookupCache.Close()
+        shutil.rmtree(self.tempDir)
+        super(LookupCacheTester, self).tearDown()
+
+    def test_lookup_cache(self):
+        """Test caching MyTardis user, group and facility lookups on disk.
+        """
+        self.UpdateSettingsFromCfg("testdataGroupDataset")
+        cache = SETTINGS.lookupCache
+        cache.Open(self.cachePath, SETTINGS.lookupCacheScope, 3600)
+
+        user = UserModel.GetUserByUsername("testuser1")
+        with self.assertRaises(DoesNotExist):
+            UserModel.GetUserByUsername("INVALID_USER")
+        group = GroupModel.GetGroupByName("TestFacility-Group1")
+        with self.assertRaises(DoesNotExist):
+            GroupModel.GetGroupByName("INVALID_GROUP")
+        facilities = FacilityModel.GetMyFacilities()
+        self.assertEqual(cache.Get("user_by_username", "INVALID_USER"),
+                         (True, None))
+
+        # Lookups which didn't find a matching record expire sooner, so
+        # records created in MyTardis are found again soon after:
+        expires = dict(cache.connection.execute(
+            "SELECT key, expires FROM lookups "
+            "WHERE kind = 'user_by_username'").fetchall())
+        self.assertLessEqual(
+            expires["INVALID_USER"], time.time() + NOT_FOUND_TTL)
+        self.assertGreater(expires["testuser1"], time.time() + NOT_FOUND_TTL)
+
+        # Cached lookups (including those which found no matching record)
+        # don't make any requests to MyTardis, so they aren't affected by
+        # an invalid API key:
+        apiKey = SETTINGS.general.apiKey
+        SETTINGS.general.apiKey = "invalid"
+        try:
+            self.assertEqual(
+                UserModel.GetUserByUsername("testuser1").userId, user.userId)
+            with self.assertRaises(DoesNotExist):
+                UserModel.GetUserByUsername("INVALID_USER")
+            self.assertEqual(
+                GroupModel.GetGroupByName("TestFacility-Group1").groupId,
+                group.groupId)
+            with self.assertRaises(DoesNotExist):
+                GroupModel.GetGroupByName("INVALID_GROUP")
+            self.assertEqual(
+                [facility.name for facility in
+                 FacilityModel.GetMyFacilities()],
+                [facility.name for facility in facilities])
+        finally:
+            SETTINGS.general.apiKey = apiKey
+
+        # Cached lookups are kept when the cache is opened again with the
+        # same settings, but discarded when the settings change:
+        cache.Open(self.cachePath, SETTINGS.lookupCacheScope, 3600)
+        self.assertTrue(cache.Get("user_by_username", "testuser1")[0])
+        groupPrefix = SETTINGS.advanced.groupPrefix
+        SETTINGS.advanced.groupPrefix = "OtherFacility-"
+        try:
+            cache.Open(self.cachePath, SETTINGS.lookupCacheScope, 3600)
+        finally:
+            SETTINGS.advanced.groupPrefix = groupPrefix
+        self.assertEqual(cache.Get("user_by_username", "testuser1"),
+                         (False, None))
+
+        # Expired lookups aren't used:
+        cache.Open(self.cachePath, SETTINGS.lookupCacheScope, 0)
+        cache.Set("group", "TestFacility-Group1", group.groupJson)
+        self.assertEqual(cache.Get("group", "TestFacility-Group1"),
+                         (False, None))
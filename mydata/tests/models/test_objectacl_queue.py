@@ -0,0 +1,121 @@
+"""
+Test creating ObjectACLs for new experiments in the background.
+"""
+import os
+
+import requests
+
+from ...logs import logger
+from ...settings import SETTINGS
+from ...models.experiment import ExperimentModel
+from ...models.folder import FolderModel
+from ...models.group import GroupModel
+from ...models.objectacl import ObjectAclModel
+from ...models.objectacl import ObjectAclQueue
+from ...models.settings.validation import ValidateSettings
+from ..utils import Subtract
+from .. import MyDataTester
+
+
+class ObjectAclQueueTester(MyDataTester):
+    """
+    Test creating ObjectACLs for new experiments in the background.
+    """
+    def test_objectacl_queue(self):
+        """Test creating ObjectACLs for new experiments in the background.
+        """
+        self.UpdateSettingsFromCfg("testdataExpDataset")
+        ValidateSettings()
+
+        owner = SETTINGS.general.defaultOwner
+        location = os.path.join(SETTINGS.general.dataDirectory, "Exp1")
+        group = GroupModel.GetGroupByName("TestFacility-Group1")
+        folderModel = FolderModel(
+            1, "Flowers", location, owner.username, None, owner, group)
+        folderModel.experimentTitle = "Existing Experiment"
+        experiment = ExperimentModel.GetExperimentForFolder(folderModel)
+
+        # Creating a new experiment queues its ObjectACLs for the facility
+        # managers group and the folder's group (the folder's owner is
+        # MyData's own user, so it doesn't need an ObjectACL):
+        aclQueue = ObjectAclQueue(2)
+        folderModel.experimentTitle = "New Experiment"
+        newExperiment = ExperimentModel.CreateExperimentForFolder(
+            folderModel, aclQueue)
+        facilityManagersGroup = SETTINGS.general.facility.managerGroup
+        self.assertEqual(
+            aclQueue.queued,
+            set([(newExperiment.experimentId, "django_group",
+                  facilityManagersGroup.groupId),
+                 (newExperiment.experimentId, "django_group",
+                  group.groupId)]))
+
+        # Each ObjectACL is only queued once:
+        aclQueue.ShareExperimentWithUser(experiment, owner)
+        aclQueue.ShareExperimentWithUser(experiment, owner)
+        self.assertEqual(len(aclQueue.queued), 3)
+        aclQueue.Shutdown()
+        self.assertEqual(aclQueue.numFailed, 0)
+
+        # ObjectACLs rejected by MyTardis aren't retried, but are counted
+        # as failed:
+        aclQueue = ObjectAclQueue(2)
+        apiKey = SETTINGS.general.apiKey
+        SETTINGS.general.apiKey = "invalid"
+        try:
+            aclQueue.ShareExperimentWithUser(experiment, owner)
+            aclQueue.ShareExperimentWithGroup(
+                experiment, group, isOwner=True)
+            aclQueue.Shutdown()
+        finally:
+            SETTINGS.general.apiKey = apiKey
+        self.assertEqual(aclQueue.numFailed, 2)
+
+        # Connection errors and timeouts are retried:
+        SETTINGS.miscellaneous.httpMaxRetries = 2
+        SETTINGS.miscellaneous.httpRetryBackoff = 0.0
+        attempts = []
+
+        def Share(err):
+            """
+            Fail with err.
+            """
+            attempts.append(err)
+            raise err
+
+        key = (experiment.experimentId, "django_group", 12345)
+        aclQueue = ObjectAclQueue(1)
+        aclQueue.ShareWithRetries(
+            key, Share, requests.exceptions.ConnectTimeout())
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(aclQueue.numFailed, 1)
+
+        # If the ObjectACL was created despite the error (e.g. a read
+        # timeout), it isn't created again:
+        del attempts[:]
+
+        def ShareSlowly():
+            """
+            Create the ObjectACL, and then time out waiting for the
+            response.
+            """
+            attempts.append(None)
+            ObjectAclModel.ShareExperimentWithGroup(
+                experiment, group, isOwner=False)
+            raise requests.exceptions.ReadTimeout()
+
+        key = (experiment.experimentId, "django_group", group.groupId)
+        self.assertFalse(ObjectAclModel.Exists(*key))
+        aclQueue.ShareWithRetries(key, ShareSlowly)
+        self.assertEqual(len(attempts), 1)
+        self.assertEqual(aclQueue.numFailed, 1)
+        self.assertTrue(ObjectAclModel.Exists(*key))
+
+        # Unexpected exceptions are logged and counted as failed, rather
+        # than being discarded by the pool:
+        loggerOutput = logger.GetValue()
+        aclQueue.Queue(("key",), Share, KeyError("unexpected"))
+        aclQueue.Shutdown()
+        self.assertEqual(aclQueue.numFailed, 2)
+        newLogs = Subtract(logger.GetValue(), loggerOutput)
+        self.assertIn("KeyError: 'unexpected'", newLogs)
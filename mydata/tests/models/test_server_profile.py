@@ -0,0 +1,83 @@
+"""
+Test remembering which capabilities the MyTardis server supports.
+"""
+import os
+import shutil
+import tempfile
+
+from .. import MyDataTester
+from ...settings import SETTINGS
+from ...models.dataset import DatasetModel
+from ...models.experiment import ExperimentModel
+from ...models.folder import FolderModel
+from ...models.replica import ReplicaModel
+from ...utils.exceptions import MissingMyDataReplicaApiEndpoint
+from ...utils.serverprofile import DATASET_INSTRUMENT_FILTER
+from ...utils.serverprofile import MYDATA_REPLICA_ENDPOINT
+from ...utils.serverprofile import ServerProfile
+
+
+class ServerProfileTester(MyDataTester):
+    """
+    Test remembering which capabilities the MyTardis server supports.
+    """
+    def setUp(self):
+        super(ServerProfileTester, self).setUp()
+        self.tempDir = tempfile.mkdtemp()
+        self.profilePath = os.path.join(
+            self.tempDir, "server-profile-http-127.0.0.1.json")
+
+    def tearDown(self):
+        SETTINGS.serverProfile.Load(self.profilePath, None)
+        shutil.rmtree(self.tempDir)
+        super(ServerProfileTester, self).tearDown()
+
+    def test_server_profile(self):
+        """Test remembering which capabilities the MyTardis server supports.
+        """
+        self.UpdateSettingsFromCfg("testdataExpDataset")
+        endpoints = {
+            "dataset": {"list_endpoint": "/api/v1/dataset/"},
+            "mydata_replica": {"list_endpoint": "/api/v1/mydata_replica/"}}
+        profile = SETTINGS.serverProfile
+        profile.Load(self.profilePath, endpoints)
+        self.assertTrue(profile.Supports(MYDATA_REPLICA_ENDPOINT))
+        self.assertIsNone(profile.Supports(DATASET_INSTRUMENT_FILTER))
+
+        # The first dataset lookup discovers that the fake MyTardis server
+        # supports filtering datasets by instrument:
+        owner = SETTINGS.general.defaultOwner
+        folderModel = FolderModel(
+            1, "Existing Dataset",
+            os.path.join(SETTINGS.general.dataDirectory, "Exp1"),
+            owner.username, None, owner)
+        folderModel.experimentModel = ExperimentModel(
+            dict(id=2552, title="Existing Experiment",
+                 resource_uri="/api/v1/mydata_experiment/2552/"))
+        dataset = DatasetModel.GetDataset(folderModel)
+        self.assertEqual(dataset.datasetId, "1001")
+        self.assertTrue(profile.Supports(DATASET_INSTRUMENT_FILTER))
+
+        # Capabilities are remembered by the next session, unless the
+        # server's API endpoints have changed:
+        otherProfile = ServerProfile()
+        otherProfile.Load(self.profilePath, endpoints)
+        self.assertTrue(otherProfile.Supports(DATASET_INSTRUMENT_FILTER))
+        del endpoints["mydata_replica"]
+        otherProfile.Load(self.profilePath, endpoints)
+        self.assertIsNone(otherProfile.Supports(DATASET_INSTRUMENT_FILTER))
+        self.assertFalse(otherProfile.Supports(MYDATA_REPLICA_ENDPOINT))
+
+        # A server known to be missing the mydata_replica endpoint isn't
+        # asked to count bytes uploaded to staging:
+        profile.Load(self.profilePath, endpoints)
+        with self.assertRaises(MissingMyDataReplicaApiEndpoint):
+            ReplicaModel.CountBytesUploadedToStaging(12345)
+
+        # Without the list of API endpoints, capabilities are only
+        # remembered for the current session:
+        profile.Load(self.profilePath, None)
+        self.assertIsNone(profile.Supports(MYDATA_REPLICA_ENDPOINT))
+        profile.SetSupported(DATASET_INSTRUMENT_FILTER, False)
+        otherProfile.Load(self.profilePath, endpoints)
+        self.assertIsNone(otherProfile.Supports(DATASET_INSTRUMENT_FILTER))
@@ -0,0 +1,144 @@
+"""
+Test looking up datafiles with the asyncio verification engine.
+"""
+import asyncio
+import os
+import threading
+import time
+
+from requests.exceptions import HTTPError
+
+from ...settings import SETTINGS
+from ...threads.flags import FLAGS
+from ...models.settings.validation import ValidateSettings
+from ...dataviewmodels.dataview import DATAVIEW_MODELS
+from ...dataviewmodels.uploads import UploadsModel
+from ...dataviewmodels.verifications import VerificationsModel
+from ...controllers.asyncverifications import AsyncVerificationEngine
+from ...controllers.folders import FoldersController
+from ...threads.dispatcher import DISPATCHER
+from ...utils.asynchttp import AsyncSession
+from .. import MyDataScanFoldersTester
+from .. import InitializeModels
+
+
+class AsyncVerificationsTester(MyDataScanFoldersTester):
+    """
+    Test looking up datafiles with the asyncio verification engine.
+    """
+    def tearDown(self):
+        SETTINGS.miscellaneous.SetDefaultForField("async_verifications")
+        SETTINGS.miscellaneous.SetDefaultForField("async_lookup_connections")
+        super(AsyncVerificationsTester, self).tearDown()
+
+    def test_async_verifications(self):
+        """Test looking up datafiles with the asyncio verification engine.
+        """
+        self.UpdateSettingsFromCfg(
+            "testdataUsernameDataset_POST",
+            dataFolderName="testdataUsernameDataset")
+        ValidateSettings()
+        InitializeModels()
+        SETTINGS.miscellaneous.asyncVerifications = True
+        SETTINGS.miscellaneous.asyncLookupConnections = 2
+        foldersModel = DATAVIEW_MODELS['folders']
+        foldersModel.ScanFolders(MyDataScanFoldersTester.ProgressCallback)
+        numFiles = 0
+        for row in range(foldersModel.GetRowCount()):
+            numFiles += foldersModel.GetFolderRecord(row).numFiles
+        self.assertEqual(numFiles, 12)
+
+        uploadsModel = UploadsModel()
+        verificationsModel = VerificationsModel()
+        DATAVIEW_MODELS['verifications'] = verificationsModel
+        DATAVIEW_MODELS['uploads'] = uploadsModel
+        foldersController = FoldersController(self.app.frame)
+        self.app.foldersController = foldersController
+        engines = []
+
+        def StartUploads():
+            """
+            Start uploads from a worker thread, as the GUI does, and exit
+            the main loop once they have completed.
+            """
+            FLAGS.performingLookupsAndUploads = True
+            foldersController.InitForUploads()
+            engines.append(
+                foldersController.verificationsQueue.asyncVerificationEngine)
+            for row in range(foldersModel.GetRowCount()):
+                folderModel = foldersModel.GetFolderRecord(row)
+                foldersController.StartUploadsForFolder(folderModel)
+            foldersController.FinishedScanningForDatasetFolders()
+            for _ in range(600):
+                if foldersController.completed:
+                    break
+                time.sleep(0.1)
+            DISPATCHER.CallAfter(DISPATCHER.ExitMainLoop)
+
+        # The event handlers which start uploads and count completed
+        # verifications must run in a main loop, so we use the one
+        # which runs MyData headless:
+        startUploadsThread = threading.Thread(
+            target=StartUploads, name="StartUploads")
+        DISPATCHER.CallAfter(startUploadsThread.start)
+        DISPATCHER.MainLoop()
+        startUploadsThread.join()
+
+        self.assertIsInstance(engines[0], AsyncVerificationEngine)
+        self.assertIsNone(
+            foldersController.verificationsQueue.asyncVerificationEngine)
+        self.assertTrue(foldersController.completed)
+        self.assertEqual(verificationsModel.GetCompletedCount(), numFiles)
+        self.assertEqual(verificationsModel.GetFoundVerifiedCount(), 4)
+        self.assertEqual(verificationsModel.GetNotFoundCount(), 8)
+        self.assertEqual(verificationsModel.GetFailedCount(), 0)
+        self.assertEqual(uploadsModel.GetCompletedCount(), 8)
+
+    def test_async_session(self):
+        """Test the asyncio verification engine's HTTP session.
+        """
+        SETTINGS.general.myTardisUrl = self.fakeMyTardisUrl
+        SETTINGS.general.username = "testuser1"
+        SETTINGS.general.apiKey = "invalid"
+        url = "%s/api/v1/mydata_dataset_file/?format=json" \
+            "&dataset__id=1&limit=10&offset=0" % self.fakeMyTardisUrl
+
+        async def Get(url):
+            """
+            Make a request with a new session.
+            """
+            session = AsyncSession(
+                maxConnections=1, connectTimeout=5, readTimeout=5)
+            try:
+                return await session.Get(
+                    url, headers=SETTINGS.defaultHeaders)
+            finally:
+                await session.Close()
+
+        response = asyncio.run(Get(url))
+        with self.assertRaises(HTTPError) as context:
+            response.raise_for_status()
+        self.assertEqual(context.exception.response.status_code, 401)
+
+        SETTINGS.general.apiKey = "valid"
+        response = asyncio.run(Get(url))
+        response.raise_for_status()
+        self.assertEqual(response.json()['meta']['total_count'], 2)
+
+        # Requests are made via the proxy server configured in the
+        # environment, like the requests module's.  The fake MyTardis
+        # server can act as a proxy server for itself, so a request for a
+        # host name which can't be resolved succeeds via the proxy:
+        proxyVars = ("HTTP_PROXY", "http_proxy", "NO_PROXY", "no_proxy")
+        savedProxyVars = dict(
+            (name, os.environ.pop(name)) for name in proxyVars
+            if name in os.environ)
+        os.environ["HTTP_PROXY"] = self.fakeMyTardisUrl
+        try:
+            response = asyncio.run(Get(
+                url.replace(self.fakeMyTardisUrl, "http://mytardis.invalid")))
+        finally:
+            del os.environ["HTTP_PROXY"]
+            os.environ.update(savedProxyVars)
+        response.raise_for_status()
+        self.assertEqual(response.json()['meta']['total_count'], 2)
@@ -0,0 +1,85 @@
+"""
+Test running MyData headless, i.e. with "python run.py --headless".
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+from ...settings import SETTINGS
+from ...events import MYDATA_EVENTS
+from ...threads.dispatcher import DISPATCHER
+from ...threads.dispatcher import GetApp
+from ...threads.flags import FLAGS
+from ...dataviewmodels.dataview import DATAVIEW_MODELS
+from ...daemon import MyDataDaemon
+from ...MyData import InitializeDataViewModels
+from ...logs import logger
+from ..utils import StartFakeMyTardisServer
+from ..utils import WaitForFakeMyTardisServerToStart
+from .. import MyDataScanFoldersTester
+
+
+class HeadlessTester(MyDataScanFoldersTester):
+    """
+    Test running MyData headless, without a wx.App.
+    """
+    def setUp(self):
+        """
+        Start the fake MyTardis server, without creating a wx.App.
+        """
+        os.environ['MYDATA_TESTING'] = 'True'
+        os.environ['MYDATA_DONT_SHOW_MODAL_DIALOGS'] = 'True'
+        FLAGS.shouldAbort = False
+        FLAGS.testRunRunning = False
+        self.fakeMyTardisHost, self.fakeMyTardisPort, self.httpd, \
+            self.fakeMyTardisServerThread = StartFakeMyTardisServer()
+        self.fakeMyTardisUrl = \
+            "http://%s:%s" % (self.fakeMyTardisHost, self.fakeMyTardisPort)
+        WaitForFakeMyTardisServerToStart(self.fakeMyTardisUrl)
+        self.tempDir = tempfile.mkdtemp()
+        self.logHandlers = list(logger.loggerObject.handlers)
+
+    def tearDown(self):
+        DISPATCHER.app = None
+        MYDATA_EVENTS.InitializeWithNotifyWindow(None)
+        SETTINGS.miscellaneous.autoexit = False
+        for handler in logger.loggerObject.handlers:
+            if handler not in self.logHandlers:
+                logger.loggerObject.removeHandler(handler)
+        shutil.rmtree(self.tempDir)
+        del os.environ['MYDATA_TESTING']
+        del os.environ['MYDATA_DONT_SHOW_MODAL_DIALOGS']
+        self.httpd.shutdown()
+        self.fakeMyTardisServerThread.join()
+
+    def test_headless_uploads(self):
+        """Test running scans and uploads headless, without a wx.App.
+        """
+        self.UpdateSettingsFromCfg(
+            "testdataUsernameDataset_POST",
+            dataFolderName="testdataUsernameDataset")
+        SETTINGS.configPath = os.path.join(self.tempDir, "MyData.cfg")
+        SETTINGS.schedule.scheduleType = "Manually"
+
+        app = MyDataDaemon(["run.py", "--headless", "--autoexit"])
+        self.assertTrue(SETTINGS.miscellaneous.autoexit)
+        # Import the data view models' modules before hiding wxPython:
+        InitializeDataViewModels()
+        # wxPython must not be used to run the headless pipeline's
+        # deferred calls and timers, so the dispatcher's GUI path (which
+        # imports wxPython lazily) should fail if it is taken:
+        wxModule = sys.modules.get('wx')
+        sys.modules['wx'] = None
+        try:
+            # Exits the main loop when the uploads have completed:
+            app.MainLoop()
+        finally:
+            sys.modules['wx'] = wxModule
+
+        self.assertIs(GetApp(), app)
+        self.assertFalse(app.Processing())
+        self.assertTrue(app.foldersController.completed)
+        self.assertEqual(DATAVIEW_MODELS['verifications'].GetRowCount(), 12)
+        self.assertEqual(DATAVIEW_MODELS['uploads'].GetCompletedCount(), 8)
+        self.assertEqual(DATAVIEW_MODELS['uploads'].GetFailedCount(), 0)
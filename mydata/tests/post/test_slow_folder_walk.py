@@ -0,0 +1,144 @@
+"""
+Test that uploads aren't marked as completed while a folder is still being
+walked, even if all of the verifications queued so far have completed.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from ...settings import SETTINGS
+from ...threads.flags import FLAGS
+from ...models.settings.validation import ValidateSettings
+from ...dataviewmodels.dataview import DATAVIEW_MODELS
+from ...dataviewmodels.uploads import UploadsModel
+from ...dataviewmodels.verifications import VerificationsModel
+from ...controllers.folders import FoldersController
+from ...threads.dispatcher import DISPATCHER
+from ...utils.scanindex import ScanIndex
+from .. import MyDataScanFoldersTester
+from .. import InitializeModels
+
+
+class SlowFolderWalkTester(MyDataScanFoldersTester):
+    """
+    Test that uploads aren't marked as completed while a folder is still
+    being walked.
+    """
+    def setUp(self):
+        super(SlowFolderWalkTester, self).setUp()
+        self.tempDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+        super(SlowFolderWalkTester, self).tearDown()
+
+    def test_slow_folder_walk(self):
+        """Test a folder walk which is slower than its verifications.
+        """
+        self.UpdateSettingsFromCfg(
+            "testdataUsernameDataset_POST",
+            dataFolderName="testdataUsernameDataset")
+        ValidateSettings()
+        InitializeModels()
+        self.assertEqual(SETTINGS.miscellaneous.maxDatasetThreads, 0)
+        # Dataset folders are walked by the upload threads, after the scan
+        # for dataset folders has finished, so the scan index should be
+        # saved after the uploads have finished:
+        SETTINGS.configPath = os.path.join(self.tempDir, "MyData.cfg")
+        SETTINGS.miscellaneous.cacheFolderScans = True
+        foldersModel = DATAVIEW_MODELS['folders']
+        foldersModel.ScanFolders(MyDataScanFoldersTester.ProgressCallback)
+        folderModels = [foldersModel.GetFolderRecord(row)
+                        for row in range(foldersModel.GetRowCount())]
+        numFiles = sum(folderModel.numFiles for folderModel in folderModels)
+        self.assertEqual(numFiles, 12)
+
+        uploadsModel = UploadsModel()
+        verificationsModel = VerificationsModel()
+        DATAVIEW_MODELS['verifications'] = verificationsModel
+        DATAVIEW_MODELS['uploads'] = uploadsModel
+        foldersController = FoldersController(self.app.frame)
+        self.app.foldersController = foldersController
+
+        # The slow folder finds its first file, and then doesn't find the
+        # rest of its files until everything queued so far (including the
+        # other folders' files) has been verified and uploaded:
+        slowFolder = max(folderModels, key=lambda folder: folder.numFiles)
+        self.assertGreater(slowFolder.numFiles, 1)
+        enumerateDataFiles = slowFolder.EnumerateDataFiles
+        walkFinished = threading.Event()
+
+        def EnumerateDataFilesSlowly():
+            """
+            Generate the slow folder's first file index, and then wait for
+            the verifications and uploads queued so far to finish before
+            generating the rest.
+            """
+            dataFileIndexes = enumerateDataFiles()
+            for dataFileIndex in dataFileIndexes:
+                yield dataFileIndex
+                break
+            for _ in range(300):
+                if foldersController.completed:
+                    break
+                uploadsProcessed = uploadsModel.GetCompletedCount() + \
+                    uploadsModel.GetFailedCount()
+                if foldersController.finishedScanningForDatasetFolders\
+                        .is_set() and \
+                        verificationsModel.GetCompletedCount() == \
+                        foldersController.numVerificationsToBePerformed \
+                        and uploadsProcessed == \
+                        uploadsModel.GetTotalRowCount():
+                    break
+                time.sleep(0.1)
+            # Give the main loop a chance to (wrongly) decide that all of
+            # the verifications and uploads have completed:
+            time.sleep(1)
+            for dataFileIndex in dataFileIndexes:
+                yield dataFileIndex
+            walkFinished.set()
+
+        slowFolder.EnumerateDataFiles = EnumerateDataFilesSlowly
+
+        def StartUploads():
+            """
+            Start uploads for each folder in its own thread, as the GUI
+            does, and exit the main loop once they have completed.
+            """
+            FLAGS.performingLookupsAndUploads = True
+            foldersController.InitForUploads()
+            threads = []
+            for folderModel in folderModels:
+                thread = threading.Thread(
+                    target=foldersController.StartUploadsForFolder,
+                    args=[folderModel])
+                threads.append(thread)
+                thread.start()
+            foldersController.FinishedScanningForDatasetFolders()
+            for _ in range(600):
+                if foldersController.completed:
+                    break
+                time.sleep(0.1)
+            for thread in threads:
+                thread.join()
+            DISPATCHER.CallAfter(DISPATCHER.ExitMainLoop)
+
+        startUploadsThread = threading.Thread(
+            target=StartUploads, name="StartUploads")
+        DISPATCHER.CallAfter(startUploadsThread.start)
+        DISPATCHER.MainLoop()
+        startUploadsThread.join()
+
+        self.assertTrue(walkFinished.is_set())
+        self.assertTrue(foldersController.completed)
+        self.assertEqual(verificationsModel.GetCompletedCount(), numFiles)
+        self.assertEqual(uploadsModel.GetCompletedCount(), 8)
+
+        scanIndex = ScanIndex()
+        scanIndex.Load(SETTINGS.scanIndexPath)
+        for folderModel in folderModels:
+            self.assertIn(
+                os.path.join(folderModel.location, folderModel.folderName),
+                scanIndex.dirs)
@@ -0,0 +1,51 @@
+"""
+Test Continuous schedule type.
+"""
+import unittest
+
+from ...settings import SETTINGS
+from ...logs import logger
+from ...MyData import MyData
+from ...controllers.watcher import FOLDER_WATCHER
+from ...dataviewmodels.dataview import DATAVIEW_MODELS
+from ...models.settings.validation import ValidateSettings
+from ...utils.inotify import IsSupported as IsInotifySupported
+from .. import MyDataSettingsTester
+
+
+@unittest.skipUnless(IsInotifySupported(), "Requires inotify")
+class ContinuousScheduleTester(MyDataSettingsTester):
+    """
+    Test Continuous schedule type.
+    """
+    def __init__(self, *args, **kwargs):
+        super(ContinuousScheduleTester, self).__init__(*args, **kwargs)
+        self.mydataApp = None
+
+    def setUp(self):
+        super(ContinuousScheduleTester, self).setUp()
+        self.UpdateSettingsFromCfg(
+            "testdataUsernameDataset_POST",
+            dataFolderName="testdataUsernameDataset")
+        SETTINGS.schedule.scheduleType = "Continuous"
+
+    def tearDown(self):
+        FOLDER_WATCHER.Stop()
+        super(ContinuousScheduleTester, self).tearDown()
+        self.mydataApp.frame.Hide()
+        self.mydataApp.frame.Destroy()
+
+    def test_continuous_schedule(self):
+        """Test Continuous schedule type.
+        """
+        ValidateSettings()
+        self.mydataApp = MyData(argv=['MyData', '--loglevel', 'DEBUG'])
+        # The initial scan uploads the same files as the On Startup
+        # schedule type:
+        uploadsModel = DATAVIEW_MODELS['uploads']
+        self.assertEqual(uploadsModel.GetCompletedCount(), 8)
+        self.assertIn(
+            "CreateContinuousTask - MainThread - DEBUG - "
+            "Schedule type is Continuous",
+            logger.loggerOutput.getvalue())
+        self.assertTrue(FOLDER_WATCHER.IsRunning())
@@ -1,3 +1,128 @@
 """
 Tests related to staging uploads.
 """
+import os
+import select
+import shutil
+import socket
+import tempfile
+import threading
+
+import mydata.utils.openssh as OpenSSH
+from ...settings import SETTINGS
+from ...controllers.folders import FoldersController
+from ...models.folder import FolderModel
+from ...models.upload import UploadModel
+from ...models.upload import UploadStatus
+from ...models.user import UserModel
+from .. import MyDataTester
+from ..fake_sftp_server import SshServerInterface
+from ..fake_sftp_server import ThreadedSftpServer
+from ..utils import GetEphemeralPort
+
+
+class MyDataSftpTester(MyDataTester):
+    """
+    Base class for inheriting from for tests which upload to a fake SFTP
+    server directly, i.e. without scanning folders.
+    """
+    # Settings which tests may change, which are reset in tearDown:
+    sftpSettings = (
+        "parallel_upload_streams", "parallel_upload_threshold_mb",
+        "progress_poll_interval", "sftp_block_size",
+        "resume_uploads", "resume_tail_check_mb", "upload_processes")
+
+    def setUp(self):
+        super(MyDataSftpTester, self).setUp()
+        with tempfile.NamedTemporaryFile() as tempConfig:
+            keyPath = tempConfig.name
+        self.keyPair = OpenSSH.NewKeyPair("MyDataTest", keyPath=keyPath)
+        pubKeyBytes = self.keyPair.privateKey.get_base64().encode("ascii")
+        if pubKeyBytes not in SshServerInterface.authorized_keys:
+            SshServerInterface.authorized_keys.append(pubKeyBytes)
+        self.scpPort = GetEphemeralPort()
+        self.sftpd = ThreadedSftpServer(("127.0.0.1", self.scpPort))
+
+        def FakeSftpServer():
+            """ Run fake SFTP server """
+            try:
+                self.sftpd.serve_forever()
+            except (IOError, OSError, socket.error, select.error):
+                pass
+        self.fakeSftpServerThread = threading.Thread(
+            target=FakeSftpServer, name="FakeSftpServerThread")
+        self.fakeSftpServerThread.daemon = True
+        self.fakeSftpServerThread.start()
+        self.tempDir = tempfile.mkdtemp()
+        # UploadFile checks foldersController.canceled:
+        self.app.foldersController = FoldersController(self.app.frame)
+
+    def tearDown(self):
+        self.CloseSftpConnection()
+        for field in self.sftpSettings:
+            SETTINGS.miscellaneous.SetDefaultForField(field)
+        super(MyDataSftpTester, self).tearDown()
+        self.keyPair.Delete()
+        self.sftpd.shutdown()
+        self.fakeSftpServerThread.join()
+        shutil.rmtree(self.tempDir)
+
+    def CreateDataFile(self, filename, size):
+        """
+        Create a data file of the specified size filled with random bytes
+        in the temporary directory, and return its path and an UploadModel
+        for uploading it.
+        """
+        dataFilePath = os.path.join(self.tempDir, filename)
+        with open(dataFilePath, 'wb') as dataFile:
+            dataFile.write(os.urandom(size))
+        folderModel = FolderModel(
+            dataViewId=1, folderName=os.path.basename(self.tempDir),
+            location=os.path.dirname(self.tempDir), userFolderName=None,
+            groupFolderName=None, owner=UserModel(username="testuser1"))
+        uploadModel = UploadModel(
+            dataViewId=1, folderModel=folderModel, dataFileIndex=0)
+        return dataFilePath, uploadModel
+
+    def UploadFile(self, dataFilePath, uploadModel, remoteFilePath,
+                   progressCallback=None, calculateMd5Sum=False):
+        """
+        Upload a file to the fake SFTP server.
+        """
+        def DefaultProgressCallback(current, total, message=None):
+            """
+            Ignore progress updates
+            """
+            # pylint: disable=unused-argument
+            return
+
+        uploadModel.status = UploadStatus.NOT_STARTED
+        try:
+            return OpenSSH.UploadFile(
+                dataFilePath, os.path.getsize(dataFilePath), "mydata",
+                self.keyPair.privateKey, "127.0.0.1", self.scpPort,
+                remoteFilePath, progressCallback or DefaultProgressCallback,
+                uploadModel, calculateMd5Sum=calculateMd5Sum)
+        finally:
+            # Stop MonitorProgress from polling for progress updates:
+            uploadModel.status = UploadStatus.COMPLETED
+
+    def AssertUploaded(self, dataFilePath, remoteFilePath):
+        """
+        Check that the remote file matches the local file.
+        """
+        with open(dataFilePath, 'rb') as dataFile:
+            with open(remoteFilePath, 'rb') as remoteFile:
+                self.assertEqual(dataFile.read(), remoteFile.read())
+
+    @staticmethod
+    def CloseSftpConnection():
+        """
+        Close the SFTP connection which UploadFile caches in the current
+        thread, so that the next upload opens a new connection.
+        """
+        uploadThread = threading.current_thread()
+        if hasattr(uploadThread, "paramikoTransport"):
+            uploadThread.paramikoTransport.close()
+            del uploadThread.paramikoTransport
+            del uploadThread.paramikoSftp
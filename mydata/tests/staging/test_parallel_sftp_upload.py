@@ -0,0 +1,61 @@
+"""
+Test uploading a large file to staging with parallel SFTP streams.
+"""
+import os
+
+import mydata.utils.openssh as OpenSSH
+from ...settings import SETTINGS
+from . import MyDataSftpTester
+
+
+class ParallelSftpUploadTester(MyDataSftpTester):
+    """
+    Test uploading a large file to staging with parallel SFTP streams.
+    """
+    def test_split_into_byte_ranges(self):
+        """Test splitting a file into byte ranges for parallel uploads.
+        """
+        mib = OpenSSH.RANGE_ALIGNMENT
+        byteRanges = OpenSSH.SplitIntoByteRanges(4 * mib, 4)
+        self.assertEqual([(r.start, r.end) for r in byteRanges],
+                         [(0, mib), (mib, 2 * mib),
+                          (2 * mib, 3 * mib), (3 * mib, 4 * mib)])
+        byteRanges = OpenSSH.SplitIntoByteRanges(5 * mib + 123, 4)
+        self.assertEqual([(r.start, r.end) for r in byteRanges],
+                         [(0, 2 * mib), (2 * mib, 4 * mib),
+                          (4 * mib, 5 * mib + 123)])
+        self.assertEqual(sum(r.size for r in byteRanges), 5 * mib + 123)
+
+    def test_parallel_sftp_upload(self):
+        """Test uploading a large file to staging with parallel SFTP streams.
+        """
+        SETTINGS.miscellaneous.parallelUploadStreams = 4
+        SETTINGS.miscellaneous.parallelUploadThresholdMb = 1
+        SETTINGS["progress_poll_interval"] = 0.1
+
+        dataFileSize = 5 * OpenSSH.RANGE_ALIGNMENT + 123
+        dataFilePath, uploadModel = \
+            self.CreateDataFile("large_file.bin", dataFileSize)
+        self.assertTrue(OpenSSH.ShouldUploadInParallel(dataFileSize))
+        self.assertFalse(OpenSSH.ShouldUploadInParallel(
+            dataFileSize, calculateMd5Sum=True))
+
+        progress = []
+
+        def ProgressCallback(current, total, message=None):
+            """
+            Record progress updates
+            """
+            # pylint: disable=unused-argument
+            progress.append((current, total))
+
+        remoteFilePath = os.path.join(self.tempDir, "staging", "large_file")
+        self.UploadFile(
+            dataFilePath, uploadModel, remoteFilePath, ProgressCallback)
+
+        self.assertEqual(len(uploadModel.byteRanges), 3)
+        for byteRange in uploadModel.byteRanges:
+            self.assertEqual(byteRange.bytesUploaded, byteRange.size)
+            self.assertIsNone(byteRange.error)
+        self.assertEqual(progress[-1], (dataFileSize, dataFileSize))
+        self.AssertUploaded(dataFilePath, remoteFilePath)
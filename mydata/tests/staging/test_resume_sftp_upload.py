@@ -0,0 +1,83 @@
+"""
+Test resuming an interrupted upload to staging.
+"""
+import hashlib
+import os
+
+from ...settings import SETTINGS
+from . import MyDataSftpTester
+
+
+class ResumeSftpUploadTester(MyDataSftpTester):
+    """
+    Test resuming an interrupted upload to staging.
+    """
+    def setUp(self):
+        super(ResumeSftpUploadTester, self).setUp()
+        SETTINGS["progress_poll_interval"] = 0.1
+        self.dataFileSize = 3 * 1024 * 1024 + 123
+        self.dataFilePath, self.uploadModel = \
+            self.CreateDataFile("file.bin", self.dataFileSize)
+        self.remoteFilePath = os.path.join(self.tempDir, "staging", "file.bin")
+        os.mkdir(os.path.dirname(self.remoteFilePath))
+        self.partialSize = 2 * 1024 * 1024 + 45
+
+    def WritePartialCopy(self, corrupt=False):
+        """
+        Write the first self.partialSize bytes of the data file to
+        staging, as if its upload had been interrupted.
+        """
+        with open(self.dataFilePath, 'rb') as dataFile:
+            data = dataFile.read(self.partialSize)
+        if corrupt:
+            data = data[:-1] + bytes([data[-1] ^ 0xff])
+        with open(self.remoteFilePath, 'wb') as remoteFile:
+            remoteFile.write(data)
+
+    def test_resume_sftp_upload(self):
+        """Test resuming an interrupted upload from the end of its partial copy.
+        """
+        self.WritePartialCopy()
+        md5sum = self.UploadFile(
+            self.dataFilePath, self.uploadModel, self.remoteFilePath,
+            calculateMd5Sum=True)
+        self.assertEqual(
+            self.uploadModel.bytesUploadedPreviously, self.partialSize)
+        self.AssertUploaded(self.dataFilePath, self.remoteFilePath)
+        # The checksum includes the bytes which were uploaded previously:
+        with open(self.dataFilePath, 'rb') as dataFile:
+            self.assertEqual(md5sum, hashlib.md5(dataFile.read()).hexdigest())
+
+        # A full-size copy isn't reused, because it is only uploaded
+        # again if it couldn't be verified:
+        self.UploadFile(
+            self.dataFilePath, self.uploadModel, self.remoteFilePath)
+        self.assertEqual(self.uploadModel.bytesUploadedPreviously, 0)
+        self.AssertUploaded(self.dataFilePath, self.remoteFilePath)
+
+    def test_resume_sftp_upload_tail_mismatch(self):
+        """Test restarting an upload whose partial copy doesn't match.
+        """
+        self.WritePartialCopy(corrupt=True)
+        self.UploadFile(
+            self.dataFilePath, self.uploadModel, self.remoteFilePath)
+        self.assertEqual(self.uploadModel.bytesUploadedPreviously, 0)
+        self.AssertUploaded(self.dataFilePath, self.remoteFilePath)
+
+        # Without the tail check, the corrupt partial copy is appended to:
+        SETTINGS.miscellaneous.resumeTailCheckMb = 0
+        self.WritePartialCopy(corrupt=True)
+        self.UploadFile(
+            self.dataFilePath, self.uploadModel, self.remoteFilePath)
+        self.assertEqual(
+            self.uploadModel.bytesUploadedPreviously, self.partialSize)
+        with open(self.remoteFilePath, 'rb') as remoteFile:
+            self.assertEqual(len(remoteFile.read()), self.dataFileSize)
+
+        # Resuming uploads can be disabled:
+        SETTINGS.miscellaneous.resumeUploads = False
+        self.WritePartialCopy()
+        self.UploadFile(
+            self.dataFilePath, self.uploadModel, self.remoteFilePath)
+        self.assertEqual(self.uploadModel.bytesUploadedPreviously, 0)
+        self.AssertUploaded(self.dataFilePath, self.remoteFilePath)
@@ -0,0 +1,75 @@
+"""
+Benchmark pipelined SFTP writes against the fake SFTP server.
+"""
+import hashlib
+import os
+import sys
+import time
+
+import mydata.utils.openssh as OpenSSH
+
+from ...settings import SETTINGS
+from . import MyDataSftpTester
+
+
+class SftpPipeliningTester(MyDataSftpTester):
+    """
+    Benchmark pipelined SFTP writes against the fake SFTP server.
+    """
+    def test_sftp_pipelining(self):
+        """Benchmark pipelined SFTP writes against the fake SFTP server.
+        """
+        dataFileSize = 2 * 1024 * 1024
+        dataFilePath, uploadModel = \
+            self.CreateDataFile("file.bin", dataFileSize)
+        remoteFilePath = os.path.join(self.tempDir, "staging", "file.bin")
+
+        # Paramiko's default request size:
+        SETTINGS.miscellaneous.sftpBlockSize = 32 * 1024
+        startTime = time.time()
+        self.UploadFile(dataFilePath, uploadModel, remoteFilePath)
+        smallBlocksTime = time.time() - startTime
+        self.AssertUploaded(dataFilePath, remoteFilePath)
+
+        # Default block size.  The MD5 checksum is also calculated while
+        # uploading:
+        SETTINGS.miscellaneous.SetDefaultForField("sftp_block_size")
+        defaultBlockSize = SETTINGS.miscellaneous.sftpBlockSize
+        os.remove(remoteFilePath)
+        startTime = time.time()
+        md5sum = self.UploadFile(
+            dataFilePath, uploadModel, remoteFilePath, calculateMd5Sum=True)
+        defaultBlocksTime = time.time() - startTime
+        self.AssertUploaded(dataFilePath, remoteFilePath)
+        with open(dataFilePath, 'rb') as dataFile:
+            self.assertEqual(md5sum, hashlib.md5(dataFile.read()).hexdigest())
+
+        # Requests are kept smaller than OpenSSH's SFTP server's limit:
+        SETTINGS.miscellaneous.sftpBlockSize = 1024 * 1024
+        os.remove(remoteFilePath)
+        remoteFiles = []
+
+        def OpenRemoteFile(*args, **kwargs):
+            """
+            Record the remote files opened for pipelined writes.
+            """
+            remoteFile = openRemoteFile(*args, **kwargs)
+            remoteFiles.append(remoteFile)
+            return remoteFile
+
+        openRemoteFile = OpenSSH.OpenRemoteFileForPipelinedWrites
+        OpenSSH.OpenRemoteFileForPipelinedWrites = OpenRemoteFile
+        try:
+            self.UploadFile(dataFilePath, uploadModel, remoteFilePath)
+        finally:
+            OpenSSH.OpenRemoteFileForPipelinedWrites = openRemoteFile
+        self.AssertUploaded(dataFilePath, remoteFilePath)
+        self.assertEqual(len(remoteFiles), 1)
+        self.assertEqual(remoteFiles[0].MAX_REQUEST_SIZE,
+                         OpenSSH.MAX_SFTP_BLOCK_SIZE)
+
+        sys.stderr.write(
+            "Pipelined SFTP upload of %d bytes: %.3f seconds with %d byte "
+            "requests, %.3f seconds with %d byte requests\n"
+            % (dataFileSize, smallBlocksTime, 32 * 1024, defaultBlocksTime,
+               defaultBlockSize))
@@ -0,0 +1,66 @@
+"""
+Test calculating checksums and uploading to staging in worker processes.
+"""
+import hashlib
+import os
+
+from ...settings import SETTINGS
+from ...models.upload import UploadStatus
+from ...utils.uploadprocesses import UPLOAD_PROCESSES
+from . import MyDataSftpTester
+
+
+class UploadProcessesTester(MyDataSftpTester):
+    """
+    Test calculating checksums and uploading to staging in worker processes.
+    """
+    def tearDown(self):
+        UPLOAD_PROCESSES.Shutdown()
+        super(UploadProcessesTester, self).tearDown()
+
+    def test_upload_processes(self):
+        """Test calculating checksums and uploading in worker processes.
+        """
+        SETTINGS.miscellaneous.uploadProcesses = 2
+        SETTINGS["progress_poll_interval"] = 0.1
+        self.assertTrue(UPLOAD_PROCESSES.enabled)
+
+        dataFileSize = 3 * 1024 * 1024 + 123
+        dataFilePath, uploadModel = \
+            self.CreateDataFile("file.bin", dataFileSize)
+        with open(dataFilePath, 'rb') as dataFile:
+            expectedMd5Sum = hashlib.md5(dataFile.read()).hexdigest()
+
+        self.assertEqual(
+            UPLOAD_PROCESSES.CalculateMd5Sum(dataFilePath, dataFileSize),
+            expectedMd5Sum)
+
+        progress = []
+
+        def ProgressCallback(current, total, message=None):
+            """
+            Record progress updates from the worker process
+            """
+            # pylint: disable=unused-argument
+            progress.append((current, total))
+
+        remoteFilePath = os.path.join(self.tempDir, "staging", "file.bin")
+        uploadModel.status = UploadStatus.IN_PROGRESS
+        md5sum = UPLOAD_PROCESSES.UploadFile(
+            dataFilePath, dataFileSize, "mydata",
+            self.keyPair, "127.0.0.1", self.scpPort,
+            remoteFilePath, ProgressCallback, uploadModel,
+            calculateMd5Sum=True)
+        self.assertEqual(md5sum, expectedMd5Sum)
+        self.assertEqual(uploadModel.bytesUploadedPreviously, 0)
+        self.assertEqual(progress[0], (0, dataFileSize))
+        self.assertEqual(progress[-1], (dataFileSize, dataFileSize))
+        self.AssertUploaded(dataFilePath, remoteFilePath)
+
+        # Canceled uploads stop in the worker process:
+        os.remove(remoteFilePath)
+        uploadModel.canceled = True
+        self.assertIsNone(UPLOAD_PROCESSES.UploadFile(
+            dataFilePath, dataFileSize, "mydata",
+            self.keyPair, "127.0.0.1", self.scpPort,
+            remoteFilePath, ProgressCallback, uploadModel))
@@ -1,6 +1,7 @@
 """
 Test scanning the Username / Dataset structure and uploading with SFTP.
 """
+import hashlib
 import logging
 import sys
 import tempfile
@@ -9,11 +10,13 @@ import threading
 import socket
 import select
 
+import requests
 import six
 import wx
 
 import mydata.utils.openssh as OpenSSH
 import mydata.tests.fake_mytardis_helpers.get as fake_mytardis_get
+import mydata.tests.fake_mytardis_helpers.patch as fake_mytardis_patch
 from ...logs import logger
 from ...settings import SETTINGS
 from ...models.settings.validation import ValidateSettings
@@ -21,6 +24,7 @@ from ...dataviewmodels.dataview import DATAVIEW_MODELS
 from ...dataviewmodels.uploads import UploadsModel
 from ...dataviewmodels.verifications import VerificationsModel
 from ...controllers.folders import FoldersController
+from ...models.datafile import DataFileModel
 from ...models.upload import UploadStatus
 from ...threads.flags import FLAGS
 from .. import MyDataScanFoldersTester
@@ -235,7 +239,8 @@ class ScanUsernameDatasetSftpTester(MyDataScanFoldersTester):
         for row in range(foldersModel.GetRowCount()):
             folderModel = foldersModel.GetFolderRecord(row)
             for dataFileIndex in range(folderModel.numFiles):
-                folderModel.dataFilePaths['files'][dataFileIndex] += "_INVALID"
+                folderModel.dataFilePaths.filenames[dataFileIndex] += \
+                    "_INVALID"
             foldersController.StartUploadsForFolder(folderModel)
         foldersController.FinishedScanningForDatasetFolders()
         newLogs = Subtract(logger.GetValue(), loggerOutput)
@@ -244,6 +249,69 @@ class ScanUsernameDatasetSftpTester(MyDataScanFoldersTester):
                             "moved, renamed or deleted.*"))
         self.assertEqual(uploadsModel.GetCompletedCount(), 0)
 
+    def test_hash_while_uploading(self):
+        """Test updating checksums calculated while uploading with SFTP
+        """
+        self.UpdateSettingsFromCfg("testdataUsernameDataset")
+        ValidateSettings()
+        SETTINGS.uploaderModel = None
+        SETTINGS.uploaderModel.UploadUploaderInfo()
+        SETTINGS.uploaderModel.sshKeyPair = self.keyPair
+        SETTINGS.miscellaneous.hashWhileUploading = True
+        InitializeModels()
+        foldersModel = DATAVIEW_MODELS['folders']
+        foldersModel.ScanFolders(MyDataScanFoldersTester.ProgressCallback)
+        md5sums = set()
+        for row in range(foldersModel.GetRowCount()):
+            folderModel = foldersModel.GetFolderRecord(row)
+            for dataFileIndex in range(folderModel.numFiles):
+                dataFilePath = folderModel.GetDataFilePath(dataFileIndex)
+                with open(dataFilePath, 'rb') as dataFile:
+                    md5sums.add(hashlib.md5(dataFile.read()).hexdigest())
+
+        DATAVIEW_MODELS['verifications'] = VerificationsModel()
+        DATAVIEW_MODELS['uploads'] = UploadsModel()
+        uploadsModel = DATAVIEW_MODELS['uploads']
+        foldersController = FoldersController(self.app.frame)
+        self.app.foldersController = foldersController
+
+        # The unverified DataFile records have placeholder checksums, as if
+        # MyData exited after uploading them, before updating them:
+        fake_mytardis_get.PLACEHOLDER_MD5SUMS = True
+        del fake_mytardis_patch.PATCHED_MD5SUMS[:]
+        try:
+            foldersController.InitForUploads()
+            for row in range(foldersModel.GetRowCount()):
+                folderModel = foldersModel.GetFolderRecord(row)
+                foldersController.StartUploadsForFolder(folderModel)
+            foldersController.FinishedScanningForDatasetFolders()
+            foldersController.ShutDownUploadThreads()
+        finally:
+            fake_mytardis_get.PLACEHOLDER_MD5SUMS = False
+            SETTINGS.miscellaneous.SetDefaultForField("hash_while_uploading")
+        self.assertEqual(uploadsModel.GetCompletedCount(), 8)
+
+        # Each uploaded file's DataFile record is updated with its checksum,
+        # including the partially uploaded file's existing record, which is
+        # uploaded again.  The full-size unverified file isn't uploaded
+        # again, but its placeholder checksum is updated before requesting
+        # its verification:
+        patched = fake_mytardis_patch.PATCHED_MD5SUMS
+        self.assertEqual(len(patched), 9)
+        for _, md5sum in patched:
+            self.assertIn(md5sum, md5sums)
+        self.assertIn(("290385", "c033080e8b2ec59e37fb1a9dc341c813"), patched)
+        self.assertIn(("290385", "e71c538337dce5b7fd36ae8db8160756"), patched)
+        for uploadModel in uploadsModel.rowsData:
+            if uploadModel.dataFileId:
+                self.assertIn(str(uploadModel.dataFileId),
+                              [datafileId for datafileId, _ in patched])
+
+        # The fake MyTardis server rejects invalid checksum updates:
+        with self.assertRaises(requests.exceptions.HTTPError) as context:
+            DataFileModel.UpdateMd5Sum("290385", "invalid")
+        self.assertEqual(context.exception.response.status_code, 400)
+
     def StartFakeSftpServer(self):
         """
         Start fake SFTP server.
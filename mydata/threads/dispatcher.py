@@ -0,0 +1,271 @@
+"""
+mydata/threads/dispatcher.py
+
+An event dispatcher for running MyData without wxPython's main loop.
+
+When MyData runs with its GUI, deferred calls (wx.CallAfter), delayed
+calls (wx.CallLater) and timers (wx.Timer) are all serviced by wxPython's
+main loop, and much of MyData checks wx.PyApp.IsMainLoopRunning() to decide
+whether to hand work over to worker threads or run it inline.
+
+When MyData runs headless (see mydata/daemon.py), there is no wx.App and no
+main loop, so the EventDispatcher below provides an equivalent loop, run
+from the main thread.  The module-level functions (GetApp,
+IsMainLoopRunning, CallAfter, CallLater and NewTimer) work with whichever
+loop is running, so the threaded verification and upload pipeline behaves
+the same way in both cases.  When neither loop is running (e.g. in unit
+tests), they fall back to wxPython's behaviour.
+
+wxPython is only imported on the GUI path, so running headless doesn't
+require a wx.App (or a display).
+"""
+import sys
+import threading
+import traceback
+
+from six.moves import queue as Queue
+
+
+class CallLaterTimer(object):
+    """
+    Runs a callable in the dispatcher's main loop after a delay.
+
+    Provides the subset of wx.CallLater's interface used by MyData.
+    """
+    def __init__(self, dispatcher, millis, func, *args, **kwargs):
+        self.dispatcher = dispatcher
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.running = False
+        self.timer = None
+        self.Start(millis)
+
+    def Start(self, millis):
+        """
+        (Re-)start the timer.
+        """
+        self.Stop()
+        self.running = True
+        self.timer = threading.Timer(millis / 1000.0, self.Notify)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def Notify(self):
+        """
+        Called from the timer's thread when the delay has elapsed.
+        """
+        if self.running:
+            self.dispatcher.CallAfter(self.Run)
+
+    def Run(self):
+        """
+        Run the callable in the dispatcher's main loop, unless the timer
+        has been stopped in the meantime.
+        """
+        if self.running:
+            self.running = False
+            self.func(*self.args, **self.kwargs)
+
+    def Stop(self):
+        """
+        Stop the timer.
+        """
+        self.running = False
+        if self.timer:
+            self.timer.cancel()
+
+    def IsRunning(self):
+        """
+        Returns True if the callable is still due to run.
+        """
+        return self.running
+
+
+class RepeatingTimer(object):
+    """
+    Runs a notify callback in the dispatcher's main loop at a fixed
+    interval.
+
+    Provides the subset of wx.Timer's interface used by MyData.
+    """
+    def __init__(self, dispatcher, notify):
+        self.dispatcher = dispatcher
+        self.notify = notify
+        self.millis = None
+        self.stopped = threading.Event()
+        self.stopped.set()
+        self.thread = None
+
+    def Start(self, millis):
+        """
+        Start the timer, calling notify every millis milliseconds.
+        """
+        self.Stop()
+        self.millis = millis
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self.Run, args=[self.stopped], name="RepeatingTimerThread")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def Run(self, stopped):
+        """
+        Post the notify callback to the dispatcher until stopped.
+        """
+        while not stopped.wait(self.millis / 1000.0):
+            self.dispatcher.CallAfter(self.notify, None)
+
+    def Stop(self):
+        """
+        Stop the timer.
+        """
+        self.stopped.set()
+
+    def IsRunning(self):
+        """
+        Returns True if the timer has been started and not stopped.
+        """
+        return not self.stopped.is_set()
+
+
+class EventDispatcher(object):
+    """
+    A queue-based replacement for wxPython's main loop, used when MyData
+    runs headless.
+
+    Callables posted with CallAfter (from any thread) are run one at a time
+    in the thread which called MainLoop, which should be the main thread,
+    because some of MyData's event handlers assert that they are running in
+    the main thread.
+    """
+    def __init__(self):
+        self.app = None
+        self.queue = Queue.Queue()
+        self.running = False
+        self.exitRequested = False
+
+    def CallAfter(self, func, *args, **kwargs):
+        """
+        Queue func to be run in the main loop.
+        """
+        self.queue.put((func, args, kwargs))
+
+    def CallLater(self, millis, func, *args, **kwargs):
+        """
+        Run func in the main loop after millis milliseconds.
+        """
+        return CallLaterTimer(self, millis, func, *args, **kwargs)
+
+    def MainLoop(self):
+        """
+        Run queued callables until ExitMainLoop is called.
+
+        Exceptions raised by callables are reported without stopping the
+        loop, as in wxPython's main loop.
+        """
+        self.running = True
+        self.exitRequested = False
+        try:
+            while not self.exitRequested:
+                try:
+                    # Use a timeout so that signal handlers get a chance
+                    # to run in the main thread:
+                    func, args, kwargs = self.queue.get(timeout=0.5)
+                except Queue.Empty:
+                    continue
+                try:
+                    func(*args, **kwargs)
+                except Exception:
+                    sys.stderr.write(traceback.format_exc())
+        finally:
+            self.running = False
+
+    def ExitMainLoop(self):
+        """
+        Ask the main loop to exit after running the current callable.
+        """
+        self.exitRequested = True
+        # Wake up the main loop if it is waiting for the queue:
+        self.queue.put((lambda: None, (), {}))
+
+    def IsRunning(self):
+        """
+        Returns True if the dispatcher's main loop is running.
+        """
+        return self.running
+
+    def IsActive(self):
+        """
+        Returns True if MyData is running headless, i.e. if deferred calls
+        should be queued for the dispatcher rather than for wxPython,
+        even if the dispatcher's main loop hasn't started yet or has
+        already finished.
+        """
+        return self.app is not None or self.running
+
+
+DISPATCHER = EventDispatcher()
+
+
+def GetApp():
+    """
+    Returns the headless application object if MyData is running headless,
+    otherwise returns wx.GetApp().
+    """
+    if DISPATCHER.app:
+        return DISPATCHER.app
+    import wx
+    return wx.GetApp()
+
+
+def IsMainLoopRunning():
+    """
+    Returns True if either wxPython's main loop or the headless dispatcher's
+    main loop is running, i.e. if it is OK to hand work over to worker
+    threads and to defer calls with CallAfter.
+    """
+    if DISPATCHER.IsActive():
+        return DISPATCHER.IsRunning()
+    import wx
+    return wx.PyApp.IsMainLoopRunning()
+
+
+def CallAfter(func, *args, **kwargs):
+    """
+    Drop-in replacement for wx.CallAfter which uses the headless
+    dispatcher's main loop when MyData is running headless.
+    """
+    if DISPATCHER.IsActive():
+        DISPATCHER.CallAfter(func, *args, **kwargs)
+    else:
+        import wx
+        wx.CallAfter(func, *args, **kwargs)
+
+
+def CallLater(millis, func, *args, **kwargs):
+    """
+    Drop-in replacement for wx.CallLater which uses the headless
+    dispatcher's main loop when MyData is running headless.
+    """
+    if DISPATCHER.IsActive():
+        return DISPATCHER.CallLater(millis, func, *args, **kwargs)
+    import wx
+    return wx.CallLater(millis, func, *args, **kwargs)
+
+
+def NewTimer(owner, notify):
+    """
+    Create a timer which calls notify(event) at the interval given to its
+    Start method.
+
+    With the GUI, this is a wx.Timer bound to the owner window.  When
+    running headless, it is a RepeatingTimer which calls notify(None)
+    from the dispatcher's main loop.
+    """
+    if DISPATCHER.IsActive():
+        return RepeatingTimer(DISPATCHER, notify)
+    import wx
+    timer = wx.Timer(owner)
+    owner.Bind(wx.EVT_TIMER, notify, timer)
+    return timer
@@ -7,9 +7,12 @@ LOCK_NAMES = [
     'scanningFolders', 'createUploader', 'requestStagingAccess',
     'updateCache', 'closeCache', 'displayModalDialog',
     'updateLastErrorMessage', 'updateLastConfirmationQuestion',
-    'addVerification', 'addUpload', 'finishedCounting', 'getOrCreateExp',
+    'addVerification', 'addUpload', 'finishedCounting',
     'numVerificationsToBePerformed', 'createDir', 'foldersToUpdate',
-    'createRemoteDir']
+    'createRemoteDir', 'scanIndex', 'createSession', 'checksumCache',
+    'numChecksumsPending', 'uploadProcesses', 'dataViewHistory',
+    'lookupCache', 'numFoldersPending', 'serverProfile', 'objectAclQueue',
+    'changedFolders']
 
 class ThreadingLocks(object):
     """
@@ -38,3 +41,31 @@ class ThreadingLocks(object):
 
 
 LOCKS = ThreadingLocks()
+
+
+class KeyedLocks(object):
+    """
+    Locks created on demand for each key, so that threads working on
+    different keys (e.g. different MyTardis experiments) don't need to
+    wait for each other.
+
+    Usage:
+
+        experimentLocks = KeyedLocks()
+        with experimentLocks.Get(key):
+            GetOrCreateExperiment(key)
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks = dict()
+
+    def Get(self, key):
+        """
+        Return the lock for key, creating it if necessary.
+        """
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._locks[key] = lock
+            return lock
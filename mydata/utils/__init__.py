@@ -82,6 +82,9 @@ def BeginBusyCursorIfRequired(event=None):
     """
     Begin busy cursor if it's not already being displayed.
     """
+    if not wx.GetApp():
+        # Running headless, so there's no cursor to update:
+        return
     try:
         if not wx.IsBusy():
             wx.BeginBusyCursor()
@@ -100,6 +103,8 @@ def EndBusyCursorIfRequired(event=None):
     The built in wx.EndBusyCursor raises an ugly exception if the
     busy cursor has already been stopped.
     """
+    if not wx.GetApp():
+        return
     try:
         if wx.IsBusy():
             wx.EndBusyCursor()
@@ -0,0 +1,107 @@
+"""
+An asyncio HTTP session for the asyncio verification engine, using aiohttp.
+
+The asyncio verification engine (mydata/controllers/asyncverifications.py)
+uses this to keep many datafile lookups in flight from a single thread,
+sharing a small number of keep-alive connections to the MyTardis server,
+instead of blocking one verification worker thread per request.
+
+Responses are returned as requests.Response objects, and errors are
+reported with the requests module's exception classes, so model methods
+can parse responses from either the shared requests session or this one.
+Like the shared requests session (see mydata/utils/session.py), requests
+honour the proxy settings in the environment (e.g. HTTPS_PROXY and
+NO_PROXY), and are retried after connection errors and transient server
+errors.
+"""
+import asyncio
+import os
+import ssl
+
+import aiohttp
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .session import RETRY_STATUS_CODES
+
+
+class AsyncSession(object):
+    """
+    Shares up to maxConnections keep-alive connections per server between
+    any number of concurrent GET requests.  Requests wait for a connection
+    to become available, so the number of requests in flight can be much
+    larger than the number of connections.
+
+    The session must be created, used and closed from the thread running
+    its event loop.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, maxConnections, connectTimeout, readTimeout,
+                 maxRetries=0, retryBackoff=0.0):
+        self.maxRetries = maxRetries
+        self.retryBackoff = retryBackoff
+        # Trust the same CA certificates as the requests module, including
+        # the bundle MyData sets with REQUESTS_CA_BUNDLE when running as a
+        # frozen executable:
+        sslContext = ssl.create_default_context(
+            cafile=os.environ.get('REQUESTS_CA_BUNDLE') or
+            requests.certs.where())
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit_per_host=maxConnections, ssl=sslContext),
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=connectTimeout, sock_read=readTimeout),
+            headers={"User-Agent": requests.utils.default_user_agent()},
+            auto_decompress=True)
+
+    async def Get(self, url, headers=None):
+        """
+        Make an HTTP GET request, returning a requests.Response.
+
+        :raises requests.exceptions.ConnectionError:
+        :raises requests.exceptions.Timeout:
+        """
+        proxy = requests.utils.select_proxy(
+            url, requests.utils.get_environ_proxies(url))
+        retries = 0
+        while True:
+            try:
+                async with self.session.get(
+                        url, headers=headers, proxy=proxy) as aioResponse:
+                    content = await aioResponse.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                if retries < self.maxRetries:
+                    retries += 1
+                    await self.Backoff(retries)
+                    continue
+                if isinstance(err, asyncio.TimeoutError):
+                    raise requests.exceptions.Timeout(
+                        "Timed out waiting for %s" % url)
+                raise requests.exceptions.ConnectionError(
+                    "%s: %s" % (url, err))
+            if aioResponse.status in RETRY_STATUS_CODES and \
+                    retries < self.maxRetries:
+                retries += 1
+                await self.Backoff(retries)
+                continue
+            response = requests.Response()
+            response.url = url
+            response.status_code = aioResponse.status
+            response.reason = aioResponse.reason
+            response.headers = CaseInsensitiveDict(aioResponse.headers)
+            response.encoding = aioResponse.charset
+            response._content = content  # pylint: disable=protected-access
+            return response
+
+    async def Backoff(self, retries):
+        """
+        Wait before retrying a request, as urllib3's Retry does.
+        """
+        if retries > 1:
+            await asyncio.sleep(self.retryBackoff * (2 ** (retries - 1)))
+
+    async def Close(self):
+        """
+        Close the session's connections.
+        """
+        await self.session.close()
@@ -0,0 +1,152 @@
+"""
+On-disk cache of the MD5 checksums calculated for local data files,
+so that a file which needs to be uploaded again (e.g. after a failed
+transfer, or after an unverified DataFile is found on the server) doesn't
+need to be read in its entirety again, unless it has been modified.
+
+Each checksum is recorded with the size, modified time and inode of the
+file it was calculated from, and is only reused if all of these still
+match the file on disk.
+
+Md5HashingReader allows a file's checksum to be calculated while it is
+being uploaded, for upload methods which don't need to know the checksum
+before the upload begins.
+"""
+import hashlib
+import os
+
+from ..logs import logger
+from ..threads.locks import LOCKS
+from .sqlitedb import SqliteDatabase
+
+
+def GetFileSignature(path):
+    """
+    Return the (size, mtime, inode) tuple used to determine whether a
+    file has changed since its checksum was calculated.
+
+    The modified time is recorded in nanoseconds (as an integer), so
+    there is no loss of precision from floating point conversions.
+    """
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+def ReadMd5Sum(path, fileSize, progressCallback=None,
+               canceledCallback=None):
+    """
+    Read the whole file at path through an Md5HashingReader, in chunks
+    sized according to the file's size, and return its MD5 checksum.
+
+    Data files' checksums should be calculated with
+    FolderModel.CalculateMd5Sum, which checks the checksum cache first,
+    and uses the upload processes if they are enabled.
+
+    :return: the checksum, or None if canceledCallback returns True
+        before the whole file has been read.
+    """
+    defaultChunkSize = 128 * 1024
+    maxChunkSize = 16 * 1024 * 1024
+    chunkSize = defaultChunkSize
+    while (fileSize / chunkSize) > 50 and chunkSize < maxChunkSize:
+        chunkSize *= 2
+    bytesProcessed = 0
+    with open(path, 'rb') as fileHandle:
+        reader = Md5HashingReader(fileHandle)
+        # Note that the iter() func needs an empty byte string
+        # for the returned iterator to halt at EOF, since read()
+        # returns b'' (not just '').
+        for chunk in iter(lambda: reader.read(chunkSize), b''):
+            if canceledCallback and canceledCallback():
+                logger.debug("Aborting MD5 calculation for %s" % path)
+                return None
+            bytesProcessed += len(chunk)
+            del chunk
+            if progressCallback:
+                progressCallback(bytesProcessed)
+    return reader.hexdigest()
+
+
+class Md5HashingReader(object):
+    """
+    Wraps a file object opened for reading, so that the MD5 checksum of
+    its contents is calculated as it is read (e.g. while it is being
+    uploaded), instead of reading the file twice.
+    """
+    def __init__(self, fileObject):
+        self.fileObject = fileObject
+        self.md5 = hashlib.md5()
+
+    def read(self, size=-1):
+        """
+        Read up to size bytes, and add them to the MD5 checksum.
+        """
+        chunk = self.fileObject.read(size)
+        self.md5.update(chunk)
+        return chunk
+
+    def hexdigest(self):
+        """
+        Return the MD5 checksum of the bytes read so far.
+        """
+        return self.md5.hexdigest()
+
+
+class ChecksumCache(SqliteDatabase):
+    """
+    On-disk cache of the MD5 checksums calculated for local data files.
+
+    Only the most recent checksum is kept for each path, so entries for
+    files which have since been modified are replaced, rather than
+    accumulating in the database.
+    """
+    description = "checksum cache"
+
+    def __init__(self):
+        super(ChecksumCache, self).__init__(LOCKS.checksumCache)
+
+    def CreateTables(self):
+        """
+        Create the checksums table if it doesn't already exist.
+        """
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS checksums "
+            "(path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, "
+            "inode INTEGER, md5sum TEXT) WITHOUT ROWID")
+
+    def GetMd5Sum(self, path, signature):
+        """
+        Return the cached MD5 checksum for path if it was calculated when
+        the file had the specified (size, mtime, inode) signature,
+        otherwise return None.
+        """
+        with LOCKS.checksumCache:
+            if not self.connection:
+                return None
+            cursor = self.connection.execute(
+                "SELECT md5sum FROM checksums WHERE path = ? AND size = ? "
+                "AND mtime = ? AND inode = ?", (path,) + tuple(signature))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    def SetMd5Sum(self, path, signature, md5sum):
+        """
+        Record the MD5 checksum calculated for path when the file had the
+        specified (size, mtime, inode) signature.
+        """
+        with LOCKS.checksumCache:
+            if not self.connection:
+                return
+            with self.connection:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO checksums "
+                    "(path, size, mtime, inode, md5sum) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (path,) + tuple(signature) + (md5sum,))
+
+    def __len__(self):
+        with LOCKS.checksumCache:
+            if not self.connection:
+                return 0
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM checksums").fetchone()[0]
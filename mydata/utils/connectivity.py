@@ -3,11 +3,11 @@ Functionality related to checking network connectivity
 """
 from datetime import datetime
 
-import wx
 import netifaces
 
 from ..constants import CONNECTIVITY_CHECK_INTERVAL as CHECK_INTERVAL
 from ..logs import logger
+from ..threads.dispatcher import CallAfter
 from ..views.connectivity import ReportNoActiveInterfaces
 from . import HandleGenericErrorWithDialog
 from . import BeginBusyCursorIfRequired
@@ -49,12 +49,12 @@ class Connectivity(object):
         Check network connectivity
         """
         from ..events import PostEvent
-        wx.CallAfter(BeginBusyCursorIfRequired)
+        CallAfter(BeginBusyCursorIfRequired)
         try:
             activeNetworkInterfaces = GetActiveNetworkInterfaces()
         except Exception as err:
             HandleGenericErrorWithDialog(err)
-        wx.CallAfter(EndBusyCursorIfRequired)
+        CallAfter(EndBusyCursorIfRequired)
         if activeNetworkInterfaces:
             logger.debug("Found at least one active network interface: %s."
                          % activeNetworkInterfaces[0])
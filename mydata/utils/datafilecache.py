@@ -0,0 +1,142 @@
+"""
+On-disk cache of DataFile lookups which found a verified DataFile
+on the MyTardis server, so that the same local file doesn't need to
+be looked up again in subsequent scans.
+
+Keys are strings of the form "<datasetId>,<path>".  Earlier versions
+of MyData pickled a dictionary of these keys, which needed to be loaded
+into memory in its entirety at the beginning of each run, and rewritten
+in its entirety when uploads finished.  The cache is now stored in an
+SQLite database, indexed by key, so each lookup only reads the pages it
+needs, and each new key is written as soon as it is recorded.
+"""
+import os
+import pickle
+import traceback
+
+from ..logs import logger
+from ..threads.locks import LOCKS
+from .sqlitedb import SqliteDatabase
+
+# Only reclaim unused space when at least this fraction of the database
+# file is free, because VACUUM rewrites the whole file:
+COMPACT_THRESHOLD = 0.25
+
+
+class VerifiedDatafilesCache(SqliteDatabase):
+    """
+    On-disk cache of DataFile lookups which found a verified DataFile.
+
+    Provides the subset of the dictionary interface which MyData used
+    with the old pickled dictionary, i.e. "key in cache" and
+    "cache[key] = True".
+    """
+    description = "verified datafiles cache"
+
+    def __init__(self):
+        super(VerifiedDatafilesCache, self).__init__(LOCKS.updateCache)
+        self.compactOnClose = True
+
+    def Open(self, path, legacyPicklePath=None):
+        """
+        Open (or create) the cache database at path.
+
+        If a cache pickled by an earlier version of MyData exists at
+        legacyPicklePath, its keys are imported, and the pickle file
+        is removed.
+        """
+        self.Close(compact=False)
+        if not super(VerifiedDatafilesCache, self).Open(path):
+            return False
+        if legacyPicklePath and os.path.exists(legacyPicklePath):
+            self.ImportPickle(legacyPicklePath)
+        return True
+
+    def CreateTables(self):
+        """
+        Create the verified table if it doesn't already exist.
+        """
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS verified "
+            "(key TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def ImportPickle(self, picklePath):
+        """
+        One-time migration from the pickled dictionary used by
+        earlier versions of MyData.
+        """
+        try:
+            with open(picklePath, 'rb') as cacheFile:
+                legacyCache = pickle.load(cacheFile)
+            with LOCKS.updateCache:
+                if not self.connection:
+                    return
+                with self.connection:
+                    self.connection.executemany(
+                        "INSERT OR IGNORE INTO verified (key) VALUES (?)",
+                        ((key,) for key in legacyCache))
+            os.remove(picklePath)
+            logger.info("Migrated %d cached datafile lookups from %s"
+                        % (len(legacyCache), picklePath))
+        except:
+            logger.warning("Couldn't migrate verified datafiles cache from "
+                           "%s" % picklePath)
+            logger.warning(traceback.format_exc())
+
+    def __contains__(self, key):
+        with LOCKS.updateCache:
+            if not self.connection or key is None:
+                return False
+            cursor = self.connection.execute(
+                "SELECT 1 FROM verified WHERE key = ?", (key,))
+            return cursor.fetchone() is not None
+
+    def __setitem__(self, key, verified):
+        """
+        Record a verified DataFile lookup.  Each new entry is committed
+        immediately, so it won't be lost if MyData exits unexpectedly.
+        """
+        with LOCKS.updateCache:
+            if not self.connection:
+                return
+            with self.connection:
+                if verified:
+                    self.connection.execute(
+                        "INSERT OR IGNORE INTO verified (key) VALUES (?)",
+                        (key,))
+                else:
+                    self.connection.execute(
+                        "DELETE FROM verified WHERE key = ?", (key,))
+
+    def __len__(self):
+        with LOCKS.updateCache:
+            if not self.connection:
+                return 0
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM verified").fetchone()[0]
+
+    def Checkpoint(self):
+        """
+        Reclaim unused space in the database file if worthwhile, before
+        it is closed, unless Close was called with compact=False.
+
+        Called from Close while holding LOCKS.updateCache.
+        """
+        if not self.compactOnClose:
+            return
+        pageCount = self.connection.execute(
+            "PRAGMA page_count").fetchone()[0]
+        freePages = self.connection.execute(
+            "PRAGMA freelist_count").fetchone()[0]
+        if pageCount and float(freePages) / pageCount >= COMPACT_THRESHOLD:
+            logger.debug("Compacting verified datafiles cache.")
+            self.connection.execute("VACUUM")
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def Close(self, compact=True):
+        """
+        Close the cache database, optionally compacting it first.
+        """
+        with LOCKS.closeCache:
+            self.compactOnClose = compact
+            super(VerifiedDatafilesCache, self).Close()
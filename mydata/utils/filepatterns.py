@@ -0,0 +1,172 @@
+"""
+Compiled glob patterns from the includes and excludes files specified in
+the Filters tab of MyData's settings.
+
+Each patterns file is read and compiled once, and only read again if its
+modified time or size changes, so checking whether a file should be
+uploaded doesn't require any disk access.  Rather than calling fnmatch for
+each pattern, exact filenames are looked up in a set, patterns like
+'*.txt' are checked with a single str.endswith call, and the remaining
+patterns are combined into one regular expression.
+
+A pattern ending with '/' (e.g. 'tmp/') matches directories rather than
+files.  Directories matching a pattern in the excludes file are skipped
+while walking a dataset folder, so none of the files beneath them are
+listed, unless the directory also matches a directory pattern in the
+includes file.
+"""
+import fnmatch
+import os
+import re
+import threading
+
+GLOB_CHARS = re.compile(r"[*?[]")
+
+
+class FilePatterns(object):
+    """
+    Glob patterns read from an includes or excludes file, compiled for
+    matching filenames and directory names.
+    """
+    def __init__(self, patterns):
+        filePatterns = []
+        dirPatterns = []
+        for pattern in patterns:
+            if pattern.endswith("/"):
+                dirPatterns.append(os.path.normcase(pattern.rstrip("/")))
+            else:
+                filePatterns.append(os.path.normcase(pattern))
+        self.names, self.suffixes, self.regex = \
+            FilePatterns.Compile(filePatterns)
+        self.dirNames, self.dirSuffixes, self.dirRegex = \
+            FilePatterns.Compile(dirPatterns)
+
+    @staticmethod
+    def Compile(patterns):
+        """
+        Return a (names, suffixes, regex) tuple for matching the glob
+        patterns, where names is a set of patterns without wildcards,
+        suffixes is a tuple of the literal suffixes of patterns like
+        '*.txt', and regex is a compiled regular expression combining
+        the remaining patterns (or None).
+        """
+        names = set()
+        suffixes = []
+        others = []
+        for pattern in patterns:
+            if not GLOB_CHARS.search(pattern):
+                names.add(pattern)
+            elif pattern.startswith("*") and \
+                    not GLOB_CHARS.search(pattern[1:]):
+                suffixes.append(pattern[1:])
+            else:
+                others.append(pattern)
+        regex = None
+        if others:
+            regex = re.compile("|".join(
+                "(?:%s)" % fnmatch.translate(pattern) for pattern in others))
+        return names, tuple(suffixes), regex
+
+    @staticmethod
+    def Read(path):
+        """
+        Read glob patterns from an includes or excludes file, which
+        contains one pattern on each line.  Blank lines, and lines
+        beginning with '#' or ';' are ignored.
+        """
+        patterns = []
+        with open(path, 'r') as patternsFile:
+            for glob in patternsFile.readlines():
+                glob = glob.strip()
+                if glob == "":
+                    continue
+                if glob.startswith(";"):
+                    continue
+                if glob.startswith("#"):
+                    continue
+                patterns.append(glob)
+        return FilePatterns(patterns)
+
+    def Matches(self, filename):
+        """
+        Return True if the filename matches at least one file pattern,
+        using the same rules as fnmatch.fnmatch.
+        """
+        filename = os.path.normcase(filename)
+        return filename in self.names or \
+            (bool(self.suffixes) and filename.endswith(self.suffixes)) or \
+            (self.regex is not None and bool(self.regex.match(filename)))
+
+    def MatchesDirectory(self, dirname):
+        """
+        Return True if the directory name matches at least one directory
+        pattern.
+        """
+        dirname = os.path.normcase(dirname)
+        return dirname in self.dirNames or \
+            (bool(self.dirSuffixes) and dirname.endswith(self.dirSuffixes)) \
+            or (self.dirRegex is not None and
+                bool(self.dirRegex.match(dirname)))
+
+
+class FilePatternsCache(object):
+    """
+    Compiled patterns for each includes or excludes file, which are only
+    read again when the file's modified time or size changes.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = dict()
+
+    def Get(self, path):
+        """
+        Return the compiled FilePatterns for the includes or excludes
+        file at path.
+        """
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+        if entry and entry[0] == signature:
+            return entry[1]
+        patterns = FilePatterns.Read(path)
+        with self.lock:
+            self.entries[path] = (signature, patterns)
+        return patterns
+
+
+FILE_PATTERNS = FilePatternsCache()
+
+
+class FileFilter(object):
+    """
+    Decides which files and directories to include in a dataset, given
+    the compiled patterns from the includes and excludes files (either
+    of which can be None).
+
+    If both an includes and an excludes file are used, then filenames
+    matching one or more includes patterns are included, even if they
+    also match one or more excludes patterns.
+    """
+    def __init__(self, includes=None, excludes=None):
+        self.includes = includes
+        self.excludes = excludes
+
+    def IncludesFile(self, filename):
+        """
+        Return True if the file should be uploaded.
+        """
+        if self.includes and self.includes.Matches(filename):
+            return True
+        if self.excludes and self.excludes.Matches(filename):
+            return False
+        return not self.includes or bool(self.excludes)
+
+    def IncludesDirectory(self, dirname):
+        """
+        Return False if the directory (and everything beneath it) should
+        be skipped.
+        """
+        if not self.excludes or not self.excludes.MatchesDirectory(dirname):
+            return True
+        return bool(self.includes and self.includes.MatchesDirectory(dirname))
@@ -0,0 +1,107 @@
+"""
+On-disk log of the rows removed from MyData's Verifications and Uploads
+views.
+
+When max_completed_dataview_rows is set in MyData.cfg, those views only
+keep the most recent completed rows in memory (along with rows which are
+still in progress, and rows which failed).  Older completed rows are
+moved here, so that a very large upload run doesn't need to keep a row
+in memory for every file, but the full history of the run can still be
+searched from the views.
+
+Each dataview model's rows are recorded under its own name, e.g.
+"verifications" or "uploads", with the string values displayed in each of
+its columns.
+"""
+import json
+
+from ..threads.locks import LOCKS
+from .sqlitedb import SqliteDatabase
+
+
+class DataViewHistory(SqliteDatabase):
+    """
+    On-disk log of the rows removed from MyData's dataviews.
+    """
+    description = "dataview history"
+
+    def __init__(self):
+        super(DataViewHistory, self).__init__(LOCKS.dataViewHistory)
+
+    def CreateTables(self):
+        """
+        Create the history table if it doesn't already exist.
+        """
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS history "
+            "(model TEXT, dataViewId INTEGER, searchText TEXT, "
+            "rowValues TEXT, PRIMARY KEY (model, dataViewId)) "
+            "WITHOUT ROWID")
+
+    def Append(self, modelName, rows):
+        """
+        Record rows removed from a dataview.
+
+        :param modelName: The name of the dataview model, e.g. "uploads"
+        :param rows: A list of (dataViewId, values) tuples, where values
+            is a dictionary mapping column keys to the strings displayed
+            in those columns
+        """
+        with LOCKS.dataViewHistory:
+            if not self.connection:
+                return
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO history "
+                    "(model, dataViewId, searchText, rowValues) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(modelName, dataViewId,
+                      "\n".join(values.values()).lower(), json.dumps(values))
+                     for dataViewId, values in rows])
+
+    def Query(self, modelName, query="", offset=0, limit=100):
+        """
+        Return rows recorded for modelName, in dataViewId order, as a list
+        of (dataViewId, values) tuples.
+
+        :param query: Only return rows containing this string (ignoring
+            case) in any of their columns
+        """
+        with LOCKS.dataViewHistory:
+            if not self.connection:
+                return []
+            cursor = self.connection.execute(
+                "SELECT dataViewId, rowValues FROM history "
+                "WHERE model = ? AND instr(searchText, ?) > 0 "
+                "ORDER BY dataViewId LIMIT ? OFFSET ?",
+                (modelName, query.lower(), limit, offset))
+            return [(dataViewId, json.loads(rowValues))
+                    for dataViewId, rowValues in cursor.fetchall()]
+
+    def GetCount(self, modelName, query=""):
+        """
+        Return the number of rows recorded for modelName, containing
+        query (ignoring case) in any of their columns.
+        """
+        with LOCKS.dataViewHistory:
+            if not self.connection:
+                return 0
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM history "
+                "WHERE model = ? AND instr(searchText, ?) > 0",
+                (modelName, query.lower())).fetchone()[0]
+
+    def Clear(self, modelName):
+        """
+        Delete the rows recorded for modelName, e.g. when a new
+        upload run begins.
+        """
+        with LOCKS.dataViewHistory:
+            if not self.connection:
+                return
+            with self.connection:
+                self.connection.execute(
+                    "DELETE FROM history WHERE model = ?", (modelName,))
+
+
+DATAVIEW_HISTORY = DataViewHistory()
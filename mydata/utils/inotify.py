@@ -0,0 +1,226 @@
+"""
+Watch a directory tree for new and modified files using Linux's inotify
+API (via ctypes, so no additional packages are required).
+
+Usage:
+
+    from ..utils.inotify import DirectoryWatcher
+    watcher = DirectoryWatcher(dataDirectory, callback)
+    watcher.Start()
+    ...
+    watcher.Stop()
+
+The callback is called from the watcher's thread with the path of each
+file or directory which has been written, created or moved into the
+tree, or with None if the kernel's event queue overflowed (in which
+case some changes may have been missed).
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import traceback
+
+from ..logs import logger
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+# Files are reported when they are closed after being written (or when
+# they are moved into the tree), rather than for every write:
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_ATTRIB | \
+    IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+
+EVENT_HEADER = struct.Struct("iIII")
+
+# How often (in seconds) the watcher's thread checks whether it has
+# been asked to stop:
+POLL_INTERVAL = 0.5
+
+_LIBC = None
+
+
+def GetLibc():
+    """
+    Return the C library, with the inotify functions' argument and
+    return types declared, or None if inotify isn't available.
+    """
+    global _LIBC  # pylint: disable=global-statement
+    if _LIBC is None and sys.platform.startswith("linux"):
+        try:
+            libc = ctypes.CDLL(
+                ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = \
+                [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+            _LIBC = libc
+        except (OSError, AttributeError):
+            logger.debug(traceback.format_exc())
+    return _LIBC
+
+
+def IsSupported():
+    """
+    Returns True if the inotify API is available.
+    """
+    return GetLibc() is not None
+
+
+class DirectoryWatcher(object):
+    """
+    Watches a directory tree for new and modified files.
+    """
+    def __init__(self, path, callback):
+        self.path = path
+        self.callback = callback
+        self.fd = None
+        self.paths = dict()
+        self.thread = None
+        self.stopRequested = threading.Event()
+
+    def Start(self):
+        """
+        Start watching the directory tree, in a new thread.
+
+        :raises OSError: if inotify couldn't be initialized or the top-level
+            directory couldn't be watched
+        """
+        libc = GetLibc()
+        if libc is None:
+            raise OSError(errno.ENOSYS, "inotify isn't available.")
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.AddWatch(self.path, raiseOnError=True)
+        self.AddWatches(self.path)
+        self.stopRequested.clear()
+        self.thread = threading.Thread(
+            target=self.Run, name="DirectoryWatcherThread")
+        self.thread.daemon = True
+        self.thread.start()
+        logger.info("Watching %d directories in %s for changes."
+                    % (len(self.paths), self.path))
+
+    def Stop(self):
+        """
+        Stop watching the directory tree.
+        """
+        self.stopRequested.set()
+        if self.thread and self.thread != threading.current_thread():
+            self.thread.join()
+        self.thread = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        self.paths.clear()
+
+    def IsRunning(self):
+        """
+        Returns True if the watcher's thread is running.
+        """
+        return self.thread is not None and self.thread.is_alive()
+
+    def AddWatch(self, dirPath, raiseOnError=False):
+        """
+        Watch a single directory.
+        """
+        wd = GetLibc().inotify_add_watch(
+            self.fd, os.fsencode(dirPath), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if raiseOnError:
+                raise OSError(err, os.strerror(err), dirPath)
+            if err == errno.ENOSPC:
+                logger.warning(
+                    "Couldn't watch %s, because the inotify watch limit "
+                    "(fs.inotify.max_user_watches) has been reached."
+                    % dirPath)
+            elif err not in (errno.ENOENT, errno.ENOTDIR):
+                logger.warning("Couldn't watch %s: %s"
+                               % (dirPath, os.strerror(err)))
+            return False
+        self.paths[wd] = dirPath
+        return True
+
+    def AddWatches(self, dirPath):
+        """
+        Watch the subdirectories of dirPath, recursively.
+        """
+        for dirname, dirnames, _ in os.walk(dirPath):
+            for subdir in dirnames:
+                self.AddWatch(os.path.join(dirname, subdir))
+
+    def Run(self):
+        """
+        Read and dispatch events until Stop is called.
+        """
+        while not self.stopRequested.is_set():
+            try:
+                readable, _, _ = select.select(
+                    [self.fd], [], [], POLL_INTERVAL)
+                if not readable:
+                    continue
+                data = os.read(self.fd, 64 * 1024)
+            except (OSError, ValueError):
+                if self.stopRequested.is_set():
+                    break
+                logger.error(traceback.format_exc())
+                break
+            for path in self.ParseEvents(data):
+                try:
+                    self.callback(path)
+                except Exception:
+                    logger.error(traceback.format_exc())
+
+    def ParseEvents(self, data):
+        """
+        Parse the inotify_event structs read from the inotify file
+        descriptor, watching any new directories, and return the paths
+        which have changed (or None if the event queue overflowed).
+        """
+        changedPaths = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, nameLength = \
+                EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + nameLength].rstrip(b"\0")
+            offset += nameLength
+            if mask & IN_Q_OVERFLOW:
+                changedPaths.append(None)
+                continue
+            if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                self.paths.pop(wd, None)
+                continue
+            dirPath = self.paths.get(wd)
+            if dirPath is None:
+                continue
+            path = os.path.join(dirPath, os.fsdecode(name)) \
+                if name else dirPath
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files may already have been written into the new
+                    # directory before it could be watched, so it is
+                    # reported as changed, as well as being watched:
+                    if self.AddWatch(path):
+                        self.AddWatches(path)
+                    changedPaths.append(path)
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_ATTRIB):
+                changedPaths.append(path)
+        return changedPaths
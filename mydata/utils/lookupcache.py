@@ -0,0 +1,133 @@
+"""
+On-disk cache of MyTardis user, group, facility and instrument lookups,
+which are repeated for every folder in every scan, but rarely change.
+
+Each lookup result is recorded as the JSON returned by MyTardis's API,
+and it expires after the number of seconds specified by lookup_cache_ttl
+in MyData.cfg.  Lookups which didn't find a matching record (e.g. for a
+user folder which doesn't correspond to a MyTardis user yet) are recorded
+as None, but they expire after NOT_FOUND_TTL seconds at most, so a record
+created in MyTardis is found again soon after.
+
+The cache is cleared whenever the settings which the lookups depend on
+(e.g. the MyTardis URL, username or group prefix) change.
+"""
+import json
+import time
+
+from ..logs import logger
+from ..threads.locks import LOCKS
+from .sqlitedb import SqliteDatabase
+
+# The maximum number of seconds for which lookups which didn't find a
+# matching record are cached:
+NOT_FOUND_TTL = 60
+
+
+class LookupCache(SqliteDatabase):
+    """
+    On-disk cache of MyTardis user, group, facility and instrument lookups.
+    """
+    description = "lookup cache"
+
+    def __init__(self):
+        super(LookupCache, self).__init__(LOCKS.lookupCache)
+        self.scope = None
+        self.ttl = 0
+
+    def Open(self, path, scope, ttl):
+        """
+        Open (or create) the cache database at path, clearing it if scope
+        (a string summarizing the settings which the lookups depend on)
+        has changed since the cache was last opened.
+
+        :param ttl: The number of seconds for which new lookup results
+            are cached
+        """
+        self.scope = scope
+        self.ttl = ttl
+        return super(LookupCache, self).Open(path)
+
+    def CreateTables(self):
+        """
+        Create the cache's tables, clearing them if the scope has changed,
+        and remove expired lookups.
+        """
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS lookups "
+            "(kind TEXT, key TEXT, value TEXT, expires REAL, "
+            "PRIMARY KEY (kind, key)) WITHOUT ROWID")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS meta "
+            "(name TEXT PRIMARY KEY, value TEXT)")
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE name = 'scope'").fetchone()
+        if not row or row[0] != self.scope:
+            if row:
+                logger.debug(
+                    "Settings have changed, so clearing the cached "
+                    "MyTardis lookups.")
+            self.connection.execute("DELETE FROM lookups")
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta (name, value) "
+                "VALUES ('scope', ?)", (self.scope,))
+        self.connection.execute(
+            "DELETE FROM lookups WHERE expires <= ?", (time.time(),))
+
+    def Get(self, kind, key):
+        """
+        Return a (found, value) tuple for a cached lookup, where found is
+        False if the lookup isn't cached (or has expired), and value is
+        the JSON recorded for the lookup, or None if the record wasn't
+        found in MyTardis.
+
+        :param kind: The kind of lookup, e.g. "user_by_username"
+        :param key: The value looked up, e.g. the username
+        """
+        with LOCKS.lookupCache:
+            if not self.connection:
+                return False, None
+            row = self.connection.execute(
+                "SELECT value FROM lookups WHERE kind = ? AND key = ? "
+                "AND expires > ?", (kind, key, time.time())).fetchone()
+        if not row:
+            return False, None
+        if row[0] is None:
+            return True, None
+        return True, json.loads(row[0])
+
+    def Set(self, kind, key, value):
+        """
+        Record the result of a lookup, where value is the JSON returned
+        by MyTardis's API, or None if the record wasn't found.
+        """
+        with LOCKS.lookupCache:
+            if not self.connection:
+                return
+            if value is None:
+                ttl = min(self.ttl, NOT_FOUND_TTL)
+            else:
+                ttl = self.ttl
+                value = json.dumps(value)
+            with self.connection:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO lookups "
+                    "(kind, key, value, expires) VALUES (?, ?, ?, ?)",
+                    (kind, key, value, time.time() + ttl))
+
+    def Invalidate(self, kind, key=None):
+        """
+        Remove cached lookups of the specified kind, or just the lookup
+        for key if it is specified, e.g. after renaming an instrument.
+        """
+        with LOCKS.lookupCache:
+            if not self.connection:
+                return
+            with self.connection:
+                if key is None:
+                    self.connection.execute(
+                        "DELETE FROM lookups WHERE kind = ?", (kind,))
+                else:
+                    self.connection.execute(
+                        "DELETE FROM lookups WHERE kind = ? AND key = ?",
+                        (kind, key))
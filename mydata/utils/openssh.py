@@ -8,6 +8,7 @@ MyData is now using Paramiko SFTP
 import base64
 import hashlib
 from datetime import datetime
+from functools import partial
 import getpass
 import os
 import re
@@ -15,6 +16,8 @@ import sys
 import threading
 
 import paramiko
+from paramiko.sftp import SFTPError
+from paramiko.ssh_exception import SSHException
 
 from ..events.stop import ShouldCancelUpload
 from ..settings import SETTINGS
@@ -22,10 +25,19 @@ from ..logs import logger
 from ..utils.exceptions import PrivateKeyDoesNotExist
 from ..threads.locks import LOCKS
 
+from .checksums import Md5HashingReader
 from .progress import MonitorProgress
 
 REMOTE_DIRS_CREATED = dict()
 
+# Byte ranges uploaded in parallel start on a multiple of this
+# number of bytes:
+RANGE_ALIGNMENT = 1024 * 1024
+
+# OpenSSH's SFTP server rejects messages larger than 256 KiB, so each
+# write request's data must be smaller than that, including its header:
+MAX_SFTP_BLOCK_SIZE = 255 * 1024
+
 
 class KeyPair(object):
     """
@@ -189,32 +201,68 @@ def FindOrCreateKeyPair(keyName="MyData"):
     return keyPair
 
 
+def OpenSftpConnection(username, privateKey, host, port):
+    """
+    Open an SSH transport and an SFTP session over it.
+
+    :return: (transport, sftp) tuple
+    """
+    transport = paramiko.Transport((host, int(port)))
+    transport.connect(username=username, pkey=privateKey)
+    sftp = paramiko.SFTPClient.from_transport(transport)
+    sftp.get_channel().settimeout(SETTINGS.miscellaneous.connectionTimeout)
+    return transport, sftp
+
+
+def ShouldUploadInParallel(fileSize, calculateMd5Sum=False):
+    """
+    Determine whether a file is large enough to be uploaded with
+    multiple parallel SFTP streams.
+
+    Parallel streams read the file out of order, so they can't be used
+    when the MD5 checksum is being calculated while uploading.
+    """
+    threshold = \
+        SETTINGS.miscellaneous.parallelUploadThresholdMb * 1024 * 1024
+    return SETTINGS.miscellaneous.parallelUploadStreams > 1 and \
+        not calculateMd5Sum and fileSize >= threshold
+
+
 def UploadFile(filePath, fileSize, username, privateKey,
                host, port, remoteFilePath, progressCallback,
-               uploadModel):
+               uploadModel, calculateMd5Sum=False):
     """
     Upload a file to staging using SFTP.
 
-    Ignore bytes uploaded previously, because MyData is no longer
-    chunking files, so with SFTP, we will always upload the whole
-    file.
+    If a partial copy of the file is already in staging (e.g. from an
+    interrupted upload), the upload is resumed from the end of the
+    partial copy, see GetResumeOffset.
+
+    If calculateMd5Sum is True, the file's MD5 checksum is calculated
+    from the same reads used to upload it, and returned.
+
+    Large files may be split into byte ranges which are uploaded in
+    parallel, see UploadFileInParallel.
     """
     progressCallback(current=0, total=fileSize, message="Uploading...")
 
-    monitoringProgress = threading.Event()
+    uploadInParallel = ShouldUploadInParallel(fileSize, calculateMd5Sum)
     uploadModel.startTime = datetime.now()
-    MonitorProgress(SETTINGS.miscellaneous.progressPollInterval, uploadModel,
-                    fileSize, monitoringProgress, progressCallback)
+    if not uploadInParallel:
+        # Parallel uploads count the bytes written by each stream, so
+        # they don't need to poll the size of the staged file:
+        monitoringProgress = threading.Event()
+        MonitorProgress(SETTINGS.miscellaneous.progressPollInterval,
+                        uploadModel, fileSize, monitoringProgress,
+                        progressCallback)
 
     uploadThread = threading.current_thread()
-    if not hasattr(uploadThread, "paramikoTransport"):
-        uploadThread.paramikoTransport = paramiko.Transport((host, int(port)))
-        uploadThread.paramikoTransport.connect(
-            username=username, pkey=privateKey)
-        uploadThread.paramikoSftp = paramiko.SFTPClient.from_transport(
-            uploadThread.paramikoTransport)
-        uploadThread.paramikoSftp.get_channel().settimeout(
-            SETTINGS.miscellaneous.connectionTimeout)
+    if not hasattr(uploadThread, "paramikoTransport") or \
+            not uploadThread.paramikoTransport.is_active():
+        # A connection which was dropped during a previous attempt
+        # is replaced, so that the upload can be resumed:
+        uploadThread.paramikoTransport, uploadThread.paramikoSftp = \
+            OpenSftpConnection(username, privateKey, host, port)
         assert uploadThread.paramikoSftp
 
     remoteDir = os.path.dirname(remoteFilePath)
@@ -223,15 +271,336 @@ def UploadFile(filePath, fileSize, username, privateKey,
 
     if ShouldCancelUpload(uploadModel):
         logger.debug("UploadFile: Aborting upload for %s" % filePath)
-        return
+        return None
 
-    logger.debug("sftp.put(%s, %s)" % (filePath, remoteFilePath))
-    uploadThread.paramikoSftp.put(filePath, remoteFilePath)
+    md5sum = None
+    if uploadInParallel:
+        UploadFileInParallel(
+            uploadThread.paramikoSftp, filePath, fileSize,
+            (username, privateKey, host, port), remoteFilePath,
+            progressCallback, uploadModel,
+            SETTINGS.miscellaneous.parallelUploadStreams)
+    else:
+        md5sum = UploadFileFromOffset(
+            uploadThread.paramikoSftp, filePath, fileSize, remoteFilePath,
+            progressCallback, uploadModel, calculateMd5Sum)
+    if ShouldCancelUpload(uploadModel):
+        return None
 
     uploadThread.paramikoSftp.chmod(remoteFilePath, 0o660)
 
     uploadModel.SetLatestTime(datetime.now())
     progressCallback(current=fileSize, total=fileSize)
+    return md5sum
+
+
+def GetResumeOffset(sftp, filePath, fileSize, remoteFilePath):
+    """
+    Return the offset from which an upload to remoteFilePath can be
+    resumed, i.e. the size of the partial copy already in staging, or 0
+    if there is no partial copy, or if it can't be trusted.
+
+    If SETTINGS.miscellaneous.resumeTailCheckMb is non-zero, the MD5
+    checksum of the end of the partial copy (up to that many MB) is
+    compared with the checksum of the same bytes of the local file, so
+    that we don't append to a staged copy which doesn't match the local
+    file, e.g. because the local file has been modified since.
+    """
+    if not SETTINGS.miscellaneous.resumeUploads:
+        return 0
+    try:
+        remoteFileSize = sftp.stat(remoteFilePath).st_size
+    except IOError:
+        return 0
+    if not remoteFileSize or remoteFileSize >= fileSize:
+        # A full-size staged copy is only uploaded again if it
+        # couldn't be verified, so it isn't reused.
+        return 0
+    tailSize = min(remoteFileSize,
+                   SETTINGS.miscellaneous.resumeTailCheckMb * 1024 * 1024)
+    if tailSize:
+        tailStart = remoteFileSize - tailSize
+        with open(filePath, 'rb') as localFile:
+            localFile.seek(tailStart)
+            localMd5Sum = hashlib.md5(localFile.read(tailSize)).hexdigest()
+        remoteMd5 = hashlib.md5()
+        with sftp.open(remoteFilePath, 'rb') as remoteFile:
+            for chunk in remoteFile.readv([(tailStart, tailSize)]):
+                remoteMd5.update(chunk)
+        if remoteMd5.hexdigest() != localMd5Sum:
+            logger.warning(
+                "Not resuming upload of %s, because the last %d bytes of "
+                "the partial copy in staging don't match the local file."
+                % (filePath, tailSize))
+            return 0
+    return remoteFileSize
+
+
+def UploadFileFromOffset(sftp, filePath, fileSize, remoteFilePath,
+                         progressCallback, uploadModel, calculateMd5Sum,
+                         canceledCallback=None, reportBytesWritten=False):
+    """
+    Upload a file with a single SFTP stream, resuming from the end of
+    any partial copy found in staging.
+
+    The number of bytes which didn't need to be uploaded again is
+    recorded in uploadModel.bytesUploadedPreviously.
+
+    Progress is usually monitored by polling the size of the staged file
+    (see MonitorProgress), but if reportBytesWritten is True,
+    progressCallback is also called as each block is written.
+
+    :return: the file's MD5 checksum if calculateMd5Sum is True,
+        otherwise None.
+    :raises SSHException: if the size of the staged copy doesn't match
+        the size of the local file after uploading.
+    """
+    if not canceledCallback:
+        canceledCallback = partial(ShouldCancelUpload, uploadModel)
+    resumeOffset = GetResumeOffset(sftp, filePath, fileSize, remoteFilePath)
+    uploadModel.bytesUploadedPreviously = resumeOffset
+    md5sum = None
+
+    def BytesWrittenCallback(bytesWritten):
+        """
+        Report progress from the number of bytes written
+        """
+        progressCallback(current=resumeOffset + bytesWritten, total=fileSize)
+
+    with open(filePath, 'rb') as localFile:
+        if calculateMd5Sum:
+            localFile = Md5HashingReader(localFile)
+        if resumeOffset:
+            logger.debug("Resuming upload of %s to %s from byte %d"
+                         % (filePath, remoteFilePath, resumeOffset))
+            progressCallback(current=resumeOffset, total=fileSize,
+                             message="Resuming upload...")
+            if calculateMd5Sum:
+                # The bytes which have already been uploaded still need
+                # to be included in the checksum:
+                blockSize = SETTINGS.miscellaneous.sftpBlockSize
+                bytesRead = 0
+                while bytesRead < resumeOffset:
+                    chunk = localFile.read(
+                        min(blockSize, resumeOffset - bytesRead))
+                    if not chunk:
+                        raise IOError(
+                            "%s was truncated during its upload." % filePath)
+                    bytesRead += len(chunk)
+            else:
+                localFile.seek(resumeOffset)
+        else:
+            logger.debug("Uploading %s to %s" % (filePath, remoteFilePath))
+        with OpenRemoteFileForPipelinedWrites(
+                sftp, remoteFilePath,
+                'r+' if resumeOffset else 'wb') as remoteFile:
+            remoteFile.seek(resumeOffset)
+            PipelinedWrite(
+                filePath, localFile, remoteFile, fileSize - resumeOffset,
+                canceledCallback,
+                BytesWrittenCallback if reportBytesWritten else None)
+        if calculateMd5Sum:
+            md5sum = localFile.hexdigest()
+    if not canceledCallback():
+        remoteFileSize = sftp.stat(remoteFilePath).st_size
+        if remoteFileSize != fileSize:
+            raise SSHException(
+                "Size mismatch in upload of %s: %d != %d"
+                % (filePath, remoteFileSize, fileSize))
+    return md5sum
+
+
+def OpenRemoteFileForPipelinedWrites(sftp, remoteFilePath, mode='wb'):
+    """
+    Open a remote file for writing with pipelining enabled, i.e. without
+    waiting for the server to acknowledge each write request before
+    sending the next one, and with each request writing up to
+    SETTINGS.miscellaneous.sftpBlockSize bytes (but no more than
+    MAX_SFTP_BLOCK_SIZE).
+
+    Paramiko collects the acknowledgements of pipelined write requests
+    as they arrive, and waits for the rest when the file is closed,
+    raising an error if any of the writes failed.
+    """
+    remoteFile = sftp.open(remoteFilePath, mode)
+    # Paramiko's default is 32 KiB per request:
+    remoteFile.MAX_REQUEST_SIZE = \
+        min(SETTINGS.miscellaneous.sftpBlockSize, MAX_SFTP_BLOCK_SIZE)
+    remoteFile.set_pipelined(True)
+    return remoteFile
+
+
+def PipelinedWrite(filePath, localFile, remoteFile, numBytes,
+                   canceledCallback, bytesWrittenCallback=None):
+    """
+    Copy numBytes from the current position of localFile (opened from
+    filePath) to the current position of remoteFile (opened with
+    OpenRemoteFileForPipelinedWrites).
+
+    The write requests are acknowledged when remoteFile is closed.
+
+    :return: the number of bytes written, which is less than numBytes
+        if the upload was canceled.
+    """
+    blockSize = remoteFile.MAX_REQUEST_SIZE
+    bytesWritten = 0
+    while bytesWritten < numBytes:
+        if canceledCallback():
+            break
+        chunk = localFile.read(min(blockSize, numBytes - bytesWritten))
+        if not chunk:
+            raise IOError("%s was truncated during its upload." % filePath)
+        remoteFile.write(chunk)
+        bytesWritten += len(chunk)
+        if bytesWrittenCallback:
+            bytesWrittenCallback(bytesWritten)
+    remoteFile.flush()
+    return bytesWritten
+
+
+class ByteRange(object):
+    """
+    A contiguous range of bytes from a file which is being uploaded in
+    parallel with other ranges of the same file.
+    """
+    def __init__(self, start, end):
+        self.start = start
+        # The end offset is exclusive:
+        self.end = end
+        self.bytesUploaded = 0
+        self.retries = 0
+        self.error = None
+
+    @property
+    def size(self):
+        """
+        The number of bytes in the range
+        """
+        return self.end - self.start
+
+
+def SplitIntoByteRanges(fileSize, numRanges):
+    """
+    Split a file into (at most) numRanges contiguous byte ranges of
+    similar sizes, with each range (except the last) starting and ending
+    on a multiple of RANGE_ALIGNMENT.
+    """
+    rangeSize = -(-fileSize // numRanges)
+    rangeSize = -(-rangeSize // RANGE_ALIGNMENT) * RANGE_ALIGNMENT
+    byteRanges = []
+    start = 0
+    while start < fileSize:
+        end = min(start + rangeSize, fileSize)
+        byteRanges.append(ByteRange(start, end))
+        start = end
+    return byteRanges
+
+
+def UploadByteRange(filePath, byteRange, connectionArgs, remoteFilePath,
+                    canceledCallback):
+    """
+    Upload one byte range of a file over its own SSH connection, writing
+    it at the same offset in the remote file.
+
+    If an error occurs, the range is uploaded again from its beginning,
+    up to SETTINGS.advanced.maxUploadRetries times.  If it still can't be
+    uploaded, the last error is recorded in byteRange.error.
+    """
+    while True:
+        transport = None
+        try:
+            transport, sftp = OpenSftpConnection(*connectionArgs)
+            byteRange.bytesUploaded = 0
+
+            def BytesWrittenCallback(bytesWritten):
+                """
+                Update the range's byte counter
+                """
+                byteRange.bytesUploaded = bytesWritten
+
+            with open(filePath, 'rb') as localFile:
+                with OpenRemoteFileForPipelinedWrites(
+                        sftp, remoteFilePath, 'r+') as remoteFile:
+                    localFile.seek(byteRange.start)
+                    remoteFile.seek(byteRange.start)
+                    PipelinedWrite(
+                        filePath, localFile, remoteFile, byteRange.size,
+                        canceledCallback, BytesWrittenCallback)
+            byteRange.error = None
+            return
+        except (SSHException, SFTPError, IOError, EOFError) as err:
+            byteRange.error = err
+            if canceledCallback() or \
+                    byteRange.retries >= SETTINGS.advanced.maxUploadRetries:
+                return
+            byteRange.retries += 1
+            logger.warning(
+                "Restarting upload of bytes %d-%d of %s: %s"
+                % (byteRange.start, byteRange.end - 1, filePath, err))
+        finally:
+            if transport:
+                transport.close()
+
+
+def UploadFileInParallel(sftp, filePath, fileSize, connectionArgs,
+                         remoteFilePath, progressCallback, uploadModel,
+                         numStreams, canceledCallback=None):
+    """
+    Upload a large file by splitting it into byte ranges, and uploading
+    each range over its own SSH connection.
+
+    A single SFTP stream's throughput is limited by the SSH channel's
+    window size on high-latency links, so using several connections
+    allows more of the available bandwidth to be used.
+
+    :param sftp: SFTP client used to create the remote file and to check
+        its size once all of the ranges have been uploaded.
+    :param connectionArgs: (username, privateKey, host, port) tuple used
+        to open each stream's connection.
+    :raises SSHException: if any range couldn't be uploaded.
+    """
+    if not canceledCallback:
+        canceledCallback = partial(ShouldCancelUpload, uploadModel)
+    # Create (or truncate) the remote file, so that each stream can
+    # open it for writing at its own offsets.  Parallel uploads aren't
+    # resumed, because the size of a partial copy written by several
+    # streams doesn't tell us which byte ranges were completed:
+    sftp.open(remoteFilePath, 'wb').close()
+    uploadModel.bytesUploadedPreviously = 0
+    uploadModel.byteRanges = SplitIntoByteRanges(fileSize, numStreams)
+    logger.debug("Uploading %s in %d parallel byte ranges."
+                 % (filePath, len(uploadModel.byteRanges)))
+    uploadThread = threading.current_thread()
+    rangeThreads = []
+    for index, byteRange in enumerate(uploadModel.byteRanges):
+        thread = threading.Thread(
+            name="%s-Range-%d" % (uploadThread.name, index + 1),
+            target=UploadByteRange,
+            args=(filePath, byteRange, connectionArgs, remoteFilePath,
+                  canceledCallback))
+        rangeThreads.append(thread)
+        thread.start()
+    for thread in rangeThreads:
+        while thread.is_alive():
+            thread.join(SETTINGS.miscellaneous.progressPollInterval)
+            uploadModel.SetLatestTime(datetime.now())
+            progressCallback(
+                current=sum(byteRange.bytesUploaded
+                            for byteRange in uploadModel.byteRanges),
+                total=fileSize)
+    if canceledCallback():
+        return
+    for byteRange in uploadModel.byteRanges:
+        if byteRange.error:
+            raise SSHException(
+                "Failed to upload bytes %d-%d of %s: %s"
+                % (byteRange.start, byteRange.end - 1, filePath,
+                   byteRange.error))
+    remoteFileSize = sftp.stat(remoteFilePath).st_size
+    if remoteFileSize != fileSize:
+        raise SSHException(
+            "Size mismatch in parallel upload of %s: %d != %d"
+            % (filePath, remoteFileSize, fileSize))
 
 
 def MakeRemoteDirs(paramikoSftp, remoteDir):
@@ -0,0 +1,208 @@
+"""
+Persistent index of the directories listed while scanning for
+dataset folders and their files.
+
+For each directory, we record its modified time when it was last
+listed, together with the names of its subdirectories and files.
+Adding, removing or renaming an entry within a directory updates the
+directory's modified time, so if a directory's modified time hasn't
+changed since it was last listed, we can reuse the cached listing
+instead of listing it again, which saves a lot of time on network file
+systems for large datasets.
+
+Every directory is still stat'ed on each scan, because a change deep
+within a directory tree doesn't update the modified times of the
+directories above it, so unchanged subtrees can't be skipped entirely.
+Similarly, modifying a file in place doesn't update its directory's
+modified time, so every file in the tree is still reported, not only
+new files.
+
+Directories which are found to be deleted or renamed are removed from
+the index (along with everything beneath them), and directories which
+were not visited during a complete scan are pruned when the index is
+saved.
+"""
+import os
+import pickle
+import time
+import traceback
+
+from ..logs import logger
+from ..threads.locks import LOCKS
+
+# Some file systems (e.g. FAT) only record modified times to the nearest
+# two seconds, so a directory listed within this interval of its last
+# modification could be modified again without its modified time changing.
+# We don't reuse cached listings recorded within this interval.
+RACY_INTERVAL = 2.0
+
+
+class ScanIndex(object):
+    """
+    Persistent index of the directories listed while scanning for
+    dataset folders and their files.
+
+    Each entry in self.dirs maps an absolute directory path to a tuple:
+    (mtime, timeListed, dirnames, filenames).
+    """
+    def __init__(self):
+        self.path = None
+        self.dirs = dict()
+        self.visited = set()
+        self.enabled = False
+        self.forceFullRescan = False
+        self.modified = False
+
+    def Load(self, path, forceFullRescan=False):
+        """
+        Load the index from disk (if it exists), and start recording
+        which directories are visited, so that stale entries can be
+        pruned when the index is saved.
+
+        If forceFullRescan is True, every directory will be listed again,
+        and the index will be rebuilt from the new listings.
+        """
+        with LOCKS.scanIndex:
+            self.path = path
+            self.enabled = True
+            self.forceFullRescan = forceFullRescan
+            self.visited = set()
+            self.modified = False
+            self.dirs = dict()
+            try:
+                if os.path.exists(path):
+                    with open(path, 'rb') as indexFile:
+                        self.dirs = pickle.load(indexFile)
+            except:
+                logger.warning("Couldn't load scan index from %s" % path)
+                logger.warning(traceback.format_exc())
+                self.dirs = dict()
+
+    def Disable(self):
+        """
+        List directories without consulting or updating the index
+        """
+        with LOCKS.scanIndex:
+            self.enabled = False
+            self.dirs = dict()
+            self.visited = set()
+
+    def Save(self, prune=True):
+        """
+        Save the index to disk.
+
+        If prune is True, entries for directories which weren't visited
+        since the index was loaded are removed first.  This should only
+        be done after a complete scan, including the walks of the dataset
+        folders it found (which are performed by the upload threads), i.e.
+        not after a scan which was aborted by the user.
+        """
+        with LOCKS.scanIndex:
+            if not self.enabled:
+                return
+            self.enabled = False
+            if prune:
+                for path in list(self.dirs.keys()):
+                    if path not in self.visited:
+                        del self.dirs[path]
+                        self.modified = True
+            self.visited = set()
+            if not self.modified:
+                return
+            tempPath = self.path + ".tmp"
+            try:
+                with open(tempPath, 'wb') as indexFile:
+                    pickle.dump(self.dirs, indexFile,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tempPath, self.path)
+            except:
+                logger.warning("Couldn't save scan index to %s" % self.path)
+                logger.warning(traceback.format_exc())
+
+    def Forget(self, path):
+        """
+        Remove a directory and everything beneath it from the index,
+        e.g. because it has been deleted or renamed.
+        """
+        with LOCKS.scanIndex:
+            self._Forget(path)
+
+    def _Forget(self, path):
+        """
+        Remove a directory and everything beneath it from the index.
+
+        The caller should hold LOCKS.scanIndex.
+        """
+        if self.dirs.pop(path, None) is None:
+            return
+        self.modified = True
+        prefix = os.path.join(path, "")
+        for key in [key for key in self.dirs if key.startswith(prefix)]:
+            del self.dirs[key]
+
+    def ListDir(self, path):
+        """
+        Return a tuple (dirnames, filenames) for the specified directory,
+        reusing the cached listing if the directory hasn't been modified
+        since it was last listed.
+
+        Raises OSError if the directory can't be listed.
+        """
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            self.Forget(path)
+            raise
+        with LOCKS.scanIndex:
+            entry = self.dirs.get(path) if self.enabled else None
+            if entry:
+                self.visited.add(path)
+        if entry and not self.forceFullRescan and entry[0] == mtime and \
+                entry[1] - mtime > RACY_INTERVAL:
+            return list(entry[2]), list(entry[3])
+
+        timeListed = time.time()
+        dirnames = []
+        filenames = []
+        for dirEntry in os.scandir(path):
+            try:
+                isDir = dirEntry.is_dir()
+            except OSError:
+                isDir = False
+            if isDir:
+                dirnames.append(dirEntry.name)
+            else:
+                filenames.append(dirEntry.name)
+
+        if self.enabled:
+            with LOCKS.scanIndex:
+                if entry:
+                    for dirname in set(entry[2]) - set(dirnames):
+                        self._Forget(os.path.join(path, dirname))
+                self.dirs[path] = (mtime, timeListed, dirnames, filenames)
+                self.visited.add(path)
+                self.modified = True
+        return list(dirnames), list(filenames)
+
+    def Walk(self, top):
+        """
+        Generate (dirpath, dirnames, filenames) tuples for the directory
+        tree rooted at top, like os.walk (top-down, not following
+        symbolic links), using cached listings for unmodified directories.
+
+        Like os.walk, the caller can modify dirnames in-place to prevent
+        subdirectories from being visited.
+        """
+        try:
+            dirnames, filenames = self.ListDir(top)
+        except OSError:
+            return
+        yield top, dirnames, filenames
+        for dirname in dirnames:
+            dirpath = os.path.join(top, dirname)
+            if not os.path.islink(dirpath):
+                for item in self.Walk(dirpath):
+                    yield item
+
+
+SCAN_INDEX = ScanIndex()
@@ -0,0 +1,115 @@
+"""
+The capabilities of a MyTardis server, remembered across runs, so that
+MyData doesn't need to probe for them again (e.g. by making a request
+which is known to fail on older MyTardis servers) for every folder.
+
+Capabilities are discovered from the list of endpoints returned by
+/api/v1/?format=json during settings validation, or from the responses
+to the first requests which depend on them.  The API doesn't report
+MyTardis's version, so the list of endpoints is used to detect when the
+server has been upgraded (or downgraded), in which case the
+capabilities are discovered again.
+"""
+import hashlib
+import json
+import os
+import traceback
+
+from ..logs import logger
+from ..threads.locks import LOCKS
+
+# Whether datasets can be filtered by instrument, e.g.
+# /api/v1/dataset/?format=json&instrument__id=1 (older MyTardis servers
+# respond with HTTP 400):
+DATASET_INSTRUMENT_FILTER = "dataset_instrument_filter"
+
+# Whether the mytardis-app-mydata app provides the /api/v1/mydata_replica/
+# endpoint, used to count the bytes uploaded to staging:
+MYDATA_REPLICA_ENDPOINT = "mydata_replica_endpoint"
+
+
+class ServerProfile(object):
+    """
+    The capabilities of a MyTardis server, saved as JSON on disk.
+    """
+    def __init__(self):
+        self.path = None
+        self.signature = None
+        self.capabilities = dict()
+
+    def Load(self, path, apiEndpointsJson=None):
+        """
+        Load the capabilities previously discovered for a MyTardis server
+        from path.
+
+        :param apiEndpointsJson: The list of API endpoints returned by
+            /api/v1/?format=json.  If the endpoints have changed since the
+            capabilities were discovered, they are discarded.  If they
+            couldn't be retrieved, a server upgrade couldn't be detected,
+            so capabilities are only discovered (and remembered) for the
+            current session.
+        """
+        with LOCKS.serverProfile:
+            if apiEndpointsJson is None:
+                self.path = None
+                self.signature = None
+                self.capabilities = dict()
+                return
+            self.path = path
+            profile = dict()
+            if os.path.exists(path):
+                try:
+                    with open(path, 'r') as profileFile:
+                        profile = json.load(profileFile)
+                except (IOError, OSError, ValueError):
+                    logger.warning("Couldn't read MyTardis server profile.")
+                    logger.warning(traceback.format_exc())
+            self.signature = profile.get('signature')
+            self.capabilities = profile.get('capabilities', dict())
+            signature = hashlib.sha256(
+                "\n".join(sorted(apiEndpointsJson.keys())).encode('utf-8')) \
+                .hexdigest()
+            if signature == self.signature:
+                return
+            if self.signature:
+                logger.info("MyTardis's API endpoints have changed, so its "
+                            "capabilities will be discovered again.")
+            self.signature = signature
+            self.capabilities = {
+                MYDATA_REPLICA_ENDPOINT: "mydata_replica" in apiEndpointsJson}
+            self.Save()
+
+    def Supports(self, capability):
+        """
+        Returns True or False if the server is known to support (or not
+        support) capability, or None if this hasn't been discovered yet.
+        """
+        with LOCKS.serverProfile:
+            return self.capabilities.get(capability)
+
+    def SetSupported(self, capability, supported):
+        """
+        Record whether the server supports capability.
+        """
+        with LOCKS.serverProfile:
+            if self.capabilities.get(capability) == supported:
+                return
+            self.capabilities[capability] = supported
+            self.Save()
+
+    def Save(self):
+        """
+        Save the capabilities to disk.  The caller must hold
+        LOCKS.serverProfile.
+        """
+        if not self.path:
+            return
+        try:
+            tempPath = self.path + ".tmp"
+            with open(tempPath, 'w') as profileFile:
+                json.dump(dict(signature=self.signature,
+                               capabilities=self.capabilities), profileFile)
+            os.replace(tempPath, self.path)
+        except (IOError, OSError):
+            logger.warning("Couldn't save MyTardis server profile.")
+            logger.warning(traceback.format_exc())
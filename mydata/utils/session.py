@@ -0,0 +1,153 @@
+"""
+Shared HTTP session for MyTardis API requests.
+
+Using a single requests.Session allows keep-alive connections (and their
+TLS sessions) to be reused across requests and across threads, rather than
+opening a new connection for every API call.
+
+The global SETTINGS singleton is imported inline when needed to avoid
+circular dependencies.  Code which runs while SETTINGS is being constructed
+(e.g. UploaderModel) should pass its own settings instance instead.
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..threads.locks import LOCKS
+
+# Methods which are safe to retry automatically, because repeating them
+# won't create duplicate records on the MyTardis server:
+RETRY_METHODS = frozenset(['GET', 'HEAD', 'PUT', 'OPTIONS', 'DELETE'])
+
+# Retry's allowed_methods argument was called method_whitelist before
+# urllib3 1.26, and the version of requests in requirements.txt requires
+# an earlier version of urllib3:
+if hasattr(Retry, "DEFAULT_ALLOWED_METHODS"):
+    RETRY_METHODS_ARG = "allowed_methods"
+else:
+    RETRY_METHODS_ARG = "method_whitelist"
+
+# Responses which usually indicate a transient problem with the server
+# or a proxy in front of it:
+RETRY_STATUS_CODES = frozenset([502, 503, 504])
+
+# Connections for threads other than the verification and upload workers,
+# e.g. the main thread, the folder scanning thread and the experiment and
+# dataset lookups performed in StartUploadsForFolder:
+EXTRA_POOL_CONNECTIONS = 4
+
+
+class MyTardisSession(object):
+    """
+    Thread-safe wrapper around a requests.Session with a connection pool
+    sized for MyData's verification and upload worker threads.
+
+    Usage:
+
+        from ..utils.session import HTTP_SESSION
+        response = HTTP_SESSION.Get(url)
+    """
+    def __init__(self):
+        self._session = None
+        self._config = None
+
+    @staticmethod
+    def GetConfig(settings):
+        """
+        Return the settings which determine how the session's
+        connection pool is configured.
+        """
+        poolSize = settings.miscellaneous.maxVerificationThreads + \
+            settings.advanced.maxUploadThreads + EXTRA_POOL_CONNECTIONS
+        return (poolSize, settings.miscellaneous.httpMaxRetries,
+                settings.miscellaneous.httpRetryBackoff)
+
+    @staticmethod
+    def CreateSession(poolSize, maxRetries, retryBackoff):
+        """
+        Create a requests.Session with a connection pool of the specified
+        size, which retries idempotent requests after connection errors or
+        transient server errors.
+        """
+        retryKwargs = {RETRY_METHODS_ARG: RETRY_METHODS}
+        retry = Retry(
+            total=maxRetries, backoff_factor=retryBackoff,
+            status_forcelist=RETRY_STATUS_CODES, raise_on_status=False,
+            **retryKwargs)
+        adapter = HTTPAdapter(
+            pool_connections=poolSize, pool_maxsize=poolSize,
+            max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def GetSession(self, settings):
+        """
+        Return the shared session, creating it if necessary, or recreating
+        it if the settings which determine its configuration have changed.
+        """
+        config = MyTardisSession.GetConfig(settings)
+        with LOCKS.createSession:
+            if self._session is None or self._config != config:
+                if self._session is not None:
+                    self._session.close()
+                self._session = MyTardisSession.CreateSession(*config)
+                self._config = config
+            return self._session
+
+    def Close(self):
+        """
+        Close the shared session's pooled connections.
+        """
+        with LOCKS.createSession:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._config = None
+
+    def Request(self, method, url, settings=None, **kwargs):
+        """
+        Make an HTTP request using the shared session.
+
+        If no headers are supplied, the default headers (providing
+        authorization for the MyTardis API) are used.  If no timeout
+        is supplied, the connection timeout and HTTP read timeout from
+        MyData's settings are used.
+        """
+        if settings is None:
+            from ..settings import SETTINGS
+            settings = SETTINGS
+        if kwargs.get('headers') is None:
+            kwargs['headers'] = settings.defaultHeaders
+        if 'timeout' not in kwargs:
+            kwargs['timeout'] = (settings.miscellaneous.connectionTimeout,
+                                 settings.miscellaneous.httpReadTimeout)
+        return self.GetSession(settings).request(method, url, **kwargs)
+
+    def Get(self, url, **kwargs):
+        """
+        Make an HTTP GET request using the shared session.
+        """
+        return self.Request("GET", url, **kwargs)
+
+    def Post(self, url, **kwargs):
+        """
+        Make an HTTP POST request using the shared session.
+        """
+        return self.Request("POST", url, **kwargs)
+
+    def Put(self, url, **kwargs):
+        """
+        Make an HTTP PUT request using the shared session.
+        """
+        return self.Request("PUT", url, **kwargs)
+
+    def Patch(self, url, **kwargs):
+        """
+        Make an HTTP PATCH request using the shared session.
+        """
+        return self.Request("PATCH", url, **kwargs)
+
+
+HTTP_SESSION = MyTardisSession()
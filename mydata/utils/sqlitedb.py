@@ -0,0 +1,95 @@
+"""
+Base class for MyData's on-disk SQLite databases, i.e. the verified
+datafiles cache, the checksum cache, the MyTardis lookup cache and the
+dataview history.
+
+Each database is shared between MyData's threads, so its connection is
+created with check_same_thread=False, and every use of the connection
+must hold the database's lock.  The databases use write-ahead logging,
+so readers don't block the writer, and they are only synced to disk at
+checkpoints, because they can be rebuilt if they are lost.
+"""
+import sqlite3
+import traceback
+
+from ..logs import logger
+
+
+class SqliteDatabase(object):
+    """
+    An on-disk SQLite database shared between MyData's threads.
+
+    Subclasses set description (used in log messages) and implement
+    CreateTables.
+    """
+    description = "database"
+
+    def __init__(self, lock):
+        """
+        :param lock: The lock (from LOCKS) to hold while using the
+            database's connection
+        """
+        self.path = None
+        self.connection = None
+        self.lock = lock
+
+    def Open(self, path):
+        """
+        Open (or create) the database at path.
+
+        Returns True if the database was opened, or logs a warning and
+        returns False if it couldn't be opened.
+        """
+        self.Close()
+        with self.lock:
+            self.path = path
+            try:
+                self.connection = sqlite3.connect(
+                    path, check_same_thread=False)
+                self.connection.execute("PRAGMA journal_mode=WAL")
+                self.connection.execute("PRAGMA synchronous=NORMAL")
+                with self.connection:
+                    self.CreateTables()
+            except sqlite3.Error:
+                logger.warning("Couldn't open %s." % self.description)
+                logger.warning(traceback.format_exc())
+                self.connection = None
+            return self.connection is not None
+
+    def CreateTables(self):
+        """
+        Create the database's tables if they don't already exist.
+
+        Called from Open in a transaction, while holding the lock.
+        """
+        raise NotImplementedError()
+
+    def IsOpen(self):
+        """
+        Returns True if the database is open.
+        """
+        return self.connection is not None
+
+    def Checkpoint(self):
+        """
+        Write the database's log back into the database file before it is
+        closed, so the log file doesn't keep growing.
+
+        Called from Close while holding the lock.
+        """
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def Close(self):
+        """
+        Close the database.
+        """
+        with self.lock:
+            if not self.connection:
+                return
+            try:
+                self.Checkpoint()
+                self.connection.close()
+            except sqlite3.Error:
+                logger.warning("Couldn't close %s." % self.description)
+                logger.warning(traceback.format_exc())
+            self.connection = None
@@ -0,0 +1,389 @@
+"""
+Optional pool of worker processes for the CPU-intensive parts of uploads,
+i.e. calculating MD5 checksums and encrypting SFTP transfers (which
+Paramiko does in Python), so that they don't contend for the GIL when
+several upload threads are running.
+
+The upload worker threads still run each UploadDatafileRunnable, so
+DataFile records are created, progress is displayed in the Uploads view
+and UploadCompleteEvent is posted from the main process as usual, but
+each file's checksum calculation and transfer are delegated to a worker
+process.  Progress updates are sent back to the main process through a
+multiprocessing queue, and cancellations are signalled to the worker
+processes through a shared array of flags.
+
+Worker processes are started with the "spawn" method, because forking a
+process which is running other threads (including wxPython's) isn't safe.
+
+Usage:
+
+    from ..utils.uploadprocesses import UPLOAD_PROCESSES
+    if UPLOAD_PROCESSES.enabled:
+        md5sum = UPLOAD_PROCESSES.UploadFile(...)
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import partial
+import itertools
+import multiprocessing
+import os
+from queue import Queue
+import threading
+import time
+import traceback
+
+from paramiko.ssh_exception import SSHException
+
+from ..events.stop import ShouldCancelUpload
+from ..logs import logger
+from ..settings import SETTINGS
+from ..threads.locks import LOCKS
+from .checksums import ReadMd5Sum
+from .openssh import MakeRemoteDirs
+from .openssh import OpenSftpConnection
+from .openssh import ShouldUploadInParallel
+from .openssh import UploadFileFromOffset
+from .openssh import UploadFileInParallel
+
+
+class WorkerProcessState(object):
+    """
+    State of a worker process, set by InitializeWorker when the process
+    starts, and the SFTP connection it caches between uploads.
+    """
+    def __init__(self):
+        self.progressQueue = None
+        self.canceledSlots = None
+        self.connectionArgs = None
+        self.transport = None
+        self.sftp = None
+
+
+WORKER_STATE = WorkerProcessState()
+
+
+def InitializeWorker(progressQueue, canceledSlots, mydataConfig):
+    """
+    Initialize a worker process.
+
+    Worker processes don't load MyData.cfg or receive settings updates, so
+    the settings which affect uploads are copied from the main process.
+    """
+    WORKER_STATE.progressQueue = progressQueue
+    WORKER_STATE.canceledSlots = canceledSlots
+    for key, value in mydataConfig.items():
+        SETTINGS[key] = value
+
+
+def GetWorkerSftpConnection(username, privateKeySource, host, port):
+    """
+    Return the worker process's SFTP connection, opening a new one if
+    it hasn't been opened yet, or if it has been dropped.
+
+    The private key is loaded from the file in privateKeySource, a
+    (keyClass, privateKeyFilePath) tuple, using the same Paramiko key class
+    which loaded the key pair in the main process.
+
+    :return: (sftp, connectionArgs) tuple, where connectionArgs can be
+        used to open additional connections for parallel uploads.
+    """
+    if not WORKER_STATE.transport or \
+            not WORKER_STATE.transport.is_active() or \
+            WORKER_STATE.connectionArgs[2:] != (host, port):
+        if WORKER_STATE.transport:
+            WORKER_STATE.transport.close()
+        keyClass, privateKeyFilePath = privateKeySource
+        privateKey = keyClass.from_private_key_file(privateKeyFilePath)
+        WORKER_STATE.connectionArgs = (username, privateKey, host, port)
+        WORKER_STATE.transport, WORKER_STATE.sftp = \
+            OpenSftpConnection(*WORKER_STATE.connectionArgs)
+    return WORKER_STATE.sftp, WORKER_STATE.connectionArgs
+
+
+class WorkerTask(object):
+    """
+    A task running in a worker process.
+
+    Provides the subset of UploadModel's interface used by
+    mydata.utils.openssh's upload functions.
+    """
+    def __init__(self, taskId, slot):
+        self.taskId = taskId
+        self.slot = slot
+        self.bytesUploadedPreviously = None
+        self.byteRanges = []
+        self.lastProgressTime = 0
+
+    def IsCanceled(self):
+        """
+        Return True if the main process has canceled this task
+        """
+        return bool(WORKER_STATE.canceledSlots[self.slot])
+
+    def ProgressCallback(self, *args, **kwargs):
+        """
+        Send a progress update to the main process, unless one was sent
+        less than SETTINGS.miscellaneous.progressPollInterval seconds ago
+        (updates with messages are always sent).
+        """
+        now = time.time()
+        if not kwargs.get('message') and now - self.lastProgressTime < \
+                SETTINGS.miscellaneous.progressPollInterval:
+            return
+        self.lastProgressTime = now
+        WORKER_STATE.progressQueue.put((self.taskId, args, kwargs))
+
+    def SetLatestTime(self, latestTime):
+        """
+        The main process records the time of each progress update
+        """
+
+
+def CalculateMd5SumInWorker(taskId, slot, path, fileSize):
+    """
+    Calculate a file's MD5 checksum in a worker process.
+    """
+    task = WorkerTask(taskId, slot)
+    return ReadMd5Sum(
+        path, fileSize, task.ProgressCallback, task.IsCanceled)
+
+
+def UploadFileInWorker(taskId, slot, filePath, fileSize, connectionArgs,
+                       remoteFilePath, calculateMd5Sum):
+    """
+    Upload a file to staging in a worker process.
+
+    :param connectionArgs: (username, privateKeySource, host, port), see
+        GetWorkerSftpConnection
+    :return: (md5sum, bytesUploadedPreviously) tuple, or None if the
+        upload was canceled.
+    """
+    task = WorkerTask(taskId, slot)
+    sftp, connectionArgs = GetWorkerSftpConnection(*connectionArgs)
+    remoteDir = os.path.dirname(remoteFilePath)
+    try:
+        MakeRemoteDirs(sftp, remoteDir)
+    except IOError:
+        # Another worker process may have just created the same directory:
+        MakeRemoteDirs(sftp, remoteDir)
+    if task.IsCanceled():
+        return None
+    md5sum = None
+    if ShouldUploadInParallel(fileSize, calculateMd5Sum):
+        UploadFileInParallel(
+            sftp, filePath, fileSize, connectionArgs, remoteFilePath,
+            task.ProgressCallback, task,
+            SETTINGS.miscellaneous.parallelUploadStreams, task.IsCanceled)
+    else:
+        md5sum = UploadFileFromOffset(
+            sftp, filePath, fileSize, remoteFilePath, task.ProgressCallback,
+            task, calculateMd5Sum, task.IsCanceled, reportBytesWritten=True)
+    if task.IsCanceled():
+        return None
+    sftp.chmod(remoteFilePath, 0o660)
+    return md5sum, task.bytesUploadedPreviously
+
+
+class UploadProcessPool(object):
+    """
+    Pool of worker processes for calculating checksums and uploading files
+    to staging, which is started when it is first needed and shut down
+    once uploads have finished.
+    """
+    def __init__(self):
+        self.executor = None
+        self.progressQueue = None
+        self.progressThread = None
+        self.canceledSlots = None
+        self.freeSlots = None
+        self.progressCallbacks = dict()
+        self.taskIds = itertools.count(1)
+
+    @property
+    def enabled(self):
+        """
+        Whether checksums and uploads should be delegated to worker processes
+        """
+        return SETTINGS.miscellaneous.uploadProcesses > 0
+
+    def Start(self):
+        """
+        Start the worker processes, unless they are already running.
+        """
+        with LOCKS.uploadProcesses:
+            if self.executor:
+                return
+            self.StopDispatchingProgressUpdates()
+            numProcesses = SETTINGS.miscellaneous.uploadProcesses
+            # Each upload thread and checksum thread waits for one task
+            # at a time, and each task needs a cancellation flag:
+            numSlots = SETTINGS.advanced.maxUploadThreads + \
+                SETTINGS.miscellaneous.maxChecksumThreads
+            logger.debug("Starting %d upload worker processes."
+                         % numProcesses)
+            context = multiprocessing.get_context("spawn")
+            self.progressQueue = context.Queue()
+            self.canceledSlots = context.RawArray('b', numSlots)
+            self.freeSlots = Queue()
+            for slot in range(numSlots):
+                self.freeSlots.put(slot)
+            mydataConfig = dict(SETTINGS.advanced.mydataConfig)
+            mydataConfig.update(SETTINGS.miscellaneous.mydataConfig)
+            self.executor = ProcessPoolExecutor(
+                max_workers=numProcesses, mp_context=context,
+                initializer=InitializeWorker,
+                initargs=(self.progressQueue, self.canceledSlots,
+                          mydataConfig))
+            self.progressThread = threading.Thread(
+                target=self.DispatchProgressUpdates,
+                args=(self.progressQueue,), name="UploadProgressThread")
+            self.progressThread.daemon = True
+            self.progressThread.start()
+
+    def DispatchProgressUpdates(self, progressQueue):
+        """
+        Pass progress updates from the worker processes to the callbacks
+        supplied by the tasks' callers in the main process.
+        """
+        while True:
+            update = progressQueue.get()
+            if update is None:
+                return
+            taskId, args, kwargs = update
+            progressCallback = self.progressCallbacks.get(taskId)
+            if progressCallback:
+                try:
+                    progressCallback(*args, **kwargs)
+                except:
+                    logger.error(traceback.format_exc())
+
+    def Run(self, function, args, progressCallback=None,
+            canceledCallback=None):
+        """
+        Run function(taskId, slot, *args) in a worker process, and wait for
+        its result.
+
+        While waiting, the task is canceled if canceledCallback returns
+        True, and progress updates from the task are passed to
+        progressCallback.
+
+        :raises BrokenProcessPool: if a worker process was terminated
+            abruptly, in which case new worker processes will be started
+            for subsequent tasks.
+        """
+        self.Start()
+        # If the pool breaks, it will be replaced, so the task's slot
+        # needs to be returned to the pool it was taken from:
+        executor = self.executor
+        freeSlots = self.freeSlots
+        canceledSlots = self.canceledSlots
+        slot = freeSlots.get()
+        taskId = next(self.taskIds)
+        canceledSlots[slot] = 0
+        if progressCallback:
+            self.progressCallbacks[taskId] = progressCallback
+        try:
+            future = executor.submit(function, taskId, slot, *args)
+            while True:
+                try:
+                    return future.result(
+                        timeout=SETTINGS.miscellaneous.progressPollInterval)
+                except FutureTimeoutError:
+                    if canceledCallback and canceledCallback():
+                        canceledSlots[slot] = 1
+        except BrokenProcessPool:
+            logger.error(traceback.format_exc())
+            with LOCKS.uploadProcesses:
+                if self.executor is executor:
+                    executor.shutdown(wait=False)
+                    self.executor = None
+            raise
+        finally:
+            self.progressCallbacks.pop(taskId, None)
+            freeSlots.put(slot)
+
+    def CalculateMd5Sum(self, path, fileSize, progressCallback=None,
+                        canceledCallback=None):
+        """
+        Calculate a file's MD5 checksum in a worker process.
+
+        :return: the checksum, or None if the calculation was canceled.
+        """
+        try:
+            return self.Run(
+                CalculateMd5SumInWorker, (path, fileSize), progressCallback,
+                canceledCallback)
+        except BrokenProcessPool as err:
+            raise IOError("Couldn't calculate MD5 sum for %s: %s"
+                          % (path, err))
+
+    def UploadFile(self, filePath, fileSize, username, keyPair,
+                   host, port, remoteFilePath, progressCallback,
+                   uploadModel, calculateMd5Sum=False):
+        """
+        Upload a file to staging in a worker process, see
+        mydata.utils.openssh.UploadFile.
+
+        The key pair's private key is loaded from its file by the worker
+        process, because Paramiko's key objects can't be pickled.
+        """
+        privateKeySource = \
+            (type(keyPair.privateKey), keyPair.privateKeyFilePath)
+        progressCallback(current=0, total=fileSize, message="Uploading...")
+        uploadModel.startTime = datetime.now()
+
+        def UploadProgressCallback(current, total, message=None):
+            """
+            Record the time of each progress update from the worker
+            process, so that the upload speed can be estimated.
+            """
+            uploadModel.SetLatestTime(datetime.now())
+            progressCallback(current=current, total=total, message=message)
+
+        try:
+            result = self.Run(
+                UploadFileInWorker,
+                (filePath, fileSize,
+                 (username, privateKeySource, host, port),
+                 remoteFilePath, calculateMd5Sum),
+                UploadProgressCallback,
+                partial(ShouldCancelUpload, uploadModel))
+        except BrokenProcessPool as err:
+            raise SSHException(
+                "Upload worker process terminated while uploading %s: %s"
+                % (filePath, err))
+        if not result or ShouldCancelUpload(uploadModel):
+            return None
+        md5sum, uploadModel.bytesUploadedPreviously = result
+        uploadModel.SetLatestTime(datetime.now())
+        progressCallback(current=fileSize, total=fileSize)
+        return md5sum
+
+    def Shutdown(self):
+        """
+        Shut down the worker processes, once all of their tasks have
+        finished.
+        """
+        with LOCKS.uploadProcesses:
+            if self.executor:
+                logger.debug("Shutting down upload worker processes.")
+                self.executor.shutdown(wait=True)
+                self.executor = None
+            self.StopDispatchingProgressUpdates()
+
+    def StopDispatchingProgressUpdates(self):
+        """
+        Stop the thread which dispatches progress updates from the worker
+        processes, once any updates already queued have been dispatched.
+        """
+        if self.progressThread:
+            self.progressQueue.put(None)
+            self.progressThread.join()
+            self.progressThread = None
+            self.progressQueue.close()
+            self.progressQueue = None
+
+
+UPLOAD_PROCESSES = UploadProcessPool()
@@ -9,6 +9,8 @@ import wx.dataview as dv
 
 from ..dataviewmodels.dataview import ColumnRenderer
 from ..dataviewmodels.dataview import DATAVIEW_MODELS
+from ..settings import SETTINGS
+from .history import HistoryFrame
 
 
 class MyDataDataView(wx.Panel):
@@ -63,3 +65,27 @@ class MyDataDataView(wx.Panel):
         sizer = wx.BoxSizer(wx.VERTICAL)
         self.SetSizer(sizer)
         sizer.Add(self.dataViewControl, 1, wx.EXPAND)
+
+        # When the view only keeps the most recent completed rows, older
+        # rows can be searched in a separate window:
+        self.dataViewModelName = dataViewModelName
+        self.historyFrame = None
+        if dataViewModel.historyName and \
+                SETTINGS.miscellaneous.maxCompletedDataViewRows > 0:
+            historyButton = wx.Button(self, wx.ID_ANY, "History...")
+            self.Bind(wx.EVT_BUTTON, self.OnHistory, historyButton)
+            sizer.Add(historyButton, 0, wx.ALIGN_RIGHT | wx.ALL, 3)
+
+    def OnHistory(self, event):  # pylint: disable=unused-argument
+        """
+        Show the completed rows which have been removed from this view.
+        """
+        dataViewModel = DATAVIEW_MODELS[self.dataViewModelName]
+        if not self.historyFrame:
+            self.historyFrame = HistoryFrame(
+                self, dataViewModel,
+                "MyData - %s History" % dataViewModel.historyName.title())
+        self.historyFrame.listCtrl.Search(
+            self.historyFrame.searchCtrl.GetValue())
+        self.historyFrame.Show()
+        self.historyFrame.Raise()
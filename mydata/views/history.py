@@ -0,0 +1,110 @@
+"""
+Window for searching the completed rows which have been moved from the
+Verifications or Uploads view to the on-disk history log, when those views
+are bounded by max_completed_dataview_rows in MyData.cfg.
+"""
+import wx
+
+from ..dataviewmodels.dataview import ColumnRenderer
+from ..utils.history import DATAVIEW_HISTORY
+
+# Number of rows read from the history log at a time, as they are scrolled
+# into view:
+PAGE_SIZE = 200
+
+
+class HistoryListCtrl(wx.ListCtrl):
+    """
+    Virtual list control, which only reads the rows it displays from the
+    history log, so it can display millions of rows.
+    """
+    def __init__(self, parent, dataViewModel):
+        wx.ListCtrl.__init__(
+            self, parent, wx.ID_ANY,
+            style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_HRULES | wx.LC_VRULES)
+        self.historyName = dataViewModel.historyName
+        self.columnKeys = []
+        for col in range(dataViewModel.GetColumnCount()):
+            if dataViewModel.GetColumnRenderer(col) != ColumnRenderer.TEXT:
+                continue
+            self.InsertColumn(
+                len(self.columnKeys), dataViewModel.GetColumnName(col),
+                width=dataViewModel.GetDefaultColumnWidth(col))
+            self.columnKeys.append(dataViewModel.GetColumnKeyName(col))
+        self.query = ""
+        self.pageOffset = None
+        self.page = []
+
+    def Search(self, query):
+        """
+        Only display rows containing query in any of their columns.
+        """
+        self.query = query
+        self.pageOffset = None
+        self.SetItemCount(
+            DATAVIEW_HISTORY.GetCount(self.historyName, self.query))
+        self.Refresh()
+
+    def OnGetItemText(self, item, col):
+        """
+        Return the text to display in the specified row and column.
+        """
+        pageOffset = item - item % PAGE_SIZE
+        if pageOffset != self.pageOffset:
+            self.page = DATAVIEW_HISTORY.Query(
+                self.historyName, self.query, offset=pageOffset,
+                limit=PAGE_SIZE)
+            self.pageOffset = pageOffset
+        try:
+            _, values = self.page[item - pageOffset]
+        except IndexError:
+            return ""
+        return values.get(self.columnKeys[col], "")
+
+
+class HistoryFrame(wx.Frame):
+    """
+    Window for searching the completed rows which have been moved from
+    the Verifications or Uploads view to the on-disk history log.
+    """
+    def __init__(self, parent, dataViewModel, title):
+        wx.Frame.__init__(
+            self, parent, wx.ID_ANY, title, size=(900, 500),
+            style=wx.DEFAULT_FRAME_STYLE | wx.FRAME_FLOAT_ON_PARENT)
+        self.Bind(wx.EVT_CLOSE, self.OnCloseFrame)
+        panel = wx.Panel(self, wx.ID_ANY)
+
+        self.searchCtrl = wx.SearchCtrl(
+            panel, size=(200, -1), style=wx.TE_PROCESS_ENTER)
+        self.searchCtrl.SetDescriptiveText("Search")
+        self.searchCtrl.ShowCancelButton(True)
+        self.Bind(wx.EVT_TEXT, self.OnSearch, self.searchCtrl)
+        self.Bind(wx.EVT_SEARCHCTRL_CANCEL_BTN, self.OnCancelSearch,
+                  self.searchCtrl)
+
+        self.listCtrl = HistoryListCtrl(panel, dataViewModel)
+
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(self.searchCtrl, flag=wx.ALIGN_RIGHT | wx.ALL, border=5)
+        sizer.Add(self.listCtrl, 1, flag=wx.EXPAND)
+        panel.SetSizer(sizer)
+
+        self.listCtrl.Search("")
+
+    def OnSearch(self, event):
+        """
+        Called when the user types into the search field.
+        """
+        self.listCtrl.Search(event.GetString())
+
+    def OnCancelSearch(self, event):  # pylint: disable=unused-argument
+        """
+        Called when the user clears the search field.
+        """
+        self.searchCtrl.SetValue("")
+
+    def OnCloseFrame(self, event):  # pylint: disable=unused-argument
+        """
+        Don't actually destroy the frame, just hide it.
+        """
+        self.Hide()
@@ -52,6 +52,13 @@ def ShowMessageDialog(event):
         return
     with LOCKS.updateLastErrorMessage:
         globals()['LAST_ERROR_MESSAGE'] = event.message
+    if not wx.GetApp():
+        # Running headless, so there's no one to show a dialog to:
+        if event.icon == wx.ICON_ERROR:
+            logger.error(event.message)
+        else:
+            logger.warning(event.message)
+        return
     if event.icon == wx.ICON_ERROR:
         FLAGS.showingErrorDialog = True
     dlg = wx.MessageDialog(None, event.message, event.title,
@@ -19,9 +19,11 @@ import wx
 from ..settings import SETTINGS
 from ..models.settings.serialize import LoadSettings
 from ..models.settings.serialize import SaveFieldsFromDialog
+from ..models.settings.validation import CONTINUOUS_UNAVAILABLE_MESSAGE
 from ..utils import BeginBusyCursorIfRequired
 from ..utils import EndBusyCursorIfRequired
 from ..utils.autostart import IsMyDataShortcutInWinStartupItems
+from ..utils.inotify import IsSupported as IsInotifySupported
 from ..logs import logger
 from ..events import MYDATA_EVENTS
 from ..events import PostEvent
@@ -254,13 +256,25 @@ class SettingsDialog(wx.Dialog):
                                                       "Schedule type"))
 
         choices = ["On Startup", "On Settings Saved", "Manually",
-                   "Once", "Daily", "Weekly", "Timer"]
+                   "Once", "Daily", "Weekly", "Timer", "Continuous"]
         self.scheduleTypeComboBox = wx.ComboBox(self.scheduleTypePanel,
                                                 choices=choices,
                                                 style=wx.CB_READONLY)
         self.scheduleTypeComboBox.SetMinSize((150, -1))
         self.scheduleTypeComboBox.SetSelection(0)
+        self.lastScheduleType = self.scheduleTypeComboBox.GetValue()
         self.scheduleTypePanelSizer.Add(self.scheduleTypeComboBox)
+        # A wx.ComboBox's choices can't be disabled individually, so if
+        # the Continuous schedule type is unavailable, the reason is shown
+        # below the combo box, and selecting it is reverted in
+        # OnScheduleTypeChange:
+        if not IsInotifySupported():
+            self.continuousUnavailableLabel = wx.StaticText(
+                self.scheduleTypePanel, wx.ID_ANY,
+                CONTINUOUS_UNAVAILABLE_MESSAGE)
+            self.scheduleTypePanelSizer.Add(self.continuousUnavailableLabel)
+            self.scheduleTypeComboBox.SetToolTip(
+                CONTINUOUS_UNAVAILABLE_MESSAGE)
         self.Bind(wx.EVT_COMBOBOX, self.OnScheduleTypeChange,
                   self.scheduleTypeComboBox)
         self.scheduleTypePanel.SetSizerAndFit(self.scheduleTypePanelSizer)
@@ -1863,6 +1877,11 @@ class SettingsDialog(wx.Dialog):
 
     def OnScheduleTypeChange(self, event):
         scheduleType = self.scheduleTypeComboBox.GetValue()
+        if event and scheduleType == "Continuous" and \
+                not IsInotifySupported():
+            self.scheduleTypeComboBox.SetValue(self.lastScheduleType)
+            scheduleType = self.lastScheduleType
+        self.lastScheduleType = scheduleType
         if scheduleType in ("On Startup", "On Settings Saved"):
             self.SetScheduledDate(datetime.date(datetime.now()))
             self.SetScheduledTime(datetime.time(datetime.now()))
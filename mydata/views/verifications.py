@@ -41,7 +41,7 @@ class VerificationsDataView(MyDataDataView):
         Update the cache hit summary.
         """
         hits = DATAVIEW_MODELS['verifications'].GetFoundInCacheCount()
-        total = DATAVIEW_MODELS['verifications'].GetCount() + hits
+        total = DATAVIEW_MODELS['verifications'].GetTotalRowCount() + hits
         self.cacheHitSummary.SetLabel(
             "%s of %s datafile lookups found in cache." % (hits, total))
         if event:
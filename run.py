@@ -11,7 +11,13 @@ Only the very latest pre-release wxPython (3.0.3.dev)
 is pip-installable.  For earlier versions (2.9.5 or
 3.0.2), use the installer from http://wxpython.org
 """
+import multiprocessing
 import sys
 import mydata.MyData
 
-mydata.MyData.Run(sys.argv)
+if __name__ == "__main__":
+    # Upload worker processes (see mydata.utils.uploadprocesses) import
+    # this module, so it mustn't launch MyData unless it is run directly,
+    # and in frozen builds, the worker processes need freeze_support:
+    multiprocessing.freeze_support()
+    mydata.MyData.Run(sys.argv)
@@ -491,6 +491,7 @@ SETUP_ARGS = dict(name=APP_NAME,
                       'install': CustomInstallCommand,
                   },
                   setup_requires=SETUP_REQUIRES,
+                  python_requires=">=3.7",
                   scripts=["run.py"],
                   long_description="GUI for uploading data to MyTardis",
                   classifiers=[
@@ -502,6 +503,8 @@ SETUP_ARGS = dict(name=APP_NAME,
                       "Operating System :: Microsoft :: Windows",
                       "Operating System :: MacOS :: MacOS X",
                       "Programming Language :: Python",
+                      "Programming Language :: Python :: 3",
+                      "Programming Language :: Python :: 3 :: Only",
                       "Topic :: Database :: Front-Ends",
                       "Topic :: System :: Archiving",
                   ])